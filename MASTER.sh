@@ -21,6 +21,10 @@ JLCPCB="$OUT/jlcpcb_bundle"
 # Setup directories
 mkdir -p "$OUT/gerbers" "$REPORTS" "$BACKUP" "$DOCS" "$AUTO" "$JLCPCB"
 
+# Trace every step: spans land in one run, summarised at the end
+export VIKINGBOARD_TRACE="$(python3 tools/vikingboard_trace.py start --label master)"
+TR="python3 tools/vikingboard_trace.py exec"
+
 # Check tools
 [[ -f "$K" ]] && echo "✅ KiCad CLI" || { echo "❌ KiCad missing"; exit 1; }
 command -v kikit &> /dev/null && KIKIT_OK=1 && echo "✅ KiKit CLI" || { KIKIT_OK=0; echo "⚠️  KiKit not found"; }
@@ -30,70 +34,37 @@ command -v kikit &> /dev/null && KIKIT_OK=1 && echo "✅ KiKit CLI" || { KIKIT_O
 echo ""
 echo "💾 Backing up..."
 T=$(date +%Y%m%d_%H%M%S)
-cp "$PCB" "$BACKUP/Vikingboard_${T}.kicad_pcb" 2>/dev/null
-cp "$SCH" "$BACKUP/Vikingboard_${T}.kicad_sch" 2>/dev/null
-echo "✅ Backup saved: $T"
-
-echo ""
-echo "📐 Exporting Gerbers..."
-$K pcb export gerbers --output "$OUT/gerbers/" "$PCB" 2>/dev/null
-$K pcb export drill --output "$OUT/gerbers/" "$PCB" 2>/dev/null
-ZIP="$OUT/vikingboard_gerbers_$(date +%Y%m%d).zip"
-cd "$OUT/gerbers" && zip -q -r "../$(basename $ZIP)" * && cd - > /dev/null
-echo "✅ Gerbers: $(du -h "$ZIP" | awk '{print $1}')"
+$TR backup -- python3 tools/vikingboard_backup.py snapshot --timestamp "$T" "$PCB" "$SCH"
 
 echo ""
-echo "📋 Exporting BOM/CPL..."
-$K sch export bom --output "$OUT/vikingboard_bom.csv" "$SCH" 2>/dev/null
+echo "🚀 Running export pipeline (parallel, skips unchanged stages)..."
+KICAD_CLI="$K" python3 tools/vikingboard_pipeline.py --layout master || echo "⚠️  Some pipeline stages failed"
+ZIP="$OUT/vikingboard_gerbers.zip"
+echo "✅ Gerbers: $(du -h "$ZIP" 2>/dev/null | awk '{print $1}')"
 BOM=$(($(wc -l < "$OUT/vikingboard_bom.csv") - 1))
 echo "✅ BOM: $BOM components"
-
-$K pcb export pos --output "$OUT/vikingboard_cpl.csv" --units mm --side front "$PCB" 2>/dev/null
 CPL=$(($(wc -l < "$OUT/vikingboard_cpl.csv") - 1))
 echo "✅ CPL: $CPL placements"
 
-echo ""
-echo "🏭 Creating KiKit JLCPCB Bundle..."
-if [[ $KIKIT_OK -eq 1 ]]; then
-    kikit fab jlcpcb \
-      --assembly \
-      --schematic "$SCH" \
-      --no-drc \
-      "$PCB" \
-      "$JLCPCB" 2>/dev/null && echo "✅ KiKit bundle created" || echo "⚠️  KiKit bundle failed"
-    
-    if [[ -d "$JLCPCB" ]] && [[ -n "$(ls -A $JLCPCB 2>/dev/null)" ]]; then
-        JLCZIP="$OUT/jlcpcb_complete_$(date +%Y%m%d).zip"
-        cd "$JLCPCB" && zip -q -r "../$(basename $JLCZIP)" * && cd - > /dev/null
-        echo "✅ JLCPCB ZIP: $(du -h "$JLCZIP" | awk '{print $1}')"
-    fi
-else
-    echo "⚠️  KiKit not available, skipping JLCPCB bundle"
-    JLCZIP=""
+JLCZIP=""
+if [[ $KIKIT_OK -eq 1 ]] && [[ -d "$JLCPCB" ]] && [[ -n "$(ls -A $JLCPCB 2>/dev/null)" ]]; then
+    JLCZIP="$OUT/jlcpcb_complete_$(date +%Y%m%d).zip"
+    $TR bundle -- python3 tools/vikingboard_bundle.py build "$JLCZIP" "$JLCPCB" > /dev/null
+    echo "✅ JLCPCB ZIP: $(du -h "$JLCZIP" | awk '{print $1}')"
 fi
 
-echo ""
-echo "✅ Running DRC..."
-$K pcb drc --output "$REPORTS/drc_report.txt" --severity-all "$PCB" 2>/dev/null
-VIOL=$(grep -c "violations" "$REPORTS/drc_report.txt" 2>/dev/null || echo "0")
-UNCON=$(grep -c "unconnected_items" "$REPORTS/drc_report.txt" 2>/dev/null || echo "0")
+VIOLATIONS=0; UNCONNECTED=0
+[[ -f "$REPORTS/drc_report.txt" ]] && eval "$(python3 tools/vikingboard_drc.py "$REPORTS/drc_report.txt" --format shell)"
+VIOL=$VIOLATIONS
+UNCON=$UNCONNECTED
 if [[ $UNCON -eq 0 ]]; then
-    echo "✅ Perfect - No issues"
+    echo "✅ DRC: Perfect - No issues"
 else
-    echo "⚠️  $VIOL violations, $UNCON unconnected"
+    echo "⚠️  DRC: $VIOL violations, $UNCON unconnected"
 fi
 
-echo ""
-echo "📄 Exporting Documentation..."
-$K sch export pdf --output "$DOCS/schematic.pdf" "$SCH" 2>/dev/null
-$K pcb export pdf --output "$DOCS/pcb.pdf" --layers "F.Cu,B.Cu,Edge.Cuts" "$PCB" 2>/dev/null
-$K pcb export svg --output "$DOCS/" --layers "F.Cu" "$PCB" 2>/dev/null || true
-echo "✅ PDFs exported"
-
-echo ""
-echo "🎯 Exporting 3D Model..."
-$K pcb export step --output "$OUT/vikingboard_3d.step" "$PCB" 2>/dev/null
-echo "✅ STEP: $(du -h "$OUT/vikingboard_3d.step" | awk '{print $1}')"
+$TR svg -- $K pcb export svg --output "$DOCS/" --layers "F.Cu" "$PCB" 2>/dev/null || true
+echo "✅ STEP: $(du -h "$OUT/vikingboard_3d.step" 2>/dev/null | awk '{print $1}')"
 
 echo ""
 echo "📊 Project Statistics..."
@@ -109,15 +80,9 @@ echo "📝 Creating Helper Scripts..."
 
 cat > "quick_export.sh" << 'QEXPORT'
 #!/bin/bash
-K="/Applications/KiCad/KiCad.app/Contents/MacOS/kicad-cli"
-OUT="production_output"
-PCB="kicad/Vikingboard.kicad_pcb"
-mkdir -p "$OUT/gerbers"
-$K pcb export gerbers --output "$OUT/gerbers/" "$PCB" 2>/dev/null
-$K pcb export drill --output "$OUT/gerbers/" "$PCB" 2>/dev/null
-ZIP="$OUT/quick_$(date +%H%M).zip"
-cd "$OUT/gerbers" && zip -q -r "../$(basename $ZIP)" * && cd - > /dev/null
-echo "Quick export: $ZIP"
+# Gerbers + drill + bundle only; unchanged stages are skipped
+python3 tools/vikingboard_pipeline.py --layout master bundle
+echo "Quick export: production_output/vikingboard_gerbers.zip"
 QEXPORT
 chmod +x quick_export.sh
 
@@ -132,7 +97,7 @@ cat > "check_status.sh" << 'CHECKSTATUS'
 #!/bin/bash
 echo "VikingBoard Status"
 echo "=================="
-[[ -f production_output/vikingboard_gerbers_*.zip ]] && echo "✅ Gerbers" || echo "❌ Gerbers"
+[[ -f production_output/vikingboard_gerbers*.zip ]] && echo "✅ Gerbers" || echo "❌ Gerbers"
 [[ -f production_output/vikingboard_bom.csv ]] && echo "✅ BOM" || echo "❌ BOM"
 [[ -f production_output/vikingboard_cpl.csv ]] && echo "✅ CPL" || echo "❌ CPL"
 [[ -f production_output/vikingboard_3d.step ]] && echo "✅ 3D Model" || echo "❌ 3D Model"
@@ -150,9 +115,9 @@ SCH="kicad/Vikingboard.kicad_sch"
 OUT="production_output/jlcpcb_bundle"
 mkdir -p "$OUT"
 echo "Creating JLCPCB bundle with KiKit..."
-kikit fab jlcpcb --assembly --schematic "$SCH" --no-drc "$PCB" "$OUT" 2>/dev/null
+python3 tools/vikingboard_pipeline.py --layout master kikit
 ZIP="production_output/jlcpcb_$(date +%Y%m%d_%H%M).zip"
-cd "$OUT" && zip -q -r "../../$(basename $ZIP)" * && cd - > /dev/null
+python3 tools/vikingboard_bundle.py build "$ZIP" "$OUT"
 echo "JLCPCB bundle: $ZIP"
 JLCSCRIPT
 chmod +x make_jlcpcb.sh
@@ -261,6 +226,7 @@ echo "CPL: $CPL placements" >> "$AUTO/last_run.log"
 echo "DRC violations: $VIOL" >> "$AUTO/last_run.log"
 echo "Unconnected pads: $UNCON" >> "$AUTO/last_run.log"
 echo "Components: $COMP_COUNT" >> "$AUTO/last_run.log"
+python3 tools/vikingboard_trace.py finish --label master --log "$AUTO/last_run.log" || true
 
 echo ""
 echo "╔════════════════════════════════════════════╗"
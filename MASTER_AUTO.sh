@@ -28,9 +28,8 @@ python3 automate_production.py
 echo "🎁 Lager JLCPCB-pakke..."
 ./make_jlcpcb.sh 2>/dev/null || {
     TIMESTAMP=$(date +%Y%m%d_%H%M%S)
-    cd production/gerbers
-    zip -q ../JLCPCB_${TIMESTAMP}.zip *.g* *.drl
-    cd ../..
+    python3 tools/vikingboard_bundle.py build "production/JLCPCB_${TIMESTAMP}.zip" production/gerbers \
+        --include '*.g*' --include '*.drl' > /dev/null
     echo "  ✅ production/JLCPCB_${TIMESTAMP}.zip"
 }
 
@@ -28,8 +28,7 @@ echo "  SCH: $SCH"
 echo ""
 echo "Backing up..."
 T=$(date +%Y%m%d_%H%M%S)
-cp "$PCB" "backups/pcb_$T.kicad_pcb"
-cp "$SCH" "backups/sch_$T.kicad_sch"
+python3 tools/vikingboard_backup.py snapshot --timestamp "$T" "$PCB" "$SCH"
 echo "Exporting gerbers..."
 $K pcb export gerbers --output "$OUT/gerbers/" "$PCB" 2>/dev/null
 $K pcb export drill --output "$OUT/gerbers/" "$PCB" 2>/dev/null
@@ -43,11 +42,18 @@ echo "Exporting 3D..."
 $K pcb export step --output "$OUT/3d.step" "$PCB" 2>/dev/null
 echo "Creating JLCPCB bundle..."
 ZIP="$OUT/JLCPCB_$(date +%Y%m%d_%H%M).zip"
-cd "$OUT/gerbers" && zip -q -r "../$(basename $ZIP)" * && cd - > /dev/null
+python3 tools/vikingboard_bundle.py build "$ZIP" "$OUT/gerbers"
+PREV=$(ls -t "$OUT"/JLCPCB_*.zip 2>/dev/null | grep -vx "$ZIP" | head -1)
+if [[ -n "$PREV" ]]; then
+    echo "Comparing with $(basename "$PREV")..."
+    python3 tools/vikingboard_gerber.py diff "$PREV" "$ZIP" || true
+fi
 echo "Running DRC..."
 $K pcb drc --output "$OUT/drc.txt" --severity-all "$PCB" 2>/dev/null
-VIOL=$(grep -c violations "$OUT/drc.txt" 2>/dev/null || echo 0)
-UNCON=$(grep -c unconnected "$OUT/drc.txt" 2>/dev/null || echo 0)
+VIOLATIONS=0; UNCONNECTED=0
+[[ -f "$OUT/drc.txt" ]] && eval "$(python3 tools/vikingboard_drc.py "$OUT/drc.txt" --format shell)"
+VIOL=$VIOLATIONS
+UNCON=$UNCONNECTED
 COMP=$(grep -c footprint "$PCB" 2>/dev/null || echo 0)
 echo ""
 echo "COMPLETE!"
@@ -58,7 +58,7 @@ echo "✅ All files exported"
 echo ""
 echo "📦 PHASE 5: JLCPCB Bundle"
 ZIP="$OUT/JLCPCB_$(date +%Y%m%d_%H%M).zip"
-cd "$OUT/gerbers" && zip -q -r "../$(basename $ZIP)" * && cd ../..
+python3 tools/vikingboard_bundle.py build "$ZIP" "$OUT/gerbers" > /dev/null
 echo "✅ JLCPCB bundle: $ZIP"
 
 echo ""
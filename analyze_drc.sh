@@ -2,7 +2,10 @@
 echo "DRC VIOLATION ANALYSE"
 echo "====================="
 echo ""
-echo "Total violations: $(grep -c '\[' production/drc.txt)"
-echo ""
-echo "Top violation types:"
-grep '\[.*\]:' production/drc.txt | cut -d'[' -f2 | cut -d']' -f1 | sort | uniq -c | sort -rn
+REPORT="${1:-production/drc.txt}"
+if [[ ! -f "$REPORT" ]]; then
+    echo "❌ No DRC report at $REPORT"
+    exit 1
+fi
+# Summary by category/rule/net, plus new/fixed entries since the previous run
+python3 tools/vikingboard_drc.py "$REPORT"
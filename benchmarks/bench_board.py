@@ -0,0 +1,21 @@
+"""Board parsing (tools/vikingboard_board.py), the base of most checks."""
+
+import pytest
+
+from vikingboard_board import load_board
+from vikingboard_cache import ParseCache
+
+
+@pytest.mark.benchmark(group="board-load")
+def bench_board_load(benchmark, synth):
+    board = benchmark(load_board, synth.pcb, cache=False)
+    assert len(board.footprints) > 0
+
+
+@pytest.mark.benchmark(group="board-load-cached")
+def bench_board_load_cached(benchmark, synth, tmp_path):
+    cache = ParseCache(tmp_path)
+    cache.board(synth.pcb)
+    board = benchmark(cache.board, synth.pcb)
+    assert cache.misses == 1
+    assert len(board.footprints) > 0
@@ -0,0 +1,23 @@
+"""BOM annotation against the local LCSC catalog."""
+
+import pytest
+
+from conftest import synth_config
+from vikingboard_lcsc import LcscCatalog, annotate_csv
+from vikingboard_synth import make_parts, write_bom
+
+
+@pytest.fixture(scope="module")
+def catalog(tmp_path_factory):
+    catalog = LcscCatalog.open(tmp_path_factory.mktemp("lcsc") / "catalog.sqlite")
+    yield catalog
+    catalog.close()
+
+
+@pytest.mark.benchmark(group="bom-annotate")
+def bench_bom_annotate(benchmark, size, catalog, tmp_path):
+    # One line per part, so the row count scales with the board
+    bom = tmp_path / "bom.csv"
+    write_bom(bom, make_parts(synth_config(size)), grouped=False)
+    rows, parts = benchmark(annotate_csv, catalog, bom)
+    assert len(rows) == len(parts) == size
@@ -0,0 +1,20 @@
+"""Documentation export (tools/vikingboard_export.py) of the spec net table."""
+
+import csv
+
+import pytest
+
+from vikingboard_export import CsvWriter, MarkdownWriter, export
+
+
+@pytest.mark.benchmark(group="docs-export")
+def bench_docs_export(benchmark, synth, tmp_path):
+    with open(synth.spec, newline="", encoding="utf-8") as f:
+        rows = [(r["Ref"], r["Pad"], r["Net"]) for r in csv.DictReader(f)]
+    targets = {tmp_path / "nets.md": MarkdownWriter(title="Synthetic net overview"),
+               tmp_path / "nets.csv": CsvWriter()}
+
+    # After the first round the files are unchanged, so this measures the
+    # steady state a docs run sees: render, hash, skip the write.
+    results = benchmark(export, rows, targets, sort=True)
+    assert all(r.size > 0 for r in results)
@@ -0,0 +1,11 @@
+"""DRC report parsing (tools/vikingboard_drc.py)."""
+
+import pytest
+
+from vikingboard_drc import DrcSummary
+
+
+@pytest.mark.benchmark(group="drc-parse")
+def bench_drc_parse(benchmark, synth):
+    summary = benchmark(DrcSummary.from_report, synth.drc)
+    assert summary.total > 0
@@ -0,0 +1,17 @@
+"""Net sync (pcb_scripts/vikingboard_nets.py) against the pcbnew stub."""
+
+import pytest
+
+
+@pytest.mark.benchmark(group="net-sync")
+def bench_net_sync(benchmark, synth, pcbnew, capsys):
+    import vikingboard_nets
+
+    spec = vikingboard_nets.build_spec_dict(vikingboard_nets.iter_net_rows_from_csv(synth.spec))
+
+    def setup():
+        return (spec,), {"board": pcbnew.LoadBoard(str(synth.pcb)), "dry_run": False}
+
+    changed = benchmark.pedantic(vikingboard_nets.apply_nets_from_spec, setup=setup, rounds=5)
+    capsys.readouterr()
+    assert changed > 0
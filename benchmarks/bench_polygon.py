@@ -0,0 +1,21 @@
+"""Zone outlines and fill estimates (tools/vikingboard_polygon.py)."""
+
+import pytest
+
+from vikingboard_board import load_board
+from vikingboard_polygon import board_zone_outline, estimate
+
+
+@pytest.mark.benchmark(group="zone-outline")
+def bench_zone_outline(benchmark, synth):
+    board = load_board(synth.pcb, cache=False)
+    region = benchmark(board_zone_outline, board, ["B.Cu"], 0.5)
+    assert region
+
+
+@pytest.mark.benchmark(group="zone-estimate")
+def bench_zone_estimate(benchmark, synth):
+    board = load_board(synth.pcb, cache=False)
+    zone = next(z for z in board.zones if not z.keepout)
+    result = benchmark(estimate, board, zone)
+    assert result.area > 0
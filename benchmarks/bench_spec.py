@@ -0,0 +1,39 @@
+"""Spec loading: CSV -> merged, compiled artifact -> mmapped lookups."""
+
+import csv
+
+import pytest
+
+from vikingboard_specdb import CompiledSpec, compile_spec, merge
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(r["Ref"], r["Pad"], r["Net"]) for r in csv.DictReader(f)]
+
+
+@pytest.mark.benchmark(group="spec-compile")
+def bench_spec_compile(benchmark, synth, tmp_path):
+    out = tmp_path / "spec.bin"
+
+    def run():
+        rows, conflicts = merge([("synth", read_rows(synth.spec))])
+        return compile_spec(rows, {}, ["synth"], conflicts, [], out)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group="spec-load")
+def bench_spec_load(benchmark, synth, tmp_path):
+    out = tmp_path / "spec.bin"
+    rows, conflicts = merge([("synth", read_rows(synth.spec))])
+    compile_spec(rows, {}, ["synth"], conflicts, [], out)
+
+    def run():
+        spec = CompiledSpec(out)
+        count = sum(1 for _ in spec.rows())
+        spec.pins_on("GND")
+        spec.pins_of(spec.refs[-1])
+        return count
+
+    assert benchmark(run) == len(rows)
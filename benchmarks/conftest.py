@@ -0,0 +1,65 @@
+"""
+Shared fixtures: synthetic designs (tools/vikingboard_synth.py) at each
+requested size, generated once per session, and the pcbnew stub.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+for _path in (REPO_ROOT / "tools", REPO_ROOT / "pcb_scripts", Path(__file__).resolve().parent):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+from vikingboard_synth import SynthConfig, generate  # noqa: E402
+
+# Measure parsing, not .cache/parsed hits; bench_board_load_cached uses its own cache
+os.environ["VIKINGBOARD_PARSE_CACHE"] = "off"
+
+DEFAULT_SIZES = "100,1000"
+
+
+def pytest_addoption(parser):
+    parser.addoption("--synth-sizes", default=DEFAULT_SIZES,
+                     help=f"comma-separated footprint counts to benchmark (default {DEFAULT_SIZES})")
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        sizes = [int(s) for s in metafunc.config.getoption("synth_sizes").split(",") if s.strip()]
+        metafunc.parametrize("size", sizes)
+
+
+def synth_config(size: int) -> SynthConfig:
+    """Scale nets, copper and DRC entries with the footprint count."""
+    return SynthConfig(footprints=size, nets=max(8, size // 2), tracks=size * 5, vias=size,
+                       zones=2, violations=size * 2)
+
+
+@pytest.fixture(scope="session")
+def synth_cache(tmp_path_factory):
+    return {}
+
+
+@pytest.fixture
+def synth(size, synth_cache, tmp_path_factory):
+    if size not in synth_cache:
+        synth_cache[size] = generate(tmp_path_factory.mktemp(f"synth{size}"), synth_config(size))
+    return synth_cache[size]
+
+
+@pytest.fixture(scope="session")
+def pcbnew():
+    """The real pcbnew would measure KiCad, not us; always use pcb_scripts/pcbnew_stub."""
+    import pcbnew_stub
+
+    previous = sys.modules.get("pcbnew")
+    sys.modules["pcbnew"] = pcbnew_stub
+    yield pcbnew_stub
+    if previous is not None:
+        sys.modules["pcbnew"] = previous
+    else:
+        sys.modules.pop("pcbnew", None)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+trend.py - Scaling curves and slowdown check over saved benchmark runs.
+
+pytest-benchmark saves every run in .cache/benchmarks/<machine>/, named
+after the commit. This prints, per benchmark group, the median time at
+each synthetic size for the last few commits (the scaling curve), plus
+the growth factor between the two largest sizes, and compares the newest
+run with the previous one: any benchmark more than --threshold slower
+fails the check.
+
+Usage:
+    python benchmarks/trend.py
+    python benchmarks/trend.py --last 10 --threshold 0.25
+    python benchmarks/trend.py --storage .cache/benchmarks/Linux-CPython-3.11-64bit
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+STORAGE = REPO_ROOT / ".cache" / "benchmarks"
+
+
+class Run(NamedTuple):
+    path: Path
+    commit: str
+    dirty: bool
+    when: str
+    medians: Dict[str, float]           # fullname -> median seconds
+    groups: Dict[str, List[str]]        # group -> fullnames
+    sizes: Dict[str, int]               # fullname -> synthetic size
+
+
+def load_runs(storage: Path) -> List[Run]:
+    runs = []
+    for path in sorted(storage.rglob("*.json")):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        info = data.get("commit_info", {})
+        medians, groups, sizes = {}, {}, {}
+        for b in data.get("benchmarks", []):
+            medians[b["fullname"]] = b["stats"]["median"]
+            groups.setdefault(b.get("group") or b["name"], []).append(b["fullname"])
+            sizes[b["fullname"]] = int((b.get("params") or {}).get("size", 0))
+        runs.append(Run(path, info.get("id", "")[:10], bool(info.get("dirty")),
+                        data.get("datetime", "")[:19], medians, groups, sizes))
+    runs.sort(key=lambda r: r.when)
+    return runs
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return f"{seconds * 1000:10.2f}" if seconds is not None else f"{'-':>10}"
+
+
+def print_curves(runs: List[Run]) -> None:
+    groups = sorted({g for r in runs for g in r.groups})
+    for group in groups:
+        sizes = sorted({r.sizes[n] for r in runs for n in r.groups.get(group, [])})
+        print(f"\n📋 {group} (median ms)")
+        print(f"{'commit':<14}" + "".join(f"{s:>10}" for s in sizes) + "    growth")
+        for run in runs:
+            by_size = {run.sizes[n]: run.medians[n] for n in run.groups.get(group, [])}
+            if not by_size:
+                continue
+            label = run.commit + ("*" if run.dirty else "")
+            growth = ""
+            if len(sizes) >= 2 and sizes[-1] in by_size and sizes[-2] in by_size and by_size[sizes[-2]] > 0:
+                # ~x10 per x10 size is linear; x100 is quadratic
+                growth = f"x{by_size[sizes[-1]] / by_size[sizes[-2]]:.1f} for x{sizes[-1] / sizes[-2]:g} size"
+            print(f"{label:<14}" + "".join(_ms(by_size.get(s)) for s in sizes) + f"    {growth}")
+
+
+def check_regressions(runs: List[Run], threshold: float) -> List[str]:
+    if len(runs) < 2:
+        return []
+    previous, latest = runs[-2], runs[-1]
+    slow = []
+    for name, seconds in sorted(latest.medians.items()):
+        before = previous.medians.get(name)
+        if before and seconds > before * (1 + threshold):
+            slow.append(f"{name}: {before * 1000:.2f} -> {seconds * 1000:.2f} ms (+{(seconds / before - 1) * 100:.0f}%)")
+    return slow
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark scaling curves and slowdown check")
+    parser.add_argument("--storage", type=Path, default=STORAGE)
+    parser.add_argument("--last", type=int, default=5, help="commits to show")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs previous run (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    runs = load_runs(args.storage)
+    if not runs:
+        print(f"❌ No saved runs in {args.storage}; run `python -m pytest benchmarks` first")
+        return 2
+    print_curves(runs[-args.last:])
+    slow = check_regressions(runs, args.threshold)
+    if len(runs) < 2:
+        print("\n[INFO] Only one run saved; nothing to compare yet")
+    elif slow:
+        print(f"\n❌ {len(slow)} benchmark(s) slower than {runs[-2].commit} by more than {args.threshold:.0%}:")
+        for line in slow:
+            print(f"   {line}")
+        return 1
+    else:
+        print(f"\n✅ No slowdowns vs {runs[-2].commit}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,14 +11,14 @@ OUT="production_output"
 REPORTS="reports"
 
 # Backup
-cp "$PCB" "${PCB}.backup_$(date +%Y%m%d_%H%M%S)" 2>/dev/null || true
+python3 tools/vikingboard_backup.py snapshot "$PCB" || true
 mkdir -p "$OUT/gerbers" "$REPORTS"
 
 # 1. Gerbers + Drill
 echo "📐 Exporting Gerbers..."
 $KICAD_CLI pcb export gerbers --output "$OUT/gerbers/" "$PCB" 2>/dev/null
 $KICAD_CLI pcb export drill --output "$OUT/gerbers/" "$PCB" 2>/dev/null
-cd "$OUT/gerbers" && zip -q -r ../vikingboard_gerbers_$(date +%Y%m%d).zip * && cd ../..
+python3 tools/vikingboard_bundle.py build "$OUT/vikingboard_gerbers_$(date +%Y%m%d).zip" "$OUT/gerbers" > /dev/null
 echo "✅ Gerbers ready"
 
 # 2. BOM + CPL
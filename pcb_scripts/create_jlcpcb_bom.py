@@ -1,33 +1,36 @@
 import csv
-import re
+import sys
+from pathlib import Path
 
-# Parse spec for LCSC codes
-spec_path = 'vikingboard_spec.py'
-lcsc_map = {}
-
-with open(spec_path, 'r') as f:
-    content = f.read()
-    # Extract name and lcsc pairs
-    matches = re.findall(r'"name":\s*"([^"]+)".*?"lcsc":\s*"([^"]+)"', content, re.DOTALL)
-    for name, lcsc in matches:
-        lcsc_map[name] = lcsc
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from vikingboard_lcsc import LcscCatalog
 
 # Read KiCad BOM
 with open('vikingboard_bom.csv', 'r') as f:
     reader = csv.DictReader(f)
     rows = list(reader)
 
+# LCSC codes from the shared catalog (seeded from lcsc_parts.csv and the
+# "lcsc" entries in vikingboard_spec.py)
+catalog = LcscCatalog.open()
+try:
+    parts = catalog.annotate([(row['Value'], row['Footprint'], row['Refs']) for row in rows])
+finally:
+    catalog.close()
+
 # Write JLCPCB BOM
 with open('vikingboard_bom_jlcpcb.csv', 'w', newline='') as f:
     fieldnames = ['Designator', 'Value', 'Footprint', 'LCSC', 'Quantity']
     writer = csv.DictWriter(f, fieldnames=fieldnames)
     writer.writeheader()
-    
-    for row in rows:
+
+    matched = {}
+    for row, part in zip(rows, parts):
         value = row['Value']
-        # Try to find LCSC code
-        lcsc = lcsc_map.get(value, 'MANUAL')
-        
+        lcsc = part.lcsc if part else 'MANUAL'
+        if part:
+            matched[value] = lcsc
+
         writer.writerow({
             'Designator': row['Refs'],
             'Value': value,
@@ -38,5 +41,5 @@ with open('vikingboard_bom_jlcpcb.csv', 'w', newline='') as f:
 
 print("Created vikingboard_bom_jlcpcb.csv")
 print("\nComponents with LCSC codes:")
-for k, v in lcsc_map.items():
+for k, v in matched.items():
     print(f"  {k}: {v}")
@@ -1,29 +1,29 @@
 import csv
+import sys
+from pathlib import Path
 
-# Common LCSC codes for standard components
-common_lcsc = {
-    '10µF': 'C15850',      # 10µF 0805 cap
-    '100nF': 'C14663',     # 0.1µF 0805 cap
-    '10k': 'C17513',       # 10k 0805 resistor
-    '1k': 'C17513',        # 1k 0805 resistor
-    '4.7k': 'C17673',      # 4.7k 0805 resistor
-    '100k': 'C17407',      # 100k 0805 resistor
-}
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from vikingboard_lcsc import LcscCatalog
 
 # Read current BOM
 rows = []
 with open('vikingboard_bom_jlcpcb.csv', 'r') as f:
     reader = csv.DictReader(f)
     for row in reader:
-        value = row['Value']
-        if row['LCSC'] == 'MANUAL':
-            # Try to match common component
-            for key, lcsc in common_lcsc.items():
-                if key in value:
-                    row['LCSC'] = lcsc
-                    break
         rows.append(row)
 
+# Common LCSC codes for standard components come from the shared catalog
+# (pcb_scripts/lcsc_parts.csv), matched on normalized value + package
+manual = [row for row in rows if row['LCSC'] == 'MANUAL']
+catalog = LcscCatalog.open()
+try:
+    parts = catalog.annotate([(row['Value'], row['Footprint'], row['Designator']) for row in manual])
+finally:
+    catalog.close()
+for row, part in zip(manual, parts):
+    if part is not None:
+        row['LCSC'] = part.lcsc
+
 # Write back
 with open('vikingboard_bom_jlcpcb.csv', 'w', newline='') as f:
     fieldnames = ['Designator', 'Value', 'Footprint', 'LCSC', 'Quantity']
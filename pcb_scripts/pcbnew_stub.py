@@ -0,0 +1,104 @@
+"""
+pcbnew_stub.py - Minimal stand-in for pcbnew-modulen, i minnet.
+
+Dekker kallene vikingboard_nets.py og vikingboard_worker.py bruker
+(footprints, pads, nett, soner, LoadBoard/SaveBoard), bygget på
+tools/vikingboard_board, slik at nett-synk og workeren kan testes og
+benchmarkes uten KiCad. Installeres som sys.modules["pcbnew"] av
+benchmarks/conftest.py og av `vikingboard_worker.py serve --backend stub`.
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from vikingboard_board import load_board
+
+
+class NETINFO_ITEM:
+    def __init__(self, board: "BOARD", name: str, code: int = -1):
+        self.name = name
+        self.code = code
+
+    def GetNetname(self) -> str:
+        return self.name
+
+
+class PAD:
+    def __init__(self, number: str, net: NETINFO_ITEM):
+        self.number = number
+        self.net = net
+
+    def GetNumber(self) -> str:
+        return self.number
+
+    def GetNetname(self) -> str:
+        return self.net.name
+
+    def SetNet(self, net: NETINFO_ITEM) -> None:
+        self.net = net
+
+
+class FOOTPRINT:
+    def __init__(self, ref: str, pads: List[PAD]):
+        self.ref = ref
+        self.pads = pads
+
+    def GetReference(self) -> str:
+        return self.ref
+
+    def Pads(self) -> List[PAD]:
+        return self.pads
+
+
+class BOARD:
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.footprints: List[FOOTPRINT] = []
+        self.nets: Dict[str, NETINFO_ITEM] = {}
+
+    def GetFileName(self) -> str:
+        return self.path
+
+    def Zones(self) -> list:
+        return []
+
+    def GetFootprints(self) -> List[FOOTPRINT]:
+        return self.footprints
+
+    def GetNetsByName(self) -> Dict[str, NETINFO_ITEM]:
+        return dict(self.nets)
+
+    def FindNet(self, name: str) -> Optional[NETINFO_ITEM]:
+        return self.nets.get(name)
+
+    def Add(self, item) -> None:
+        if isinstance(item, NETINFO_ITEM):
+            item.code = len(self.nets)
+            self.nets[item.name] = item
+        elif isinstance(item, FOOTPRINT):
+            self.footprints.append(item)
+
+
+_current: Optional[BOARD] = None
+
+
+def LoadBoard(path: str) -> BOARD:
+    parsed = load_board(path)
+    board = BOARD(str(path))
+    for code, name in sorted(parsed.nets.items()):
+        board.nets[name] = NETINFO_ITEM(board, name, code)
+    for fp in parsed.footprints:
+        pads = [PAD(p.number, board.nets.get(p.net) or board.nets.setdefault(p.net, NETINFO_ITEM(board, p.net)))
+                for p in fp.pads]
+        board.Add(FOOTPRINT(fp.ref, pads))
+    return board
+
+
+def SaveBoard(path: str, board: BOARD) -> bool:
+    return True
+
+
+def GetBoard() -> Optional[BOARD]:
+    return _current
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+vikingboard_fixups.py - GND/Edge.Cuts-fiksene som steg i én transaksjon.
+
+remove_duplicate_gnd.py, fix_gnd_clearance.py, rebuild_gnd_zone.py,
+connect_gnd_plane.py og fix_edge_cuts.py lastet, fylte alle soner og lagret
+brettet hver for seg. Her er de steg som kjøres på ett lastet brett:
+
+- Brettet lastes én gang.
+- Sonefylling utsettes til commit og gjelder bare soner der outline, nett,
+  lag eller innstillinger er endret. Soner som overlapper dem på samme lag
+  fylles også. Endres Edge.Cuts, fylles bare soner der det innrykkede
+  brettomrisset faktisk endrer arealet sonen kan fylle.
+- Nye GND-soner får omriss fra Edge.Cuts (innrykket clearance, minus
+  keep-outs) via tools/vikingboard_polygon.py, ikke faste hjørner. Uten
+  lukket Edge.Cuts-kontur eller uten numpy brukes de gamle hjørnene.
+- Brettet lagres én gang. Feiler et steg, lagres ingenting.
+- Lasting, hvert steg, sonefylling og commit er spans i tools/vikingboard_trace.py
+  ("fixups: <fase>") når VIKINGBOARD_TRACE er satt.
+
+Stegene finnes bare her og bruker brettet gjennom FixupTransaction. To
+backender implementerer den:
+- vikingboard_fixups_pcbnew.py: pcbnew, fyller sonene (KiCad).
+- vikingboard_fixups_headless.py: tekstredigering med tools/vikingboard_edit.py,
+  uten pcbnew og uten sonefylling (CI, maskiner uten KiCad).
+Uten pcbnew brukes tekstredigering automatisk; --headless tvinger den.
+
+Bruk:
+    python pcb_scripts/vikingboard_fixups.py                      # standard rekkefølge
+    python pcb_scripts/vikingboard_fixups.py fix_edge_cuts rebuild_gnd_zone
+    python pcb_scripts/vikingboard_fixups.py --headless --dry-run
+    python pcb_scripts/vikingboard_fixups.py --list
+
+Fra Scripting Console (ingen lagring, brettet oppdateres i editoren):
+    from vikingboard_fixups import run_steps
+    run_steps(["connect_gnd_plane"], board=pcbnew.GetBoard())
+"""
+
+import argparse
+import sys
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from vikingboard_board import Graphic, Zone
+from vikingboard_spatial import DesignRules
+from vikingboard_trace import span
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BOARD = REPO_ROOT / "kicad" / "Vikingboard.kicad_pcb"
+
+# Standard rekkefølge når ingen steg er oppgitt
+DEFAULT_STEPS = ["fix_edge_cuts", "remove_duplicate_gnd", "connect_gnd_plane", "fix_gnd_clearance"]
+
+Point = Tuple[float, float]
+
+
+class FixupTransaction(ABC):
+    """
+    Ett brett, mange endringer, én lagring. Stegene ser bare disse metodene;
+    soner er backendens egne objekter, mål er i mm og lag er navn ("B.Cu").
+
+        with BoardTransaction() as tx:
+            remove_duplicate_gnd(tx)
+            fix_gnd_clearance(tx)
+    """
+
+    backend = ""
+
+    def __init__(self, path: Optional[Path], dry_run: bool = False):
+        self.path = path
+        self.dry_run = dry_run
+        self.timings: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[dict]:
+        """Tid for rapporten og en trace-span; dict-en kan fylles med ekstra args."""
+        t0 = time.perf_counter()
+        try:
+            with span(f"fixups: {name}", cat="fixups", backend=self.backend) as info:
+                yield info
+        finally:
+            self.timings.append((name, time.perf_counter() - t0))
+
+    def report(self) -> None:
+        print("\n⏱  Tidsbruk:")
+        for name, seconds in self.timings:
+            print(f"  {name:<22} {seconds * 1000:8.1f} ms")
+
+    def __enter__(self) -> "FixupTransaction":
+        self.load()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            with span("fixups: commit", cat="fixups", backend=self.backend, dry_run=self.dry_run):
+                self.commit()
+        else:
+            print(f"❌ Steg feilet ({exc}), brettet er ikke lagret")
+        return False
+
+    def zone_polygons(self, layer: str, clearance_mm: float, fallback: Sequence[Point]) -> List[Tuple]:
+        """(hjørner, hull) per sone: brettomrisset innrykket clearance, minus keep-outs på laget."""
+        try:
+            from vikingboard_polygon import polygons, zone_outline
+        except ImportError:     # numpy mangler i KiCads Python
+            print("  ⚠️  numpy mangler, bruker faste hjørner")
+            return [(fallback, [])]
+        region = zone_outline(self.edge_shapes(), self.keepouts(), [layer], clearance_mm)
+        if not region:
+            print("  ⚠️  Ingen lukket Edge.Cuts-kontur, bruker faste hjørner")
+            return [(fallback, [])]
+        return [(outer.tolist(), [h.tolist() for h in holes]) for outer, holes in polygons(region)]
+
+    # --- Backenden ---
+
+    @abstractmethod
+    def load(self) -> None:
+        """Last brettet (hvis det ikke allerede er lastet)."""
+
+    @abstractmethod
+    def zones(self, net: Optional[str] = None) -> List[Any]:
+        """Gjeldende soner, eventuelt bare på ett nett."""
+
+    @abstractmethod
+    def zone_layer(self, zone: Any) -> str:
+        ...
+
+    @abstractmethod
+    def remove_zone(self, zone: Any) -> None:
+        ...
+
+    @abstractmethod
+    def set_zone_rules(self, zone: Any, clearance_mm: float, min_thickness_mm: float, spoke_mm: float) -> None:
+        """Clearance, minste tykkelse og termiske innstillinger på en sone."""
+
+    @abstractmethod
+    def new_zone(self, net: str, layer: str, corners_mm: Sequence[Point], clearance_mm: float,
+                 min_thickness_mm: float = 0.25, spoke_mm: float = 0.3,
+                 holes_mm: Sequence[Sequence[Point]] = ()) -> Any:
+        """Ny sone med termisk tilkobling; RuntimeError hvis nettet ikke finnes."""
+
+    @abstractmethod
+    def edge_shapes(self) -> List[Graphic]:
+        """Edge.Cuts slik brettet ser ut nå (for tools/vikingboard_polygon.py)."""
+
+    @abstractmethod
+    def keepouts(self) -> List[Zone]:
+        """Regelområder som forbyr kobberfylling."""
+
+    @abstractmethod
+    def remove_edge_cuts(self) -> int:
+        """Fjern all Edge.Cuts-grafikk på brettet, returner antallet."""
+
+    @abstractmethod
+    def footprint_extents(self) -> Optional[Tuple[float, float, float, float]]:
+        """(min_x, min_y, max_x, max_y) rundt alle footprints, None uten footprints."""
+
+    @abstractmethod
+    def add_edge_cuts(self, points_mm: Sequence[Point], width_mm: float) -> None:
+        """Edge.Cuts-linjer mellom påfølgende punkter."""
+
+    @abstractmethod
+    def commit(self) -> None:
+        """Fyll (eller marker) berørte soner og lagre én gang."""
+
+
+# === Steg ===
+
+def remove_duplicate_gnd(tx: FixupTransaction) -> None:
+    """Behold én GND-sone per lag."""
+    seen = set()
+    removed = 0
+    for zone in tx.zones("GND"):
+        layer = tx.zone_layer(zone)
+        if layer in seen:
+            tx.remove_zone(zone)
+            removed += 1
+        else:
+            seen.add(layer)
+    print(f"  ✓ Fjernet {removed} duplikate GND-soner")
+
+
+def fix_gnd_clearance(tx: FixupTransaction) -> None:
+    """Sett clearance/termiske innstillinger på GND-soner fra netclass."""
+    clearance = DesignRules.load().clearance("GND")
+    for zone in tx.zones("GND"):
+        tx.set_zone_rules(zone, clearance, min_thickness_mm=0.25, spoke_mm=0.3)
+        print(f"  ✓ Fixed GND zone on layer {tx.zone_layer(zone)}")
+
+
+def rebuild_gnd_zone(tx: FixupTransaction) -> None:
+    """Fjern alle GND-soner og lag én ren sone på B.Cu."""
+    zones = tx.zones("GND")
+    for zone in zones:
+        tx.remove_zone(zone)
+    print(f"  ✗ Removed {len(zones)} GND zones")
+    clearance = DesignRules.load().clearance("GND")
+    for corners, holes in tx.zone_polygons("B.Cu", clearance, [(45, 65), (135, 65), (135, 115), (45, 115)]):
+        tx.new_zone("GND", "B.Cu", corners, clearance, holes_mm=holes)
+    print("  ✓ Created GND zone on B.Cu")
+
+
+def connect_gnd_plane(tx: FixupTransaction) -> None:
+    """Legg til GND-plan på B.Cu hvis det ikke finnes fra før."""
+    if any(tx.zone_layer(z) == "B.Cu" for z in tx.zones("GND")):
+        print("  ✓ GND plane finnes allerede på B.Cu")
+        return
+    clearance = DesignRules.load().clearance("GND")
+    for corners, holes in tx.zone_polygons("B.Cu", clearance, [(45, 65), (130, 65), (130, 115), (45, 115)]):
+        tx.new_zone("GND", "B.Cu", corners, clearance, holes_mm=holes)
+    print("  ✓ GND plane lagt til på B.Cu")
+
+
+def fix_edge_cuts(tx: FixupTransaction, margin_mm: float = 5.0) -> None:
+    """Erstatt Edge.Cuts med en lukket outline rundt komponentene + margin."""
+    print(f"  ✓ Fjernet {tx.remove_edge_cuts()} gamle linjer")
+
+    extents = tx.footprint_extents()
+    if extents is None:
+        raise RuntimeError("Ingen footprints å lage outline rundt")
+    min_x, min_y, max_x, max_y = extents
+    min_x, min_y = min_x - margin_mm, min_y - margin_mm
+    max_x, max_y = max_x + margin_mm, max_y + margin_mm
+
+    tx.add_edge_cuts([(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y), (min_x, min_y)], 0.1)
+    print(f"  ✓ Board outline: {max_x - min_x:.1f}mm x {max_y - min_y:.1f}mm")
+
+
+STEPS: Dict[str, Callable[[FixupTransaction], None]] = {
+    "fix_edge_cuts": fix_edge_cuts,
+    "remove_duplicate_gnd": remove_duplicate_gnd,
+    "rebuild_gnd_zone": rebuild_gnd_zone,
+    "connect_gnd_plane": connect_gnd_plane,
+    "fix_gnd_clearance": fix_gnd_clearance,
+}
+
+
+def open_transaction(path: Optional[Path] = DEFAULT_BOARD, board=None, dry_run: bool = False,
+                     save_path: Optional[Path] = None, headless: Optional[bool] = None) -> FixupTransaction:
+    """pcbnew-backenden hvis pcbnew finnes (eller board er gitt), ellers tekstredigering."""
+    if not headless:
+        try:
+            from vikingboard_fixups_pcbnew import BoardTransaction
+        except ImportError:
+            if headless is not None or board is not None:
+                raise
+            print("[INFO] pcbnew mangler, kjører som tekstredigering (uten sonefylling)")
+        else:
+            return BoardTransaction(path, board=board, dry_run=dry_run, save_path=save_path)
+    if board is not None:
+        raise ValueError("et lastet pcbnew-brett kan ikke redigeres som tekst")
+    from vikingboard_fixups_headless import EditTransaction
+    return EditTransaction(Path(path), dry_run=dry_run)
+
+
+def run_steps(names: Sequence[str], path: Optional[Path] = DEFAULT_BOARD, board=None, dry_run: bool = False,
+              save_path: Optional[Path] = None, headless: Optional[bool] = None) -> None:
+    """Kjør stegene i rekkefølge i én transaksjon (save_path: lagre et allerede lastet brett)."""
+    unknown = [n for n in names if n not in STEPS]
+    if unknown:
+        raise SystemExit(f"❌ Ukjente steg: {', '.join(unknown)} (velg blant {', '.join(STEPS)})")
+    tx = open_transaction(path, board=board, dry_run=dry_run, save_path=save_path, headless=headless)
+    with tx:
+        for name in names:
+            print(f"▶ {name}")
+            with tx.phase(name):
+                STEPS[name](tx)
+    tx.report()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Kjør GND/Edge.Cuts-fiks i én transaksjon")
+    parser.add_argument("steps", nargs="*", help=f"steg (standard: {' '.join(DEFAULT_STEPS)})")
+    parser.add_argument("--board", type=Path, default=DEFAULT_BOARD)
+    parser.add_argument("--dry-run", action="store_true", help="ikke lagre brettet")
+    parser.add_argument("--headless", action="store_true", default=None,
+                        help="rediger filen som tekst uten pcbnew (soner fylles ikke)")
+    parser.add_argument("--list", action="store_true", help="vis tilgjengelige steg")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, func in STEPS.items():
+            print(f"  {name:<22} {func.__doc__}")
+        return 0
+    if not args.board.exists():
+        print(f"❌ Fant ikke {args.board}")
+        return 1
+    run_steps(args.steps or DEFAULT_STEPS, args.board, dry_run=args.dry_run, headless=args.headless)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+vikingboard_fixups_headless.py - Tekstbackenden for stegene i vikingboard_fixups.py.
+
+Brettet endres med tools/vikingboard_edit.py: filen parses uten KiCad,
+endringene skrives som tekstlapper og resten av filen forblir
+byte-identisk. Kjører derfor på Linux CI og maskiner uten KiCad, og diffen
+viser bare det stegene endret.
+
+Forskjeller fra pcbnew-backenden:
+- Soner fylles ikke. Fyllingen (filled_polygon) fjernes fra endrede soner
+  (fra alle soner hvis en sone fjernes, og fra soner som det nye Edge.Cuts
+  faktisk klipper annerledes), så ingen stoler på en utdatert fylling.
+  Fyll i KiCad (B) eller med `kicad-cli pcb drc --refill-zones`.
+- fix_edge_cuts regner omrisset fra pads og footprint-grafikk, ikke fra
+  KiCads GetBoundingBox (som også tar med tekst), så det kan bli litt
+  mindre enn med pcbnew.
+
+Stegene og CLI-et ligger i vikingboard_fixups.py (--headless).
+"""
+
+import difflib
+import math
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from vikingboard_board import Board, Graphic, Zone, from_node
+from vikingboard_edit import Document, fmt_mm, new_uuid
+from vikingboard_fixups import DEFAULT_BOARD, FixupTransaction, Point
+from vikingboard_sexpr import Node, QStr
+from vikingboard_spatial import DesignRules
+
+# Toppnivå-elementer i den rekkefølgen KiCad skriver dem; nye noder settes inn etter siste av sin gruppe
+_GRAPHICS_ORDER = ("footprint", "gr_line", "gr_arc", "gr_rect", "gr_circle", "gr_poly", "gr_curve", "gr_text")
+_ZONE_ORDER = _GRAPHICS_ORDER + ("segment", "arc", "via", "zone")
+
+
+def zone_layer(zone: Node) -> str:
+    layer = zone.value("layer")
+    if layer is None:
+        layers = zone.find("layers")
+        layer = layers.atoms[0] if layers is not None and layers.atoms else ""
+    return layer
+
+
+def _set_in_memory(node: Node, path: str, atoms: Sequence[str]) -> None:
+    """Som Document.set, men for en ny node som ikke finnes i teksten ennå."""
+    names = path.split("/")
+    for name in names[:-1]:
+        child = node.find(name)
+        if child is None:
+            child = Node(name, [])
+            node.items.append(child)
+        node = child
+    last = node.find(names[-1])
+    if last is None:
+        node.items.append(Node(names[-1], list(atoms)))
+    else:
+        last.items[:] = list(atoms) + last.children
+
+
+def _footprint_extents(board: Board) -> Tuple[float, float, float, float]:
+    """Omsluttende boks for pads (rotert) og footprint-grafikk."""
+    xs: List[float] = []
+    ys: List[float] = []
+    for pad in board.pads:
+        a = math.radians(pad.angle)
+        dx = abs(pad.w / 2 * math.cos(a)) + abs(pad.h / 2 * math.sin(a))
+        dy = abs(pad.w / 2 * math.sin(a)) + abs(pad.h / 2 * math.cos(a))
+        xs += [pad.x - dx, pad.x + dx]
+        ys += [pad.y - dy, pad.y + dy]
+    for g in board.graphics:
+        if not g.ref:
+            continue
+        half = g.width / 2
+        if g.kind == "circle" and len(g.points) == 2:
+            (cx, cy), (ex, ey) = g.points
+            r = math.hypot(ex - cx, ey - cy) + half
+            xs += [cx - r, cx + r]
+            ys += [cy - r, cy + r]
+            continue
+        for x, y in g.points:
+            xs += [x - half, x + half]
+            ys += [y - half, y + half]
+    for fp in board.footprints:
+        if not fp.pads:
+            xs.append(fp.x)
+            ys.append(fp.y)
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class EditTransaction(FixupTransaction):
+    """Ett parset brett, mange endringer, én lagring (uten sonefylling)."""
+
+    backend = "headless"
+
+    def __init__(self, path: Path = DEFAULT_BOARD, dry_run: bool = False):
+        super().__init__(Path(path), dry_run)
+        self.doc: Optional[Document] = None
+        self.board: Optional[Board] = None
+        self._removed: Set[int] = set()          # id() av fjernede toppnivånoder
+        self._touched: Set[int] = set()          # id() av eksisterende soner med endrede innstillinger
+        self._new_zones: List[Node] = []
+        self.edges_changed = False
+        self.edges: List[Graphic] = []           # Edge.Cuts slik stegene har latt dem være
+
+    def load(self) -> None:
+        with self.phase("Parse board"):
+            self.doc = Document.open(self.path)
+            self.board = from_node(self.doc.root, self.path)
+            self.edges = self.board.edges()
+
+    @property
+    def root(self) -> Node:
+        return self.doc.root
+
+    def _remove(self, node: Node) -> None:
+        if any(node is z for z in self._new_zones):
+            self._new_zones = [z for z in self._new_zones if z is not node]
+            return
+        self.doc.remove(node)
+        self._removed.add(id(node))
+
+    def _set(self, zone: Node, path: str, *atoms: str) -> None:
+        current: Optional[Node] = zone
+        for name in path.split("/"):
+            current = current.find(name) if current is not None else None
+        if current is not None and current.atoms == list(atoms):
+            return          # allerede riktig: ingen endring, ingen ny fylling
+        if any(zone is z for z in self._new_zones):
+            _set_in_memory(zone, path, atoms)
+        else:
+            self.doc.set(zone, path, *atoms)
+            self._touched.add(id(zone))
+
+    def _anchor(self, names: Sequence[str]) -> Optional[Node]:
+        """Siste gjenværende toppnivånode med et av navnene (None: legg til sist)."""
+        last = None
+        for child in self.root.children:
+            if child.name in names and id(child) not in self._removed:
+                last = child
+        return last
+
+    def _insert(self, node: Node, order: Sequence[str]) -> None:
+        anchor = self._anchor(order)
+        if anchor is None:
+            self.doc.insert(self.root, node)
+        else:
+            self.doc.insert(self.root, node, after=anchor)
+
+    # --- Soner ---
+
+    def zones(self, net: Optional[str] = None) -> List[Node]:
+        """Gjeldende soner: de i filen som ikke er fjernet, pluss nye."""
+        zones = [z for z in self.root.find_all("zone") if id(z) not in self._removed] + self._new_zones
+        return [z for z in zones if net is None or z.value("net_name") == net]
+
+    def zone_layer(self, zone: Node) -> str:
+        return zone_layer(zone)
+
+    def remove_zone(self, zone: Node) -> None:
+        self._remove(zone)
+
+    def set_zone_rules(self, zone: Node, clearance_mm: float, min_thickness_mm: float, spoke_mm: float) -> None:
+        self._set(zone, "connect_pads/clearance", fmt_mm(clearance_mm))
+        self._set(zone, "min_thickness", fmt_mm(min_thickness_mm))
+        self._set(zone, "fill/thermal_gap", fmt_mm(clearance_mm))
+        self._set(zone, "fill/thermal_bridge_width", fmt_mm(spoke_mm))
+
+    def new_zone(self, net: str, layer: str, corners_mm: Sequence[Point], clearance_mm: float,
+                 min_thickness_mm: float = 0.25, spoke_mm: float = 0.3,
+                 holes_mm: Sequence[Sequence[Point]] = ()) -> Node:
+        code = next((code for code, name in self.board.nets.items() if name == net), None)
+        if code is None:
+            raise RuntimeError(f"{net} net ikke funnet")
+        zone = Node("zone", [
+            Node("net", [str(code)]),
+            Node("net_name", [QStr(net)]),
+            Node("layer", [QStr(layer)]),
+            Node("uuid", [QStr(new_uuid())]),
+            Node("hatch", ["edge", "0.5"]),
+            Node("connect_pads", [Node("clearance", [fmt_mm(clearance_mm)])]),
+            Node("min_thickness", [fmt_mm(min_thickness_mm)]),
+            Node("filled_areas_thickness", ["no"]),
+            Node("fill", [Node("thermal_gap", [fmt_mm(clearance_mm)]),
+                          Node("thermal_bridge_width", [fmt_mm(spoke_mm)])]),
+        ] + [
+            # Første polygon er omrisset, de neste er hull
+            Node("polygon", [Node("pts", [Node("xy", [fmt_mm(x), fmt_mm(y)]) for x, y in ring])])
+            for ring in [corners_mm, *holes_mm]
+        ])
+        self._new_zones.append(zone)
+        return zone
+
+    # --- Edge.Cuts ---
+
+    def edge_shapes(self) -> List[Graphic]:
+        return self.edges
+
+    def keepouts(self) -> List[Zone]:
+        return self.board.zones
+
+    def remove_edge_cuts(self) -> int:
+        old = [n for n in self.root.children if n.name.startswith("gr_") and n.value("layer") == "Edge.Cuts"]
+        for node in old:
+            self._remove(node)
+        self.edges = [g for g in self.edges if g.ref]     # Edge.Cuts i footprints blir stående
+        self.edges_changed = self.edges_changed or bool(old)
+        return len(old)
+
+    def footprint_extents(self) -> Optional[Tuple[float, float, float, float]]:
+        return _footprint_extents(self.board) if self.board.footprints else None
+
+    def add_edge_cuts(self, points_mm: Sequence[Point], width_mm: float) -> None:
+        for a, b in zip(points_mm, points_mm[1:]):
+            self.edges.append(Graphic("line", (a, b), "Edge.Cuts", width_mm))
+            self._insert(Node("gr_line", [
+                Node("start", [fmt_mm(a[0]), fmt_mm(a[1])]),
+                Node("end", [fmt_mm(b[0]), fmt_mm(b[1])]),
+                Node("stroke", [Node("width", [fmt_mm(width_mm)]), Node("type", ["default"])]),
+                Node("layer", [QStr("Edge.Cuts")]),
+                Node("uuid", [QStr(new_uuid())]),
+            ]), _GRAPHICS_ORDER)
+        self.edges_changed = True
+
+    # --- Commit ---
+
+    def _edge_change_affects(self, zone: Node) -> bool:
+        """Endrer de nye Edge.Cuts arealet sonen kan fylle? (Uten numpy: anta ja.)"""
+        try:
+            from vikingboard_polygon import edge_change_affects
+        except ImportError:
+            return True
+        parsed = next((z for z in self.board.zones if z.uuid == zone.value("uuid")), None)
+        if parsed is None:
+            return True
+        clearance = max(DesignRules.load().edge_clearance, parsed.clearance)
+        return edge_change_affects(parsed.outline, self.board.edges(), self.edges, clearance)
+
+    def stale_fills(self) -> List[Node]:
+        """Eksisterende soner med fylling som ikke lenger stemmer."""
+        zones = [z for z in self.root.find_all("zone") if id(z) not in self._removed]
+        if not self._removed:
+            zones = [z for z in zones if id(z) in self._touched
+                     or self.edges_changed and self._edge_change_affects(z)]
+        return [z for z in zones if z.find("filled_polygon") is not None]
+
+    def commit(self) -> None:
+        with self.phase("Save board"):
+            stale = self.stale_fills()
+            for zone in stale:
+                for fill in zone.find_all("filled_polygon"):
+                    self.doc.remove(fill)
+            for zone in self._new_zones:
+                self._insert(zone, _ZONE_ORDER)
+            unfilled = len(stale) + len(self._new_zones)
+            if unfilled:
+                print(f"[INFO] {unfilled} av {len(self.zones())} soner må fylles på nytt: "
+                      "i KiCad (B) eller med `kicad-cli pcb drc --refill-zones`")
+
+            if not self.doc.changed:
+                print("[INFO] Ingen endringer")
+            elif self.dry_run:
+                diff = difflib.unified_diff(self.doc.text.splitlines(True), self.doc.result().splitlines(True),
+                                            self.path.name, f"{self.path.name} (endret)")
+                changed = sum(1 for line in diff if line[:1] in "+-" and line[:3] not in ("+++", "---"))
+                print(f"[DRY-RUN] {len(self.doc.edits)} tekstendringer ({changed} linjer), ingenting lagret")
+            else:
+                stats = self.doc.save()
+                print(f"💾 Lagret {self.path.name}: {stats.bytes_written} av {stats.file_size} bytes skrevet")
@@ -0,0 +1,265 @@
+"""
+vikingboard_fixups_pcbnew.py - pcbnew-backenden for stegene i vikingboard_fixups.py.
+
+Brettet lastes med pcbnew (eller er allerede åpent i editoren). Ved commit
+fylles bare soner der outline, nett, lag eller innstillinger er endret,
+soner som overlapper dem på samme lag, og soner der ny Edge.Cuts faktisk
+endrer arealet de kan fylle.
+
+Stegene og CLI-et ligger i vikingboard_fixups.py.
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pcbnew
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from vikingboard_board import Graphic, Zone
+from vikingboard_fixups import DEFAULT_BOARD, FixupTransaction, Point
+from vikingboard_spatial import DesignRules
+
+
+def _call(obj, name: str):
+    """Kall en getter som kan mangle eller ha endret signatur mellom KiCad-versjoner."""
+    try:
+        return getattr(obj, name)()
+    except Exception:
+        return None
+
+
+def zone_signature(zone: "pcbnew.ZONE") -> Tuple:
+    """Alt som påvirker fyllingen av en sone: outline, nett, lag og innstillinger."""
+    outline = zone.Outline()
+    points = tuple((outline.CVertex(i).x, outline.CVertex(i).y) for i in range(outline.TotalVertices()))
+    layers = tuple(int(l) for l in zone.GetLayerSet().Seq())
+    settings = tuple(repr(_call(zone, name)) for name in (
+        "GetLocalClearance", "GetMinThickness", "GetPadConnection", "GetThermalReliefGap",
+        "GetThermalReliefSpokeWidth", "GetAssignedPriority", "GetIsRuleArea", "GetFillMode",
+    ))
+    return points, zone.GetNetCode(), layers, settings
+
+
+def edge_signature(board: "pcbnew.BOARD") -> Tuple:
+    shapes = []
+    for item in board.GetDrawings():
+        if item.GetLayer() == pcbnew.Edge_Cuts:
+            start, end = item.GetStart(), item.GetEnd()
+            shapes.append((int(item.GetShape()), start.x, start.y, end.x, end.y))
+    return tuple(sorted(shapes))
+
+
+def _zone_id(zone: "pcbnew.ZONE") -> str:
+    return zone.m_Uuid.AsString()
+
+
+def _mm(point) -> Tuple[float, float]:
+    return point.x / 1e6, point.y / 1e6
+
+
+def _chain_mm(chain) -> Tuple[Tuple[float, float], ...]:
+    return tuple(_mm(chain.CPoint(i)) for i in range(chain.PointCount()))
+
+
+def edge_graphics(board: "pcbnew.BOARD") -> List[Graphic]:
+    """Edge.Cuts på brettet og i footprints, som Graphic for tools/vikingboard_polygon.py."""
+    kinds = {pcbnew.SHAPE_T_SEGMENT: "line", pcbnew.SHAPE_T_ARC: "arc", pcbnew.SHAPE_T_RECT: "rect",
+             pcbnew.SHAPE_T_CIRCLE: "circle", pcbnew.SHAPE_T_POLY: "poly"}
+    items = list(board.GetDrawings()) + [g for fp in board.GetFootprints() for g in fp.GraphicalItems()]
+    shapes = []
+    for item in items:
+        if item.GetLayer() != pcbnew.Edge_Cuts or not hasattr(item, "GetShape"):
+            continue
+        kind = kinds.get(item.GetShape())
+        if kind == "arc":
+            points = (_mm(item.GetStart()), _mm(item.GetArcMid()), _mm(item.GetEnd()))
+        elif kind == "poly":
+            points = _chain_mm(item.GetPolyShape().COutline(0))
+        elif kind is not None:
+            points = (_mm(item.GetStart()), _mm(item.GetEnd()))   # sirkel: senter, punkt på randen
+        else:
+            continue
+        shapes.append(Graphic(kind, points, "Edge.Cuts", item.GetWidth() / 1e6))
+    return shapes
+
+
+def pour_keepouts(board: "pcbnew.BOARD") -> List[Zone]:
+    """Regelområder som forbyr kobberfylling, på brettet og i footprints (RF-moduler)."""
+    zones = list(board.Zones()) + [z for fp in board.GetFootprints() for z in fp.Zones()]
+    keepouts = []
+    for zone in zones:
+        no_fill = _call(zone, "GetDoNotAllowZoneFills") or _call(zone, "GetDoNotAllowCopperPour")
+        if not zone.GetIsRuleArea() or not no_fill:
+            continue
+        layers = tuple(board.GetLayerName(layer) for layer in zone.GetLayerSet().Seq())
+        keepouts.append(Zone(zone.GetNetname(), layers, _chain_mm(zone.Outline().COutline(0)), (), 0, True,
+                             0.0, 0.0, _zone_id(zone), pour_keepout=True))
+    return keepouts
+
+
+def _zone_vector(zones: Sequence["pcbnew.ZONE"]):
+    """ZONE_FILLER.Fill vil ha en std::vector<ZONE*>."""
+    try:
+        vec = pcbnew.ZONES()
+        for zone in zones:
+            vec.append(zone)
+        return vec
+    except AttributeError:
+        return list(zones)
+
+
+def _boxes_overlap(a: "pcbnew.BOX2I", b: "pcbnew.BOX2I") -> bool:
+    return (a.GetLeft() <= b.GetRight() and b.GetLeft() <= a.GetRight()
+            and a.GetTop() <= b.GetBottom() and b.GetTop() <= a.GetBottom())
+
+
+def _vector(point: Point) -> "pcbnew.VECTOR2I":
+    return pcbnew.VECTOR2I(pcbnew.FromMM(point[0]), pcbnew.FromMM(point[1]))
+
+
+class BoardTransaction(FixupTransaction):
+    """Ett lastet pcbnew-brett, mange endringer, én fylling og én lagring."""
+
+    backend = "pcbnew"
+
+    def __init__(self, path: Optional[Path] = DEFAULT_BOARD, board: Optional["pcbnew.BOARD"] = None,
+                 dry_run: bool = False, save_path: Optional[Path] = None):
+        # Med board og uten save_path er vi i editoren: ingen lagring, bare Refresh
+        super().__init__(Path(path) if path is not None and board is None else save_path, dry_run)
+        self.board = board
+        self._zones_before: Dict[str, Tuple] = {}
+        self._edges_before: Tuple = ()
+        self._edge_shapes_before: List[Graphic] = []
+
+    def load(self) -> None:
+        if self.board is None:
+            with self.phase("Load board"):
+                self.board = pcbnew.LoadBoard(str(self.path))
+        self._zones_before = {_zone_id(z): zone_signature(z) for z in self.board.Zones()}
+        self._edges_before = edge_signature(self.board)
+        self._edge_shapes_before = edge_graphics(self.board)
+
+    # --- Soner ---
+
+    def zones(self, net: Optional[str] = None) -> List["pcbnew.ZONE"]:
+        return [z for z in self.board.Zones() if net is None or z.GetNetname() == net]
+
+    def zone_layer(self, zone: "pcbnew.ZONE") -> str:
+        return zone.GetLayerName()
+
+    def remove_zone(self, zone: "pcbnew.ZONE") -> None:
+        self.board.Remove(zone)
+
+    def set_zone_rules(self, zone: "pcbnew.ZONE", clearance_mm: float, min_thickness_mm: float,
+                       spoke_mm: float) -> None:
+        zone.SetLocalClearance(pcbnew.FromMM(clearance_mm))
+        zone.SetMinThickness(pcbnew.FromMM(min_thickness_mm))
+        zone.SetThermalReliefGap(pcbnew.FromMM(clearance_mm))
+        zone.SetThermalReliefSpokeWidth(pcbnew.FromMM(spoke_mm))
+
+    def new_zone(self, net: str, layer: str, corners_mm: Sequence[Point], clearance_mm: float,
+                 min_thickness_mm: float = 0.25, spoke_mm: float = 0.3,
+                 holes_mm: Sequence[Sequence[Point]] = ()) -> "pcbnew.ZONE":
+        netinfo = self.board.FindNet(net)
+        if netinfo is None:
+            raise RuntimeError(f"{net} net ikke funnet")
+        zone = pcbnew.ZONE(self.board)
+        zone.SetLayer(self.board.GetLayerID(layer))
+        zone.SetNetCode(netinfo.GetNetCode())
+        zone.SetPadConnection(pcbnew.ZONE_CONNECTION_THERMAL)
+        self.set_zone_rules(zone, clearance_mm, min_thickness_mm, spoke_mm)
+        outline = pcbnew.SHAPE_POLY_SET()
+        outline.NewOutline()
+        for point in corners_mm:
+            outline.Append(_vector(point))
+        for hole in holes_mm:
+            index = outline.NewHole()
+            for x, y in hole:
+                outline.Append(pcbnew.FromMM(x), pcbnew.FromMM(y), -1, index)
+        zone.SetOutline(outline)
+        self.board.Add(zone)
+        return zone
+
+    # --- Edge.Cuts ---
+
+    def edge_shapes(self) -> List[Graphic]:
+        return edge_graphics(self.board)
+
+    def keepouts(self) -> List[Zone]:
+        return pour_keepouts(self.board)
+
+    def remove_edge_cuts(self) -> int:
+        old = [item for item in self.board.GetDrawings() if item.GetLayer() == pcbnew.Edge_Cuts]
+        for item in old:
+            self.board.Remove(item)
+        return len(old)
+
+    def footprint_extents(self) -> Optional[Tuple[float, float, float, float]]:
+        boxes = [fp.GetBoundingBox() for fp in self.board.GetFootprints()]
+        if not boxes:
+            return None
+        return (min(b.GetLeft() for b in boxes) / 1e6, min(b.GetTop() for b in boxes) / 1e6,
+                max(b.GetRight() for b in boxes) / 1e6, max(b.GetBottom() for b in boxes) / 1e6)
+
+    def add_edge_cuts(self, points_mm: Sequence[Point], width_mm: float) -> None:
+        for a, b in zip(points_mm, points_mm[1:]):
+            line = pcbnew.PCB_SHAPE(self.board)
+            line.SetShape(pcbnew.SHAPE_T_SEGMENT)
+            line.SetStart(_vector(a))
+            line.SetEnd(_vector(b))
+            line.SetLayer(pcbnew.Edge_Cuts)
+            line.SetWidth(pcbnew.FromMM(width_mm))
+            self.board.Add(line)
+
+    # --- Commit ---
+
+    def edge_change_affects(self, zone: "pcbnew.ZONE") -> bool:
+        """Endrer de nye Edge.Cuts arealet sonen kan fylle? (Uten numpy: anta ja.)"""
+        try:
+            from vikingboard_polygon import edge_change_affects
+        except ImportError:
+            return True
+        clearance = max(DesignRules.load().edge_clearance, (_call(zone, "GetLocalClearance") or 0) / 1e6)
+        return edge_change_affects(_chain_mm(zone.Outline().COutline(0)), self._edge_shapes_before,
+                                   edge_graphics(self.board), clearance)
+
+    def dirty_zones(self) -> List["pcbnew.ZONE"]:
+        """Nye eller endrede soner, pluss soner som overlapper dem på samme lag."""
+        zones = list(self.board.Zones())
+        dirty = [z for z in zones if self._zones_before.get(_zone_id(z)) != zone_signature(z)]
+        removed = set(self._zones_before) - {_zone_id(z) for z in zones}
+        if removed:
+            # En fjernet sone kan ha dekket areal som naboene nå skal fylle
+            return zones
+        if edge_signature(self.board) != self._edges_before:
+            dirty += [z for z in zones if z not in dirty and self.edge_change_affects(z)]
+        dirty_ids = {_zone_id(z) for z in dirty}
+        extra = []
+        for z in zones:
+            if _zone_id(z) in dirty_ids:
+                continue
+            box, layers = z.GetBoundingBox(), set(z.GetLayerSet().Seq())
+            if any(layers & set(d.GetLayerSet().Seq()) and _boxes_overlap(box, d.GetBoundingBox()) for d in dirty):
+                extra.append(z)
+        return dirty + extra
+
+    def commit(self) -> None:
+        dirty = self.dirty_zones()
+        total = len(list(self.board.Zones()))
+        if dirty:
+            with self.phase("Fill zones") as info:
+                info.update(zones=len(dirty), total=total)
+                filler = pcbnew.ZONE_FILLER(self.board)
+                filler.Fill(_zone_vector(dirty))
+        print(f"[INFO] Fylte {len(dirty)} av {total} soner")
+
+        if self.dry_run:
+            print("[DRY-RUN] Ingen endringer lagret")
+        elif self.path is None:
+            pcbnew.Refresh()
+            print("💾 Lagre nå: File → Save (Ctrl+S)")
+        else:
+            with self.phase("Save board"):
+                pcbnew.SaveBoard(str(self.path), self.board)
+            print(f"💾 Lagret {self.path.name}")
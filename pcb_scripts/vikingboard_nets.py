@@ -2,12 +2,22 @@
 """
 vikingboard_nets.py - Synkroniser nett fra spec til KiCad PCB.
 
-Kjøres fra KiCad PCB Editor → Tools → Scripting Console (PyShell).
+Kjøres fra KiCad PCB Editor → Tools → Scripting Console (PyShell),
+eller headless uten GUI:
+
+    python pcb_scripts/vikingboard_nets.py --headless [--board FIL] [--dry-run]
+
+Headless-modus laster brettet med pcbnew.LoadBoard, lagrer med
+pcbnew.SaveBoard og skriver ut tid per fase.
 """
 
+import argparse
 import csv
+import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import pcbnew
 
@@ -16,6 +26,31 @@ DRY_RUN = False  # Sett til False for å faktisk skrive endringer
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DOCS_CSV = REPO_ROOT / "docs" / "vikingboard_nets.csv"
+DEFAULT_BOARD = REPO_ROOT / "kicad" / "Vikingboard.kicad_pcb"
+
+PadIndex = Dict[Tuple[str, str], "pcbnew.PAD"]
+
+
+class PhaseTimer:
+    """Samler tid per fase og skriver en oppsummering til slutt."""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - t0))
+
+    def report(self) -> None:
+        print("\n--- Timing ---")
+        for name, seconds in self.phases:
+            print(f"{name:<20}: {seconds * 1000:8.1f} ms")
+        total = sum(seconds for _, seconds in self.phases)
+        print(f"{'Total':<20}: {total * 1000:8.1f} ms")
 
 
 def iter_net_rows_from_csv(csv_path: Path) -> List[Tuple[str, str, str]]:
@@ -40,29 +75,62 @@ def build_spec_dict(rows: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str], s
     return spec
 
 
-def get_or_create_net(board: pcbnew.BOARD, net_name: str) -> pcbnew.NETINFO_ITEM:
-    """Hent eksisterende nett eller opprett nytt hvis det ikke finnes."""
-    # Prøv å finne eksisterende nett
-    netinfo = board.FindNet(net_name)
-    if netinfo is not None and netinfo.GetNetname() == net_name:
-        return netinfo
-    
-    # Opprett nytt nett
-    netinfo = pcbnew.NETINFO_ITEM(board, net_name)
-    board.Add(netinfo)
-    return netinfo
-
-
-def apply_nets_from_spec(spec: Dict[Tuple[str, str], str]):
-    """Gå gjennom spec og sett nett på pads."""
-    board = pcbnew.GetBoard()
+def build_pad_index(board: pcbnew.BOARD) -> PadIndex:
+    """Bygg (ref, pad_number) -> pad i én gjennomgang av alle footprints."""
+    index: PadIndex = {}
+    for fp in board.GetFootprints():
+        ref = fp.GetReference()
+        for pad in fp.Pads():
+            # Første pad vinner, som i den gamle lineære søket
+            index.setdefault((ref, pad.GetNumber()), pad)
+    return index
+
+
+def get_or_create_nets(board: pcbnew.BOARD, net_names) -> Dict[str, pcbnew.NETINFO_ITEM]:
+    """
+    Slå opp alle nett i én omgang og opprett de som mangler.
+
+    Nye NETINFO_ITEMs legges til brettet samlet, i stedet for ett
+    FindNet/Add-kall per endret pad.
+    """
+    existing = {str(name): net for name, net in board.GetNetsByName().items()}
+    result = {}
+    missing = []
+    for name in sorted(set(net_names)):
+        if name in existing:
+            result[name] = existing[name]
+        else:
+            missing.append(name)
+
+    for name in missing:
+        netinfo = pcbnew.NETINFO_ITEM(board, name)
+        board.Add(netinfo)
+        result[name] = netinfo
+    if missing:
+        print(f"[INFO] Created {len(missing)} new nets: {', '.join(missing)}")
+    return result
+
+
+def apply_nets_from_spec(
+    spec: Dict[Tuple[str, str], str],
+    board: Optional[pcbnew.BOARD] = None,
+    dry_run: Optional[bool] = None,
+    timer: Optional[PhaseTimer] = None,
+) -> int:
+    """Gå gjennom spec og sett nett på pads. Returnerer antall endrede pads."""
+    if board is None:
+        board = pcbnew.GetBoard()
     if board is None:
         print("[ERROR] No board loaded in PCB editor.")
-        return
+        return 0
+    if dry_run is None:
+        dry_run = DRY_RUN
+    if timer is None:
+        timer = PhaseTimer()
 
     print("=== VikingBoard net-script ===")
-    print(f"Mode: {'DRY_RUN' if DRY_RUN else 'APPLY'}")
-    
+    print(f"Mode: {'DRY_RUN' if dry_run else 'APPLY'}")
+
     total = len(spec)
     fp_not_found = 0
     pads_not_found = 0
@@ -70,50 +138,50 @@ def apply_nets_from_spec(spec: Dict[Tuple[str, str], str]):
 
     print(f"[INFO] Total spec entries: {total}")
 
-    # Bygg dict over footprints
-    footprints = {fp.GetReference(): fp for fp in board.GetFootprints()}
-
-    for (ref, pad_name), net_name in spec.items():
-        fp = footprints.get(ref)
-        if fp is None:
-            print(f"[ERROR] Footprint not found for ref {ref}")
-            fp_not_found += 1
-            continue
-
-        # Finn pad
-        pad = None
-        for p in fp.Pads():
-            if p.GetNumber() == pad_name:
-                pad = p
-                break
-
-        if pad is None:
-            print(f"[ERROR] Pad '{pad_name}' not found on footprint {ref}")
-            pads_not_found += 1
-            continue
-
-        # Sjekk current net
-        current_net = pad.GetNetname()
-        if current_net == net_name:
-            continue  # Allerede riktig
-
-        print(f"[CHANGE] {ref}.{pad_name}: {current_net} -> {net_name}")
-
-        if not DRY_RUN:
-            netinfo = get_or_create_net(board, net_name)
-            pad.SetNet(netinfo)
-            changed += 1
+    with timer.phase("Index pads"):
+        pad_index = build_pad_index(board)
+        refs = {ref for ref, _ in pad_index}
+
+    # Planlegg alle endringer før brettet røres
+    with timer.phase("Plan changes"):
+        changes: List[Tuple[str, str, "pcbnew.PAD", str]] = []
+        for (ref, pad_name), net_name in spec.items():
+            pad = pad_index.get((ref, pad_name))
+            if pad is None:
+                if ref not in refs:
+                    print(f"[ERROR] Footprint not found for ref {ref}")
+                    fp_not_found += 1
+                else:
+                    print(f"[ERROR] Pad '{pad_name}' not found on footprint {ref}")
+                    pads_not_found += 1
+                continue
+
+            current_net = pad.GetNetname()
+            if current_net == net_name:
+                continue  # Allerede riktig
+
+            print(f"[CHANGE] {ref}.{pad_name}: {current_net} -> {net_name}")
+            changes.append((ref, pad_name, pad, net_name))
+
+    if not dry_run and changes:
+        with timer.phase("Create nets"):
+            nets = get_or_create_nets(board, (net for _, _, _, net in changes))
+        with timer.phase("Apply nets"):
+            for _, _, pad, net_name in changes:
+                pad.SetNet(nets[net_name])
+            changed = len(changes)
 
     print("\n--- Summary ---")
     print(f"Total spec entries  : {total}")
     print(f"Footprints not found: {fp_not_found}")
     print(f"Pads not found      : {pads_not_found}")
     print(f"Pads changed        : {changed}")
-    if DRY_RUN:
+    if dry_run:
         print("\n[NOTE] DRY_RUN is True. No changes were written to the board.")
         print("       Set DRY_RUN = False and reload the module to apply changes.")
     else:
         print("\n[NOTE] Changes written to the board. Save the PCB to persist.")
+    return changed
 
 
 def print_markdown_preview(spec: Dict[Tuple[str, str], str]):
@@ -125,15 +193,43 @@ def print_markdown_preview(spec: Dict[Tuple[str, str], str]):
         print(f"| {ref} | {pad} | `{net}` |")
 
 
-def main():
-    rows = iter_net_rows_from_csv(DOCS_CSV)
+def run_headless(board_path: Path, spec: Dict[Tuple[str, str], str], dry_run: bool) -> None:
+    """Last, oppdater og lagre brettet uten KiCad GUI."""
+    timer = PhaseTimer()
+    with timer.phase("Load board"):
+        board = pcbnew.LoadBoard(str(board_path))
+
+    changed = apply_nets_from_spec(spec, board=board, dry_run=dry_run, timer=timer)
+
+    if changed and not dry_run:
+        with timer.phase("Save board"):
+            pcbnew.SaveBoard(str(board_path), board)
+        print(f"[INFO] Saved {board_path}")
+    timer.report()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sync nets from spec CSV to the KiCad PCB")
+    parser.add_argument("--headless", action="store_true", help="run via LoadBoard/SaveBoard without the GUI")
+    parser.add_argument("--board", type=Path, default=DEFAULT_BOARD, help="board file for --headless")
+    parser.add_argument("--csv", type=Path, default=DOCS_CSV, help="spec CSV (Ref,Pad,Net)")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing")
+    # Scripting Console har ingen meningsfulle argv, så ignorer ukjente
+    args, _ = parser.parse_known_args(argv if argv is not None else [])
+
+    rows = iter_net_rows_from_csv(args.csv)
     print(f"[INFO] iter_net_rows_from_csv() yielded {len(rows)} rows")
     spec = build_spec_dict(rows)
     print(f"[INFO] Normalized {len(spec)} spec entries")
 
-    apply_nets_from_spec(spec)
+    if args.headless:
+        run_headless(args.board, spec, dry_run=args.dry_run or DRY_RUN)
+    else:
+        timer = PhaseTimer()
+        apply_nets_from_spec(spec, dry_run=args.dry_run or DRY_RUN, timer=timer)
+        timer.report()
     print_markdown_preview(spec)
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
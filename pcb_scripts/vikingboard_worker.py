@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+vikingboard_worker.py - Langlevd pcbnew-prosess bak en Unix-socket.
+
+Hvert brettskript betaler for `import pcbnew` og LoadBoard på nytt, flere
+sekunder før første linje gjør noe. Workeren holder pcbnew importert og
+brettet lastet, og tar JSON-RPC 2.0-kall (én JSON per linje) over en
+Unix-socket:
+
+- Brettet lastes på nytt bare når filens mtime/størrelse er endret OG
+  innholdshashen er en annen (en `touch` eller en lagring fra workeren
+  selv gir ingen ny lasting).
+- Kall kjøres ett om gangen; pcbnew er ikke trådsikker.
+- Feiler et endrende kall, eller kjøres det som dry-run, kastes brettet i
+  minnet slik at neste kall leser filen på nytt.
+- Hvert kall er en span ("worker: <metode>") i tools/vikingboard_trace.py.
+  Klienten sender med sin VIKINGBOARD_TRACE, så spans havner i kallerens
+  kjøring og ikke i den workeren tilfeldigvis ble startet fra.
+- `--backend stub` bruker pcbnew_stub.py, så workeren og klientene kan
+  testes uten KiCad. Stubben har ikke tegninger eller sonefylling, så
+  fixups kjøres da som tekstredigering (vikingboard_fixups.py --headless).
+
+Metoder: ping, load, info, nets_sync, fixups, exec, save, drop, shutdown.
+
+Klienter (importerer ikke pcbnew, starter workeren ved behov):
+    from vikingboard_worker import WorkerClient
+    WorkerClient.connect().call("fixups", steps=["connect_gnd_plane"])
+
+Bruk:
+    python pcb_scripts/vikingboard_worker.py serve [--backend stub]
+    python pcb_scripts/vikingboard_worker.py ping
+    python pcb_scripts/vikingboard_worker.py load --board kicad/Vikingboard.kicad_pcb
+    python pcb_scripts/vikingboard_worker.py fixups fix_edge_cuts connect_gnd_plane
+    python pcb_scripts/vikingboard_worker.py nets --dry-run
+    python pcb_scripts/vikingboard_worker.py exec add_gnd_plane.py --save   # bare pcbnew-backenden
+    python pcb_scripts/vikingboard_worker.py stop
+"""
+
+import argparse
+import contextlib
+import hashlib
+import inspect
+import io
+import json
+import os
+import runpy
+import socket
+import socketserver
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from vikingboard_trace import ENV as TRACE_ENV
+from vikingboard_trace import span
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BOARD = REPO_ROOT / "kicad" / "Vikingboard.kicad_pcb"
+DEFAULT_SOCKET = REPO_ROOT / ".cache" / "pcbnew_worker.sock"
+DOCS_CSV = REPO_ROOT / "docs" / "vikingboard_nets.csv"
+ENV_SOCKET = "VIKINGBOARD_WORKER"
+
+# JSON-RPC 2.0 feilkoder
+PARSE_ERROR = -32700
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class WorkerError(RuntimeError):
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+def socket_path() -> Path:
+    return Path(os.environ.get(ENV_SOCKET) or DEFAULT_SOCKET)
+
+
+# === Backend og brett-cache ===
+
+def load_backend(name: str):
+    """pcbnew-modulen (ekte eller stub). Stubben registreres som 'pcbnew' for skriptene."""
+    if name == "stub":
+        import pcbnew_stub
+        sys.modules["pcbnew"] = pcbnew_stub
+        return pcbnew_stub
+    import pcbnew
+    return pcbnew
+
+
+class Stamp(NamedTuple):
+    mtime_ns: int
+    size: int
+    sha: str
+
+
+def _sha(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class BoardCache:
+    """Lastede brett per sti, gyldige så lenge filen ikke har fått nytt innhold."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.boards: Dict[Path, Any] = {}
+        self.stamps: Dict[Path, Stamp] = {}
+        self.loads = 0
+
+    def get(self, path: Path) -> Any:
+        path = Path(path).resolve()
+        st = path.stat()
+        stamp = self.stamps.get(path)
+        if path in self.boards and stamp and (stamp.mtime_ns, stamp.size) == (st.st_mtime_ns, st.st_size):
+            return self.boards[path]
+        sha = _sha(path)
+        if path in self.boards and stamp and stamp.sha == sha:
+            self.stamps[path] = Stamp(st.st_mtime_ns, st.st_size, sha)
+            return self.boards[path]
+        self.boards[path] = self.backend.LoadBoard(str(path))
+        self.stamps[path] = Stamp(st.st_mtime_ns, st.st_size, sha)
+        self.loads += 1
+        return self.boards[path]
+
+    def saved(self, path: Path) -> None:
+        """Etter egen lagring: minnet og filen er like, så oppdater stempelet."""
+        path = Path(path).resolve()
+        st = path.stat()
+        self.stamps[path] = Stamp(st.st_mtime_ns, st.st_size, _sha(path))
+
+    def drop(self, path: Optional[Path] = None) -> None:
+        if path is None:
+            self.boards.clear()
+            self.stamps.clear()
+        else:
+            self.boards.pop(Path(path).resolve(), None)
+            self.stamps.pop(Path(path).resolve(), None)
+
+
+# === Metoder ===
+
+class Worker:
+    def __init__(self, backend_name: str = "pcbnew"):
+        self.backend_name = backend_name
+        self.backend = load_backend(backend_name)
+        self.cache = BoardCache(self.backend)
+        self.started = time.time()
+        self.calls = 0
+        self.running = True
+        self.methods: Dict[str, Callable[..., Any]] = {
+            "ping": self.ping, "load": self.load, "info": self.info, "nets_sync": self.nets_sync,
+            "fixups": self.fixups, "exec": self.exec, "save": self.save, "drop": self.drop,
+            "shutdown": self.shutdown,
+        }
+
+    def _board(self, path: Optional[str]) -> Any:
+        return self.cache.get(Path(path) if path else DEFAULT_BOARD)
+
+    @contextlib.contextmanager
+    def _mutating(self, path: Optional[str], dry_run: bool):
+        """Kast brettet i minnet hvis kallet feiler eller ikke skal lagres."""
+        target = Path(path) if path else DEFAULT_BOARD
+        ok = False
+        try:
+            yield target
+            ok = True
+        finally:
+            if dry_run or not ok:
+                self.cache.drop(target)
+
+    def ping(self) -> dict:
+        return {"pid": os.getpid(), "backend": self.backend_name, "uptime": round(time.time() - self.started, 1),
+                "calls": self.calls, "loads": self.cache.loads, "boards": [str(p) for p in self.cache.boards]}
+
+    def load(self, path: Optional[str] = None) -> dict:
+        before = self.cache.loads
+        t0 = time.perf_counter()
+        self._board(path)
+        return {"reloaded": self.cache.loads != before, "ms": round((time.perf_counter() - t0) * 1000, 2)}
+
+    def info(self, path: Optional[str] = None) -> dict:
+        board = self._board(path)
+        footprints = list(board.GetFootprints())
+        return {"footprints": len(footprints), "pads": sum(len(list(fp.Pads())) for fp in footprints),
+                "nets": len(board.GetNetsByName()), "zones": len(list(board.Zones()))}
+
+    def nets_sync(self, path: Optional[str] = None, csv: Optional[str] = None, dry_run: bool = False) -> dict:
+        import vikingboard_nets
+        with self._mutating(path, dry_run) as target:
+            board = self._board(path)
+            spec = vikingboard_nets.build_spec_dict(vikingboard_nets.iter_net_rows_from_csv(Path(csv or DOCS_CSV)))
+            changed = vikingboard_nets.apply_nets_from_spec(spec, board=board, dry_run=dry_run)
+            if changed and not dry_run:
+                self.backend.SaveBoard(str(target), board)
+                self.cache.saved(target)
+        return {"changed": changed}
+
+    def fixups(self, steps: Optional[List[str]] = None, path: Optional[str] = None, dry_run: bool = False) -> dict:
+        import vikingboard_fixups
+        if self.backend_name == "stub":
+            target = Path(path) if path else DEFAULT_BOARD
+            steps = steps or vikingboard_fixups.DEFAULT_STEPS
+            try:
+                vikingboard_fixups.run_steps(steps, target, dry_run=dry_run, headless=True)
+            finally:
+                self.cache.drop(target)      # filen er endret utenom brettet i minnet
+            return {"steps": steps}
+        with self._mutating(path, dry_run) as target:
+            board = self._board(path)
+            vikingboard_fixups.run_steps(steps or vikingboard_fixups.DEFAULT_STEPS, board=board,
+                                         dry_run=dry_run, save_path=target)
+            if not dry_run:
+                self.cache.saved(target)
+        return {"steps": steps or vikingboard_fixups.DEFAULT_STEPS}
+
+    def exec(self, script: str, path: Optional[str] = None, save: bool = False) -> dict:
+        """Kjør et skript som bruker pcbnew.GetBoard(); det får det cachede brettet."""
+        with self._mutating(path, not save) as target:
+            board = self._board(path)
+            original = getattr(self.backend, "GetBoard", None)
+            self.backend.GetBoard = lambda: board
+            try:
+                runpy.run_path(str(Path(script).resolve()), run_name="__main__")
+            finally:
+                if original is not None:
+                    self.backend.GetBoard = original
+            if save:
+                self.backend.SaveBoard(str(target), board)
+                self.cache.saved(target)
+        return {"saved": save}
+
+    def save(self, path: Optional[str] = None) -> dict:
+        target = Path(path) if path else DEFAULT_BOARD
+        self.backend.SaveBoard(str(target), self._board(path))
+        self.cache.saved(target)
+        return {"saved": str(target)}
+
+    def drop(self, path: Optional[str] = None) -> dict:
+        self.cache.drop(Path(path) if path else None)
+        return {"boards": len(self.cache.boards)}
+
+    def shutdown(self) -> dict:
+        self.running = False
+        return {"pid": os.getpid()}
+
+    def dispatch(self, request: dict) -> dict:
+        """Ett JSON-RPC-kall -> svar. Skriptenes utskrift returneres som 'output'."""
+        rid = request.get("id")
+        method = self.methods.get(request.get("method", ""))
+        if method is None:
+            return _error(rid, METHOD_NOT_FOUND, f"Ukjent metode: {request.get('method')}")
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            return _error(rid, INVALID_PARAMS, "params må være et objekt")
+        try:
+            inspect.signature(method).bind(**params)
+        except TypeError as e:
+            return _error(rid, INVALID_PARAMS, str(e))
+        self.calls += 1
+        out = io.StringIO()
+        t0 = time.perf_counter()
+        try:
+            with _trace_env(request), span(f"worker: {request['method']}", cat="worker", backend=self.backend_name):
+                with contextlib.redirect_stdout(out):
+                    result = method(**params)
+        except BaseException as e:  # SystemExit fra skript skal ikke ta ned workeren
+            return _error(rid, INTERNAL_ERROR, f"{type(e).__name__}: {e}", {"output": out.getvalue()})
+        return {"jsonrpc": "2.0", "id": rid,
+                "result": {**result, "output": out.getvalue(), "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2)}}
+
+
+@contextlib.contextmanager
+def _trace_env(request: dict) -> Iterator[None]:
+    """Bruk kallerens trace-katalog (None: ingen tracing) under kallet; uten feltet: workerens egen."""
+    if "trace" not in request:
+        yield
+        return
+    previous = os.environ.pop(TRACE_ENV, None)
+    if request["trace"]:
+        os.environ[TRACE_ENV] = str(request["trace"])
+    try:
+        yield
+    finally:
+        os.environ.pop(TRACE_ENV, None)
+        if previous is not None:
+            os.environ[TRACE_ENV] = previous
+
+
+def _error(rid, code: int, message: str, data: Any = None) -> dict:
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": rid, "error": error}
+
+
+# === Server ===
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        worker: Worker = self.server.worker
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = _error(None, PARSE_ERROR, str(e))
+            else:
+                response = worker.dispatch(request)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+            if not worker.running:
+                break
+
+
+def serve(path: Path, backend: str = "pcbnew", preload: bool = True) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        try:
+            WorkerClient(path).call("ping")
+            raise SystemExit(f"❌ En worker kjører allerede på {path}")
+        except (OSError, WorkerError):
+            path.unlink()               # gammel socket etter krasj
+    t0 = time.perf_counter()
+    worker = Worker(backend)
+    if preload and DEFAULT_BOARD.exists():
+        worker.cache.get(DEFAULT_BOARD)
+    server = socketserver.UnixStreamServer(str(path), _Handler)
+    server.worker = worker
+    os.chmod(path, 0o600)
+    print(f"✅ Worker klar på {path} ({backend}, {(time.perf_counter() - t0) * 1000:.0f} ms oppstart)", flush=True)
+    try:
+        while worker.running:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with contextlib.suppress(OSError):
+            path.unlink()
+
+
+# === Klient ===
+
+class WorkerClient:
+    def __init__(self, path: Optional[Path] = None, timeout: float = 600.0):
+        self.path = Path(path or socket_path())
+        self.timeout = timeout
+        self._next_id = 0
+
+    @classmethod
+    def connect(cls, path: Optional[Path] = None, autostart: bool = True, backend: str = "pcbnew",
+                wait: float = 60.0) -> "WorkerClient":
+        """Koble til, og start workeren i bakgrunnen hvis den ikke kjører."""
+        client = cls(path)
+        try:
+            client.call("ping")
+            return client
+        except OSError:
+            if not autostart:
+                raise
+        log = client.path.with_suffix(".log")
+        log.parent.mkdir(parents=True, exist_ok=True)
+        with open(log, "a") as f:
+            subprocess.Popen([sys.executable, str(Path(__file__).resolve()), "--socket", str(client.path), "serve",
+                              "--backend", backend], stdout=f, stderr=subprocess.STDOUT, start_new_session=True)
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            time.sleep(0.1)
+            try:
+                client.call("ping")
+                return client
+            except OSError:
+                continue
+        raise OSError(f"Workeren startet ikke innen {wait:g} s (se {log})")
+
+    def call(self, method: str, **params) -> dict:
+        self._next_id += 1
+        request = {"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params,
+                   "trace": os.environ.get(TRACE_ENV)}
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(self.timeout)
+            s.connect(str(self.path))
+            s.sendall(json.dumps(request).encode() + b"\n")
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = s.recv(1 << 16)
+                if not chunk:
+                    break
+                data += chunk
+        response = json.loads(data)
+        if "error" in response:
+            err = response["error"]
+            raise WorkerError(err["code"], err["message"], err.get("data"))
+        return response["result"]
+
+
+def run_steps(names: Sequence[str], path: Path = DEFAULT_BOARD, dry_run: bool = False) -> None:
+    """Fiks-steg via workeren hvis den kjører, ellers lokalt (uten pcbnew: som tekstredigering)."""
+    try:
+        client = WorkerClient.connect(autostart=False)
+    except OSError:
+        from vikingboard_fixups import run_steps as local
+        local(names, path, dry_run=dry_run)
+        return
+    try:
+        result = client.call("fixups", steps=list(names), path=str(path), dry_run=dry_run)
+    except WorkerError as e:
+        if isinstance(e.data, dict) and e.data.get("output"):
+            print(e.data["output"], end="")
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    print(result["output"], end="")
+    print(f"[INFO] Via worker på {result['elapsed_ms']:.0f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Resident pcbnew-worker med JSON-RPC over Unix-socket")
+    parser.add_argument("--socket", type=Path, default=None, help=f"socket (standard: ${ENV_SOCKET} eller {DEFAULT_SOCKET})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("serve", help="start workeren i forgrunnen")
+    p.add_argument("--backend", choices=["pcbnew", "stub"], default="pcbnew")
+    p.add_argument("--no-preload", action="store_true", help="ikke last standardbrettet ved oppstart")
+    sub.add_parser("ping")
+    sub.add_parser("stop")
+    p = sub.add_parser("load", help="last brettet (på nytt hvis filen er endret)")
+    p.add_argument("--board", type=Path)
+    p = sub.add_parser("info")
+    p.add_argument("--board", type=Path)
+    p = sub.add_parser("fixups")
+    p.add_argument("steps", nargs="*")
+    p.add_argument("--board", type=Path)
+    p.add_argument("--dry-run", action="store_true")
+    p = sub.add_parser("nets")
+    p.add_argument("--board", type=Path)
+    p.add_argument("--csv", type=Path)
+    p.add_argument("--dry-run", action="store_true")
+    p = sub.add_parser("exec", help="kjør et GetBoard()-skript mot det lastede brettet")
+    p.add_argument("script", type=Path)
+    p.add_argument("--board", type=Path)
+    p.add_argument("--save", action="store_true")
+    for name in ("load", "fixups", "nets", "exec", "info"):
+        sub.choices[name].add_argument("--start", choices=["pcbnew", "stub"],
+                                       help="start workeren med denne backenden hvis den ikke kjører")
+    args = parser.parse_args(argv)
+    path = args.socket or socket_path()
+
+    if args.cmd == "serve":
+        serve(path, args.backend, preload=not args.no_preload)
+        return 0
+    try:
+        start = getattr(args, "start", None)
+        client = WorkerClient.connect(path, autostart=start is not None, backend=start or "pcbnew")
+        board = str(args.board) if getattr(args, "board", None) else None
+        if args.cmd == "ping":
+            result = client.call("ping")
+        elif args.cmd == "stop":
+            result = client.call("shutdown")
+        elif args.cmd == "load":
+            result = client.call("load", path=board)
+        elif args.cmd == "info":
+            result = client.call("info", path=board)
+        elif args.cmd == "fixups":
+            result = client.call("fixups", steps=args.steps or None, path=board, dry_run=args.dry_run)
+        elif args.cmd == "nets":
+            result = client.call("nets_sync", path=board, csv=str(args.csv) if args.csv else None, dry_run=args.dry_run)
+        else:
+            result = client.call("exec", script=str(args.script), path=board, save=args.save)
+    except OSError as e:
+        print(f"❌ Ingen worker på {path} ({e}); start med: python pcb_scripts/vikingboard_worker.py serve")
+        return 1
+    except WorkerError as e:
+        if isinstance(e.data, dict) and e.data.get("output"):
+            print(e.data["output"], end="")
+        print(f"❌ {e}")
+        return 1
+    output = result.pop("output", "")
+    if output:
+        print(output, end="")
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
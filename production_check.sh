@@ -12,8 +12,10 @@ echo "✅ Files Ready:"
 
 echo ""
 echo "⚠️  Known Issues:"
-drc_violations=$(grep -c "Found.*violations" reports/drc_report.txt 2>/dev/null || echo "0")
-drc_unconnected=$(grep -c "unconnected_items" reports/drc_report.txt 2>/dev/null || echo "0")
+VIOLATIONS=0; UNCONNECTED=0
+[[ -f reports/drc_report.txt ]] && eval "$(python3 tools/vikingboard_drc.py reports/drc_report.txt --format shell)"
+drc_violations=$VIOLATIONS
+drc_unconnected=$UNCONNECTED
 
 echo "  - DRC violations: $drc_violations"
 echo "  - Unconnected pads: $drc_unconnected"
@@ -1,19 +1,12 @@
 import sys
-sys.path.insert(0, '/Applications/KiCad/KiCad.app/Contents/Frameworks/Python.framework/Versions/3.9/lib/python3.9/site-packages')
-import pcbnew
+from pathlib import Path
 
-board = pcbnew.LoadBoard("kicad/Vikingboard.kicad_pcb")
+sys.path.insert(0, '/Applications/KiCad/KiCad.app/Contents/Frameworks/Python.framework/Versions/3.9/lib/python3.9/site-packages')
+sys.path.insert(0, str(Path(__file__).resolve().parent / "pcb_scripts"))
 
-gnd_zones = {}
-for zone in board.Zones():
-    if zone.GetNetname() == "GND":
-        layer = zone.GetLayer()
-        if layer not in gnd_zones:
-            gnd_zones[layer] = zone
-        else:
-            board.Remove(zone)
+# Ett steg i samme transaksjon som resten av fiksene (én lasting, én fylling, én lagring).
+# Kjør flere steg samlet: python3 pcb_scripts/vikingboard_fixups.py
+# Går via pcbnew-workeren hvis den kjører (pcb_scripts/vikingboard_worker.py serve).
+from vikingboard_worker import run_steps
 
-filler = pcbnew.ZONE_FILLER(board)
-filler.Fill(board.Zones())
-pcbnew.SaveBoard("kicad/Vikingboard.kicad_pcb", board)
-print("✅ Duplicate GND zones removed!")
+run_steps(["remove_duplicate_gnd"])
@@ -0,0 +1,9 @@
+"""Unit tests for tools/ and pcb_scripts/. Run from the repo root: python -m pytest tests"""
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+for _path in (REPO_ROOT / "tools", REPO_ROOT / "pcb_scripts"):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
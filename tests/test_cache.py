@@ -0,0 +1,15 @@
+"""Parse cache (tools/vikingboard_cache.py)."""
+
+from vikingboard_board import REPO_ROOT
+from vikingboard_cache import ParseCache
+
+BOARD = REPO_ROOT / "kicad" / "Vikingboard.kicad_pcb"
+
+
+def test_unwritable_cache_still_parses(tmp_path, capsys):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = ParseCache(blocker / "parsed")          # mkdir fails: the parent is a file
+    assert cache.board(BOARD).footprints
+    assert cache.tree(BOARD).name == "kicad_pcb"
+    assert capsys.readouterr().err.count("not writable") == 1
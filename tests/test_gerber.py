@@ -0,0 +1,27 @@
+"""Macro expressions and aperture kernels (tools/vikingboard_gerber.py)."""
+
+import pytest
+
+from vikingboard_gerber import Aperture, GerberError, _eval, _kernel, aperture_kernel
+
+
+def test_macro_arithmetic():
+    variables = {1: 2.0, 2: 0.5}
+    assert _eval("$1x3+1", variables) == 7.0
+    assert _eval("($1+$2)/-0.5", variables) == -5.0
+    assert _eval("-$3", variables) == 0.0          # undefined variables are 0
+    assert _eval("  ", variables) == 0.0
+
+
+@pytest.mark.parametrize("expr", ["2**99999", "__import__('os')", "1+", "(1", "1)", "1/0", "1 2"])
+def test_macro_rejects_everything_else(expr):
+    with pytest.raises(GerberError):
+        _eval(expr, {})
+
+
+def test_kernels_are_shared_by_shape():
+    _kernel.cache_clear()
+    a = Aperture(10, [("circle", True, 0.5, 0.0, 0.0)], 0.25)
+    b = Aperture(11, [("circle", True, 0.5, 0.0, 0.0)], 0.25)
+    assert aperture_kernel(a, 20.0) is aperture_kernel(b, 20.0)
+    assert _kernel.cache_info().currsize == 1
@@ -0,0 +1,25 @@
+"""Value parsing in tools/vikingboard_lcsc.py."""
+
+import pytest
+
+from vikingboard_lcsc import parse_value
+
+
+@pytest.mark.parametrize("text, kind, expected", [
+    ("10UF", "", ("C", 10e-6)),
+    ("100N", "C", ("C", 100e-9)),
+    ("22P", "C", ("C", 22e-12)),
+    ("4N7", "C", ("C", 4.7e-9)),
+    ("10uF", "", ("C", 10e-6)),
+    ("4k7", "", ("R", 4700.0)),
+    ("1M", "R", ("R", 1e6)),
+    ("10 OHM", "", ("R", 10.0)),
+])
+def test_parse_value(text, kind, expected):
+    value_kind, value = parse_value(text, kind)
+    assert value_kind == expected[0]
+    assert value == pytest.approx(expected[1])
+
+
+def test_parse_value_rejects_unknown_prefix():
+    assert parse_value("10XF") is None
@@ -1,24 +1,7 @@
 import csv
 from pathlib import Path
 
-LCSC_MAP = {
-    "ESP32-S3-WROOM-1U-N16R8": "C3046459",
-    "CC1101": "C111074",
-    "SX1262": "C2834871",
-    "NRF24L01": "C109041",
-    "PN532": "C510389",
-    "EM4100": "C148677",
-    "BME280": "C96014",
-    "BH1750": "C212757",
-    "MPU6050": "C84194",
-    "NEO-6M": "C109017",
-    "MPR121": "C103878",
-    "WS2812B": "C47108",
-    "USB-C": "C2886994",
-    "SMA": "C168445",
-    "10µF": "C15849",
-    "100nF": "C14663"
-}
+from vikingboard_lcsc import LcscCatalog, bom_columns
 
 def annotate_and_generate_bom():
     """Generer JLCPCB BOM fra eksisterende production/bom.csv"""
@@ -39,20 +22,15 @@ def annotate_and_generate_bom():
         reader = csv.DictReader(f)
         rows = list(reader)
     
-    # 2. Match LCSC-koder
+    # 2. Match LCSC-koder mot katalogen (én indeksert join for hele BOM-en)
+    catalog = LcscCatalog.open()
+    keys = [bom_columns(row) for row in rows]  # Handle både formater
+    parts = catalog.annotate(keys)
+    catalog.close()
+
     components = []
-    for row in rows:
-        value = row.get("Value", row.get("value", ""))  # Handle både formater
-        refs = row.get("Refs", row.get("ref", row.get("Id", "")))
-        footprint = row.get("Footprint", row.get("footprint", ""))
-        
-        # Match LCSC
-        lcsc = "MANUAL"
-        for key, code in LCSC_MAP.items():
-            if key.lower() in value.lower():
-                lcsc = code
-                break
-        
+    for (value, footprint, refs), part in zip(keys, parts):
+        lcsc = part.lcsc if part else "MANUAL"
         components.append({
             "Comment": value,
             "Designator": refs,
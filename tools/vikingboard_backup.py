@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+vikingboard_backup.py - Content-addressed, deduplicating backup store.
+
+Replaces the timestamped full copies that MASTER.sh/RUN.sh `cp` into
+backups/ on every run. Each KiCad file is cut into chunks at top-level
+S-expression boundaries (one footprint, segment, zone, ... per chunk),
+and every chunk is stored once under its SHA-256. A snapshot is just a
+small manifest listing the chunk hashes of each file, so disk use
+and backup time grow with what changed, not with file size x run count.
+
+Everything lives in one SQLite file, backups/vikingboard_backups.sqlite:
+    objects         zlib-compressed chunk, keyed by SHA-256
+    snapshot_files  (timestamp, path) -> ordered chunk list
+Timestamps use the scripts' format, YYYYmmdd_HHMMSS. Paths are relative to
+the repo; absolute paths and ".." are refused, so a restore can only write
+below its destination.
+
+Usage:
+    python tools/vikingboard_backup.py snapshot [FILES...]
+    python tools/vikingboard_backup.py list
+    python tools/vikingboard_backup.py restore 20251205_120909 [--dest DIR | --in-place]
+    python tools/vikingboard_backup.py gc [--keep 20] [--before 20251201_000000]
+    python tools/vikingboard_backup.py import-legacy
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+import zipfile
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from io import StringIO
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from vikingboard_sexpr import CLOSE, OPEN, SexprError, iter_events
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+STORE_PATH = REPO_ROOT / "backups" / "vikingboard_backups.sqlite"
+DEFAULT_FILES = [
+    REPO_ROOT / "kicad" / "Vikingboard.kicad_pcb",
+    REPO_ROOT / "kicad" / "Vikingboard.kicad_sch",
+]
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+# Filenames written by the old shell scripts, mapped to the file they copied
+_LEGACY_PATTERNS = [
+    re.compile(r"^Vikingboard_(?P<ts>\d{8}_\d{6})\.(?P<ext>kicad_pcb|kicad_sch)$"),
+    re.compile(r"^pcb_(?P<ts>\d{8}_\d{6})\.(?P<ext>kicad_pcb)$"),
+    re.compile(r"^sch_(?P<ts>\d{8}_\d{6})\.(?P<ext>kicad_sch)$"),
+    re.compile(r"^Vikingboard\.(?P<ext>kicad_pcb|kicad_sch)\.backup_(?P<ts>\d{8}_\d{6})$"),
+]
+_LEGACY_ZIP_RE = re.compile(r"^Vikingboard-(\d{4})-(\d{2})-(\d{2})_(\d{6})\.zip$")
+
+
+# === Chunking ================================================================
+
+def chunk_boundaries(text: str) -> List[int]:
+    """
+    Offsets where chunks end: after every direct child of the root list.
+
+    The header (everything before the first child) and the closing
+    parenthesis each end up in their own chunk. Non-S-expression text
+    (e.g. .kicad_pro JSON) yields a single chunk.
+    """
+    cuts: List[int] = []
+    depth = 0
+    try:
+        for kind, _name, offset in iter_events(StringIO(text)):
+            if kind == OPEN:
+                if depth == 1 and not cuts:
+                    cuts.append(offset)
+                depth += 1
+            elif kind == CLOSE:
+                depth -= 1
+                if depth == 1:
+                    cuts.append(offset)
+    except SexprError:
+        return [len(text)]
+    if not cuts or cuts[-1] != len(text):
+        cuts.append(len(text))
+    return cuts
+
+
+def split_chunks(data: bytes) -> List[bytes]:
+    """Cut file contents into chunks whose concatenation is the original."""
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return [data]
+    chunks = []
+    start = 0
+    for end in chunk_boundaries(text):
+        if end > start:
+            chunks.append(text[start:end].encode("utf-8"))
+        start = end
+    return chunks
+
+
+# === Store ===================================================================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash BLOB PRIMARY KEY,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshot_files (
+    timestamp TEXT NOT NULL,
+    path      TEXT NOT NULL,
+    sha256    BLOB NOT NULL,
+    size      INTEGER NOT NULL,
+    chunks    BLOB NOT NULL,
+    PRIMARY KEY (timestamp, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshot_files_by_path ON snapshot_files (path, timestamp);
+"""
+
+_DIGEST_SIZE = 32
+
+
+def safe_rel(rel: str) -> str:
+    """rel as a clean relative path; ValueError if it is absolute or climbs out with ".."."""
+    path = PurePosixPath(rel.replace("\\", "/"))
+    if path.is_absolute() or ".." in path.parts or not path.parts or re.match(r"^[A-Za-z]:", rel):
+        raise ValueError(f"Refusing path outside the repo: {rel}")
+    return path.as_posix()
+
+
+class BackupStore:
+    """
+    Chunk objects and snapshot manifests in one SQLite file.
+
+    A single database keeps thousands of small chunks from each costing a
+    filesystem block, and gives parallel pipeline runs safe concurrent
+    writes. Chunk lists are stored as concatenated 32-byte SHA-256 digests.
+    """
+
+    def __init__(self, path: Path = STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    @contextmanager
+    def _write(self):
+        """
+        One transaction that takes the write lock up front, so what it reads
+        (live chunks, existing objects) stays true until it commits.
+        """
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.db.rollback()
+            raise
+        self.db.commit()
+
+    # --- Objects ----------------------------------------------------------
+
+    def has_object(self, digest: bytes) -> bool:
+        row = self.db.execute("SELECT 1 FROM objects WHERE hash = ?", (digest,)).fetchone()
+        return row is not None
+
+    def put_object(self, data: bytes) -> Tuple[bytes, bool]:
+        """Store one chunk; returns (digest, newly_written)."""
+        digest = hashlib.sha256(data).digest()
+        if self.has_object(digest):
+            return digest, False
+        self.db.execute(
+            "INSERT OR IGNORE INTO objects (hash, data) VALUES (?, ?)",
+            (digest, zlib.compress(data, 6)),
+        )
+        return digest, True
+
+    def get_object(self, digest: bytes) -> bytes:
+        row = self.db.execute("SELECT data FROM objects WHERE hash = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"Missing chunk {digest.hex()}")
+        return zlib.decompress(row[0])
+
+    # --- Snapshots --------------------------------------------------------
+
+    def list_snapshots(self) -> List[str]:
+        rows = self.db.execute("SELECT DISTINCT timestamp FROM snapshot_files ORDER BY timestamp")
+        return [r[0] for r in rows]
+
+    def snapshot_files(self, timestamp: str) -> Dict[str, int]:
+        """{relative_path: size} for one snapshot."""
+        rows = self.db.execute(
+            "SELECT path, size FROM snapshot_files WHERE timestamp = ? ORDER BY path", (timestamp,)
+        )
+        return dict(rows.fetchall())
+
+    def resolve(self, timestamp: str) -> Optional[str]:
+        """Exact match, otherwise the latest snapshot at or before timestamp."""
+        row = self.db.execute(
+            "SELECT MAX(timestamp) FROM snapshot_files WHERE timestamp <= ?", (timestamp,)
+        ).fetchone()
+        return row[0]
+
+    def _latest_entry(self, rel: str) -> Optional[Tuple[bytes, int, bytes]]:
+        return self.db.execute(
+            "SELECT sha256, size, chunks FROM snapshot_files WHERE path = ? "
+            "ORDER BY timestamp DESC LIMIT 1",
+            (rel,),
+        ).fetchone()
+
+    def snapshot(self, files: Dict[str, bytes], timestamp: Optional[str] = None) -> dict:
+        """
+        Store a snapshot of {relative_path: contents}.
+
+        Files identical to their latest stored version are recorded without
+        re-chunking. Re-using a timestamp replaces those files in it.
+        """
+        timestamp = timestamp or datetime.now().strftime(TIMESTAMP_FORMAT)
+        stats = {"files": 0, "unchanged": 0, "chunks": 0, "new_chunks": 0, "new_bytes": 0}
+        files = {safe_rel(rel): data for rel, data in files.items()}
+        with self._write():
+            for rel, data in sorted(files.items()):
+                stats["files"] += 1
+                digest = hashlib.sha256(data).digest()
+                previous = self._latest_entry(rel)
+                if previous is not None and previous[0] == digest:
+                    chunks = previous[2]
+                    stats["unchanged"] += 1
+                else:
+                    chunk_ids = []
+                    for chunk in split_chunks(data):
+                        chunk_id, created = self.put_object(chunk)
+                        chunk_ids.append(chunk_id)
+                        if created:
+                            stats["new_chunks"] += 1
+                            stats["new_bytes"] += len(chunk)
+                    stats["chunks"] += len(chunk_ids)
+                    chunks = b"".join(chunk_ids)
+                self.db.execute(
+                    "INSERT OR REPLACE INTO snapshot_files VALUES (?, ?, ?, ?, ?)",
+                    (timestamp, rel, digest, len(data), chunks),
+                )
+        stats["timestamp"] = timestamp
+        return stats
+
+    def read_file(self, timestamp: str, rel: str) -> bytes:
+        row = self.db.execute(
+            "SELECT sha256, chunks FROM snapshot_files WHERE timestamp = ? AND path = ?",
+            (timestamp, rel),
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Snapshot {timestamp} has no file {rel}")
+        digest, chunks = row
+        data = b"".join(
+            self.get_object(chunks[i : i + _DIGEST_SIZE]) for i in range(0, len(chunks), _DIGEST_SIZE)
+        )
+        if hashlib.sha256(data).digest() != digest:
+            raise ValueError(f"Snapshot {timestamp}: checksum mismatch for {rel}")
+        return data
+
+    def restore(self, timestamp: str, dest: Path, only: Optional[Iterable[str]] = None) -> List[Path]:
+        """Write every file of a snapshot under dest; returns written paths."""
+        wanted = set(only) if only else None
+        # Check every path before writing any: older stores may hold absolute ones
+        targets = [(rel, dest / safe_rel(rel)) for rel in self.snapshot_files(timestamp)
+                   if wanted is None or rel in wanted]
+        for rel, target in targets:
+            _atomic_write(target, self.read_file(timestamp, rel))
+        return [target for _, target in targets]
+
+    # --- Garbage collection -------------------------------------------------
+
+    def prune(self, keep: Optional[int] = None, before: Optional[str] = None) -> List[str]:
+        """Drop snapshots older than before and/or beyond the newest keep."""
+        snapshots = self.list_snapshots()
+        doomed: Set[str] = set()
+        if before is not None:
+            doomed.update(t for t in snapshots if t < before)
+        if keep is not None and keep >= 0:
+            doomed.update(snapshots[: max(len(snapshots) - keep, 0)])
+        with self.db:
+            self.db.executemany(
+                "DELETE FROM snapshot_files WHERE timestamp = ?", [(t,) for t in doomed]
+            )
+        return sorted(doomed)
+
+    def collect_garbage(self) -> Tuple[int, int]:
+        """Delete chunks no snapshot references and compact the file."""
+        # Scan and delete in one write transaction: a snapshot committing in
+        # between could otherwise re-use a chunk that looked dead
+        with self._write():
+            live: Set[bytes] = set()
+            for (chunks,) in self.db.execute("SELECT chunks FROM snapshot_files"):
+                live.update(chunks[i : i + _DIGEST_SIZE] for i in range(0, len(chunks), _DIGEST_SIZE))
+            dead = [
+                (digest, size)
+                for digest, size in self.db.execute("SELECT hash, length(data) FROM objects")
+                if digest not in live
+            ]
+            self.db.executemany("DELETE FROM objects WHERE hash = ?", [(d,) for d, _ in dead])
+        self.db.execute("VACUUM")
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return len(dead), sum(size for _, size in dead)
+
+    def disk_usage(self) -> int:
+        paths = [self.path, self.path.with_name(self.path.name + "-wal")]
+        return sum(p.stat().st_size for p in paths if p.exists())
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """
+    Write via a temp file + rename so readers never see half a file. The
+    file keeps its mode if it exists, else gets the umask default (mkstemp
+    alone would leave it 0600).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mode = path.stat().st_mode & 0o777 if path.exists() else 0o666 & ~_umask()
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# === Legacy import ===========================================================
+
+def find_legacy_backups(repo_root: Path = REPO_ROOT) -> Dict[str, Dict[str, Path]]:
+    """Map timestamp -> {relative_path: file} for the old full-copy backups."""
+    found: Dict[str, Dict[str, Path]] = {}
+    candidates = list((repo_root / "backups").glob("*")) + list((repo_root / "kicad").glob("*.backup_*"))
+    for path in candidates:
+        if not path.is_file():
+            continue
+        for pattern in _LEGACY_PATTERNS:
+            m = pattern.match(path.name)
+            if m:
+                rel = f"kicad/Vikingboard.{m.group('ext')}"
+                found.setdefault(m.group("ts"), {})[rel] = path
+                break
+    return found
+
+
+def find_legacy_zips(repo_root: Path = REPO_ROOT) -> Dict[str, Path]:
+    """Map timestamp -> zip for KiCad's own kicad/Vikingboard-backups/*.zip."""
+    found = {}
+    for path in (repo_root / "kicad" / "Vikingboard-backups").glob("*.zip"):
+        m = _LEGACY_ZIP_RE.match(path.name)
+        if m:
+            year, month, day, hms = m.groups()
+            found[f"{year}{month}{day}_{hms}"] = path
+    return found
+
+
+def import_legacy(store: BackupStore, repo_root: Path = REPO_ROOT) -> List[dict]:
+    """Ingest old timestamped copies and zips into the store, oldest first."""
+    results = []
+    copies = find_legacy_backups(repo_root)
+    zips = find_legacy_zips(repo_root)
+    for timestamp in sorted(set(copies) | set(zips)):
+        files = {rel: path.read_bytes() for rel, path in copies.get(timestamp, {}).items()}
+        if timestamp in zips:
+            with zipfile.ZipFile(zips[timestamp]) as zf:
+                for info in zf.infolist():
+                    if info.is_dir():
+                        continue
+                    try:
+                        files[safe_rel(f"kicad/{info.filename}")] = zf.read(info)
+                    except ValueError as exc:
+                        print(f"⚠️  {zips[timestamp].name}: {exc}, skipped")
+        results.append(store.snapshot(files, timestamp))
+    return results
+
+
+# === CLI =====================================================================
+
+def _rel(path: Path) -> str:
+    """Repo-relative key for path; ValueError for files outside the repo."""
+    try:
+        return path.resolve().relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        raise ValueError(f"Refusing path outside the repo: {path}") from None
+
+
+def _fmt_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n} B"
+
+
+def cmd_snapshot(store: BackupStore, args) -> int:
+    paths = args.files or DEFAULT_FILES
+    files = {}
+    for path in paths:
+        if not path.exists():
+            print(f"❌ Missing file: {path}")
+            return 1
+        try:
+            files[_rel(path)] = path.read_bytes()
+        except ValueError as exc:
+            print(f"❌ {exc}")
+            return 1
+    t0 = time.perf_counter()
+    stats = store.snapshot(files, args.timestamp)
+    elapsed = time.perf_counter() - t0
+    print(
+        f"✅ Backup saved: {stats['timestamp']} "
+        f"({stats['files']} files, {stats['unchanged']} unchanged, "
+        f"{stats['new_chunks']}/{stats['chunks']} new chunks, "
+        f"+{_fmt_bytes(stats['new_bytes'])}, {elapsed * 1000:.0f} ms)"
+    )
+    return 0
+
+
+def cmd_list(store: BackupStore, args) -> int:
+    snapshots = store.list_snapshots()
+    for timestamp in snapshots:
+        files = store.snapshot_files(timestamp)
+        names = ", ".join(sorted(files))
+        print(f"{timestamp}  {len(files)} files  {names}")
+    print(f"\n{len(snapshots)} snapshots, store size {_fmt_bytes(store.disk_usage())}")
+    return 0
+
+
+def cmd_restore(store: BackupStore, args) -> int:
+    timestamp = store.resolve(args.timestamp)
+    if timestamp is None:
+        print(f"❌ No snapshot at or before {args.timestamp}")
+        return 1
+    dest = REPO_ROOT if args.in_place else (args.dest or REPO_ROOT / "backups" / f"restore_{timestamp}")
+    try:
+        written = store.restore(timestamp, dest, args.file)
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return 1
+    print(f"✅ Restored snapshot {timestamp} ({len(written)} files)")
+    for path in written:
+        print(f"   {path}")
+    return 0
+
+
+def cmd_gc(store: BackupStore, args) -> int:
+    before = store.disk_usage()
+    pruned = store.prune(keep=args.keep, before=args.before)
+    removed, freed = store.collect_garbage()
+    print(f"🧹 Pruned {len(pruned)} snapshots, removed {removed} unreferenced chunks ({_fmt_bytes(freed)} compressed)")
+    print(f"   Store size: {_fmt_bytes(before)} -> {_fmt_bytes(store.disk_usage())}")
+    return 0
+
+
+def cmd_import_legacy(store: BackupStore, args) -> int:
+    t0 = time.perf_counter()
+    results = import_legacy(store)
+    new_bytes = sum(r["new_bytes"] for r in results)
+    print(f"✅ Imported {len(results)} legacy snapshots in {time.perf_counter() - t0:.2f} s")
+    print(f"   New chunk data: {_fmt_bytes(new_bytes)}, store size {_fmt_bytes(store.disk_usage())}")
+    print("   The old copies are left in place; delete them once you have checked the store.")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Deduplicating backup store for KiCad files")
+    parser.add_argument("--store", type=Path, default=STORE_PATH, help="store database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("snapshot", help="back up files (default: PCB + schematic)")
+    p.add_argument("files", nargs="*", type=Path)
+    p.add_argument("--timestamp", help=f"override timestamp ({TIMESTAMP_FORMAT})")
+    p.set_defaults(func=cmd_snapshot)
+
+    p = sub.add_parser("list", help="list snapshots")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("restore", help="restore a snapshot by timestamp")
+    p.add_argument("timestamp", help="exact timestamp, or latest snapshot at or before it")
+    p.add_argument("--dest", type=Path, help="output directory (default backups/restore_<T>)")
+    p.add_argument("--in-place", action="store_true", help="overwrite the working files")
+    p.add_argument("--file", action="append", help="restore only this relative path")
+    p.set_defaults(func=cmd_restore)
+
+    p = sub.add_parser("gc", help="prune old snapshots and delete unreferenced chunks")
+    p.add_argument("--keep", type=int, help="keep only the newest N snapshots")
+    p.add_argument("--before", help="drop snapshots older than this timestamp")
+    p.set_defaults(func=cmd_gc)
+
+    p = sub.add_parser("import-legacy", help="ingest backups/*.kicad_* and kicad/*.backup_* copies")
+    p.set_defaults(func=cmd_import_legacy)
+
+    args = parser.parse_args(argv)
+    store = BackupStore(args.store)
+    try:
+        return args.func(store, args)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+vikingboard_bisect.py - Find the snapshot where a board check started failing.
+
+Collects every saved revision of the board (or schematic) in time order:
+    backups/*.kicad_*              old timestamped copies from the scripts
+    kicad/*.backup_*               pre-fix-up copies
+    kicad/Vikingboard-backups/*.zip KiCad's own autosave zips
+    backups/vikingboard_backups.sqlite  the deduplicating store
+    the working file               newest entry, labelled "working"
+
+and evaluates checks over them in a process pool. Identical contents are
+evaluated once: snapshots are keyed by SHA-256, each distinct file is
+loaded once through the parse cache (tools/vikingboard_cache.py) and the
+Board is shared by all checks, and results are kept in
+.cache/bisect_cache.json until the checks or the spec change.
+
+Default mode checks the whole history and prints a per-snapshot metrics
+table plus, per check, the first bad snapshot of the current failing run.
+--bisect narrows a good..bad range instead, evaluating --jobs evenly
+spaced snapshots per round, for histories too long to check in full.
+
+Checks are built-in names (see --list) or module:function, called with a
+Snapshot context and returning (ok, value) or a bool.
+
+Usage:
+    python tools/vikingboard_bisect.py
+    python tools/vikingboard_bisect.py --check outline --check gnd_zones
+    python tools/vikingboard_bisect.py --check net_spec --bisect --good 20251202_024209
+    python tools/vikingboard_bisect.py --file kicad/Vikingboard.kicad_sch --check symbols
+    python tools/vikingboard_bisect.py --check my_checks:no_vias_on_edge --json
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from vikingboard_backup import (
+    STORE_PATH,
+    TIMESTAMP_FORMAT,
+    BackupStore,
+    find_legacy_backups,
+    find_legacy_zips,
+)
+from vikingboard_board import Board, from_node
+from vikingboard_cache import default_cache
+from vikingboard_sexpr import Node, SexprError, parse
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_FILE = "kicad/Vikingboard.kicad_pcb"
+CACHE_PATH = REPO_ROOT / ".cache" / "bisect_cache.json"
+EDGE_TOLERANCE = 0.01    # mm; outline endpoints closer than this meet
+
+Metric = Tuple[bool, str]
+
+
+class Revision(NamedTuple):
+    timestamp: str
+    source: str        # where the copy came from, relative to the repo
+    digest: str        # SHA-256 of the contents
+
+
+class Snapshot:
+    """One distinct file content; the tree and Board are parsed on first use."""
+
+    def __init__(self, data: bytes, rel: str):
+        self.data = data
+        self.rel = rel
+        self._root: Optional[Node] = None
+        self._board: Optional[Board] = None
+
+    @property
+    def root(self) -> Node:
+        if self._root is None:
+            cache = default_cache()
+            self._root = cache.tree(data=self.data) if cache else parse(self.data.decode("utf-8"))
+        return self._root
+
+    @property
+    def board(self) -> Board:
+        if self._board is None:
+            cache = default_cache()
+            self._board = cache.board(data=self.data) if cache else from_node(self.root)
+        return self._board
+
+
+# === Checks ==================================================================
+
+def check_outline(snap: Snapshot) -> Metric:
+    """Edge.Cuts forms closed loops: every line/arc endpoint is shared."""
+    edges = snap.board.edges()
+    if not edges:
+        return False, "no edges"
+    ends: Dict[Tuple[int, int], int] = {}
+    for g in edges:
+        if g.kind in ("rect", "circle", "poly"):
+            continue
+        for x, y in (g.points[0], g.points[-1]):
+            key = (round(x / EDGE_TOLERANCE), round(y / EDGE_TOLERANCE))
+            ends[key] = ends.get(key, 0) + 1
+    loose = sum(1 for n in ends.values() if n % 2)
+    if loose:
+        return False, f"{len(edges)} edges, {loose} open ends"
+    return True, f"{len(edges)} edges"
+
+
+def check_gnd_zones(snap: Snapshot) -> Metric:
+    """At least one GND copper zone."""
+    count = sum(1 for z in snap.board.zones if z.net == "GND" and not z.keepout)
+    return count > 0, str(count)
+
+
+_SPEC_ROWS: Optional[List[Tuple[str, str, str]]] = None
+
+
+def check_net_spec(snap: Snapshot) -> Metric:
+    """Pad nets match the compiled spec (tools/vikingboard_specdb.py)."""
+    global _SPEC_ROWS
+    if _SPEC_ROWS is None:
+        from vikingboard_specdb import load_spec
+
+        _SPEC_ROWS = list(load_spec().rows())
+    pads = {(p.ref, p.number): p.net for p in snap.board.pads}
+    missing = sum(1 for ref, pad, _net in _SPEC_ROWS if (ref, pad) not in pads)
+    wrong = sum(1 for ref, pad, net in _SPEC_ROWS if (ref, pad) in pads and pads[(ref, pad)] != net)
+    if missing or wrong:
+        return False, f"{wrong} wrong, {missing} missing"
+    return True, f"{len(_SPEC_ROWS)} pins"
+
+
+def check_unrouted(snap: Snapshot) -> Metric:
+    """No unconnected items (tools/vikingboard_connectivity.py)."""
+    from vikingboard_connectivity import check_board
+
+    unconnected = check_board(snap.board).unconnected
+    return unconnected == 0, str(unconnected)
+
+
+def check_footprints(snap: Snapshot) -> Metric:
+    """The board has footprints at all."""
+    count = len(snap.board.footprints)
+    return count > 0, str(count)
+
+
+def check_symbols(snap: Snapshot) -> Metric:
+    """Schematic: number of placed symbols."""
+    count = sum(1 for s in snap.root.find_all("symbol") if s.find("lib_id") is not None)
+    return count > 0, str(count)
+
+
+CHECKS: Dict[str, Callable[[Snapshot], Metric]] = {
+    "outline": check_outline,
+    "gnd_zones": check_gnd_zones,
+    "net_spec": check_net_spec,
+    "unrouted": check_unrouted,
+    "footprints": check_footprints,
+    "symbols": check_symbols,
+}
+DEFAULT_CHECKS = {".kicad_pcb": ["outline", "gnd_zones", "net_spec", "footprints"], ".kicad_sch": ["symbols"]}
+
+
+def resolve_check(name: str) -> Callable[[Snapshot], Metric]:
+    if name in CHECKS:
+        return CHECKS[name]
+    if ":" in name:
+        module, func = name.split(":", 1)
+        return getattr(importlib.import_module(module), func)
+    raise KeyError(f"Unknown check '{name}' (built-in: {', '.join(CHECKS)})")
+
+
+def _evaluate(data: bytes, rel: str, names: Sequence[str]) -> Dict[str, Metric]:
+    """Worker: run every check against one file content, parsing it once."""
+    snap = Snapshot(data, rel)
+    results: Dict[str, Metric] = {}
+    for name in names:
+        try:
+            result = resolve_check(name)(snap)
+        except (SexprError, UnicodeDecodeError) as exc:
+            result = (False, f"unreadable: {exc}")
+        except Exception as exc:  # a broken snapshot must not stop the bisect
+            result = (False, f"{type(exc).__name__}: {exc}")
+        if isinstance(result, bool):
+            result = (result, "ok" if result else "fail")
+        results[name] = (bool(result[0]), str(result[1]))
+    return results
+
+
+# === History =================================================================
+
+def collect_history(rel: str = DEFAULT_FILE, repo_root: Path = REPO_ROOT,
+                    store_path: Path = STORE_PATH) -> Tuple[List[Revision], Dict[str, bytes]]:
+    """All saved copies of rel, oldest first, plus their contents by digest."""
+    found: Dict[str, Tuple[str, bytes]] = {}
+
+    def add(timestamp: str, source: str, data: bytes) -> None:
+        found.setdefault(timestamp, (source, data))
+
+    for timestamp, files in find_legacy_backups(repo_root).items():
+        if rel in files:
+            add(timestamp, files[rel].relative_to(repo_root).as_posix(), files[rel].read_bytes())
+    member = Path(rel).name
+    for timestamp, path in find_legacy_zips(repo_root).items():
+        with zipfile.ZipFile(path) as zf:
+            if member in zf.namelist():
+                add(timestamp, path.relative_to(repo_root).as_posix(), zf.read(member))
+    # Opening a BackupStore creates it, so only look when it is there
+    if store_path.exists():
+        store = BackupStore(store_path)
+        try:
+            for timestamp in store.list_snapshots():
+                if rel in store.snapshot_files(timestamp):
+                    add(timestamp, f"store:{timestamp}", store.read_file(timestamp, rel))
+        finally:
+            store.close()
+    working = repo_root / rel
+    if working.exists():
+        timestamp = datetime.fromtimestamp(working.stat().st_mtime).strftime(TIMESTAMP_FORMAT)
+        found[timestamp] = ("working", working.read_bytes())
+
+    revisions: List[Revision] = []
+    contents: Dict[str, bytes] = {}
+    for timestamp in sorted(found):
+        source, data = found[timestamp]
+        digest = hashlib.sha256(data).hexdigest()
+        contents.setdefault(digest, data)
+        revisions.append(Revision(timestamp, source, digest))
+    return revisions, contents
+
+
+# === Evaluation ==============================================================
+
+def _cache_salt() -> str:
+    """Changes whenever the check code or the spec sources change."""
+    from vikingboard_specdb import SOURCES
+
+    tools = REPO_ROOT / "tools"
+    paths = [Path(__file__), tools / "vikingboard_board.py", tools / "vikingboard_sexpr.py",
+             tools / "vikingboard_connectivity.py"] + [p for _, p in SOURCES]
+    h = hashlib.sha256()
+    for path in paths:
+        try:
+            st = path.stat()
+            h.update(f"{path}:{st.st_mtime_ns}:{st.st_size};".encode())
+        except OSError:
+            h.update(f"{path}:missing;".encode())
+    return h.hexdigest()[:16]
+
+
+class Evaluator:
+    """Runs checks per distinct content in a process pool, with a result cache."""
+
+    def __init__(self, contents: Dict[str, bytes], rel: str, checks: Sequence[str],
+                 jobs: Optional[int] = None, cache_path: Optional[Path] = CACHE_PATH):
+        self.contents = contents
+        self.rel = rel
+        self.checks = list(checks)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache_path = cache_path
+        self.results: Dict[str, Dict[str, Metric]] = {}
+        self.evaluated = 0
+        self.cached = 0
+        self._salt = _cache_salt()
+        self._cache: Dict[str, Dict[str, list]] = {}
+        if cache_path is not None and cache_path.exists():
+            try:
+                data = json.loads(cache_path.read_text(encoding="utf-8"))
+                if data.get("salt") == self._salt:
+                    self._cache = data.get("results", {})
+            except (OSError, ValueError):
+                pass
+
+    def _cacheable(self, name: str) -> bool:
+        return name in CHECKS
+
+    def run(self, digests: Iterable[str]) -> None:
+        todo = []
+        for digest in dict.fromkeys(digests):
+            if digest in self.results:
+                continue
+            hit = self._cache.get(digest, {})
+            if all(self._cacheable(c) and c in hit for c in self.checks):
+                self.results[digest] = {c: (hit[c][0], hit[c][1]) for c in self.checks}
+                self.cached += 1
+            else:
+                todo.append(digest)
+        if not todo:
+            return
+        if self.jobs == 1 or len(todo) == 1:
+            for digest in todo:
+                self._store(digest, _evaluate(self.contents[digest], self.rel, self.checks))
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(todo))) as pool:
+                futures = {d: pool.submit(_evaluate, self.contents[d], self.rel, self.checks) for d in todo}
+                for digest, future in futures.items():
+                    self._store(digest, future.result())
+
+    def _store(self, digest: str, result: Dict[str, Metric]) -> None:
+        self.results[digest] = result
+        self.evaluated += 1
+        entry = self._cache.setdefault(digest, {})
+        for name, metric in result.items():
+            if self._cacheable(name):
+                entry[name] = list(metric)
+
+    def save(self) -> None:
+        if self.cache_path is None or not self.evaluated:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        mask = os.umask(0)
+        os.umask(mask)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_path.parent, prefix=f".{self.cache_path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"salt": self._salt, "results": self._cache}, f)
+            os.chmod(tmp, 0o666 & ~mask)        # mkstemp creates 0600
+            os.replace(tmp, self.cache_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def passes(self, digest: str) -> bool:
+        return all(ok for ok, _ in self.results[digest].values())
+
+
+# === Bisect ==================================================================
+
+def first_bad(revisions: Sequence[Revision], ok: Callable[[Revision], bool]) -> Optional[int]:
+    """Start of the failing run that reaches the newest revision, or None."""
+    if not revisions or ok(revisions[-1]):
+        return None
+    index = len(revisions) - 1
+    while index > 0 and not ok(revisions[index - 1]):
+        index -= 1
+    return index
+
+
+def bisect(revisions: Sequence[Revision], evaluator: Evaluator, good: int, bad: int) -> Tuple[int, int, int]:
+    """
+    Narrow good..bad to an adjacent (good, bad) pair.
+
+    Each round evaluates up to evaluator.jobs evenly spaced revisions in
+    parallel, so the range shrinks by a factor of jobs + 1 per round.
+    Returns (last_good, first_bad, rounds).
+    """
+    rounds = 0
+    while bad - good > 1:
+        rounds += 1
+        span = bad - good
+        count = min(evaluator.jobs, span - 1)
+        probes = sorted({good + (span * (i + 1)) // (count + 1) for i in range(count)} - {good, bad})
+        evaluator.run(revisions[i].digest for i in probes)
+        for i in probes:
+            if evaluator.passes(revisions[i].digest):
+                good = i
+            else:
+                bad = i
+                break
+    return good, bad, rounds
+
+
+def _index(revisions: Sequence[Revision], timestamp: Optional[str], default: int) -> int:
+    if timestamp is None:
+        return default
+    for i, rev in enumerate(revisions):
+        if rev.timestamp >= timestamp:
+            return i
+    return len(revisions) - 1
+
+
+# === CLI =====================================================================
+
+def _cell(metric: Optional[Metric]) -> str:
+    if metric is None:
+        return "-"
+    return f"{'✅' if metric[0] else '❌'} {metric[1]}"
+
+
+def print_table(revisions: Sequence[Revision], evaluator: Evaluator) -> None:
+    checks = evaluator.checks
+    widths = [max(len(c), 14) for c in checks]
+    print(f"{'timestamp':<16} {'source':<44} " + " ".join(f"{c:<{w}}" for c, w in zip(checks, widths)))
+    previous: Dict[str, bool] = {}
+    for rev in revisions:
+        metrics = evaluator.results.get(rev.digest)
+        if metrics is None:
+            continue
+        cells = []
+        for name, width in zip(checks, widths):
+            cell = _cell(metrics.get(name))
+            flipped = name in previous and previous[name] != metrics[name][0]
+            previous[name] = metrics[name][0]
+            cells.append(f"{cell + (' ←' if flipped else ''):<{width}}")
+        source = rev.source if len(rev.source) <= 44 else "…" + rev.source[-43:]
+        print(f"{rev.timestamp:<16} {source:<44} " + " ".join(cells))
+
+
+def _diff_hint(old: Revision, new: Revision, rel: str) -> str:
+    """A vikingboard_diff.py command for two revisions, if both are readable by it."""
+    args = []
+    for rev in (old, new):
+        if rev.source == "working":
+            args.append(rel)
+        elif rev.source.startswith("store:"):
+            args.append(rev.timestamp)
+        elif rev.source.endswith(".zip"):
+            return ""
+        else:
+            args.append(rev.source)
+    return f"   Compare: python tools/vikingboard_diff.py {' '.join(args)}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate checks across the backup history and find the first bad snapshot")
+    parser.add_argument("--file", default=DEFAULT_FILE, help=f"file to follow (default {DEFAULT_FILE})")
+    parser.add_argument("--check", action="append", help="built-in check or module:function (repeatable)")
+    parser.add_argument("--bisect", action="store_true", help="narrow good..bad instead of checking every snapshot")
+    parser.add_argument("--good", help="known good timestamp (default: oldest)")
+    parser.add_argument("--bad", help="known bad timestamp (default: newest)")
+    parser.add_argument("--jobs", "-j", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help=f"ignore and do not update {CACHE_PATH.relative_to(REPO_ROOT)}")
+    parser.add_argument("--list", action="store_true", help="list built-in checks")
+    parser.add_argument("--json", action="store_true", help="print the metrics table as JSON")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, func in CHECKS.items():
+            print(f"  {name:<11} {func.__doc__}")
+        return 0
+    checks = args.check or DEFAULT_CHECKS.get(Path(args.file).suffix, ["footprints"])
+    try:
+        for name in checks:
+            resolve_check(name)
+    except (KeyError, ImportError, AttributeError) as exc:
+        print(f"❌ {exc}")
+        return 2
+
+    t0 = time.perf_counter()
+    revisions, contents = collect_history(args.file)
+    if not revisions:
+        print(f"❌ No saved copies of {args.file}")
+        return 2
+    evaluator = Evaluator(contents, args.file, checks, args.jobs, None if args.no_cache else CACHE_PATH)
+    if not args.json:
+        print(f"[INFO] {len(revisions)} snapshots of {args.file}, {len(contents)} distinct; checks: {', '.join(checks)}")
+
+    if args.bisect:
+        good = _index(revisions, args.good, 0)
+        bad = _index(revisions, args.bad, len(revisions) - 1)
+        evaluator.run([revisions[good].digest, revisions[bad].digest])
+        if not evaluator.passes(revisions[good].digest):
+            print(f"❌ 'Good' snapshot {revisions[good].timestamp} fails; pick an earlier --good")
+            return 2
+        if evaluator.passes(revisions[bad].digest):
+            print(f"✅ {revisions[bad].timestamp} passes; nothing to bisect")
+            return 0
+        last_good, bad, rounds = bisect(revisions, evaluator, good, bad)
+        evaluator.save()
+        print_table([r for r in revisions if r.digest in evaluator.results], evaluator)
+        print(f"\n🔎 First bad: {revisions[bad].timestamp} ({revisions[bad].source})")
+        print(f"   Last good: {revisions[last_good].timestamp} ({revisions[last_good].source})")
+        print(f"[INFO] {rounds} round(s), {evaluator.evaluated} evaluated, {evaluator.cached} from cache, "
+              f"{time.perf_counter() - t0:.2f} s")
+        hint = _diff_hint(revisions[last_good], revisions[bad], args.file)
+        if hint:
+            print(hint)
+        return 1
+
+    evaluator.run(r.digest for r in revisions)
+    evaluator.save()
+    elapsed = time.perf_counter() - t0
+    if args.json:
+        rows = [{"timestamp": r.timestamp, "source": r.source, "sha256": r.digest,
+                 "checks": {c: {"ok": m[0], "value": m[1]} for c, m in evaluator.results[r.digest].items()}}
+                for r in revisions]
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+    else:
+        print_table(revisions, evaluator)
+        print()
+    failing = 0
+    for name in checks:
+        index = first_bad(revisions, lambda r: evaluator.results[r.digest][name][0])
+        if index is None:
+            if not args.json:
+                print(f"✅ {name}: passes at {revisions[-1].timestamp}")
+            continue
+        failing += 1
+        if not args.json:
+            rev = revisions[index]
+            since = f"since {rev.timestamp} ({rev.source})" if index else "in every snapshot"
+            print(f"❌ {name}: failing {since}")
+            hint = _diff_hint(revisions[index - 1], rev, args.file) if index else ""
+            if hint:
+                print(hint)
+    if not args.json:
+        print(f"[INFO] {evaluator.evaluated} evaluated, {evaluator.cached} from cache, {elapsed:.2f} s")
+    return 1 if failing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
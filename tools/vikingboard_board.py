@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+vikingboard_board.py - Flat geometric model of a .kicad_pcb.
+
+Built on vikingboard_sexpr, without pcbnew. Pads are resolved to board
+coordinates, layer wildcards ("*.Cu", "F&B.Cu") are expanded against the
+board's copper stack, and net numbers are resolved to names. The connectivity
+engine, spatial index and polygon tools all work on this model.
+
+Usage:
+    python tools/vikingboard_board.py kicad/Vikingboard.kicad_pcb
+"""
+
+import argparse
+import math
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from vikingboard_sexpr import Node, load
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PCB = REPO_ROOT / "kicad" / "Vikingboard.kicad_pcb"
+
+Point = Tuple[float, float]
+
+
+class Pad(NamedTuple):
+    ref: str
+    number: str
+    x: float
+    y: float
+    w: float
+    h: float
+    angle: float          # absolute rotation in degrees
+    shape: str            # rect, circle, oval, roundrect, trapezoid, custom
+    kind: str             # thru_hole, smd, np_thru_hole, connect
+    layers: Tuple[str, ...]
+    net: str
+    drill: float
+    uuid: str
+
+
+class Track(NamedTuple):
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    width: float
+    layer: str
+    net: str
+    uuid: str
+    mid: Optional[Point] = None   # set for arcs
+
+
+class Via(NamedTuple):
+    x: float
+    y: float
+    size: float
+    drill: float
+    layers: Tuple[str, ...]
+    net: str
+    uuid: str
+
+
+class Zone(NamedTuple):
+    net: str
+    layers: Tuple[str, ...]
+    outline: Tuple[Point, ...]
+    fills: Tuple[Tuple[str, Tuple[Point, ...]], ...]   # (layer, polygon) per filled island
+    priority: int
+    keepout: bool
+    clearance: float
+    min_thickness: float
+    uuid: str
+    thermal_gap: float = 0.0
+    pad_connection: str = "thermal"   # thermal, solid, none, thru_hole_only
+    island_removal: int = 0           # KiCad island_removal_mode: 0 always, 1 never, 2 below area
+    pour_keepout: bool = False        # keep-out that forbids copper pour
+
+
+class Graphic(NamedTuple):
+    kind: str                      # line, arc, rect, circle, poly
+    points: Tuple[Point, ...]      # line/rect: start, end; arc: start, mid, end; circle: center, end
+    layer: str
+    width: float
+    ref: str = ""                  # owning footprint for fp_* shapes
+
+
+@dataclass
+class Footprint:
+    ref: str
+    lib_id: str
+    value: str
+    x: float
+    y: float
+    angle: float
+    layer: str
+    uuid: str
+    pads: List[Pad] = field(default_factory=list)
+
+
+@dataclass
+class Board:
+    path: Optional[Path]
+    copper: List[str]
+    nets: Dict[int, str]
+    footprints: List[Footprint]
+    tracks: List[Track]
+    vias: List[Via]
+    zones: List[Zone]
+    graphics: List[Graphic]
+
+    @property
+    def pads(self) -> List[Pad]:
+        return [p for fp in self.footprints for p in fp.pads]
+
+    def edges(self) -> List[Graphic]:
+        return [g for g in self.graphics if g.layer == "Edge.Cuts"]
+
+    def net_names(self) -> List[str]:
+        return sorted(n for n in self.nets.values() if n)
+
+
+def rotate(x: float, y: float, angle: float) -> Point:
+    """Rotate a footprint-local offset the way KiCad does (degrees, y down)."""
+    if not angle:
+        return x, y
+    a = math.radians(angle)
+    c, s = math.cos(a), math.sin(a)
+    return x * c + y * s, -x * s + y * c
+
+
+def expand_layers(names, copper: List[str]) -> Tuple[str, ...]:
+    """Expand "*.Cu" and "F&B.Cu" wildcards; other layer names pass through."""
+    out: List[str] = []
+    for name in names:
+        if name == "*.Cu":
+            out.extend(copper)
+        elif name == "F&B.Cu":
+            out.extend(l for l in ("F.Cu", "B.Cu") if l in copper)
+        elif name.startswith("*."):
+            out.extend(f"{side}.{name[2:]}" for side in ("F", "B"))
+        else:
+            out.append(name)
+    return tuple(dict.fromkeys(out))
+
+
+def via_span(layers, copper: List[str]) -> Tuple[str, ...]:
+    """All copper layers between a via's two end layers."""
+    ends = [copper.index(l) for l in layers if l in copper]
+    if len(ends) < 2:
+        return tuple(copper)
+    lo, hi = min(ends), max(ends)
+    return tuple(copper[lo:hi + 1])
+
+
+def _net(node: Node, nets: Dict[int, str]) -> str:
+    """Net name from (net 3 "GND"), (net 3) or KiCad 10's (net "GND")."""
+    child = node.find("net")
+    if child is None:
+        return ""
+    atoms = child.atoms
+    if len(atoms) >= 2:
+        return atoms[1]
+    if not atoms:
+        return ""
+    try:
+        return nets.get(int(atoms[0]), "")
+    except ValueError:
+        return atoms[0]
+
+
+def _points(node: Optional[Node]) -> Tuple[Point, ...]:
+    if node is None:
+        return ()
+    return tuple((float(p.atoms[0]), float(p.atoms[1])) for p in node.find_all("xy"))
+
+
+def _width(node: Node) -> float:
+    stroke = node.find("stroke")
+    w = (stroke or node).value("width", "0")
+    return float(w)
+
+
+def _graphic(node: Node, kind: str, ref: str = "", origin: Optional[Tuple[float, float, float]] = None) -> Optional[Graphic]:
+    layer = node.value("layer", "")
+    if kind == "poly":
+        pts = _points(node.find("pts"))
+    else:
+        keys = {"line": ("start", "end"), "rect": ("start", "end"),
+                "arc": ("start", "mid", "end"), "circle": ("center", "end")}[kind]
+        found = [node.xy(k) for k in keys]
+        if any(p is None for p in found):
+            return None
+        pts = tuple((p[0], p[1]) for p in found)
+    if origin is not None:
+        ox, oy, angle = origin
+        pts = tuple((ox + dx, oy + dy) for dx, dy in (rotate(px, py, angle) for px, py in pts))
+    return Graphic(kind, pts, layer, _width(node), ref)
+
+
+_GRAPHICS = {"line": "line", "arc": "arc", "rect": "rect", "circle": "circle", "poly": "poly"}
+
+
+def _copper_layers(root: Node) -> List[str]:
+    layers = root.find("layers")
+    if layers is None:
+        return ["F.Cu", "B.Cu"]
+    found = []
+    for entry in layers.children:
+        atoms = entry.atoms
+        if atoms and atoms[0].endswith(".Cu"):
+            found.append((int(entry.name), atoms[0]))
+    # Stack order: F.Cu first, inner layers by ordinal, B.Cu last
+    found.sort(key=lambda e: (e[1] == "B.Cu", e[1] != "F.Cu", e[0]))
+    return [name for _, name in found] or ["F.Cu", "B.Cu"]
+
+
+def _footprint(node: Node, nets: Dict[int, str], copper: List[str], graphics: List[Graphic],
+               zones: List["Zone"]) -> Footprint:
+    at = node.xy("at") or (0.0, 0.0)
+    fx, fy = at[0], at[1]
+    fa = at[2] if len(at) > 2 else 0.0
+    ref = node.property("Reference") or ""
+    if not ref:
+        for text in node.find_all("fp_text"):
+            if text.arg(0) == "reference":
+                ref = text.arg(1, "")
+    fp = Footprint(ref, node.arg(0, ""), node.property("Value") or "", fx, fy, fa,
+                   node.value("layer", "F.Cu"), node.value("uuid", ""))
+    for pad in node.find_all("pad"):
+        pat = pad.xy("at") or (0.0, 0.0)
+        dx, dy = rotate(pat[0], pat[1], fa)
+        size = pad.xy("size") or (0.0, 0.0)
+        drill = pad.find("drill")
+        drill_d = 0.0
+        if drill is not None:
+            nums = [a for a in drill.atoms if a != "oval"]
+            drill_d = float(nums[0]) if nums else 0.0
+        layers = pad.find("layers")
+        fp.pads.append(Pad(
+            ref, pad.arg(0, ""), fx + dx, fy + dy,
+            size[0], size[1] if len(size) > 1 else size[0],
+            pat[2] if len(pat) > 2 else fa,
+            pad.arg(2, "rect"), pad.arg(1, "smd"),
+            expand_layers(layers.atoms if layers is not None else (), copper),
+            _net(pad, nets), drill_d, pad.value("uuid", ""),
+        ))
+    for child in node.children:
+        if child.name.startswith("fp_") and child.name[3:] in _GRAPHICS:
+            g = _graphic(child, _GRAPHICS[child.name[3:]], ref, (fx, fy, fa))
+            if g is not None:
+                graphics.append(g)
+    for zone in node.find_all("zone"):
+        # Footprint zones (module keep-outs) are stored in board coordinates
+        zones.append(_zone(zone, nets, copper))
+    return fp
+
+
+def _zone(node: Node, nets: Dict[int, str], copper: List[str]) -> Zone:
+    layers = node.find("layers")
+    names = layers.atoms if layers is not None else [node.value("layer", "")]
+    polygon = node.find("polygon")
+    fills = tuple((f.value("layer", names[0] if names else ""), _points(f.find("pts")))
+                  for f in node.find_all("filled_polygon"))
+    connect = node.find("connect_pads")
+    fill = node.find("fill")
+    keepout = node.find("keepout")
+    mode = connect.arg(0, "") if connect is not None else ""
+    name = node.value("net_name") or _net(node, nets)
+    return Zone(
+        name,
+        expand_layers(names, copper),
+        _points(polygon.find("pts")) if polygon is not None else (),
+        fills,
+        int(node.value("priority", "0")),
+        keepout is not None,
+        float(connect.value("clearance", "0")) if connect is not None else 0.0,
+        float(node.value("min_thickness", "0")),
+        node.value("uuid", ""),
+        float(fill.value("thermal_gap", "0")) if fill is not None else 0.0,
+        {"yes": "solid", "no": "none", "thru_hole_only": "thru_hole_only"}.get(mode, "thermal"),
+        int(fill.value("island_removal_mode", "0")) if fill is not None else 0,
+        keepout is not None and keepout.value("copperpour") == "not_allowed",
+    )
+
+
+def from_node(root: Node, path: Optional[Path] = None) -> Board:
+    """Build a Board from an already parsed kicad_pcb tree."""
+    copper = _copper_layers(root)
+    nets: Dict[int, str] = {}
+    for n in root.find_all("net"):
+        atoms = n.atoms
+        if len(atoms) >= 2:
+            nets[int(atoms[0])] = atoms[1]
+    board = Board(path, copper, nets, [], [], [], [], [])
+    for child in root.children:
+        name = child.name
+        if name == "footprint" or name == "module":
+            board.footprints.append(_footprint(child, nets, copper, board.graphics, board.zones))
+        elif name == "segment":
+            s, e = child.xy("start"), child.xy("end")
+            board.tracks.append(Track(s[0], s[1], e[0], e[1], float(child.value("width", "0")),
+                                      child.value("layer", ""), _net(child, nets), child.value("uuid", "")))
+        elif name == "arc":
+            s, m, e = child.xy("start"), child.xy("mid"), child.xy("end")
+            board.tracks.append(Track(s[0], s[1], e[0], e[1], float(child.value("width", "0")),
+                                      child.value("layer", ""), _net(child, nets), child.value("uuid", ""),
+                                      (m[0], m[1])))
+        elif name == "via":
+            at = child.xy("at")
+            layers = child.find("layers")
+            board.vias.append(Via(at[0], at[1], float(child.value("size", "0")), float(child.value("drill", "0")),
+                                  via_span(layers.atoms if layers is not None else (), copper),
+                                  _net(child, nets), child.value("uuid", "")))
+        elif name == "zone":
+            board.zones.append(_zone(child, nets, copper))
+        elif name.startswith("gr_") and name[3:] in _GRAPHICS:
+            g = _graphic(child, _GRAPHICS[name[3:]])
+            if g is not None:
+                board.graphics.append(g)
+    return board
+
+
+def load_board(path: Union[str, Path] = DEFAULT_PCB, cache: bool = True) -> Board:
+    """
+    Parse a .kicad_pcb file into a Board.
+
+    Goes through the shared parse cache (tools/vikingboard_cache.py), so
+    only the first tool to see a given file content tokenizes it.
+    """
+    path = Path(path)
+    if cache:
+        from vikingboard_cache import load_board as load_cached
+
+        return load_cached(path)
+    return from_node(load(path), path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarise the geometric board model")
+    parser.add_argument("pcb", type=Path, nargs="?", default=DEFAULT_PCB)
+    args = parser.parse_args(argv)
+
+    board = load_board(args.pcb)
+    print(f"📋 {args.pcb.name}")
+    print(f"  Copper layers : {', '.join(board.copper)}")
+    print(f"  Nets          : {len(board.net_names())}")
+    print(f"  Footprints    : {len(board.footprints)}")
+    print(f"  Pads          : {len(board.pads)}")
+    print(f"  Tracks/arcs   : {len(board.tracks)}")
+    print(f"  Vias          : {len(board.vias)}")
+    print(f"  Zones         : {len(board.zones)} ({sum(len(z.fills) for z in board.zones)} filled islands)")
+    print(f"  Edge.Cuts     : {len(board.edges())} shapes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
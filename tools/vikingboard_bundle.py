@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+vikingboard_bundle.py - Reproducible, incremental JLCPCB bundle builder.
+
+`zip -r` stamps every member with its mtime, so two identical fabrication
+outputs never give the same archive. This bundler writes deterministic zips:
+
+- entries sorted by name, fixed 1980-01-01 timestamps, fixed permissions,
+  no extra fields, so identical inputs always give byte-identical zips
+- members are deflated in parallel (zlib releases the GIL) and cached in
+  .cache/bundle/ by content hash, so only changed files are recompressed
+- a manifest (<bundle>.manifest.json) lists every member with size, sha256
+  and crc32; when neither the inputs nor the zip changed since the last
+  build, the rebuild is a stat() per file and nothing else
+
+Sources are files or directories. A directory contributes its contents at
+the archive root (like `cd dir && zip -r ../x.zip *`); write PREFIX=PATH to
+put it under PREFIX/ instead.
+
+Usage:
+    python tools/vikingboard_bundle.py build production/JLCPCB_bundle.zip production/gerbers
+    python tools/vikingboard_bundle.py build out.zip gerbers=production/gerbers production/bom.csv
+    python tools/vikingboard_bundle.py verify production/JLCPCB_bundle.zip
+    python tools/vikingboard_bundle.py dedupe production            # list identical zips
+    python tools/vikingboard_bundle.py dedupe production --remove   # keep the newest of each group
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = REPO_ROOT / ".cache" / "bundle"
+
+LEVEL = 9
+DOS_TIME = 0                          # 00:00:00
+DOS_DATE = (0 << 9) | (1 << 5) | 1    # 1980-01-01
+FILE_MODE = 0o100644 << 16
+MADE_BY = (3 << 8) | 20               # unix, zip 2.0
+
+_LOCAL = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END = struct.Struct("<IHHHHIIH")
+
+
+class Member(NamedTuple):
+    name: str          # archive name
+    path: Path
+    size: int
+    mtime_ns: int
+
+
+class Packed(NamedTuple):
+    name: str
+    size: int
+    sha256: str
+    crc32: int
+    method: int        # 8 = deflate, 0 = stored
+    data: bytes
+
+
+# === Collect =================================================================
+
+def collect(sources: Iterable[str], include: Optional[Sequence[str]] = None) -> List[Member]:
+    """Resolve PATH / PREFIX=PATH sources into sorted, de-duplicated members."""
+    members: Dict[str, Member] = {}
+    for source in sources:
+        prefix, _, raw = source.rpartition("=")
+        path = Path(raw)
+        if path.is_dir():
+            # Hidden files are skipped, like `zip -r dir/*`
+            files = [(f.relative_to(path).as_posix(), f) for f in path.rglob("*")
+                     if f.is_file() and not any(part.startswith(".") for part in f.relative_to(path).parts)]
+        elif path.is_file():
+            files = [(path.name, path)]
+        else:
+            raise FileNotFoundError(f"bundle source not found: {path}")
+        for rel, f in files:
+            name = f"{prefix.strip('/')}/{rel}" if prefix else rel
+            if include and not any(Path(name).match(pattern) for pattern in include):
+                continue
+            st = f.stat()
+            members[name] = Member(name, f, st.st_size, st.st_mtime_ns)
+    return [members[name] for name in sorted(members)]
+
+
+# === Compress (cached by content hash) =======================================
+
+def _cache_path(sha: str, level: int, cache_dir: Path) -> Path:
+    return cache_dir / sha[:2] / f"{sha}-{level}.z"
+
+
+def pack_member(member: Member, level: int = LEVEL, cache_dir: Optional[Path] = CACHE_DIR) -> Tuple[Packed, bool]:
+    """Deflate one member, reusing the cached stream for identical content. Returns (packed, cache_hit)."""
+    raw = member.path.read_bytes()
+    sha = hashlib.sha256(raw).hexdigest()
+    crc = zlib.crc32(raw)
+    cached = _cache_path(sha, level, cache_dir) if cache_dir else None
+    if cached is not None and cached.exists():
+        method, data = 8, cached.read_bytes()
+        if data[:1] == b"\0":
+            method, data = 0, raw
+        else:
+            data = data[1:]
+        return Packed(member.name, len(raw), sha, crc, method, data), True
+    comp = zlib.compressobj(level, zlib.DEFLATED, -15)
+    data = comp.compress(raw) + comp.flush()
+    method = 8
+    if len(data) >= len(raw):
+        method, data = 0, raw
+    if cached is not None:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cached.parent, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"\1" + data if method == 8 else b"\0")
+        os.replace(tmp, cached)
+    return Packed(member.name, len(raw), sha, crc, method, data), False
+
+
+def _publish(tmp: str, path: Path) -> None:
+    """Rename a mkstemp file into place with a normal file mode (mkstemp creates 0600)."""
+    mask = os.umask(0)
+    os.umask(mask)
+    os.chmod(tmp, 0o666 & ~mask)
+    os.replace(tmp, path)
+
+
+def _write_text(path: Path, text: str) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        _publish(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def write_zip(path: Path, packed: Sequence[Packed], previous: Optional[str] = None) -> str:
+    """
+    Write a deterministic zip from pre-compressed members; returns its sha256.
+    An existing file with sha256 previous is left in place when the new zip is identical.
+    """
+    central = bytearray()
+    digest = hashlib.sha256()
+    offset = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".zip")
+    with os.fdopen(fd, "wb") as f:
+        def emit(chunk: bytes) -> None:
+            f.write(chunk)
+            digest.update(chunk)
+
+        for p in packed:
+            name = p.name.encode("utf-8")
+            flags = 0 if p.name.isascii() else 0x0800
+            if offset > 0xFFFFFFFF or p.size > 0xFFFFFFFF:
+                raise ValueError("bundle too large for a non-zip64 archive")
+            emit(_LOCAL.pack(0x04034B50, 20, flags, p.method, DOS_TIME, DOS_DATE,
+                             p.crc32, len(p.data), p.size, len(name), 0))
+            emit(name)
+            emit(p.data)
+            central += _CENTRAL.pack(0x02014B50, MADE_BY, 20, flags, p.method, DOS_TIME, DOS_DATE,
+                                     p.crc32, len(p.data), p.size, len(name), 0, 0, 0, 0, FILE_MODE, offset)
+            central += name
+            offset += _LOCAL.size + len(name) + len(p.data)
+        emit(bytes(central))
+        emit(_END.pack(0x06054B50, 0, 0, len(packed), len(packed), len(central), offset, 0))
+    sha = digest.hexdigest()
+    if previous == sha and path.exists() and file_sha256(path) == sha:
+        os.unlink(tmp)
+    else:
+        _publish(tmp, path)
+    return sha
+
+
+# === Build ===================================================================
+
+class BuildResult(NamedTuple):
+    path: Path
+    sha256: str
+    members: int
+    cached: int
+    skipped: bool
+    seconds: float
+
+
+def manifest_path(bundle: Path) -> Path:
+    return bundle.with_name(bundle.name + ".manifest.json")
+
+
+def _stamp(members: Sequence[Member]) -> List[list]:
+    return [[m.name, str(m.path), m.size, m.mtime_ns] for m in members]
+
+
+def _zip_stamp(bundle: Path) -> list:
+    st = bundle.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def build(bundle: Path, sources: Iterable[str], include: Optional[Sequence[str]] = None,
+          level: int = LEVEL, workers: Optional[int] = None, force: bool = False,
+          cache_dir: Optional[Path] = CACHE_DIR) -> BuildResult:
+    """Build bundle from sources; a no-op when inputs and output are unchanged."""
+    t0 = time.perf_counter()
+    bundle = Path(bundle)
+    members = collect(sources, include)
+    mpath = manifest_path(bundle)
+    stamp = _stamp(members)
+    old: dict = {}
+    if bundle.exists() and mpath.exists():
+        try:
+            old = json.loads(mpath.read_text(encoding="utf-8"))
+        except ValueError:
+            old = {}
+    if (not force and old.get("inputs") == stamp and old.get("level") == level
+            and old.get("zip") == _zip_stamp(bundle) and "sha256" in old):
+        return BuildResult(bundle, old["sha256"], len(members), len(members), True, time.perf_counter() - t0)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        results = list(pool.map(lambda m: pack_member(m, level, cache_dir), members))
+    packed = [p for p, _ in results]
+    sha = write_zip(bundle, packed, old.get("sha256"))
+    manifest = {
+        "bundle": bundle.name,
+        "sha256": sha,
+        "level": level,
+        "entries": [{"name": p.name, "size": p.size, "sha256": p.sha256, "crc32": f"{p.crc32:08x}",
+                     "compressed": len(p.data)} for p in packed],
+        "inputs": stamp,
+        "zip": _zip_stamp(bundle),
+    }
+    _write_text(mpath, json.dumps(manifest, indent=2) + "\n")
+    return BuildResult(bundle, sha, len(packed), sum(hit for _, hit in results), False,
+                       time.perf_counter() - t0)
+
+
+def verify(bundle: Path) -> List[str]:
+    """Check the zip against its manifest; returns a list of problems."""
+    import zipfile
+
+    problems = []
+    mpath = manifest_path(bundle)
+    manifest = json.loads(mpath.read_text(encoding="utf-8")) if mpath.exists() else None
+    if manifest is None:
+        problems.append(f"no manifest ({mpath.name})")
+    elif file_sha256(bundle) != manifest["sha256"]:
+        problems.append("zip sha256 differs from manifest")
+    with zipfile.ZipFile(bundle) as zf:
+        bad = zf.testzip()
+        if bad:
+            problems.append(f"CRC error in {bad}")
+        if manifest is not None:
+            expected = {e["name"]: e for e in manifest["entries"]}
+            for info in zf.infolist():
+                entry = expected.pop(info.filename, None)
+                if entry is None:
+                    problems.append(f"{info.filename} not in manifest")
+                elif hashlib.sha256(zf.read(info)).hexdigest() != entry["sha256"]:
+                    problems.append(f"{info.filename} content differs from manifest")
+            problems += [f"{name} missing from zip" for name in expected]
+    return problems
+
+
+# === Dedupe ==================================================================
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def duplicates(directory: Path) -> List[List[Path]]:
+    """Groups (sorted by name) of byte-identical zips; only same-size files are hashed."""
+    by_size: Dict[int, List[Path]] = {}
+    for z in directory.glob("*.zip"):
+        by_size.setdefault(z.stat().st_size, []).append(z)
+    groups: Dict[str, List[Path]] = {}
+    for same in by_size.values():
+        if len(same) > 1:
+            for z in same:
+                groups.setdefault(file_sha256(z), []).append(z)
+    return [sorted(g) for g in groups.values() if len(g) > 1]
+
+
+# === CLI =====================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Deterministic, cached JLCPCB bundle builder")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("build", help="build a bundle")
+    p.add_argument("bundle", type=Path)
+    p.add_argument("sources", nargs="+", help="file, directory or PREFIX=PATH")
+    p.add_argument("--include", action="append", help="glob on archive names (repeatable)")
+    p.add_argument("--level", type=int, default=LEVEL)
+    p.add_argument("-j", "--jobs", type=int)
+    p.add_argument("--force", action="store_true", help="rebuild even if nothing changed")
+
+    p = sub.add_parser("verify", help="check a bundle against its manifest")
+    p.add_argument("bundle", type=Path)
+
+    p = sub.add_parser("dedupe", help="find byte-identical zips in a directory")
+    p.add_argument("directory", type=Path)
+    p.add_argument("--remove", action="store_true", help="delete all but the newest (by name) of each group")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        r = build(args.bundle, args.sources, args.include, args.level, args.jobs, args.force)
+        if r.skipped:
+            print(f"✅ {r.path} unchanged ({r.members} files, {r.seconds * 1000:.1f} ms)")
+        else:
+            print(f"✅ {r.path}: {r.members} files, {r.cached} from cache, "
+                  f"{r.path.stat().st_size / 1024:.0f} KiB in {r.seconds * 1000:.0f} ms")
+        print(f"   sha256 {r.sha256}")
+        return 0
+
+    if args.cmd == "verify":
+        problems = verify(args.bundle)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if not problems:
+            print(f"✅ {args.bundle} matches its manifest")
+        return 1 if problems else 0
+
+    groups = duplicates(args.directory)
+    if not groups:
+        print(f"✅ No duplicate zips in {args.directory}")
+        return 0
+    for group in groups:
+        keep, drop = group[-1], group[:-1]
+        print(f"📋 {len(group)} identical: keep {keep.name}")
+        for z in drop:
+            print(f"   {'removed' if args.remove else 'duplicate'} {z.name}")
+            if args.remove:
+                z.unlink()
+                manifest_path(z).unlink(missing_ok=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
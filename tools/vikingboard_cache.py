@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+vikingboard_cache.py - On-disk cache of parsed boards and schematics.
+
+Every tool used to re-tokenize the .kicad_pcb on start-up. The first tool
+in a run now stores what it parsed under .cache/parsed/, keyed by a hash of
+the file contents (plus the parser's own source stamp), and the tools after
+it load that instead:
+
+- Boards (vikingboard_board.Board) are stored column-wise: one array('d')
+  per float field, string fields as indexes into one interned string
+  table, everything else marshalled. Loading is a few array copies and
+  NamedTuple constructions, no tokenizing: ~1 ms for Vikingboard.kicad_pcb
+  against ~45 ms to parse it.
+- S-expression trees (vikingboard_sexpr.Node) are pickled. That is only a
+  few times faster than parsing, but it spares schematics and the diff
+  tool the tokenizer.
+
+Entries are written to a temp file and renamed into place, so parallel
+pipeline stages never see half an entry; a reader whose entry is evicted
+mid-read still holds the open file. The cache is never needed for a
+correct result: if it cannot be written (read-only, full), tools warn
+once and carry on with what they parsed. Reads touch the entry's mtime, and
+after each write the oldest entries are deleted (under a lock file) until
+the cache is below its size cap.
+
+Environment:
+    VIKINGBOARD_PARSE_CACHE     cache directory, or "off" to disable
+    VIKINGBOARD_PARSE_CACHE_MB  size cap in MB (default 256)
+
+Usage:
+    python tools/vikingboard_cache.py stats
+    python tools/vikingboard_cache.py warm kicad/Vikingboard.kicad_pcb kicad/Vikingboard.kicad_sch
+    python tools/vikingboard_cache.py clear
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import marshal
+import os
+import pickle
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: eviction runs unlocked
+    fcntl = None
+
+from vikingboard_board import Board, Footprint, Graphic, Pad, Track, Via, Zone, from_node
+from vikingboard_sexpr import Node, parse
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = REPO_ROOT / ".cache" / "parsed"
+DEFAULT_MAX_MB = 256
+
+MAGIC = b"VBPARSE1"
+BOARD = "board"
+TREE = "tree"
+
+# Sources whose changes make cached entries stale
+_PARSER_SOURCES = [Path(__file__).resolve().parent / name
+                   for name in ("vikingboard_sexpr.py", "vikingboard_board.py", "vikingboard_cache.py")]
+
+_FLOAT, _STR, _OTHER = "d", "s", "o"
+
+
+class CacheStats(NamedTuple):
+    entries: int
+    bytes: int
+    max_bytes: int
+    oldest: float
+    newest: float
+
+
+def _source_stamp() -> bytes:
+    h = hashlib.sha256(MAGIC)
+    for path in _PARSER_SOURCES:
+        try:
+            st = path.stat()
+            h.update(f"{path.name}:{st.st_mtime_ns}:{st.st_size};".encode())
+        except OSError:
+            h.update(f"{path.name}:missing;".encode())
+    return h.digest()
+
+
+# === Board codec =============================================================
+
+class _Strings:
+    """Interns strings into one table; plain str so marshal accepts them."""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.table: List[str] = []
+
+    def __call__(self, s: str) -> int:
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.table)
+            self.table.append(str(s))
+        return i
+
+
+def _plain(value):
+    """QStr and NamedTuple -> str and tuple, recursively (marshal needs exact types)."""
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, tuple):
+        return tuple(_plain(v) for v in value)
+    return value
+
+
+def _field_kinds(cls) -> List[Tuple[str, str]]:
+    if dataclasses.is_dataclass(cls):
+        hints = {f.name: f.type for f in dataclasses.fields(cls) if f.name != "pads"}
+    else:
+        hints = {name: cls.__annotations__[name] for name in cls._fields}
+    return [(name, _FLOAT if hint is float else _STR if hint is str else _OTHER) for name, hint in hints.items()]
+
+
+def _encode_rows(cls, rows: Sequence, strings: _Strings) -> tuple:
+    kinds = _field_kinds(cls)
+    columns = []
+    for i, (name, kind) in enumerate(kinds):
+        column = [getattr(r, name) for r in rows] if dataclasses.is_dataclass(cls) else [r[i] for r in rows]
+        if kind == _FLOAT:
+            columns.append(array("d", column).tobytes())
+        elif kind == _STR:
+            columns.append(array("I", map(strings, column)).tobytes())
+        else:
+            columns.append(_plain(tuple(column)))
+    return len(rows), tuple(columns)
+
+
+def _decode_rows(cls, encoded: tuple, table: List[str]) -> List[list]:
+    _count, columns = encoded
+    out = []
+    for (_name, kind), raw in zip(_field_kinds(cls), columns):
+        if kind == _FLOAT:
+            column = array("d")
+            column.frombytes(raw)
+            out.append(column.tolist())
+        elif kind == _STR:
+            column = array("I")
+            column.frombytes(raw)
+            out.append([table[i] for i in column])
+        else:
+            out.append(list(raw))
+    return out
+
+
+def encode_board(board: Board) -> bytes:
+    strings = _Strings()
+    pads = [p for fp in board.footprints for p in fp.pads]
+    body = (
+        str(board.path) if board.path is not None else None,
+        [str(c) for c in board.copper],
+        {int(k): str(v) for k, v in board.nets.items()},
+        _encode_rows(Footprint, board.footprints, strings),
+        [len(fp.pads) for fp in board.footprints],
+        _encode_rows(Pad, pads, strings),
+        _encode_rows(Track, board.tracks, strings),
+        _encode_rows(Via, board.vias, strings),
+        _encode_rows(Zone, board.zones, strings),
+        _encode_rows(Graphic, board.graphics, strings),
+    )
+    return marshal.dumps((strings.table, body))
+
+
+def decode_board(data: bytes, path: Optional[Path] = None) -> Board:
+    table, body = marshal.loads(data)
+    stored_path, copper, nets, fps, pad_counts, pads, tracks, vias, zones, graphics = body
+    pad_list = list(map(Pad, *_decode_rows(Pad, pads, table)))
+    footprints = []
+    start = 0
+    for count, fields in zip(pad_counts, zip(*_decode_rows(Footprint, fps, table))):
+        footprints.append(Footprint(*fields, pads=pad_list[start:start + count]))
+        start += count
+    if path is None and stored_path is not None:
+        path = Path(stored_path)
+    return Board(
+        path, copper, nets, footprints,
+        list(map(Track, *_decode_rows(Track, tracks, table))),
+        list(map(Via, *_decode_rows(Via, vias, table))),
+        list(map(Zone, *_decode_rows(Zone, zones, table))),
+        list(map(Graphic, *_decode_rows(Graphic, graphics, table))),
+    )
+
+
+# === Cache ===================================================================
+
+class ParseCache:
+    """Content-addressed entries in one directory, LRU by mtime, capped in size."""
+
+    def __init__(self, root: Union[str, Path] = CACHE_DIR, max_bytes: int = DEFAULT_MAX_MB << 20):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._stamp = _source_stamp()
+        self._warned = False
+
+    def key(self, data: bytes, kind: str) -> str:
+        return hashlib.sha256(self._stamp + kind.encode() + b"\0" + data).hexdigest()
+
+    def _path(self, key: str, kind: str) -> Path:
+        return self.root / f"{key[:40]}.{kind}"
+
+    def get(self, key: str, kind: str) -> Optional[bytes]:
+        path = self._path(key, kind)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)                      # mark as recently used
+        except OSError:
+            pass
+        if not blob.startswith(MAGIC):
+            return None
+        return blob[len(MAGIC):]
+
+    def put(self, key: str, kind: str, payload: bytes) -> None:
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(MAGIC + payload)
+                os.replace(tmp, self._path(key, kind))
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+        except OSError as exc:
+            self._warn(exc)
+            return
+        self.evict()
+
+    def _warn(self, exc: OSError) -> None:
+        if not self._warned:
+            self._warned = True
+            print(f"⚠️  Parse cache {self.root} not writable, continuing without it ({exc})", file=sys.stderr)
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        try:
+            paths = list(self.root.iterdir())
+        except OSError:
+            return []
+        for path in paths:
+            if path.name.startswith("."):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def evict(self) -> int:
+        """Delete least recently used entries until under max_bytes; returns count."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        try:
+            with open(self.root / ".lock", "a+b") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                entries = sorted(self._entries())
+                total = sum(size for _, size, _ in entries)
+                for _mtime, size, path in entries:
+                    if total <= self.max_bytes:
+                        break
+                    try:
+                        path.unlink()
+                    except OSError:
+                        continue
+                    total -= size
+                    removed += 1
+        except OSError as exc:
+            self._warn(exc)
+        return removed
+
+    def clear(self) -> int:
+        entries = self._entries()
+        for _, _, path in entries:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        return len(entries)
+
+    def stats(self) -> CacheStats:
+        entries = self._entries()
+        mtimes = [m for m, _, _ in entries] or [0.0]
+        return CacheStats(len(entries), sum(s for _, s, _ in entries), self.max_bytes, min(mtimes), max(mtimes))
+
+    # --- Parsed objects -----------------------------------------------------
+
+    def board(self, path: Union[str, Path, None] = None, data: Optional[bytes] = None) -> Board:
+        """Board for a file (or its contents), parsed at most once per content."""
+        path = Path(path) if path is not None else None
+        if data is None:
+            data = path.read_bytes()
+        key = self.key(data, BOARD)
+        payload = self.get(key, BOARD)
+        if payload is not None:
+            try:
+                board = decode_board(payload, path)
+                self.hits += 1
+                return board
+            except (ValueError, EOFError, TypeError):
+                pass                                    # damaged entry: rebuild it
+        self.misses += 1
+        board = from_node(parse(data.decode("utf-8")), path)
+        self.put(key, BOARD, encode_board(board))
+        return board
+
+    def tree(self, path: Union[str, Path, None] = None, data: Optional[bytes] = None) -> Node:
+        """S-expression tree for a file (or its contents)."""
+        if data is None:
+            data = Path(path).read_bytes()
+        key = self.key(data, TREE)
+        payload = self.get(key, TREE)
+        if payload is not None:
+            try:
+                root = pickle.loads(payload)
+                self.hits += 1
+                return root
+            except (pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+                pass
+        self.misses += 1
+        root = parse(data.decode("utf-8"))
+        self.put(key, TREE, pickle.dumps(root, protocol=pickle.HIGHEST_PROTOCOL))
+        return root
+
+
+_DEFAULT: Optional[ParseCache] = None
+
+
+def default_cache() -> Optional[ParseCache]:
+    """The shared cache, or None when VIKINGBOARD_PARSE_CACHE=off."""
+    global _DEFAULT
+    setting = os.environ.get("VIKINGBOARD_PARSE_CACHE", "")
+    if setting.lower() in ("off", "0", "no", "false"):
+        return None
+    if _DEFAULT is None:
+        max_mb = int(os.environ.get("VIKINGBOARD_PARSE_CACHE_MB", DEFAULT_MAX_MB))
+        _DEFAULT = ParseCache(Path(setting) if setting else CACHE_DIR, max_mb << 20)
+    return _DEFAULT
+
+
+def load_board(path: Union[str, Path]) -> Board:
+    """vikingboard_board.load_board() through the shared cache."""
+    cache = default_cache()
+    if cache is None:
+        from vikingboard_board import load_board as parse_board
+
+        return parse_board(path, cache=False)
+    return cache.board(path)
+
+
+def load_tree(path: Union[str, Path]) -> Node:
+    """vikingboard_sexpr.load() through the shared cache."""
+    cache = default_cache()
+    if cache is None:
+        from vikingboard_sexpr import load
+
+        return load(path)
+    return cache.tree(path)
+
+
+# === CLI =====================================================================
+
+def _fmt_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n} B"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parsed board/schematic cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="entries and size")
+    sub.add_parser("clear", help="delete every entry")
+    p = sub.add_parser("warm", help="parse files into the cache and time a cached load")
+    p.add_argument("files", nargs="+", type=Path)
+    args = parser.parse_args(argv)
+
+    cache = default_cache()
+    if cache is None:
+        print("[INFO] Parse cache disabled (VIKINGBOARD_PARSE_CACHE=off)")
+        return 0
+    if args.command == "stats":
+        s = cache.stats()
+        print(f"📋 {cache.root}: {s.entries} entries, {_fmt_bytes(s.bytes)} of {_fmt_bytes(s.max_bytes)}")
+    elif args.command == "clear":
+        print(f"🧹 Removed {cache.clear()} entries from {cache.root}")
+    else:
+        for path in args.files:
+            if not path.exists():
+                print(f"❌ Missing file: {path}")
+                return 1
+            load = cache.board if path.suffix == ".kicad_pcb" else cache.tree
+            t0 = time.perf_counter()
+            load(path)
+            t1 = time.perf_counter()
+            load(path)
+            t2 = time.perf_counter()
+            print(f"✅ {path.name}: first {(t1 - t0) * 1000:.1f} ms, cached {(t2 - t1) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+vikingboard_consistency.py - Cross-file consistency checks before ordering.
+
+BOM, JLCPCB BOM, CPL, netlist and board are each loaded into a columnar
+table (one array per column), then hash-joined on designator (and on
+designator+pad for the netlist). Every check is one vectorized pass over
+the joined columns: mismatched value, footprint, side, position or
+rotation, missing LCSC numbers, LCSC parts whose value/package disagree
+with the line, refs whose prefix doesn't fit the footprint class (a "U" on
+a PinHeader), and netlist pads that the footprint lacks or that carry a
+different net on the board.
+
+NumPy is used for the column operations when installed; otherwise the
+same operations run as plain list passes.
+
+Usage:
+    python tools/vikingboard_consistency.py
+    python tools/vikingboard_consistency.py --layout master --json
+    python tools/vikingboard_consistency.py --cpl production/cpl.csv --no-lcsc-lookup
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+from vikingboard_board import DEFAULT_PCB, load_board
+from vikingboard_lcsc import normalize_package, parse_description, parse_value, ref_kind, value_key
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+LAYOUTS = {
+    "production": {"bom": "production/bom.csv", "cpl": "production/cpl.csv"},
+    "master": {"bom": "production_output/vikingboard_bom.csv", "cpl": "production_output/vikingboard_cpl.csv"},
+}
+JLC_BOM = "manufacturing/BOM_JLCPCB.csv"
+NETS = "docs/vikingboard_nets.csv"
+POS_TOLERANCE = 0.01       # mm
+ROT_TOLERANCE = 0.1        # degrees
+
+# Header aliases -> canonical column
+_ALIASES = {
+    "ref": ("ref", "refs", "reference", "designator", "designators"),
+    "value": ("value", "val", "comment"),
+    "footprint": ("footprint", "package"),
+    "lcsc": ("lcsc part #", "lcsc part", "lcsc", "jlcpcb part #", "lcsc part number"),
+    "dnp": ("dnp",),
+    "x": ("posx", "mid x", "x"),
+    "y": ("posy", "mid y", "y"),
+    "rot": ("rot", "rotation"),
+    "side": ("side", "layer"),
+    "pad": ("pad", "pin"),
+    "net": ("net",),
+}
+_REF_SPLIT = re.compile(r"[,\s;]+")
+
+# Footprint library -> the designator kinds that belong on it
+_FP_CLASS = {
+    "Connector": {"J", "P", "CN", "X"},
+    "Capacitor": {"C"},
+    "Resistor": {"R", "RN"},
+    "Inductor": {"L", "FB"},
+    "LED": {"D", "LED"},
+    "Diode": {"D"},
+    "Crystal": {"Y", "X"},
+}
+
+
+class Issue(NamedTuple):
+    check: str
+    severity: str          # "error" or "warning"
+    ref: str
+    detail: str
+
+
+# === Columns =================================================================
+
+def col(values: Iterable[str]):
+    values = list(values)
+    return np.asarray(values, dtype=str) if np is not None else values
+
+
+def colf(values: Iterable[float]):
+    values = list(values)
+    return np.asarray(values, dtype=float) if np is not None else values
+
+
+def take(column, idx, fill=""):
+    """column[idx] with fill where idx == -1 (a missing join partner)."""
+    if np is not None:
+        idx = np.asarray(idx)
+        if len(column) == 0:
+            return np.full(len(idx), fill, dtype=float if isinstance(fill, float) else str)
+        out = np.asarray(column)[np.maximum(idx, 0)]
+        return np.where(idx >= 0, out, fill)
+    return [column[i] if i >= 0 else fill for i in idx]
+
+
+def apply(fn: Callable[[str], str], column):
+    """Elementwise Python function (used once per column, for normalisation)."""
+    return col(fn(v) for v in column)
+
+
+def _op(npf, pyf):
+    if np is not None:
+        return npf
+    return lambda *cols: [pyf(*vals) for vals in zip(*cols)]
+
+
+ne = _op(lambda a, b: np.asarray(a) != np.asarray(b), lambda a, b: a != b)
+blank = _op(lambda a: np.char.str_len(np.asarray(a, dtype=str)) == 0, lambda a: a == "")
+present = _op(lambda idx: np.asarray(idx) >= 0, lambda i: i >= 0)
+both = _op(lambda a, b: np.asarray(a) & np.asarray(b), lambda a, b: a and b)
+either = _op(lambda a, b: np.asarray(a) | np.asarray(b), lambda a, b: a or b)
+invert = _op(lambda a: ~np.asarray(a), lambda a: not a)
+
+
+def far(a, b, tol: float):
+    if np is not None:
+        return np.abs(np.asarray(a, dtype=float) - np.asarray(b, dtype=float)) > tol
+    return [abs(x - y) > tol for x, y in zip(a, b)]
+
+
+def nonzero(mask) -> List[int]:
+    if np is not None:
+        return np.flatnonzero(mask).tolist()
+    return [i for i, m in enumerate(mask) if m]
+
+
+# === Tables ==================================================================
+
+class Table:
+    """Named columns of equal length plus the join key column."""
+
+    def __init__(self, name: str, columns: Dict[str, list], key: str = "ref"):
+        self.name = name
+        self.key = key
+        self.columns = {k: (colf(v) if k in ("x", "y", "rot") else col(v)) for k, v in columns.items()}
+
+    def __len__(self) -> int:
+        return len(self.columns[self.key]) if self.key in self.columns else 0
+
+    def __getitem__(self, name: str):
+        return self.columns.get(name, col([""] * len(self)))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def index(self) -> Dict[str, int]:
+        """Hash side of the join: key -> first row. Later duplicates are reported separately."""
+        idx: Dict[str, int] = {}
+        for i, k in enumerate(self.columns.get(self.key, [])):
+            idx.setdefault(str(k), i)
+        return idx
+
+    def duplicates(self) -> List[str]:
+        seen, dup = set(), []
+        for k in self.columns.get(self.key, []):
+            if k in seen:
+                dup.append(str(k))
+            seen.add(k)
+        return dup
+
+
+def _canonical(header: Sequence[str]) -> Dict[int, str]:
+    out = {}
+    for i, h in enumerate(header):
+        h = h.strip().strip("#").strip().lower()
+        for canon, names in _ALIASES.items():
+            if h in names and canon not in out.values():
+                out[i] = canon
+                break
+    return out
+
+
+def _float(text: str) -> float:
+    m = re.match(r"\s*(-?[\d.]+)", text or "")
+    return float(m.group(1)) if m else float("nan")
+
+
+def load_csv(name: str, path: Path, key: str = "ref") -> Optional[Table]:
+    """Read a KiCad/JLCPCB CSV, exploding grouped designators ("C1,C2")."""
+    if not path.exists():
+        return None
+    with path.open(newline="", encoding="utf-8-sig") as f:
+        rows = [r for r in csv.reader(f) if r and not r[0].startswith("#")]
+    if not rows:
+        return Table(name, {key: []}, key)
+    mapping = _canonical(rows[0])
+    cols: Dict[str, list] = {c: [] for c in mapping.values()}
+    for row in rows[1:]:
+        values = {mapping[i]: v.strip() for i, v in enumerate(row) if i in mapping}
+        refs = [r for r in _REF_SPLIT.split(values.get("ref", "")) if r] if key == "ref" else [values.get("ref", "")]
+        for ref in refs:
+            for c in cols:
+                v = values.get(c, "")
+                if c == "ref":
+                    v = ref
+                elif c in ("x", "y", "rot"):
+                    v = _float(v)
+                elif c == "side":
+                    v = {"t": "top", "b": "bottom"}.get(v.lower()[:1], v.lower())
+                cols[c].append(v)
+    return Table(name, cols, key)
+
+
+def board_tables(path: Path) -> Tuple[Table, Table]:
+    board = load_board(path)
+    fps = board.footprints
+    parts = Table("board", {
+        "ref": [f.ref for f in fps],
+        "value": [f.value for f in fps],
+        "footprint": [f.lib_id for f in fps],
+        "side": ["bottom" if f.layer.startswith("B.") else "top" for f in fps],
+        "x": [f.x for f in fps],
+        "y": [-f.y for f in fps],              # pos files use y up
+        "rot": [f.angle for f in fps],
+    })
+    pads = [(f.ref, p.number, p.net) for f in fps for p in f.pads if p.number]
+    pad_table = Table("board pads", {
+        "key": [f"{r}\0{n}" for r, n, _ in pads],
+        "ref": [r for r, _, _ in pads],
+        "pad": [n for _, n, _ in pads],
+        "net": [str(net or "") for _, _, net in pads],
+    }, key="key")
+    return parts, pad_table
+
+
+# === Join ====================================================================
+
+def hash_join(keys: Sequence[str], tables: Sequence[Table]) -> List[list]:
+    """For every key, the row index in each table (-1 when absent)."""
+    out = []
+    for t in tables:
+        idx = t.index()
+        out.append(col_int(idx.get(k, -1) for k in keys))
+    return out
+
+
+def col_int(values: Iterable[int]):
+    values = list(values)
+    return np.asarray(values, dtype=np.int64) if np is not None else values
+
+
+# === Checks ==================================================================
+
+def _norm_value(ref_kind_hint: str):
+    def norm(text: str) -> str:
+        parsed = parse_value(text, ref_kind_hint) if text else None
+        return value_key(*parsed) if parsed else text.strip()
+    return norm
+
+
+def _fp_name(text: str) -> str:
+    return text.split(":", 1)[-1].strip()
+
+
+def _fp_class_ok(ref: str, footprint: str) -> bool:
+    lib = footprint.split(":", 1)[0] if ":" in footprint else ""
+    prefix = re.match(r"[A-Za-z]*", ref).group(0).upper()
+    for word, kinds in _FP_CLASS.items():
+        if lib.startswith(word):
+            return prefix in kinds
+    return True
+
+
+def _lcsc_checker(enabled: bool):
+    if not enabled:
+        return None
+    try:
+        from vikingboard_lcsc import LcscCatalog
+        return LcscCatalog.open()
+    except Exception:
+        return None
+
+
+def check_all(tables: Dict[str, Table], lcsc_lookup: bool = True) -> List[Issue]:
+    issues: List[Issue] = []
+    board = tables["board"]
+    others = [t for name, t in tables.items() if name not in ("board", "board pads", "netlist")]
+
+    for t in [board] + others:
+        for ref in t.duplicates():
+            issues.append(Issue("duplicate", "error", ref, f"listed more than once in {t.name}"))
+
+    keys = sorted(set(board[board.key]).union(*(set(t[t.key]) for t in others)),
+                  key=lambda r: (re.sub(r"\d+", "", r), int(re.sub(r"\D", "", r) or 0), r))
+    keys = [str(k) for k in keys]
+    idx = dict(zip(["board"] + [t.name for t in others], hash_join(keys, [board] + others)))
+    refs = col(keys)
+    on_board = present(idx["board"])
+    dnp = col([""] * len(keys))
+    if "bom" in idx:
+        dnp = take(tables["bom"]["dnp"], idx["bom"])
+    fitted = blank(dnp)
+
+    def report(check: str, severity: str, mask, detail: Callable[[int], str]) -> None:
+        for i in nonzero(mask):
+            issues.append(Issue(check, severity, keys[i], detail(i)))
+
+    # Presence, both directions
+    for t in others:
+        here = present(idx[t.name])
+        report("missing", "error", both(both(on_board, invert(here)), fitted),
+               lambda i, t=t: f"on the board but not in {t.name}")
+        report("missing", "error", both(here, invert(on_board)),
+               lambda i, t=t: f"in {t.name} but not on the board")
+
+    kinds = [ref_kind(k) for k in keys]
+    b_value = take(board["value"], idx["board"])
+    b_value_n = col(_norm_value(k)(v) for k, v in zip(kinds, b_value))
+    b_fp = take(board["footprint"], idx["board"])
+    b_fp_name = apply(_fp_name, b_fp)
+
+    for t in others:
+        here = both(present(idx[t.name]), on_board)
+        if "value" in t:
+            v = take(t["value"], idx[t.name])
+            vn = col(_norm_value(k)(x) for k, x in zip(kinds, v))
+            report("value", "warning", both(here, ne(vn, b_value_n)),
+                   lambda i, t=t, v=v: f"{t.name} says '{v[i]}', board says '{b_value[i]}'")
+        if "footprint" in t:
+            f = take(t["footprint"], idx[t.name])
+            # Compare names without the library prefix: BOM/CPL exports often drop it
+            report("footprint", "error", both(both(here, invert(blank(f))), ne(apply(_fp_name, f), b_fp_name)),
+                   lambda i, t=t, f=f: f"{t.name} says '{f[i]}', board has '{b_fp[i]}'")
+        if "side" in t:
+            s = take(t["side"], idx[t.name])
+            report("side", "error", both(here, ne(s, take(board["side"], idx["board"]))),
+                   lambda i, t=t, s=s: f"{t.name} places it on {s[i]}, board on {take(board['side'], idx['board'])[i]}")
+        if "x" in t and "y" in t:
+            nan = float("nan")
+            tx, ty = take(t["x"], idx[t.name], nan), take(t["y"], idx[t.name], nan)
+            bx, by = take(board["x"], idx["board"], nan), take(board["y"], idx["board"], nan)
+            report("position", "warning", both(here, either(far(tx, bx, POS_TOLERANCE), far(ty, by, POS_TOLERANCE))),
+                   lambda i, t=t: f"{t.name} at ({tx[i]:.3f}, {ty[i]:.3f}), board at ({bx[i]:.3f}, {by[i]:.3f})")
+        if "rot" in t:
+            tr = take(t["rot"], idx[t.name], 0.0)
+            br = take(board["rot"], idx["board"], 0.0)
+            if np is not None:
+                delta = np.abs((np.asarray(tr, dtype=float) - np.asarray(br, dtype=float) + 180) % 360 - 180)
+                rot_off = delta > ROT_TOLERANCE
+            else:
+                rot_off = [abs((a - b + 180) % 360 - 180) > ROT_TOLERANCE for a, b in zip(tr, br)]
+            report("rotation", "warning", both(here, rot_off),
+                   lambda i, t=t: f"{t.name} rotation {tr[i]:g}°, board {br[i]:g}°")
+
+    # Designator prefix vs footprint library
+    kind_ok = col_bool(_fp_class_ok(r, f) for r, f in zip(keys, b_fp))
+    report("ref_kind", "error", both(on_board, invert(kind_ok)),
+           lambda i: f"designator {keys[i]} does not fit footprint {b_fp[i]} (value '{b_value[i]}')")
+
+    # LCSC numbers
+    if "jlc_bom" in idx:
+        jlc = tables["jlc_bom"]
+        lcsc = take(jlc["lcsc"], idx["jlc_bom"])
+        in_jlc = present(idx["jlc_bom"])
+        report("lcsc_missing", "error", both(both(in_jlc, blank(lcsc)), fitted),
+               lambda i: "no LCSC part number in the JLCPCB BOM")
+        catalog = _lcsc_checker(lcsc_lookup)
+        if catalog is not None:
+            try:
+                jv = take(jlc["value"], idx["jlc_bom"])
+                jf = take(jlc["footprint"], idx["jlc_bom"])
+                for i in nonzero(both(in_jlc, invert(blank(lcsc)))):
+                    part = catalog.get(str(lcsc[i]))
+                    if part is None:
+                        issues.append(Issue("lcsc_unknown", "warning", keys[i],
+                                            f"{lcsc[i]} is not in the local catalog"))
+                        continue
+                    want = parse_value(str(jv[i]), kinds[i])
+                    vkey = parse_description(part.description)[0]
+                    if want and vkey and value_key(*want) != vkey:
+                        issues.append(Issue("lcsc_value", "error", keys[i],
+                                            f"{lcsc[i]} is {part.description!r}, line says '{jv[i]}'"))
+                    pkg = normalize_package(str(jf[i]))
+                    if pkg and part.package and normalize_package(part.package) != pkg:
+                        issues.append(Issue("lcsc_package", "error", keys[i],
+                                            f"{lcsc[i]} is {part.package}, footprint is {jf[i]}"))
+            finally:
+                catalog.close()
+
+    issues += check_pads(tables.get("netlist"), tables["board pads"], set(board[board.key]))
+    return issues
+
+
+def col_bool(values: Iterable[bool]):
+    values = list(values)
+    return np.asarray(values, dtype=bool) if np is not None else values
+
+
+def check_pads(netlist: Optional[Table], pads: Table, board_refs: set) -> List[Issue]:
+    """Join netlist (ref, pad) rows with the board's pads on ref+pad."""
+    if netlist is None or len(netlist) == 0:
+        return []
+    keys = [f"{r}\0{p}" for r, p in zip(netlist["ref"], netlist["pad"])]
+    (hit,) = hash_join(keys, [pads])
+    refs, pad_no, want = netlist["ref"], netlist["pad"], netlist["net"]
+    have = take(pads["net"], hit)
+    ref_on_board = col_bool(r in board_refs for r in refs)
+    issues = []
+    for i in nonzero(both(ref_on_board, invert(present(hit)))):
+        issues.append(Issue("pad_missing", "error", str(refs[i]), f"netlist pad {pad_no[i]} ({want[i]}) is not on the footprint"))
+    for i in nonzero(both(present(hit), ne(have, want))):
+        issues.append(Issue("pad_net", "error", str(refs[i]),
+                            f"pad {pad_no[i]} is on {have[i] or '<no net>'} on the board, netlist says {want[i]}"))
+    return issues
+
+
+# === CLI =====================================================================
+
+def load_tables(args) -> Dict[str, Table]:
+    parts, pads = board_tables(args.pcb)
+    tables: Dict[str, Table] = {"board": parts, "board pads": pads}
+    for name, path in (("bom", args.bom), ("cpl", args.cpl), ("jlc_bom", args.jlc_bom)):
+        t = load_csv(name, path)
+        if t is not None:
+            tables[name] = t
+        else:
+            print(f"⚠️  {name}: {path} not found, skipped", file=sys.stderr)     # keep --json output valid
+    nets = load_csv("netlist", args.nets, key="ref")
+    if nets is not None:
+        tables["netlist"] = nets
+    return tables
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cross-check BOM, CPL, netlist and board")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), default="production")
+    parser.add_argument("--pcb", type=Path, default=DEFAULT_PCB)
+    parser.add_argument("--bom", type=Path)
+    parser.add_argument("--cpl", type=Path)
+    parser.add_argument("--jlc-bom", type=Path, default=REPO_ROOT / JLC_BOM)
+    parser.add_argument("--nets", type=Path, default=REPO_ROOT / NETS)
+    parser.add_argument("--no-lcsc-lookup", action="store_true", help="don't check LCSC numbers against the catalog")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    layout = LAYOUTS[args.layout]
+    args.bom = args.bom or REPO_ROOT / layout["bom"]
+    args.cpl = args.cpl or REPO_ROOT / layout["cpl"]
+
+    tables = load_tables(args)
+    issues = check_all(tables, lcsc_lookup=not args.no_lcsc_lookup)
+    errors = sum(1 for i in issues if i.severity == "error")
+
+    if args.json:
+        print(json.dumps([i._asdict() for i in issues], indent=2))
+        return 1 if errors else 0
+
+    sizes = ", ".join(f"{name} {len(t)}" for name, t in tables.items())
+    print(f"📋 Loaded {sizes}")
+    by_check: Dict[str, List[Issue]] = {}
+    for issue in issues:
+        by_check.setdefault(issue.check, []).append(issue)
+    for check, items in by_check.items():
+        icon = "❌" if items[0].severity == "error" else "⚠️ "
+        print(f"\n{icon} {check} ({len(items)})")
+        for issue in items:
+            print(f"   {issue.ref:6} {issue.detail}")
+    if not issues:
+        print("\n✅ All files agree")
+    else:
+        print(f"\n{errors} error(s), {len(issues) - errors} warning(s)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
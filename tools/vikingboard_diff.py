@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+vikingboard_diff.py - Structural diff between two board or schematic revisions.
+
+A text diff of two backups is mostly noise: KiCad reorders items, writes
+the same coordinate with different float formatting and renumbers nets.
+This diff works on the parsed tree instead. Every subtree gets a Merkle
+hash (its name, its normalised atoms and its children's hashes), top-level
+items are matched by UUID, and only pairs whose hashes differ are
+descended into. Hashing is one linear pass per file; the comparison
+itself only visits the changed subtrees.
+
+Changes are reported in board terms: footprint moved/rotated/flipped,
+value or pad net changed, track or via added/removed/moved/net changed,
+zone added/removed/outline changed, net added/removed, schematic symbol
+moved or changed, and so on. Items deleted and re-created with identical
+content under a new UUID (fix_edge_cuts.py does this) are reported as
+"recreated", and zone refills are "refilled"; both are hidden unless --all.
+
+Either side can be a file or a backup-store timestamp
+(tools/vikingboard_backup.py), in which case --file picks the path.
+
+Usage:
+    python tools/vikingboard_diff.py backups/pcb_20251205_112125.kicad_pcb backups/pcb_20251205_120909.kicad_pcb
+    python tools/vikingboard_diff.py 20251205_112125 kicad/Vikingboard.kicad_pcb --all
+    python tools/vikingboard_diff.py OLD.kicad_sch NEW.kicad_sch --json
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from vikingboard_cache import load_tree as load_cached
+from vikingboard_sexpr import Node, QStr, parse
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_FILE = "kicad/Vikingboard.kicad_pcb"
+_TIMESTAMP_RE = re.compile(r"^\d{8}_\d{6}$")
+
+# Top-level lists that identify themselves by UUID (older files: tstamp)
+_ID_NODES = ("uuid", "tstamp")
+# Child lists whose first atom tells siblings apart
+_NAMED_CHILDREN = frozenset({"property", "pad", "fp_text", "pin", "model", "layer_def"})
+# Change kinds that are side effects rather than edits; shown with --all
+NOISE = frozenset({"recreated", "refilled"})
+
+Key = Tuple[str, str]
+
+
+class Change(NamedTuple):
+    kind: str        # footprint, track, via, zone, net, symbol, ...
+    change: str      # added, removed, moved, net, value, ...
+    label: str       # reference, net name or layer
+    detail: str
+    key: str         # UUID or other match key
+
+
+class Delta(NamedTuple):
+    path: Tuple[str, ...]    # child keys below the item, () = the item's own atoms
+    old: Optional[str]
+    new: Optional[str]
+
+
+# === Merkle tree =============================================================
+
+def _norm(atom: str) -> str:
+    """Atom as hashed: numbers canonicalised so 1, 1.0 and 1.000000 are equal."""
+    if isinstance(atom, QStr):
+        return '"' + atom
+    try:
+        number = float(atom)
+    except ValueError:
+        return atom
+    return repr(round(number, 6) + 0.0)
+
+
+class Tree:
+    """
+    One parsed file with a Merkle hash per node.
+
+    Net codes are resolved to names before hashing, so a renumbered net
+    table does not make every track look changed.
+    """
+
+    def __init__(self, root: Node, label: str):
+        self.root = root
+        self.label = label
+        self.nets: Dict[str, str] = {}
+        for net in root.find_all("net"):
+            if len(net.atoms) >= 2:
+                self.nets[net.atoms[0]] = net.atoms[1]
+        self._hashes: Dict[int, bytes] = {}
+        self._content: Dict[int, bytes] = {}
+        self.nodes = 0
+        self.digest = self._hash(root)
+        self.items: Dict[Key, Node] = {}
+        counts: Dict[str, int] = {}
+        for child in root.children:
+            key = self._item_key(child, counts)
+            self.items[key] = child
+            if key[0] == "uuid":
+                self._content[id(child)] = self._content_hash(child)
+
+    # --- Hashing ------------------------------------------------------------
+
+    def atoms(self, node: Node) -> List[str]:
+        """Display atoms, with (net 3) and (net 3 "GND") both read as "GND"."""
+        atoms = node.atoms
+        if node.name == "net" and atoms and not isinstance(atoms[0], QStr):
+            return [atoms[1] if len(atoms) > 1 else self.nets.get(atoms[0], atoms[0])]
+        return atoms
+
+    def _hash(self, node: Node) -> bytes:
+        self.nodes += 1
+        h = hashlib.blake2b(node.name.encode("utf-8"), digest_size=16)
+        for item in node.items:
+            if isinstance(item, Node):
+                h.update(b"(" + self._hash(item))
+            elif node.name == "net":
+                break
+            else:
+                h.update(b"\0" + _norm(item).encode("utf-8"))
+        if node.name == "net":
+            h.update(b"\0" + "".join(self.atoms(node)).encode("utf-8"))
+        digest = h.digest()
+        self._hashes[id(node)] = digest
+        return digest
+
+    def _content_hash(self, node: Node) -> bytes:
+        """Hash of an item without its UUID, to spot delete + re-create."""
+        h = hashlib.blake2b(node.name.encode("utf-8"), digest_size=16)
+        for item in node.items:
+            if isinstance(item, Node):
+                if item.name not in _ID_NODES:
+                    h.update(b"(" + self._hashes[id(item)])
+            else:
+                h.update(b"\0" + _norm(item).encode("utf-8"))
+        return h.digest()
+
+    def hash(self, node: Node) -> bytes:
+        return self._hashes[id(node)]
+
+    def content(self, node: Node) -> Optional[bytes]:
+        return self._content.get(id(node))
+
+    def _item_key(self, node: Node, counts: Dict[str, int]) -> Key:
+        for name in _ID_NODES:
+            ident = node.value(name)
+            if ident:
+                return ("uuid", ident)
+        if node.name == "net":
+            return ("net", "".join(self.atoms(node)))
+        # Singletons (setup, layers, lib_symbols, ...) and id-less repeats
+        index = counts.get(node.name, 0)
+        counts[node.name] = index + 1
+        return (node.name, str(index))
+
+
+def _child_keys(node: Node) -> Iterator[Tuple[str, Node]]:
+    counts: Dict[str, int] = {}
+    for child in node.children:
+        key = child.name
+        if child.name in _NAMED_CHILDREN and child.atoms:
+            key = f"{child.name} {child.atoms[0]}"
+        index = counts.get(key, 0)
+        counts[key] = index + 1
+        yield (key if index == 0 else f"{key}#{index}"), child
+
+
+def _render(tree: Tree, node: Node) -> str:
+    atoms = " ".join(tree.atoms(node))
+    if node.children:
+        return f"({node.name} {atoms} …)".replace("  ", " ")
+    return atoms
+
+
+class Differ:
+    """Walks two trees together, descending only where hashes differ."""
+
+    def __init__(self, old: Tree, new: Tree):
+        self.old = old
+        self.new = new
+        self.visited = 0
+
+    def deltas(self, a: Node, b: Node, path: Tuple[str, ...] = ()) -> List[Delta]:
+        out: List[Delta] = []
+        self._compare(a, b, path, out)
+        return out
+
+    def _compare(self, a: Node, b: Node, path: Tuple[str, ...], out: List[Delta]) -> None:
+        self.visited += 1
+        atoms_a, atoms_b = self.old.atoms(a), self.new.atoms(b)
+        if path and a.name in _NAMED_CHILDREN and " " in path[-1]:
+            atoms_a, atoms_b = atoms_a[1:], atoms_b[1:]    # the name is already in the path
+        if a.name == "net" or [_norm(x) for x in atoms_a] != [_norm(x) for x in atoms_b]:
+            if atoms_a != atoms_b:
+                out.append(Delta(path, " ".join(atoms_a), " ".join(atoms_b)))
+        kids_a = dict(_child_keys(a))
+        kids_b = dict(_child_keys(b))
+        for key, child in kids_a.items():
+            other = kids_b.get(key)
+            if other is None:
+                out.append(Delta(path + (key,), _render(self.old, child), None))
+            elif self.old.hash(child) != self.new.hash(other):
+                self._compare(child, other, path + (key,), out)
+        for key, child in kids_b.items():
+            if key not in kids_a:
+                out.append(Delta(path + (key,), None, _render(self.new, child)))
+
+
+# === Semantic changes ========================================================
+
+_KIND_NAMES = {"segment": "track", "arc": "track"}
+
+_MOVE = {k: "moved" for k in ("at", "start", "end", "mid", "center", "pts", "xy")}
+_TRACK = dict(_MOVE, net="net", width="width", size="size", drill="drill", layer="layer", layers="layer")
+_GRAPHIC = dict(_MOVE, layer="layer", stroke="style", width="style", fill="style")
+
+# Per item kind: first path element (without the "#n" suffix) -> change name
+_ASPECTS: Dict[str, Dict[str, str]] = {
+    "footprint": {
+        "at": "moved", "layer": "flipped", "property Reference": "reference",
+        "property Value": "value", "property Footprint": "library", "": "library",
+    },
+    "segment": _TRACK, "arc": _TRACK, "via": _TRACK,
+    "zone": {
+        "net": "net", "net_name": "net", "polygon": "outline", "layer": "layer",
+        "layers": "layer", "filled_polygon": "refilled",
+    },
+    "gr_line": _GRAPHIC, "gr_rect": _GRAPHIC, "gr_circle": _GRAPHIC, "gr_arc": _GRAPHIC,
+    "gr_poly": _GRAPHIC, "gr_text": dict(_GRAPHIC, **{"": "text"}),
+    "symbol": {
+        "at": "moved", "mirror": "mirrored", "lib_id": "symbol", "property Reference": "reference",
+        "property Value": "value", "property Footprint": "footprint", "unit": "unit",
+    },
+    "wire": _MOVE, "bus": _MOVE, "junction": _MOVE, "no_connect": _MOVE,
+    "label": dict(_MOVE, **{"": "renamed"}), "global_label": dict(_MOVE, **{"": "renamed"}),
+    "hierarchical_label": dict(_MOVE, **{"": "renamed"}),
+}
+_DEFAULT_ASPECT = {"zone": "settings"}
+
+
+def _label(tree: Tree, node: Node) -> str:
+    ref = node.property("Reference")
+    if ref:
+        return ref
+    if node.name == "net":
+        return "".join(tree.atoms(node))
+    if node.name == "zone":
+        layers = node.find("layers")
+        layer = node.value("layer") or (" ".join(layers.atoms) if layers is not None else "")
+        return f"{node.value('net_name', '')} {layer}".strip()
+    net = node.find("net")
+    if net is not None:
+        return "".join(tree.atoms(net))
+    return node.value("layer") or ""
+
+
+def _where(node: Node) -> str:
+    for name in ("at", "start"):
+        xy = node.find(name)
+        if xy is not None:
+            text = f"({', '.join(xy.atoms[:2])})"
+            end = node.find("end") if name == "start" else None
+            return f"{text} -> ({', '.join(end.atoms[:2])})" if end is not None else text
+    return ""
+
+
+def _aspect(kind: str, path: Tuple[str, ...]) -> str:
+    if kind == "footprint" and path and path[0].startswith("pad "):
+        return "pad net" if path[-1] == "net" else "pads"
+    head = path[0].split("#")[0] if path else ""
+    if head.startswith("property ") and len(path) > 1:
+        return "property"           # (effects (hide yes)) etc. under it, not a new value
+    table = _ASPECTS.get(kind, _MOVE if head in _MOVE else {})
+    if head in table:
+        return table[head]
+    if head.startswith("property "):
+        return "property"
+    return _DEFAULT_ASPECT.get(kind, "modified")
+
+
+def _at_changes(delta: Delta) -> List[Tuple[str, str]]:
+    """Split an (at x y rot) delta into moved and rotated."""
+    old = (delta.old or "").split()
+    new = (delta.new or "").split()
+    out = []
+    if [_norm(x) for x in old[:2]] != [_norm(x) for x in new[:2]]:
+        text = f"({', '.join(old[:2])}) -> ({', '.join(new[:2])})"
+        try:
+            dx, dy = (float(n) - float(o) for o, n in zip(old[:2], new[:2]))
+            text += f"  Δ {dx:+.3f}, {dy:+.3f} mm"
+        except ValueError:
+            pass
+        out.append(("moved", text))
+    rot_old = old[2] if len(old) > 2 else "0"
+    rot_new = new[2] if len(new) > 2 else "0"
+    if _norm(rot_old) != _norm(rot_new):
+        out.append(("rotated", f"{rot_old}° -> {rot_new}°"))
+    return out
+
+
+def describe(differ: Differ, key: str, a: Node, b: Node) -> List[Change]:
+    """Turn the deltas of one matched item into named changes."""
+    kind = a.name
+    shown = _KIND_NAMES.get(kind, kind)
+    label = _label(differ.new, b)
+    grouped: Dict[str, List[Delta]] = {}
+    changes: List[Change] = []
+    for delta in differ.deltas(a, b):
+        aspect = _aspect(kind, delta.path)
+        if aspect == "moved" and delta.path == ("at",):
+            for name, text in _at_changes(delta):
+                changes.append(Change(shown, name, label, text, key))
+        elif aspect == "pad net":
+            pad = delta.path[0].split("#")[0]
+            changes.append(Change(shown, aspect, label, f"{pad}: {delta.old} -> {delta.new}", key))
+        else:
+            grouped.setdefault(aspect, []).append(delta)
+    for aspect, deltas in grouped.items():
+        if aspect == "refilled":
+            changes.append(Change(shown, aspect, label, f"{len(deltas)} fill point(s) changed", key))
+            continue
+        first = deltas[0]
+        where = " ".join(first.path)
+        text = f"{where}: " if where and aspect in ("modified", "settings", "property", "pads") else ""
+        text += f"{first.old or '∅'} -> {first.new or '∅'}"
+        if len(deltas) > 1:
+            text += f" (+{len(deltas) - 1} more)"
+        changes.append(Change(shown, aspect, label, text, key))
+    return changes
+
+
+class DiffResult(NamedTuple):
+    changes: List[Change]
+    nodes: int          # nodes in both trees
+    visited: int        # nodes compared after the hash check
+    hash_ms: float
+    diff_ms: float
+
+
+def diff_trees(old: Tree, new: Tree) -> Tuple[List[Change], int]:
+    """All changes from old to new, plus the number of nodes compared."""
+    differ = Differ(old, new)
+    if old.digest == new.digest:
+        return [], 0
+    changes: List[Change] = []
+    removed: Dict[Key, Node] = {}
+    added: Dict[Key, Node] = {}
+    for key, b in new.items.items():
+        a = old.items.get(key)
+        if a is None:
+            added[key] = b
+        elif old.hash(a) != new.hash(b):
+            changes.extend(describe(differ, key[1], a, b))
+    for key, a in old.items.items():
+        if key not in new.items:
+            removed[key] = a
+
+    # Same content under a fresh UUID: a script deleted and re-created it
+    by_content: Dict[bytes, List[Key]] = {}
+    for key, a in removed.items():
+        digest = old.content(a)
+        if digest is not None:
+            by_content.setdefault(digest, []).append(key)
+    for key, b in list(added.items()):
+        candidates = by_content.get(new.content(b) or b"")
+        if candidates:
+            old_key = candidates.pop()
+            del removed[old_key]
+            del added[key]
+            shown = _KIND_NAMES.get(b.name, b.name)
+            changes.append(Change(shown, "recreated", _label(new, b), f"uuid {old_key[1]} -> {key[1]}", key[1]))
+
+    for tree, items, change in ((new, added, "added"), (old, removed, "removed")):
+        for key, node in items.items():
+            shown = _KIND_NAMES.get(node.name, node.name)
+            changes.append(Change(shown, change, _label(tree, node), _where(node), key[1]))
+    return changes, differ.visited
+
+
+def diff(old: Tree, new: Tree) -> DiffResult:
+    t0 = time.perf_counter()
+    changes, visited = diff_trees(old, new)
+    return DiffResult(changes, old.nodes + new.nodes, visited, 0.0, (time.perf_counter() - t0) * 1000)
+
+
+# === Inputs ==================================================================
+
+def load_tree(spec: Union[str, Path], rel: str = DEFAULT_FILE) -> Tree:
+    """A file path, or a backup-store timestamp (latest snapshot at or before it)."""
+    path = Path(spec)
+    if path.exists():
+        return Tree(load_cached(path), str(spec))
+    if _TIMESTAMP_RE.match(str(spec)):
+        from vikingboard_backup import STORE_PATH, BackupStore
+
+        if not STORE_PATH.exists():
+            raise FileNotFoundError(f"No backup store at {STORE_PATH}; run vikingboard_backup.py import-legacy")
+        store = BackupStore()
+        try:
+            timestamp = store.resolve(str(spec))
+            if timestamp is None:
+                raise FileNotFoundError(f"No backup snapshot at or before {spec}")
+            data = store.read_file(timestamp, rel)
+        finally:
+            store.close()
+        return Tree(parse(data.decode("utf-8")), f"{timestamp}:{rel}")
+    raise FileNotFoundError(f"Not a file or backup timestamp: {spec}")
+
+
+# === CLI =====================================================================
+
+def print_changes(result: DiffResult, old: Tree, new: Tree, show_all: bool) -> None:
+    shown = [c for c in result.changes if show_all or c.change not in NOISE]
+    print(f"📋 {old.label} -> {new.label}")
+    if not shown:
+        print("✅ No structural changes")
+    for c in sorted(shown, key=lambda c: (c.kind, c.change, c.label)):
+        print(f"   {c.kind:<10} {c.change:<10} {c.label:<14} {c.detail}")
+
+    counts: Dict[Tuple[str, str], int] = {}
+    for c in result.changes:
+        counts[(c.kind, c.change)] = counts.get((c.kind, c.change), 0) + 1
+    if counts:
+        summary = ", ".join(f"{n} {kind} {change}" for (kind, change), n in sorted(counts.items()))
+        print(f"\nSummary: {summary}")
+    hidden = len(result.changes) - len(shown)
+    if hidden:
+        print(f"[INFO] {hidden} recreated/refilled item(s) hidden; use --all to list them")
+    share = result.visited / result.nodes * 100 if result.nodes else 0.0
+    print(f"[INFO] Compared {result.visited} of {result.nodes} nodes ({share:.1f}%); "
+          f"parse+hash {result.hash_ms:.0f} ms, diff {result.diff_ms:.1f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Structural diff of two KiCad board or schematic revisions")
+    parser.add_argument("old", help="file or backup timestamp (YYYYmmdd_HHMMSS)")
+    parser.add_argument("new", help="file or backup timestamp")
+    parser.add_argument("--file", default=DEFAULT_FILE, help=f"path inside backup snapshots (default {DEFAULT_FILE})")
+    parser.add_argument("--all", action="store_true", help="also list recreated items and zone refills")
+    parser.add_argument("--json", action="store_true", help="print changes as JSON")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    try:
+        old = load_tree(args.old, args.file)
+        new = load_tree(args.new, args.file)
+    except (OSError, KeyError, ValueError) as exc:
+        print(f"❌ {exc}")
+        return 2
+    hash_ms = (time.perf_counter() - t0) * 1000
+    result = diff(old, new)._replace(hash_ms=hash_ms)
+
+    # Exit status follows what is reported: hidden noise (recreated, refilled) alone is not a change
+    shown = [c for c in result.changes if args.all or c.change not in NOISE]
+    if args.json:
+        print(json.dumps({"old": old.label, "new": new.label, "changes": [c._asdict() for c in shown],
+                          "nodes": result.nodes, "visited": result.visited}, indent=2, ensure_ascii=False))
+    else:
+        print_changes(result, old, new, args.all)
+    return 1 if shown else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
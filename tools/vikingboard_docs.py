@@ -2,15 +2,15 @@
 """
 VikingBoard documentation generator.
 
-Leser pins fra vikingboard_spec.get_all_pins() og genererer:
+Leser pins fra den kompilerte spec-en (vikingboard_specdb) og genererer:
 - docs/vikingboard_nets.md (Markdown tabell)
 - docs/vikingboard_nets.csv (CSV)
 """
 
-import csv
 from pathlib import Path
-from typing import List
-from vikingboard_spec import get_all_pins, Pin  # type: ignore
+from typing import Dict
+from vikingboard_export import CsvWriter, MarkdownWriter, Writer, export  # type: ignore
+from vikingboard_specdb import load_spec  # type: ignore
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -19,31 +19,22 @@ MD_PATH = DOCS_DIR / "vikingboard_nets.md"
 CSV_PATH = DOCS_DIR / "vikingboard_nets.csv"
 
 
-def generate_markdown(pins: List[Pin], path: Path) -> None:
-    DOCS_DIR.mkdir(exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        f.write("# VikingBoard net overview\n\n")
-        f.write("| Ref | Pad | Net |\n")
-        f.write("| :-- | :-- | :-- |\n")
-        for pin in sorted(pins, key=lambda p: (p.ref, str(p.pad))):
-            f.write(f"| {pin.ref} | {pin.pad} | `{pin.net}` |\n")
-
-
-def generate_csv(pins: List[Pin], path: Path) -> None:
-    DOCS_DIR.mkdir(exist_ok=True)
-    with path.open("w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["Ref", "Pad", "Net"])
-        for pin in sorted(pins, key=lambda p: (p.ref, str(p.pad))):
-            writer.writerow([pin.ref, pin.pad, pin.net])
+def build_targets() -> Dict[Path, Writer]:
+    return {
+        MD_PATH: MarkdownWriter(title="VikingBoard net overview"),
+        CSV_PATH: CsvWriter(),
+    }
 
 
 def main() -> None:
-    pins = get_all_pins()
-    print(f"[INFO] Loaded {len(pins)} pins from vikingboard_spec.get_all_pins()")
-    generate_markdown(pins, MD_PATH)
-    generate_csv(pins, CSV_PATH)
-    print(f"[INFO] Wrote {MD_PATH} and {CSV_PATH}")
+    spec = load_spec()
+    print(f"[INFO] Loaded {len(spec)} pins from compiled spec")
+    results = export(spec.rows(), build_targets(), sort=True)
+    changed = [str(r.path) for r in results if r.changed]
+    if changed:
+        print(f"[INFO] Wrote {' and '.join(changed)}")
+    else:
+        print("[INFO] Docs unchanged, nothing written")
 
 
 if __name__ == "__main__":
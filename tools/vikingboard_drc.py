@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+vikingboard_drc.py - Structured DRC report parser with run-to-run diffing.
+
+Turns kicad-cli DRC output (text or --format json) into typed records:
+rule, severity, category and items with position, ref, pad, net and layer.
+Replaces the `grep -c '['` counting in analyze_drc.sh/production_check.sh,
+which counted every line with a bracket.
+
+Parsing is streaming: reports are read one violation at a time and the
+full records are never held. The summary keeps counters plus a 16-byte
+fingerprint and a one-line label per distinct violation, and the diff
+against the previous run re-reads the report to print the new entries.
+Memory still grows with the number of distinct violations, and the
+baseline JSON of the previous run is loaded whole.
+
+Usage:
+    python tools/vikingboard_drc.py reports/drc_report.txt
+    python tools/vikingboard_drc.py production/drc.txt --rule unconnected_items
+    python tools/vikingboard_drc.py production/drc.txt --net GND
+    python tools/vikingboard_drc.py production/drc.txt --format shell
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BASELINE_DIR = REPO_ROOT / ".cache" / "drc"
+
+# Text report section headers -> category names used by the JSON format
+_SECTIONS = {
+    "DRC violations": "violations",
+    "unconnected pads": "unconnected_items",
+    "Footprint errors": "schematic_parity",
+}
+_SECTION_RE = re.compile(r"^\*\* Found (\d+) (.+?) \*\*$")
+_RULE_RE = re.compile(r"^\[([^\]]+)\]:\s*(.*)$")
+_ITEM_RE = re.compile(r"^\s+@\(\s*(-?[\d.]+)\s*mm,\s*(-?[\d.]+)\s*mm\):\s*(.*)$")
+_PAD_RE = re.compile(r"\bpad (\S+)")
+_NET_RE = re.compile(r"\[([^\]]*)\]")
+_REF_RE = re.compile(r"\bof (\S+)|^Footprint (\S+)")
+_LAYER_RE = re.compile(r"\bon (\S+?)(?:,|$|\s)")
+_JSON_ARRAYS = ("violations", "unconnected_items", "schematic_parity")
+_JSON_ARRAY_RE = re.compile(r'"(%s)"\s*:\s*\[' % "|".join(_JSON_ARRAYS))
+
+
+class DrcItem(NamedTuple):
+    x: float
+    y: float
+    text: str
+    ref: str = ""
+    pad: str = ""
+    net: str = ""
+    layer: str = ""
+    uuid: str = ""
+
+
+@dataclass
+class Violation:
+    category: str      # violations | unconnected_items | schematic_parity
+    rule: str          # clearance, unconnected_items, invalid_outline, ...
+    description: str
+    severity: str      # error | warning | ignore
+    items: Tuple[DrcItem, ...]
+
+    @property
+    def nets(self) -> List[str]:
+        return sorted({i.net for i in self.items if i.net})
+
+    @property
+    def refs(self) -> List[str]:
+        return sorted({i.ref for i in self.items if i.ref})
+
+    def fingerprint(self) -> bytes:
+        """Stable identity across runs: rule plus the sorted set of items."""
+        parts = sorted(i.uuid or f"{i.text}@{i.x:.3f},{i.y:.3f}" for i in self.items)
+        return hashlib.blake2b("\x1f".join([self.rule, *parts]).encode(), digest_size=16).digest()
+
+    def summary(self) -> str:
+        where = "; ".join(i.text for i in self.items[:2])
+        more = f" (+{len(self.items) - 2})" if len(self.items) > 2 else ""
+        return f"[{self.rule}] {self.severity}: {where}{more}"
+
+
+def parse_item(x: float, y: float, text: str, uuid: str = "") -> DrcItem:
+    """Pull ref/pad/net/layer out of KiCad's item description."""
+    pad = _PAD_RE.search(text)
+    net = _NET_RE.search(text)
+    ref = _REF_RE.search(text)
+    layer = _LAYER_RE.search(text)
+    return DrcItem(
+        x, y, text,
+        ref=(ref.group(1) or ref.group(2)) if ref else "",
+        pad=pad.group(1) if pad else "",
+        net=net.group(1) if net else "",
+        layer=layer.group(1) if layer else "",
+        uuid=uuid,
+    )
+
+
+# === Text format =============================================================
+
+def _iter_text(lines: Iterable[str]) -> Iterator[Violation]:
+    category = "violations"
+    current: Optional[list] = None  # [rule, description, severity, items]
+
+    def flush():
+        if current is not None:
+            return Violation(category, current[0], current[1], current[2], tuple(current[3]))
+        return None
+
+    for raw in lines:
+        line = raw.rstrip("\n")
+        section = _SECTION_RE.match(line)
+        if section or line.startswith("** "):
+            v = flush()
+            if v is not None:
+                yield v
+            current = None
+            if section:
+                category = _SECTIONS.get(section.group(2), section.group(2))
+            continue
+        rule = _RULE_RE.match(line)
+        if rule:
+            v = flush()
+            if v is not None:
+                yield v
+            current = [rule.group(1), rule.group(2), "error", []]
+            continue
+        if current is None:
+            continue
+        item = _ITEM_RE.match(line)
+        if item:
+            current[3].append(parse_item(float(item.group(1)), float(item.group(2)), item.group(3)))
+        elif line.startswith("    ") and ";" in line:
+            # "    Rule: clearance; error" or "    Local override; warning"
+            current[2] = line.rsplit(";", 1)[1].strip()
+    v = flush()
+    if v is not None:
+        yield v
+
+
+# === JSON format =============================================================
+
+def _iter_json_objects(stream: IO[str], chunk_size: int = 1 << 16) -> Iterator[Tuple[str, dict]]:
+    """Yield (array_name, object) from the top-level violation arrays, incrementally."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    array: Optional[str] = None
+    eof = False
+
+    def refill() -> bool:
+        nonlocal buf, pos, eof
+        block = stream.read(chunk_size)
+        if not block:
+            eof = True
+            return False
+        buf = buf[pos:] + block
+        pos = 0
+        return True
+
+    refill()
+    while True:
+        if array is None:
+            m = _JSON_ARRAY_RE.search(buf, pos)
+            if m is None:
+                # keep a tail in case the key is split across chunks
+                pos = max(pos, len(buf) - 64)
+                if not refill():
+                    return
+                continue
+            array = m.group(1)
+            pos = m.end()
+            continue
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf):
+            if not refill():
+                return
+            continue
+        if buf[pos] == "]":
+            array = None
+            pos += 1
+            continue
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof or not refill():
+                raise
+            continue
+        pos = end
+        yield array, obj
+
+
+def _iter_json(stream: IO[str]) -> Iterator[Violation]:
+    for category, obj in _iter_json_objects(stream):
+        items = []
+        for item in obj.get("items", []):
+            p = item.get("pos", {})
+            items.append(parse_item(float(p.get("x", 0)), float(p.get("y", 0)),
+                                    item.get("description", ""), item.get("uuid", "")))
+        yield Violation(category, obj.get("type", category), obj.get("description", ""),
+                        obj.get("severity", "error"), tuple(items))
+
+
+def iter_violations(path: Path) -> Iterator[Violation]:
+    """Stream Violation records from a text or JSON DRC report."""
+    with open(path, "r", encoding="utf-8") as f:
+        head = f.read(1)
+        f.seek(0)
+        if head == "{":
+            yield from _iter_json(f)
+        else:
+            yield from _iter_text(f)
+
+
+# === Summary, index and diff =================================================
+
+class DrcSummary:
+    """Counters plus per-violation fingerprints, built in one streaming pass."""
+
+    def __init__(self):
+        self.total = 0
+        self.by_category: Counter = Counter()
+        self.by_rule: Counter = Counter()
+        self.by_severity: Counter = Counter()
+        self.by_net: Counter = Counter()
+        self.by_ref: Counter = Counter()
+        self.fingerprints: Counter = Counter()
+        self.labels: Dict[bytes, str] = {}
+
+    def add(self, v: Violation) -> None:
+        self.total += 1
+        self.by_category[v.category] += 1
+        self.by_rule[v.rule] += 1
+        self.by_severity[v.severity] += 1
+        for net in v.nets:
+            self.by_net[net] += 1
+        for ref in v.refs:
+            self.by_ref[ref] += 1
+        fp = v.fingerprint()
+        self.fingerprints[fp] += 1
+        self.labels.setdefault(fp, v.summary())
+
+    @classmethod
+    def from_report(cls, path: Path) -> "DrcSummary":
+        summary = cls()
+        for v in iter_violations(path):
+            summary.add(v)
+        return summary
+
+
+class DrcIndex:
+    """All records of one report, indexed by rule, net and ref for queries."""
+
+    def __init__(self, violations: Iterable[Violation]):
+        self.records: List[Violation] = []
+        self.by_rule: Dict[str, List[int]] = defaultdict(list)
+        self.by_net: Dict[str, List[int]] = defaultdict(list)
+        self.by_ref: Dict[str, List[int]] = defaultdict(list)
+        for v in violations:
+            idx = len(self.records)
+            self.records.append(v)
+            self.by_rule[v.rule].append(idx)
+            for net in v.nets:
+                self.by_net[net].append(idx)
+            for ref in v.refs:
+                self.by_ref[ref].append(idx)
+
+    def rule(self, name: str) -> List[Violation]:
+        return [self.records[i] for i in self.by_rule.get(name, [])]
+
+    def net(self, name: str) -> List[Violation]:
+        return [self.records[i] for i in self.by_net.get(name, [])]
+
+    def ref(self, name: str) -> List[Violation]:
+        return [self.records[i] for i in self.by_ref.get(name, [])]
+
+
+class DrcDiff(NamedTuple):
+    new: Counter
+    fixed: Counter
+    unchanged: int
+
+
+def diff(previous: Counter, current: Counter) -> DrcDiff:
+    """Multiset difference of fingerprints between two runs."""
+    return DrcDiff(current - previous, previous - current, sum((current & previous).values()))
+
+
+def baseline_path(report: Path) -> Path:
+    key = hashlib.sha1(str(report.resolve()).encode()).hexdigest()[:12]
+    return BASELINE_DIR / f"{report.stem}-{key}.json"
+
+
+def load_baseline(path: Path) -> Optional[Tuple[Counter, Dict[bytes, str]]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    counts = Counter({bytes.fromhex(k): v[0] for k, v in data["fingerprints"].items()})
+    labels = {bytes.fromhex(k): v[1] for k, v in data["fingerprints"].items()}
+    return counts, labels
+
+
+def save_baseline(path: Path, summary: DrcSummary) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"fingerprints": {fp.hex(): [n, summary.labels[fp]] for fp, n in summary.fingerprints.items()}}
+    mask = os.umask(0)
+    os.umask(mask)
+    # Temp file + rename: an interrupted run never leaves half a baseline behind
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, sort_keys=True)
+        os.chmod(tmp, 0o666 & ~mask)        # mkstemp creates 0600
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+# === CLI =====================================================================
+
+def print_summary(summary: DrcSummary) -> None:
+    print(f"📋 DRC entries: {summary.total}")
+    for name, count in summary.by_category.most_common():
+        print(f"  {name:<20}: {count}")
+    print("\nBy rule:")
+    for name, count in summary.by_rule.most_common():
+        print(f"  {count:6}  {name}")
+    if summary.by_net:
+        print("\nBy net (top 10):")
+        for name, count in summary.by_net.most_common(10):
+            print(f"  {count:6}  {name}")
+
+
+def print_diff(report: Path, result: DrcDiff, labels: Dict[bytes, str], limit: int = 20) -> None:
+    print(f"\n🔁 Since last run: {sum(result.new.values())} new, "
+          f"{sum(result.fixed.values())} fixed, {result.unchanged} unchanged")
+    if result.new:
+        print("  New:")
+        shown = 0
+        # Second streaming pass, so new entries are printed without keeping every record
+        for v in iter_violations(report):
+            if v.fingerprint() in result.new and shown < limit:
+                print(f"    + {v.summary()}")
+                shown += 1
+    for fp in list(result.fixed)[:limit]:
+        print(f"    - {labels.get(fp, fp.hex())}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parse and diff kicad-cli DRC reports")
+    parser.add_argument("report", type=Path, nargs="?", default=REPO_ROOT / "production" / "drc.txt")
+    parser.add_argument("--rule", help="list violations of this rule")
+    parser.add_argument("--net", help="list violations touching this net")
+    parser.add_argument("--ref", help="list violations touching this footprint")
+    parser.add_argument("--format", choices=("text", "shell", "json"), default="text")
+    parser.add_argument("--baseline", type=Path, help="previous-run state file (default: per report in .cache/drc)")
+    parser.add_argument("--no-save", action="store_true", help="do not update the baseline")
+    args = parser.parse_args(argv)
+
+    if not args.report.exists():
+        print(f"❌ No DRC report at {args.report}")
+        return 1
+
+    if args.rule or args.net or args.ref:
+        index = DrcIndex(iter_violations(args.report))
+        hits = index.rule(args.rule) if args.rule else index.net(args.net) if args.net else index.ref(args.ref)
+        for v in hits:
+            print(v.summary())
+        print(f"\n{len(hits)} matching entries")
+        return 0
+
+    summary = DrcSummary.from_report(args.report)
+    violations = summary.by_category["violations"]
+    unconnected = summary.by_category["unconnected_items"]
+    parity = summary.by_category["schematic_parity"]
+
+    if args.format == "shell":
+        print(f"VIOLATIONS={violations}\nUNCONNECTED={unconnected}\nPARITY={parity}\nTOTAL={summary.total}")
+        return 0
+    if args.format == "json":
+        print(json.dumps({
+            "total": summary.total,
+            "by_category": dict(summary.by_category),
+            "by_rule": dict(summary.by_rule),
+            "by_severity": dict(summary.by_severity),
+            "by_net": dict(summary.by_net),
+        }, indent=2))
+        return 0
+
+    print_summary(summary)
+    state = args.baseline or baseline_path(args.report)
+    previous = load_baseline(state)
+    if previous is None:
+        print("\n🔁 No previous run recorded; this run becomes the baseline.")
+    else:
+        print_diff(args.report, diff(previous[0], summary.fingerprints), previous[1])
+    if not args.no_save:
+        save_baseline(state, summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
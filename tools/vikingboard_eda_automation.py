@@ -10,10 +10,10 @@ This module is the central place for:
 All logic and comments are in English, because the repository is English-only.
 """
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from pathlib import Path
-import json
-import csv
+
+from vikingboard_export import CsvWriter, JsonWriter, MarkdownWriter, export, report
 
 # === Data model =============================================================
 
@@ -81,47 +81,25 @@ def build_assignments() -> list[NetAssignment]:
     return result
 
 
-def export_markdown(path: Path, assignments: list[NetAssignment]) -> None:
-    """Export the net assignments as a Markdown table."""
-    lines = []
-    lines.append("| Ref | Pad | Net |")
-    lines.append("| :-- | :-- | :-- |")
-    for a in assignments:
-        lines.append(f"| {a.ref} | {a.pad} | `{a.net}` |")
-    path.write_text("\n".join(lines), encoding="utf-8")
-
-
-def export_csv(path: Path, assignments: list[NetAssignment]) -> None:
-    """Export the net assignments as a CSV file."""
-    with path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Ref", "Pad", "Net"])
-        for a in assignments:
-            writer.writerow([a.ref, a.pad, a.net])
-
-
-def export_json(path: Path, assignments: list[NetAssignment]) -> None:
-    """Export the net assignments as a JSON file."""
-    data = [asdict(a) for a in assignments]
-    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+def export_targets(docs_dir: Path) -> dict:
+    """Output files for main(), keyed by path."""
+    return {
+        docs_dir / "vikingboard_nets_auto.md": MarkdownWriter(trailing_newline=False),
+        docs_dir / "vikingboard_nets_auto.csv": CsvWriter(),
+        docs_dir / "vikingboard_nets_auto.json": JsonWriter(),
+    }
 
 
 def main() -> None:
     """Main entrypoint for local automation."""
     project_root = Path(__file__).resolve().parent.parent
     docs_dir = project_root / "docs"
-    docs_dir.mkdir(exist_ok=True)
-
-    assignments = build_assignments()
 
-    export_markdown(docs_dir / "vikingboard_nets_auto.md", assignments)
-    export_csv(docs_dir / "vikingboard_nets_auto.csv", assignments)
-    export_json(docs_dir / "vikingboard_nets_auto.json", assignments)
+    rows = ((a.ref, a.pad, a.net) for a in build_assignments())
+    results = export(rows, export_targets(docs_dir))
 
     print("✅ VikingBoard EDA automation export completed.")
-    print(f"   Markdown: {docs_dir / 'vikingboard_nets_auto.md'}")
-    print(f"   CSV:      {docs_dir / 'vikingboard_nets_auto.csv'}")
-    print(f"   JSON:     {docs_dir / 'vikingboard_nets_auto.json'}")
+    report(results)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+vikingboard_edit.py - Round-trip S-expression editing that keeps the file as is.
+
+The fix-up scripts used pcbnew only to add a zone or four Edge.Cuts lines,
+and pcbnew rewrites the whole file on save. A Document instead records
+edits as text patches against the parsed tree (Node.start/end offsets):
+
+    doc = Document.open("kicad/Vikingboard.kicad_pcb")
+    zone = doc.root.find("zone")
+    doc.set(zone, "min_thickness", "0.25")
+    doc.set(zone, "connect_pads/clearance", "0.2")
+    doc.remove(doc.root.find("gr_line"))
+    doc.insert(doc.root, parse('(gr_line (start 0 0) (end 10 0) (layer "Edge.Cuts"))'))
+    doc.save()
+
+Everything outside the patched ranges stays byte-identical, so the diff
+is exactly the edit. New nodes are written in KiCad's layout (tab
+indentation, one list per line) at the indentation of their siblings.
+
+save() patches the file in place when it can: edits that keep their byte
+length are written at their offsets; otherwise only the bytes from the
+first edit to the end of the file are rewritten. It refuses to write if
+the file changed on disk since it was opened. save(atomic=True) writes a
+temp file and renames it instead.
+
+Usage:
+    python tools/vikingboard_edit.py kicad/Vikingboard.kicad_pcb --set 'zone[net_name=GND]' min_thickness 0.25 --dry-run
+    python tools/vikingboard_edit.py kicad/Vikingboard.kicad_pcb --remove 'gr_line[layer=Edge.Cuts]'
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from vikingboard_sexpr import Node, dumps, parse
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+_SELECTOR_RE = re.compile(r"^([\w.]+)(?:\[([\w.]+)=([^\]]*)\])?$")
+
+
+class Edit(NamedTuple):
+    start: int       # character offsets into the original text
+    end: int
+    text: str
+    seq: int         # insertion order, for several inserts at one offset
+
+
+class SaveStats(NamedTuple):
+    edits: int
+    bytes_written: int
+    file_size: int
+    in_place: bool
+    seconds: float
+
+
+def new_uuid() -> str:
+    return str(uuid.uuid4())
+
+
+def fmt_mm(value: float) -> str:
+    """Coordinates the way KiCad writes them: up to 6 decimals, no trailing zeros."""
+    text = f"{value:.6f}".rstrip("0").rstrip(".")
+    return "0" if text in ("-0", "") else text
+
+
+class Document:
+    """A parsed KiCad file plus pending text edits against its original offsets."""
+
+    def __init__(self, text: str, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else None
+        self._reset(text)
+        self._stamp: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "Document":
+        path = Path(path)
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            text = f.read()
+        doc = cls(text, path)
+        doc._stamp = _stat_stamp(path)
+        return doc
+
+    def _reset(self, text: str) -> None:
+        self.text = text
+        self.root = parse(text)
+        self.edits: List[Edit] = []
+        self._ascii = text.isascii()
+
+    # --- Layout helpers -------------------------------------------------------
+
+    def _line_start(self, offset: int) -> int:
+        return self.text.rfind("\n", 0, offset) + 1
+
+    def indent_of(self, node: Node) -> str:
+        """Whitespace before node on its line ("" if it shares the line with text)."""
+        lead = self.text[self._line_start(node.start):node.start]
+        return lead if lead.strip() == "" else ""
+
+    def child_indent(self, parent: Node) -> str:
+        for child in parent.children:
+            indent = self.indent_of(child)
+            if indent:
+                return indent
+        return self.indent_of(parent) + "\t"
+
+    @staticmethod
+    def render(node: Union[Node, str], indent: str) -> str:
+        """KiCad-style text for node, continuation lines indented by indent."""
+        if isinstance(node, str):
+            node = parse(node)
+        lines = dumps(node, "\t").split("\n")
+        return "\n".join([lines[0]] + [indent + line for line in lines[1:]])
+
+    # --- Edits ----------------------------------------------------------------
+
+    def _add(self, start: int, end: int, text: str) -> None:
+        for i, e in enumerate(self.edits):
+            if start == e.start and end == e.end and start != end:
+                self.edits[i] = e._replace(text=text)      # same range again: last write wins
+                return
+            if start < e.end and e.start < end or (start == end and e.start < start < e.end):
+                raise ValueError(f"Edit at {start}-{end} overlaps an earlier edit at {e.start}-{e.end}")
+        self.edits.append(Edit(start, end, text, len(self.edits)))
+
+    def replace(self, node: Node, new: Union[Node, str]) -> None:
+        """Replace node (a whole list) with new."""
+        self._add(node.start, node.end, self.render(new, self.indent_of(node)))
+
+    def remove(self, node: Node) -> None:
+        """Remove node; if it sits on its own lines, those lines go too."""
+        start, end = node.start, node.end
+        line = self._line_start(start)
+        after = self.text.find("\n", end)
+        after = len(self.text) if after < 0 else after
+        if self.text[line:start].strip() == "" and self.text[end:after].strip() == "":
+            start, end = line, min(after + 1, len(self.text))
+        elif start > 0 and self.text[start - 1] == " ":
+            start -= 1
+        self._add(start, end, "")
+
+    def insert(self, parent: Node, new: Union[Node, str], after: Optional[Node] = None) -> None:
+        """Insert new as a child of parent, after the given child or last."""
+        indent = self.child_indent(parent)
+        if after is not None:
+            self._add(after.end, after.end, "\n" + indent + self.render(new, indent))
+            return
+        close = parent.end - 1
+        line = self._line_start(close)
+        if self.text[line:close].strip() == "" and line > parent.start:
+            self._add(line, line, indent + self.render(new, indent) + "\n")
+        else:
+            self._add(close, close, " " + self.render(new, indent))
+
+    def set_atoms(self, node: Node, *atoms: str) -> None:
+        """Replace the atoms after the head symbol of node, keeping its children."""
+        start = self.text.index(node.name, node.start + 1) + len(node.name)
+        stop = node.children[0].start if node.children else node.end - 1
+        while stop > start and self.text[stop - 1] in " \t\r\n":
+            stop -= 1
+        rendered = "".join(" " + dumps(a) for a in atoms)
+        self._add(start, stop, rendered)
+
+    def set(self, node: Node, path: str, *atoms: str) -> None:
+        """
+        Set (a/b/c x y) below node: existing lists get new atoms, missing
+        ones are created at the first missing level.
+        """
+        names = path.split("/")
+        current = node
+        for depth, name in enumerate(names):
+            child = current.find(name)
+            if child is None:
+                new = Node(names[-1], list(atoms))
+                for outer in reversed(names[depth:-1]):
+                    new = Node(outer, [new])
+                self.insert(current, new)
+                return
+            current = child
+        self.set_atoms(current, *atoms)
+
+    # --- Output ---------------------------------------------------------------
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.edits)
+
+    def result(self) -> str:
+        parts = []
+        pos = 0
+        for e in sorted(self.edits, key=lambda e: (e.start, e.seq)):
+            parts.append(self.text[pos:e.start])
+            parts.append(e.text)
+            pos = max(pos, e.end)
+        parts.append(self.text[pos:])
+        return "".join(parts)
+
+    def _byte_offset(self, offset: int) -> int:
+        return offset if self._ascii else len(self.text[:offset].encode("utf-8"))
+
+    def save(self, path: Optional[Union[str, Path]] = None, atomic: bool = False) -> SaveStats:
+        """Write the edits (see module docstring); the Document then reflects the new text."""
+        t0 = time.perf_counter()
+        target = Path(path) if path is not None else self.path
+        if target is None:
+            raise ValueError("Document has no path; pass one to save()")
+        new_text = self.result()
+        new_bytes = new_text.encode("utf-8")
+        same_file = self.path is not None and target.resolve() == self.path.resolve()
+        if same_file and self._stamp is not None and _stat_stamp(target) != self._stamp:
+            raise RuntimeError(f"{target} changed on disk since it was opened; not overwriting")
+
+        in_place = same_file and not atomic and target.exists()
+        count = len(self.edits)
+        if not self.edits and same_file:
+            written = 0
+        elif not in_place:
+            _atomic_write(target, new_bytes)
+            written = len(new_bytes)
+        else:
+            written = self._patch(target, new_bytes)
+        self._reset(new_text)
+        if same_file or path is None:
+            self._stamp = _stat_stamp(target)
+        return SaveStats(count, written, len(new_bytes), in_place, time.perf_counter() - t0)
+
+    def _patch(self, target: Path, new_bytes: bytes) -> int:
+        edits = sorted(self.edits, key=lambda e: (e.start, e.seq))
+        spans = [(self._byte_offset(e.start), self._byte_offset(e.end), e.text.encode("utf-8")) for e in edits]
+        with open(target, "r+b") as f:
+            if all(end - start == len(text) for start, end, text in spans):
+                for start, _end, text in spans:
+                    f.seek(start)
+                    f.write(text)
+                written = sum(len(text) for _, _, text in spans)
+            else:
+                first = spans[0][0]
+                f.seek(first)
+                f.write(new_bytes[first:])
+                f.truncate()
+                written = len(new_bytes) - first
+            f.flush()
+            os.fsync(f.fileno())
+        return written
+
+    # --- Queries --------------------------------------------------------------
+
+    def select(self, selector: str, parent: Optional[Node] = None) -> List[Node]:
+        """Children of parent (default root) matching name or name[child=value]."""
+        m = _SELECTOR_RE.match(selector)
+        if not m:
+            raise ValueError(f"Bad selector '{selector}' (use name or name[child=value])")
+        name, key, value = m.groups()
+        nodes = (parent or self.root).find_all(name)
+        if key is not None:
+            nodes = [n for n in nodes if n.value(key) == value]
+        return nodes
+
+
+def _stat_stamp(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o777)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+# === CLI =====================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Edit a KiCad file in place, keeping untouched text identical")
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--set", nargs="+", action="append", default=[], metavar="SELECTOR PATH ATOM",
+                        help="set PATH (a/b) to ATOMs on every node matching SELECTOR")
+    parser.add_argument("--remove", action="append", default=[], metavar="SELECTOR", help="remove matching nodes")
+    parser.add_argument("--insert", action="append", default=[], metavar="SEXPR", help="append a top-level node")
+    parser.add_argument("--dry-run", action="store_true", help="print the changed text instead of saving")
+    args = parser.parse_args(argv)
+
+    if not args.file.exists():
+        print(f"❌ File not found: {args.file}")
+        return 1
+    doc = Document.open(args.file)
+    try:
+        for spec in args.set:
+            if len(spec) < 3:
+                parser.error("--set needs SELECTOR PATH ATOM...")
+            for node in doc.select(spec[0]):
+                doc.set(node, spec[1], *spec[2:])
+        for selector in args.remove:
+            for node in doc.select(selector):
+                doc.remove(node)
+        for text in args.insert:
+            doc.insert(doc.root, text)
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return 1
+
+    if not doc.changed:
+        print("[INFO] Nothing matched; file unchanged")
+        return 0
+    if args.dry_run:
+        import difflib
+
+        diff = difflib.unified_diff(doc.text.splitlines(True), doc.result().splitlines(True),
+                                    str(args.file), str(args.file) + " (edited)")
+        sys.stdout.writelines(diff)
+        return 0
+    stats = doc.save()
+    mode = "in place" if stats.in_place else "rewritten"
+    print(f"✅ {stats.edits} edit(s) saved {mode}: {stats.bytes_written} of {stats.file_size} bytes written "
+          f"in {stats.seconds * 1e6:.0f} µs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+vikingboard_export.py - Single-pass net documentation exporter.
+
+Streams (ref, pad, net) rows once into every requested writer, then hashes
+each rendered document and only touches disk when the content differs from
+what is already there. Unchanged files keep their mtime, so git stays clean
+and downstream stages see nothing to redo.
+
+Writers are plug-ins: subclass Writer, decorate with @register_writer and
+the format is available to every caller and to the CLI (--plugin loads
+extra writer modules from a file).
+
+Built-in formats: markdown, csv, json, yaml, kicad-net.
+
+Usage:
+    python tools/vikingboard_export.py                       # docs/vikingboard_nets.{md,csv}
+    python tools/vikingboard_export.py -f json -f kicad-net  # extra formats
+    python tools/vikingboard_export.py --out-dir build/ --stem nets -f yaml
+    python tools/vikingboard_export.py --plugin my_writers.py -f xlsx
+"""
+
+import argparse
+import csv
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DOCS_DIR = REPO_ROOT / "docs"
+
+Row = Tuple[str, str, str]
+
+
+# === Writers =================================================================
+
+class Writer(ABC):
+    """Base writer: begin() once, row() per assignment, end() returns the rendered bytes."""
+
+    name = ""
+    suffix = ""
+
+    def begin(self) -> None:
+        pass
+
+    @abstractmethod
+    def row(self, ref: str, pad: str, net: str) -> None:
+        ...
+
+    @abstractmethod
+    def end(self) -> bytes:
+        ...
+
+
+WRITERS: Dict[str, Type[Writer]] = {}
+
+
+def register_writer(cls: Type[Writer]) -> Type[Writer]:
+    """Class decorator that makes a writer available by its `name`."""
+    WRITERS[cls.name] = cls
+    return cls
+
+
+@register_writer
+class MarkdownWriter(Writer):
+    name = "markdown"
+    suffix = ".md"
+
+    def __init__(self, title: Optional[str] = None, trailing_newline: bool = True):
+        self.title = title
+        self.trailing_newline = trailing_newline
+
+    def begin(self) -> None:
+        self.lines = [f"# {self.title}", ""] if self.title else []
+        self.lines += ["| Ref | Pad | Net |", "| :-- | :-- | :-- |"]
+
+    def row(self, ref: str, pad: str, net: str) -> None:
+        self.lines.append(f"| {ref} | {pad} | `{net}` |")
+
+    def end(self) -> bytes:
+        return ("\n".join(self.lines) + ("\n" if self.trailing_newline else "")).encode("utf-8")
+
+
+@register_writer
+class CsvWriter(Writer):
+    name = "csv"
+    suffix = ".csv"
+
+    def begin(self) -> None:
+        self.buf = io.StringIO(newline="")
+        self.writer = csv.writer(self.buf)
+        self.writer.writerow(["Ref", "Pad", "Net"])
+
+    def row(self, ref: str, pad: str, net: str) -> None:
+        self.writer.writerow([ref, pad, net])
+
+    def end(self) -> bytes:
+        return self.buf.getvalue().encode("utf-8")
+
+
+@register_writer
+class JsonWriter(Writer):
+    name = "json"
+    suffix = ".json"
+
+    def begin(self) -> None:
+        self.items: List[Dict[str, str]] = []
+
+    def row(self, ref: str, pad: str, net: str) -> None:
+        self.items.append({"ref": ref, "pad": pad, "net": net})
+
+    def end(self) -> bytes:
+        return json.dumps(self.items, indent=2).encode("utf-8")
+
+
+@register_writer
+class YamlWriter(Writer):
+    """Nets grouped by ref; written by hand so PyYAML is not needed."""
+
+    name = "yaml"
+    suffix = ".yaml"
+
+    def begin(self) -> None:
+        self.refs: Dict[str, List[Tuple[str, str]]] = {}
+
+    def row(self, ref: str, pad: str, net: str) -> None:
+        self.refs.setdefault(ref, []).append((pad, net))
+
+    def end(self) -> bytes:
+        lines = ["refs:"]
+        for ref, pins in self.refs.items():
+            lines.append(f"  {json.dumps(ref)}:")
+            lines.extend(f"    {json.dumps(pad)}: {json.dumps(net)}" for pad, net in pins)
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@register_writer
+class KicadNetlistWriter(Writer):
+    """KiCad S-expression netlist (export version E), components and nets only."""
+
+    name = "kicad-net"
+    suffix = ".net"
+
+    def begin(self) -> None:
+        self.comps: Dict[str, None] = {}
+        self.nets: Dict[str, List[Tuple[str, str]]] = {}
+
+    def row(self, ref: str, pad: str, net: str) -> None:
+        self.comps[ref] = None
+        self.nets.setdefault(net, []).append((ref, pad))
+
+    def end(self) -> bytes:
+        q = json.dumps
+        lines = ['(export (version "E")', "  (components"]
+        lines.extend(f"    (comp (ref {q(ref)}))" for ref in self.comps)
+        lines.append("  )")
+        lines.append("  (nets")
+        for code, (net, nodes) in enumerate(self.nets.items(), start=1):
+            lines.append(f'    (net (code "{code}") (name {q(net)})')
+            lines.extend(f"      (node (ref {q(ref)}) (pin {q(pad)}))" for ref, pad in nodes)
+            lines.append("    )")
+        lines.append("  )")
+        lines.append(")")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def load_plugin(path: Path) -> None:
+    """Import a Python file; any @register_writer classes in it become available."""
+    spec = importlib.util.spec_from_file_location(f"_export_plugin_{Path(path).stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+
+# === Export ==================================================================
+
+class ExportResult(NamedTuple):
+    path: Path
+    changed: bool
+    size: int
+    digest: str
+
+
+def write_if_changed(path: Path, data: bytes) -> Tuple[bool, str]:
+    """Write `data` atomically unless the file already holds exactly these bytes."""
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    try:
+        if path.stat().st_size == len(data):
+            if hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest() == digest:
+                return False, digest
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mask = os.umask(0)
+    os.umask(mask)
+    mode = path.stat().st_mode & 0o777 if path.exists() else 0o666 & ~mask
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, mode)             # mkstemp creates 0600
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return True, digest
+
+
+def export(rows: Iterable[Row], targets: Dict[Path, Writer], sort: bool = False,
+           key: Optional[Callable[[Row], object]] = None) -> List[ExportResult]:
+    """One pass over `rows` feeding every writer, then a hash-guarded write per target."""
+    if sort:
+        rows = sorted(rows, key=key or (lambda r: (r[0], str(r[1]))))
+    writers = list(targets.values())
+    for w in writers:
+        w.begin()
+    row_fns = [w.row for w in writers]
+    for ref, pad, net in rows:
+        ref, pad, net = str(ref), str(pad), str(net)
+        for fn in row_fns:
+            fn(ref, pad, net)
+    results = []
+    for path, writer in targets.items():
+        data = writer.end()
+        changed, digest = write_if_changed(Path(path), data)
+        results.append(ExportResult(Path(path), changed, len(data), digest))
+    return results
+
+
+def report(results: List[ExportResult]) -> None:
+    for r in results:
+        state = "wrote    " if r.changed else "unchanged"
+        try:
+            shown = r.path.relative_to(REPO_ROOT)
+        except ValueError:
+            shown = r.path
+        print(f"   {state} {shown}")
+
+
+# === CLI =====================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export VikingBoard net assignments in one pass")
+    parser.add_argument("-f", "--format", action="append", dest="formats", metavar="NAME",
+                        help="writer to run (repeatable, default: markdown + csv)")
+    parser.add_argument("--out-dir", type=Path, default=DOCS_DIR)
+    parser.add_argument("--stem", default="vikingboard_nets")
+    parser.add_argument("--plugin", type=Path, action="append", default=[], help="load writers from a .py file")
+    parser.add_argument("--list", action="store_true", help="list available formats")
+    args = parser.parse_args(argv)
+
+    for plugin in args.plugin:
+        load_plugin(plugin)
+    if args.list:
+        for name, cls in sorted(WRITERS.items()):
+            print(f"{name:12} {cls.suffix}")
+        return 0
+
+    formats = args.formats or ["markdown", "csv"]
+    unknown = [f for f in formats if f not in WRITERS]
+    if unknown:
+        print(f"❌ Unknown format(s): {', '.join(unknown)} (available: {', '.join(sorted(WRITERS))})")
+        return 2
+
+    from vikingboard_specdb import load_spec
+
+    targets: Dict[Path, Writer] = {}
+    for name in formats:
+        cls = WRITERS[name]
+        writer = cls(title="VikingBoard net overview") if cls is MarkdownWriter else cls()
+        targets[args.out_dir / f"{args.stem}{cls.suffix}"] = writer
+    results = export(load_spec().rows(), targets, sort=True)
+    print(f"✅ Exported {len(targets)} format(s), {sum(r.changed for r in results)} changed")
+    report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+vikingboard_fpcatalog.py - Memory-mapped footprint catalog from kicad/fp-info-cache.
+
+fp-info-cache is ~106k lines: a timestamp line, then seven lines per
+footprint (library, name, description, keywords, order, pad count,
+unique pad count). Scanning it for every BOM check is slow, so this
+module compiles it once into a binary index and opens that with mmap.
+Lookups binary-search the mapped file directly and only decode the
+records they return.
+
+The index stores the cache's first-line timestamp and is rebuilt
+automatically whenever KiCad rewrites the cache.
+
+Usage:
+    python tools/vikingboard_fpcatalog.py lookup Capacitor_SMD:C_0805_2012Metric
+    python tools/vikingboard_fpcatalog.py prefix Capacitor_SMD:C_0805
+    python tools/vikingboard_fpcatalog.py keyword capacitor [--prefix]
+    python tools/vikingboard_fpcatalog.py pads 8 [--max 10]
+    python tools/vikingboard_fpcatalog.py check-bom production/bom.csv
+    python tools/vikingboard_fpcatalog.py --bench
+"""
+
+import argparse
+import csv
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FP_CACHE = REPO_ROOT / "kicad" / "fp-info-cache"
+CACHE_DIR = REPO_ROOT / ".cache"
+INDEX_PATH = CACHE_DIR / "fp_catalog.idx"
+
+# Header: magic, cache timestamp, record count, keyword count,
+#         then byte offsets of the strings, records, keywords and pad sections.
+_MAGIC = b"VBFPIDX1"
+_HEADER = struct.Struct("<8s32sII4Q")
+# Record: key, description, keywords as (offset, length) into the string
+#         blob, then pad count and unique pad count.
+_RECORD = struct.Struct("<IIIIIIHH")
+# Keyword entry: keyword (offset, length), record number.
+_KEYWORD = struct.Struct("<III")
+
+
+class Footprint(NamedTuple):
+    lib: str
+    name: str
+    description: str
+    keywords: str
+    pad_count: int
+    unique_pad_count: int
+
+    @property
+    def lib_id(self) -> str:
+        return f"{self.lib}:{self.name}"
+
+
+def read_cache_timestamp(cache_path: Path) -> str:
+    """First line of fp-info-cache, which KiCad bumps on every rewrite."""
+    with cache_path.open("r", encoding="utf-8") as f:
+        return f.readline().strip()
+
+
+def _iter_cache_records(cache_path: Path) -> Iterator[Tuple[str, str, str, str, int, int]]:
+    with cache_path.open("r", encoding="utf-8") as f:
+        f.readline()
+        while True:
+            lines = [f.readline() for _ in range(7)]
+            if not lines[0]:
+                return
+            lib, name, descr, tags, _order, pads, unique = (line.rstrip("\n") for line in lines)
+            yield lib, name, descr, tags, int(pads or 0), int(unique or 0)
+
+
+def build_index(cache_path: Path = FP_CACHE, index_path: Path = INDEX_PATH) -> int:
+    """Compile fp-info-cache into the binary index; returns record count."""
+    stamp = read_cache_timestamp(cache_path)
+    records = sorted(_iter_cache_records(cache_path), key=lambda r: f"{r[0]}:{r[1]}")
+
+    blob = bytearray()
+    seen = {}
+
+    def intern(text: str) -> Tuple[int, int]:
+        # Descriptions and keyword lists repeat a lot across variants
+        if text not in seen:
+            data = text.encode("utf-8")
+            seen[text] = (len(blob), len(data))
+            blob.extend(data)
+        return seen[text]
+
+    packed = bytearray()
+    keywords: List[Tuple[str, int]] = []
+    for idx, (lib, name, descr, tags, pads, unique) in enumerate(records):
+        key = intern(f"{lib}:{name}")
+        packed += _RECORD.pack(*key, *intern(descr), *intern(tags), min(pads, 0xFFFF), min(unique, 0xFFFF))
+        for word in set(tags.lower().split()):
+            keywords.append((word, idx))
+    keywords.sort()
+
+    kw_packed = bytearray()
+    for word, idx in keywords:
+        kw_packed += _KEYWORD.pack(*intern(word), idx)
+
+    by_pads = sorted(range(len(records)), key=lambda i: records[i][4])
+    pad_keys = struct.pack(f"<{len(by_pads)}H", *(min(records[i][4], 0xFFFF) for i in by_pads))
+    pad_ids = struct.pack(f"<{len(by_pads)}I", *by_pads)
+
+    strings_off = _HEADER.size
+    records_off = strings_off + len(blob)
+    records_off += -records_off % 4
+    keywords_off = records_off + len(packed)
+    pads_off = keywords_off + len(kw_packed)
+    header = _HEADER.pack(
+        _MAGIC, stamp.encode("ascii")[:32], len(records), len(keywords),
+        strings_off, records_off, keywords_off, pads_off,
+    )
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=index_path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(header)
+        f.write(blob)
+        f.write(b"\0" * (-(strings_off + len(blob)) % 4))
+        f.write(packed)
+        f.write(kw_packed)
+        f.write(pad_ids)
+        f.write(pad_keys)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, index_path)
+    return len(records)
+
+
+class FootprintCatalog:
+    """Read-only view over the mmap'ed index."""
+
+    def __init__(self, index_path: Path = INDEX_PATH):
+        with open(index_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, stamp, self._n_records, self._n_keywords,
+         self._strings, records, keywords, pads) = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{index_path} is not a footprint catalog index")
+        self.timestamp = stamp.rstrip(b"\0").decode("ascii")
+        view = memoryview(self._mm)
+        self._records = view[records:keywords]
+        self._keywords = view[keywords:pads]
+        self._pad_ids = view[pads:pads + 4 * self._n_records].cast("I")
+        self._pad_keys = view[pads + 4 * self._n_records:pads + 6 * self._n_records].cast("H")
+
+    @classmethod
+    def open(cls, cache_path: Path = FP_CACHE, index_path: Path = INDEX_PATH) -> "FootprintCatalog":
+        """Open the index, rebuilding it first if fp-info-cache has changed."""
+        if not index_path.exists() or _index_timestamp(index_path) != read_cache_timestamp(cache_path):
+            build_index(cache_path, index_path)
+        return cls(index_path)
+
+    def close(self) -> None:
+        self._records.release()
+        self._keywords.release()
+        self._pad_ids.release()
+        self._pad_keys.release()
+        self._mm.close()
+
+    def __len__(self) -> int:
+        return self._n_records
+
+    # --- Low-level access ---------------------------------------------------
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings + offset
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _key_bytes(self, idx: int) -> bytes:
+        off, length = struct.unpack_from("<II", self._records, idx * _RECORD.size)
+        start = self._strings + off
+        return self._mm[start:start + length]
+
+    def _record(self, idx: int) -> Footprint:
+        k_off, k_len, d_off, d_len, t_off, t_len, pads, unique = _RECORD.unpack_from(
+            self._records, idx * _RECORD.size
+        )
+        lib, _, name = self._string(k_off, k_len).partition(":")
+        return Footprint(lib, name, self._string(d_off, d_len), self._string(t_off, t_len), pads, unique)
+
+    def _keyword_bytes(self, idx: int) -> bytes:
+        off, length, _ = _KEYWORD.unpack_from(self._keywords, idx * _KEYWORD.size)
+        start = self._strings + off
+        return self._mm[start:start + length]
+
+    def _lower_bound(self, count: int, key_at, target: bytes) -> int:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key_at(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # --- Queries --------------------------------------------------------------
+
+    def get(self, lib_id: str) -> Optional[Footprint]:
+        """Exact lookup by "Library:Footprint"."""
+        target = lib_id.encode("utf-8")
+        idx = self._lower_bound(self._n_records, self._key_bytes, target)
+        if idx < self._n_records and self._key_bytes(idx) == target:
+            return self._record(idx)
+        return None
+
+    def __contains__(self, lib_id: str) -> bool:
+        return self.get(lib_id) is not None
+
+    def prefix(self, prefix: str, limit: Optional[int] = None) -> Iterator[Footprint]:
+        """All footprints whose "Library:Footprint" starts with prefix."""
+        target = prefix.encode("utf-8")
+        idx = self._lower_bound(self._n_records, self._key_bytes, target)
+        found = 0
+        while idx < self._n_records and self._key_bytes(idx).startswith(target):
+            if limit is not None and found >= limit:
+                return
+            yield self._record(idx)
+            idx += 1
+            found += 1
+
+    def keyword(self, word: str, prefix: bool = False) -> Iterator[Footprint]:
+        """Footprints tagged with word (case-insensitive), or any tag starting with it."""
+        target = word.lower().encode("utf-8")
+        idx = self._lower_bound(self._n_keywords, self._keyword_bytes, target)
+        seen = set()
+        while idx < self._n_keywords:
+            current = self._keyword_bytes(idx)
+            if not (current.startswith(target) if prefix else current == target):
+                return
+            record = _KEYWORD.unpack_from(self._keywords, idx * _KEYWORD.size)[2]
+            if record not in seen:
+                seen.add(record)
+                yield self._record(record)
+            idx += 1
+
+    def by_pad_count(self, minimum: int, maximum: Optional[int] = None) -> Iterator[Footprint]:
+        """Footprints with minimum <= pad count <= maximum (default: exactly minimum)."""
+        maximum = minimum if maximum is None else maximum
+        keys = self._pad_keys
+        lo, hi = 0, len(keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if keys[mid] < minimum:
+                lo = mid + 1
+            else:
+                hi = mid
+        idx = lo
+        while idx < len(keys) and keys[idx] <= maximum:
+            yield self._record(self._pad_ids[idx])
+            idx += 1
+
+
+def _index_timestamp(index_path: Path) -> Optional[str]:
+    try:
+        with index_path.open("rb") as f:
+            header = f.read(_HEADER.size)
+        magic, stamp = _HEADER.unpack(header)[:2]
+    except (OSError, struct.error):
+        return None
+    if magic != _MAGIC:
+        return None
+    return stamp.rstrip(b"\0").decode("ascii")
+
+
+# === CLI =====================================================================
+
+def _print(fp: Footprint) -> None:
+    print(f"{fp.lib_id:<70} pads={fp.pad_count:<4} {fp.description[:60]}")
+
+
+def check_bom(catalog: FootprintCatalog, bom_path: Path) -> int:
+    missing = 0
+    with bom_path.open(encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            footprint = (row.get("Footprint") or row.get("footprint") or "").strip()
+            refs = row.get("Refs") or row.get("Designator") or row.get("Ref") or "?"
+            if not footprint:
+                continue
+            if footprint in catalog:
+                print(f"  ✅ {refs:<10} {footprint}")
+            else:
+                print(f"  ❌ {refs:<10} {footprint} (not in fp-info-cache)")
+                missing += 1
+    return missing
+
+
+def run_benchmark(catalog: FootprintCatalog, rounds: int = 20_000) -> None:
+    keys = [fp.lib_id for fp in catalog.prefix("", limit=None)][:: max(len(catalog) // 500, 1)]
+    t0 = time.perf_counter()
+    for i in range(rounds):
+        catalog.get(keys[i % len(keys)])
+    per_lookup = (time.perf_counter() - t0) / rounds
+    print(f"[BENCH] exact lookup : {per_lookup * 1e6:6.1f} µs ({len(catalog)} footprints)")
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        list(catalog.prefix("Capacitor_SMD:C_0805"))
+    print(f"[BENCH] prefix query : {(time.perf_counter() - t0) * 1e3:6.1f} µs")
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        next(catalog.keyword("capacitor"), None)
+    print(f"[BENCH] keyword hit  : {(time.perf_counter() - t0) * 1e3:6.1f} µs")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Footprint catalog over kicad/fp-info-cache")
+    parser.add_argument("--cache", type=Path, default=FP_CACHE)
+    parser.add_argument("--index", type=Path, default=INDEX_PATH)
+    parser.add_argument("--bench", action="store_true", help="time lookups")
+    sub = parser.add_subparsers(dest="command")
+    p = sub.add_parser("lookup")
+    p.add_argument("lib_id")
+    p = sub.add_parser("prefix")
+    p.add_argument("prefix")
+    p.add_argument("--limit", type=int, default=50)
+    p = sub.add_parser("keyword")
+    p.add_argument("word")
+    p.add_argument("--prefix", action="store_true")
+    p = sub.add_parser("pads")
+    p.add_argument("count", type=int)
+    p.add_argument("--max", type=int)
+    p = sub.add_parser("check-bom")
+    p.add_argument("bom", type=Path, nargs="?", default=REPO_ROOT / "production" / "bom.csv")
+    sub.add_parser("rebuild")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        t0 = time.perf_counter()
+        count = build_index(args.cache, args.index)
+        print(f"[INFO] Indexed {count} footprints in {time.perf_counter() - t0:.2f} s -> {args.index}")
+        return 0
+
+    t0 = time.perf_counter()
+    catalog = FootprintCatalog.open(args.cache, args.index)
+    print(f"[INFO] Catalog: {len(catalog)} footprints (opened in {(time.perf_counter() - t0) * 1e3:.1f} ms)")
+    try:
+        if args.bench:
+            run_benchmark(catalog)
+        elif args.command == "lookup":
+            fp = catalog.get(args.lib_id)
+            if fp is None:
+                print(f"❌ {args.lib_id} not found")
+                return 1
+            _print(fp)
+            print(f"   keywords: {fp.keywords}")
+        elif args.command == "prefix":
+            for fp in catalog.prefix(args.prefix, args.limit):
+                _print(fp)
+        elif args.command == "keyword":
+            for fp in catalog.keyword(args.word, args.prefix):
+                _print(fp)
+        elif args.command == "pads":
+            for fp in catalog.by_pad_count(args.count, args.max):
+                _print(fp)
+        elif args.command == "check-bom":
+            missing = check_bom(catalog, args.bom)
+            print(f"\n{'✅ All footprints found' if not missing else f'⚠️  {missing} footprints missing'}")
+            return 1 if missing else 0
+        else:
+            parser.print_help()
+    finally:
+        catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,914 @@
+#!/usr/bin/env python3
+"""
+vikingboard_gerber.py - Gerber/Excellon parser, rasterizer and visual diff.
+
+Answers "did the fab output physically change?" without opening a viewer:
+
+- Streaming RS-274X parser: FS/MO, standard apertures (C, R, O, P),
+  aperture macros (primitives 1, 4, 5, 20, 21 with $-expressions),
+  D01/D02/D03, linear and circular interpolation (G74/G75), regions
+  (G36/G37) and LPD/LPC polarity. Files are read in chunks.
+- Streaming Excellon parser: tool table, METRIC/INCH, decimal or
+  fixed-format coordinates, drill hits and G85/M15 routed slots.
+- NumPy rasterizer: every aperture is rendered once into a small kernel
+  and stamped at all flashes in one fancy-indexing operation; strokes are
+  sampled along their length and stamped the same way; regions are
+  scanline-filled for all contours at once.
+- Layer-by-layer XOR diff over a shared canvas, with the changed area in
+  mm² and bounding boxes of the changed regions.
+
+Bundles are directories or zips. Layers are matched by TF.FileFunction
+when it is unique, otherwise by file name without the project prefix.
+
+Usage:
+    python tools/vikingboard_gerber.py info production/gerbers
+    python tools/vikingboard_gerber.py diff kicad/gerbers production/gerbers
+    python tools/vikingboard_gerber.py diff old.zip new.zip --dpi 1000 --images /tmp/gerber_diff
+"""
+
+import argparse
+import functools
+import io
+import math
+import re
+import sys
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+CHUNK_SIZE = 1 << 16
+DEFAULT_DPI = 600
+ARC_TOLERANCE = 0.005      # mm, max chord deviation when linearising arcs
+DRILL_SUFFIXES = {".drl", ".xln", ".exc", ".txt"}
+SKIP_SUFFIXES = {".gbrjob", ".json", ".md", ".pdf", ".csv"}
+_STAMP_BATCH = 1 << 21     # max (points x kernel pixels) per stamping step
+
+_TOKEN_RE = re.compile(r"%[^%]*%|[^%*]*\*")
+_WORD_RE = re.compile(r"([GDMXYIJ])([+-]?[\d.]+)")
+_EXPR_TOKEN_RE = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|\$(\d+)|([-+xX/()]))")
+
+
+class GerberError(ValueError):
+    """Raised for input the parser cannot interpret."""
+
+
+# === Model ===================================================================
+
+class Aperture(NamedTuple):
+    """Aperture as primitives in local mm coordinates: ("circle", dark, d, x, y) / ("poly", dark, Nx2)."""
+
+    code: int
+    prims: list
+    extent: float          # max distance of any dark pixel from the origin
+
+
+class Op(NamedTuple):
+    kind: str              # "flash", "stroke", "region"
+    dark: bool
+    aperture: Optional[Aperture]
+    data: object           # flash: Nx2 points; stroke: Nx4 segments; region: list of Mx2 polygons
+
+
+class Layer(NamedTuple):
+    name: str
+    function: str
+    ops: List[Op]
+    bbox: Tuple[float, float, float, float]
+
+    def counts(self) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for op in self.ops:
+            n = len(op.data)
+            out[op.kind] = out.get(op.kind, 0) + n
+        return out
+
+
+class _Builder:
+    """Collects primitives in batches of equal (kind, polarity, aperture)."""
+
+    def __init__(self):
+        self.ops: List[Op] = []
+        self.key = None
+        self.items: list = []
+        self.xs: List[float] = []
+        self.ys: List[float] = []
+
+    def add(self, kind: str, dark: bool, aperture: Optional[Aperture], item) -> None:
+        key = (kind, dark, aperture.code if aperture is not None else None)
+        if key != self.key:
+            self.flush()
+            self.key = key
+            self.current = (kind, dark, aperture)
+        self.items.append(item)
+        pad = aperture.extent if aperture is not None else 0.0
+        if kind == "flash":
+            self.xs += [item[0] - pad, item[0] + pad]
+            self.ys += [item[1] - pad, item[1] + pad]
+        elif kind == "stroke":
+            self.xs += [min(item[0], item[2]) - pad, max(item[0], item[2]) + pad]
+            self.ys += [min(item[1], item[3]) - pad, max(item[1], item[3]) + pad]
+        else:
+            self.xs += [float(item[:, 0].min()), float(item[:, 0].max())]
+            self.ys += [float(item[:, 1].min()), float(item[:, 1].max())]
+
+    def flush(self) -> None:
+        if self.items:
+            kind, dark, aperture = self.current
+            data = self.items if kind == "region" else np.asarray(self.items, dtype=np.float64)
+            self.ops.append(Op(kind, dark, aperture, data))
+        self.items = []
+        self.key = None
+
+    def layer(self, name: str, function: str) -> Layer:
+        self.flush()
+        if self.xs:
+            bbox = (min(self.xs), min(self.ys), max(self.xs), max(self.ys))
+        else:
+            bbox = (0.0, 0.0, 0.0, 0.0)
+        return Layer(name, function, self.ops, bbox)
+
+
+# === Apertures ===============================================================
+
+def _rotate(points: np.ndarray, degrees: float) -> np.ndarray:
+    if not degrees:
+        return points
+    a = math.radians(degrees)
+    c, s = math.cos(a), math.sin(a)
+    return points @ np.array([[c, s], [-s, c]])
+
+
+def _rect(w: float, h: float, cx: float = 0.0, cy: float = 0.0) -> np.ndarray:
+    return np.array([[cx - w / 2, cy - h / 2], [cx + w / 2, cy - h / 2],
+                     [cx + w / 2, cy + h / 2], [cx - w / 2, cy + h / 2]])
+
+
+def _regular(d: float, n: int, rot: float) -> np.ndarray:
+    a = np.radians(rot) + np.arange(n) * 2 * np.pi / n
+    return np.stack([np.cos(a), np.sin(a)], axis=1) * d / 2
+
+
+def _eval(expr: str, variables: Dict[int, float]) -> float:
+    """Macro arithmetic: numbers, $n, unary and binary + -, x (multiply), / and parentheses."""
+    expr = expr.strip()
+    tokens: list = []
+    pos = 0
+    while pos < len(expr):
+        m = _EXPR_TOKEN_RE.match(expr, pos)
+        if m is None:
+            raise GerberError(f"bad macro expression: {expr!r}")
+        number, var, op = m.groups()
+        if number is not None:
+            tokens.append(float(number))
+        elif var is not None:
+            tokens.append(float(variables.get(int(var), 0.0)))
+        else:
+            tokens.append(op.lower())
+        pos = m.end()
+    if not tokens:
+        return 0.0
+    try:
+        value, end = _sum(tokens, 0)
+    except (IndexError, RecursionError):
+        raise GerberError(f"bad macro expression: {expr!r}") from None
+    if end != len(tokens):
+        raise GerberError(f"bad macro expression: {expr!r}")
+    return value
+
+
+def _sum(tokens: list, i: int) -> Tuple[float, int]:
+    value, i = _product(tokens, i)
+    while i < len(tokens) and tokens[i] in ("+", "-"):
+        op = tokens[i]
+        rhs, i = _product(tokens, i + 1)
+        value = value + rhs if op == "+" else value - rhs
+    return value, i
+
+
+def _product(tokens: list, i: int) -> Tuple[float, int]:
+    value, i = _factor(tokens, i)
+    while i < len(tokens) and tokens[i] in ("x", "/"):
+        op = tokens[i]
+        rhs, i = _factor(tokens, i + 1)
+        if op == "/" and rhs == 0:
+            raise GerberError("division by zero in macro expression")
+        value = value * rhs if op == "x" else value / rhs
+    return value, i
+
+
+def _factor(tokens: list, i: int) -> Tuple[float, int]:
+    token = tokens[i]
+    if token in ("+", "-"):
+        value, i = _factor(tokens, i + 1)
+        return (-value if token == "-" else value), i
+    if token == "(":
+        value, i = _sum(tokens, i + 1)
+        if tokens[i] != ")":
+            raise IndexError
+        return value, i + 1
+    if isinstance(token, float):
+        return token, i + 1
+    raise IndexError
+
+
+def _macro_prims(body: List[str], args: List[float]) -> list:
+    variables = {i + 1: v for i, v in enumerate(args)}
+    prims = []
+    for stmt in body:
+        stmt = stmt.strip()
+        if not stmt or stmt.startswith("0"):
+            continue
+        if stmt.startswith("$"):
+            name, _, expr = stmt.partition("=")
+            variables[int(name[1:])] = _eval(expr, variables)
+            continue
+        fields = stmt.split(",")
+        code = int(fields[0])
+        vals = [_eval(f, variables) for f in fields[1:]]
+        dark = vals[0] != 0 if vals else True
+        if code == 1:                                   # circle: exp, d, x, y[, rot]
+            d, x, y = vals[1], vals[2], vals[3]
+            rot = vals[4] if len(vals) > 4 else 0.0
+            cx, cy = _rotate(np.array([[x, y]]), rot)[0]
+            prims.append(("circle", dark, d, float(cx), float(cy)))
+        elif code == 4:                                 # outline: exp, n, x0, y0, ..., rot
+            n = int(vals[1])
+            pts = np.array(vals[2:2 + 2 * (n + 1)]).reshape(-1, 2)
+            prims.append(("poly", dark, _rotate(pts, vals[2 + 2 * (n + 1)])))
+        elif code == 5:                                 # polygon: exp, n, x, y, d, rot
+            pts = _regular(vals[4], int(vals[1]), 0.0) + [vals[2], vals[3]]
+            prims.append(("poly", dark, _rotate(pts, vals[5])))
+        elif code == 20:                                # vector line: exp, w, x1, y1, x2, y2, rot
+            w, x1, y1, x2, y2, rot = vals[1:7]
+            dx, dy = x2 - x1, y2 - y1
+            length = math.hypot(dx, dy) or 1.0
+            nx, ny = -dy / length * w / 2, dx / length * w / 2
+            pts = np.array([[x1 + nx, y1 + ny], [x2 + nx, y2 + ny], [x2 - nx, y2 - ny], [x1 - nx, y1 - ny]])
+            prims.append(("poly", dark, _rotate(pts, rot)))
+        elif code == 21:                                # center line: exp, w, h, x, y, rot
+            w, h, x, y, rot = vals[1:6]
+            prims.append(("poly", dark, _rotate(_rect(w, h, x, y), rot)))
+        else:
+            raise GerberError(f"unsupported aperture macro primitive {code}")
+    return prims
+
+
+def make_aperture(code: int, template: str, args: List[float], macros: Dict[str, List[str]],
+                  scale: float = 1.0) -> Aperture:
+    """Build an Aperture from an %AD% definition (args already in file units)."""
+    args = [a * scale for a in args]
+    prims: list = []
+    if template == "C":
+        prims.append(("circle", True, args[0], 0.0, 0.0))
+        hole = args[1:2]
+    elif template in ("R", "O"):
+        w, h = args[0], args[1]
+        if template == "R" or abs(w - h) < 1e-9:
+            prims.append(("poly", True, _rect(w, h)) if template == "R" else ("circle", True, w, 0.0, 0.0))
+        elif w > h:
+            prims += [("poly", True, _rect(w - h, h)), ("circle", True, h, -(w - h) / 2, 0.0),
+                      ("circle", True, h, (w - h) / 2, 0.0)]
+        else:
+            prims += [("poly", True, _rect(w, h - w)), ("circle", True, w, 0.0, -(h - w) / 2),
+                      ("circle", True, w, 0.0, (h - w) / 2)]
+        hole = args[2:3]
+    elif template == "P":
+        # rotation is an angle, not a length: undo the unit scale
+        rot = args[2] / scale if len(args) > 2 else 0.0
+        prims.append(("poly", True, _regular(args[0], int(round(args[1] / scale)), rot)))
+        hole = args[3:4]
+    elif template in macros:
+        # Macro geometry is in file units: scale the resulting shapes instead of the arguments
+        raw = _macro_prims(macros[template], [a / scale for a in args])
+        for p in raw:
+            if p[0] == "circle":
+                prims.append(("circle", p[1], p[2] * scale, p[3] * scale, p[4] * scale))
+            else:
+                prims.append(("poly", p[1], p[2] * scale))
+        hole = []
+    else:
+        raise GerberError(f"unknown aperture template {template!r}")
+    if hole and hole[0] > 0:
+        prims.append(("circle", False, hole[0], 0.0, 0.0))
+    extent = 0.0
+    for p in prims:
+        if p[1]:
+            if p[0] == "circle":
+                extent = max(extent, math.hypot(p[3], p[4]) + p[2] / 2)
+            else:
+                extent = max(extent, float(np.hypot(p[2][:, 0], p[2][:, 1]).max()))
+    return Aperture(code, prims, extent)
+
+
+# === Gerber parser ===========================================================
+
+def _iter_tokens(stream: TextIO) -> Iterator[str]:
+    buf = ""
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        buf += chunk
+        pos = 0
+        for m in _TOKEN_RE.finditer(buf):
+            if m.start() != pos and buf[pos:m.start()].strip():
+                break
+            pos = m.end()
+            yield m.group(0).strip()
+        buf = buf[pos:]
+    if buf.strip():
+        yield buf.strip()
+
+
+def _arc_points(x0, y0, x1, y1, cx, cy, clockwise: bool, full: bool) -> List[Tuple[float, float]]:
+    r = math.hypot(x0 - cx, y0 - cy)
+    a0 = math.atan2(y0 - cy, x0 - cx)
+    a1 = math.atan2(y1 - cy, x1 - cx)
+    sweep = a1 - a0
+    if clockwise:
+        if sweep >= 0:
+            sweep -= 2 * math.pi
+    elif sweep <= 0:
+        sweep += 2 * math.pi
+    if full and abs(x0 - x1) < 1e-9 and abs(y0 - y1) < 1e-9:
+        sweep = -2 * math.pi if clockwise else 2 * math.pi
+    if r <= ARC_TOLERANCE:
+        steps = 1
+    else:
+        step = 2 * math.acos(max(-1.0, 1 - ARC_TOLERANCE / r))
+        steps = max(2, int(math.ceil(abs(sweep) / step)))
+    pts = [(cx + r * math.cos(a0 + sweep * k / steps), cy + r * math.sin(a0 + sweep * k / steps))
+           for k in range(1, steps)]
+    pts.append((x1, y1))
+    return pts
+
+
+def parse_gerber(stream: TextIO, name: str = "") -> Layer:
+    """Parse one RS-274X file into a Layer (coordinates in mm)."""
+    b = _Builder()
+    macros: Dict[str, List[str]] = {}
+    apertures: Dict[int, Aperture] = {}
+    fmt = (4, 6)
+    trailing = False
+    scale = 1.0                   # file units -> mm
+    function = ""
+    dark = True
+    interp = "G01"
+    multi = True
+    in_region = False
+    region: Optional[List[Tuple[float, float]]] = None
+    contours: List[np.ndarray] = []
+    aperture: Optional[Aperture] = None
+    x = y = 0.0
+    last_d = 2
+
+    def coord(text: str) -> float:
+        if "." in text:
+            return float(text) * scale
+        sign = -1 if text.startswith("-") else 1
+        digits = text.lstrip("+-")
+        if trailing:
+            digits = digits.ljust(fmt[0] + fmt[1], "0")
+        return sign * int(digits or "0") / 10 ** fmt[1] * scale
+
+    def close_contour() -> None:
+        nonlocal region
+        if region is not None and len(region) >= 3:
+            contours.append(np.asarray(region, dtype=np.float64))
+        region = None
+
+    for token in _iter_tokens(stream):
+        if token.startswith("%"):
+            body = token.strip("%")
+            stmts = body.split("*")
+            head = stmts[0]
+            if head.startswith("FS"):
+                m = re.match(r"FS([LT])?[AI]?X(\d)(\d)Y(\d)(\d)", head)
+                if m:
+                    trailing = m.group(1) == "T"
+                    fmt = (int(m.group(2)), int(m.group(3)))
+            elif head.startswith("MO"):
+                scale = 25.4 if head[2:4] == "IN" else 1.0
+            elif head.startswith("AM"):
+                macros[head[2:]] = [s.strip() for s in stmts[1:] if s.strip()]
+            elif head.startswith("AD"):
+                m = re.match(r"ADD(\d+)([^,]+),?(.*)", head)
+                if m:
+                    args = [float(a) for a in m.group(3).split("X") if a]
+                    apertures[int(m.group(1))] = make_aperture(int(m.group(1)), m.group(2), args, macros, scale)
+            elif head.startswith("LP"):
+                b.flush()
+                dark = head[2:3] != "C"
+            elif head.startswith("TF.FileFunction"):
+                function = head.split(",", 1)[1] if "," in head else ""
+            elif head.startswith("SR") and head not in ("SR", "SRX1Y1I0J0"):
+                raise GerberError(f"{name}: step and repeat (%SR) is not supported")
+            continue
+
+        word = token.rstrip("*").strip()
+        if not word or word.startswith("G04") or word.startswith("G4 "):
+            continue
+        if word.startswith(("M02", "M00")):
+            break
+        nx, ny, i, j, d = x, y, 0.0, 0.0, None
+        for letter, value in _WORD_RE.findall(word):
+            if letter == "G":
+                g = int(float(value))
+                if g in (1, 2, 3):
+                    interp = f"G0{g}"
+                elif g == 36:
+                    in_region, region, contours = True, None, []
+                elif g == 37:
+                    close_contour()
+                    for c in contours:
+                        b.add("region", dark, None, c)
+                    in_region, contours = False, []
+                elif g == 74:
+                    multi = False
+                elif g == 75:
+                    multi = True
+            elif letter == "D":
+                code = int(value)
+                if code >= 10:
+                    aperture = apertures.get(code)
+                else:
+                    d = code
+            elif letter == "X":
+                nx = coord(value)
+            elif letter == "Y":
+                ny = coord(value)
+            elif letter == "I":
+                i = coord(value)
+            elif letter == "J":
+                j = coord(value)
+        if d is None:
+            if "X" not in word and "Y" not in word:
+                continue
+            d = last_d                                  # deprecated modal D01/D02
+        last_d = d
+        if d == 2:
+            if in_region:
+                close_contour()
+        elif d == 3:
+            if aperture is not None:
+                b.add("flash", dark, aperture, (nx, ny))
+        else:
+            if interp == "G01":
+                path = [(nx, ny)]
+            else:
+                if multi:
+                    cx, cy = x + i, y + j
+                else:
+                    # G74: the centre offset is unsigned, pick the quadrant that fits
+                    cands = [(x + sx * abs(i), y + sy * abs(j)) for sx in (1, -1) for sy in (1, -1)]
+                    cx, cy = min(cands, key=lambda c: abs(math.hypot(x - c[0], y - c[1]) - math.hypot(nx - c[0], ny - c[1])))
+                path = _arc_points(x, y, nx, ny, cx, cy, interp == "G02", multi)
+            if in_region:
+                if region is None:
+                    region = [(x, y)]
+                region.extend(path)
+            elif aperture is not None:
+                px, py = x, y
+                for qx, qy in path:
+                    b.add("stroke", dark, aperture, (px, py, qx, qy))
+                    px, py = qx, qy
+        x, y = nx, ny
+    return b.layer(name, function)
+
+
+# === Excellon parser =========================================================
+
+def parse_excellon(stream: TextIO, name: str = "") -> Layer:
+    """Parse an Excellon drill file into a Layer of drill flashes and slot strokes."""
+    b = _Builder()
+    tools: Dict[int, Aperture] = {}
+    scale = 1.0
+    fmt = (3, 3)
+    leading = True            # LZ: leading zeros kept -> digits count from the left
+    function = ""
+    tool: Optional[Aperture] = None
+    x = y = 0.0
+    routing = False
+    route_mode = "G05"
+    plunged = False
+    tool_re = re.compile(r"T(\d+)(?:F[\d.]+|S[\d.]+)*C([\d.]+)")
+
+    def coord(text: str) -> float:
+        if "." in text:
+            return float(text) * scale
+        sign = -1 if text.startswith("-") else 1
+        digits = text.lstrip("+-")
+        total = fmt[0] + fmt[1]
+        if leading:
+            digits = digits.ljust(total, "0")
+        return sign * int(digits or "0") / 10 ** fmt[1] * scale
+
+    for raw in stream:
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith(";"):
+            if "TF.FileFunction" in line:
+                function = line.split("TF.FileFunction,", 1)[1].strip()
+            continue
+        if line.startswith(("METRIC", "INCH")):
+            scale = 1.0 if line.startswith("METRIC") else 25.4
+            fmt = (3, 3) if scale == 1.0 else (2, 4)
+            leading = "TZ" not in line
+            m = re.search(r",(0+)\.(0+)", line)
+            if m:
+                fmt = (len(m.group(1)), len(m.group(2)))
+            continue
+        m = tool_re.match(line)
+        if m:
+            code = int(m.group(1))
+            tools[code] = make_aperture(code, "C", [float(m.group(2))], {}, scale)
+            continue
+        if line in ("M30", "M00"):
+            break
+        if line.startswith("T"):
+            m = re.match(r"T(\d+)", line)
+            if m:
+                tool = tools.get(int(m.group(1)))
+            continue
+        if line.startswith("G00"):
+            routing, plunged, route_mode = True, False, "G00"
+            line = line[3:]
+        elif line.startswith("G01"):
+            route_mode = "G01"
+            line = line[3:]
+        elif line.startswith("G05"):
+            routing, route_mode = False, "G05"
+            continue
+        elif line in ("M15",):
+            plunged = True
+            continue
+        elif line in ("M16", "M17"):
+            plunged = False
+            continue
+        if not line.startswith(("X", "Y")):
+            continue
+        if "G85" in line:
+            first, second = line.split("G85", 1)
+            x0, y0 = _xy(first, x, y, coord)
+            x1, y1 = _xy(second, x0, y0, coord)
+            if tool is not None:
+                b.add("stroke", True, tool, (x0, y0, x1, y1))
+            x, y = x1, y1
+            continue
+        nx, ny = _xy(line, x, y, coord)
+        if tool is not None:
+            if routing and plunged and route_mode == "G01":
+                b.add("stroke", True, tool, (x, y, nx, ny))
+            elif not routing:
+                b.add("flash", True, tool, (nx, ny))
+        x, y = nx, ny
+    return b.layer(name, function or "Drill")
+
+
+def _xy(text: str, x: float, y: float, coord) -> Tuple[float, float]:
+    mx = re.search(r"X([+-]?[\d.]+)", text)
+    my = re.search(r"Y([+-]?[\d.]+)", text)
+    return (coord(mx.group(1)) if mx else x, coord(my.group(1)) if my else y)
+
+
+def parse_file(stream: TextIO, name: str) -> Optional[Layer]:
+    suffix = Path(name).suffix.lower()
+    if suffix in SKIP_SUFFIXES:
+        return None
+    if suffix in DRILL_SUFFIXES:
+        return parse_excellon(stream, name)
+    return parse_gerber(stream, name)
+
+
+def load_bundle(source: Path) -> Dict[str, Layer]:
+    """Parse every Gerber/drill file in a directory or zip; keys are layer match keys."""
+    source = Path(source)
+    layers: List[Layer] = []
+    if source.is_dir():
+        for f in sorted(source.iterdir()):
+            if f.is_file():
+                with f.open("r", encoding="utf-8", errors="replace", newline="") as stream:
+                    layer = parse_file(stream, f.name)
+                if layer is not None:
+                    layers.append(layer)
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            for info in sorted(zf.infolist(), key=lambda i: i.filename):
+                if info.is_dir():
+                    continue
+                with zf.open(info) as raw:
+                    stream = io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="")
+                    layer = parse_file(stream, Path(info.filename).name)
+                if layer is not None:
+                    layers.append(layer)
+    elif source.is_file():
+        with source.open("r", encoding="utf-8", errors="replace", newline="") as stream:
+            layer = parse_file(stream, source.name)
+        layers = [layer] if layer is not None else []
+    else:
+        raise FileNotFoundError(source)
+    return {layer_key(layer, layers): layer for layer in layers}
+
+
+def layer_key(layer: Layer, all_layers: Sequence[Layer]) -> str:
+    same = [other for other in all_layers if other.function == layer.function]
+    if layer.function and len(same) == 1:
+        return layer.function
+    stem, suffix = Path(layer.name).stem, Path(layer.name).suffix
+    return (stem.split("-", 1)[1] if "-" in stem else stem) + suffix
+
+
+# === Rasterizer ==============================================================
+
+class Canvas(NamedTuple):
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    dpi: float
+
+    @property
+    def scale(self) -> float:
+        return self.dpi / 25.4
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (max(1, int(math.ceil((self.y1 - self.y0) * self.scale))),
+                max(1, int(math.ceil((self.x1 - self.x0) * self.scale))))
+
+    def to_px(self, pts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """mm -> (row, col) as floats; row 0 is the top (max y)."""
+        return (self.y1 - pts[..., 1]) * self.scale, (pts[..., 0] - self.x0) * self.scale
+
+    def to_mm(self, row: float, col: float) -> Tuple[float, float]:
+        return self.x0 + col / self.scale, self.y1 - row / self.scale
+
+
+def canvas_for(layers: Sequence[Layer], dpi: float = DEFAULT_DPI, margin: float = 0.5) -> Canvas:
+    boxes = [l.bbox for l in layers if l.ops]
+    if not boxes:
+        return Canvas(0.0, 0.0, 1.0, 1.0, dpi)
+    return Canvas(min(b[0] for b in boxes) - margin, min(b[1] for b in boxes) - margin,
+                  max(b[2] for b in boxes) + margin, max(b[3] for b in boxes) + margin, dpi)
+
+
+def _points_in_poly(px: np.ndarray, py: np.ndarray, poly: np.ndarray) -> np.ndarray:
+    inside = np.zeros(px.shape, dtype=bool)
+    xs, ys = poly[:, 0], poly[:, 1]
+    x2, y2 = np.roll(xs, -1), np.roll(ys, -1)
+    for xa, ya, xb, yb in zip(xs, ys, x2, y2):
+        if ya == yb:
+            continue
+        crosses = (ya > py) != (yb > py)
+        xc = xa + (py - ya) * (xb - xa) / (yb - ya)
+        inside ^= crosses & (px < xc)
+    return inside
+
+
+def aperture_kernel(ap: Aperture, scale: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(row offsets, col offsets) of the aperture's dark pixels around its centre pixel."""
+    shape = tuple(p if p[0] == "circle" else (p[0], p[1], tuple(map(tuple, p[2].tolist()))) for p in ap.prims)
+    return _kernel(shape, ap.extent, scale)
+
+
+@functools.lru_cache(maxsize=512)
+def _kernel(shape: Tuple, extent: float, scale: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Kernel for primitives in hashable form; equal apertures from any file share one entry."""
+    r = int(math.ceil(extent * scale)) + 1
+    off = np.arange(-r, r + 1)
+    rows, cols = np.meshgrid(off, off, indexing="ij")
+    mx, my = cols / scale, -rows / scale           # pixel centre -> aperture mm (y up)
+    mask = np.zeros(rows.shape, dtype=bool)
+    for prim in shape:
+        if prim[0] == "circle":
+            _, dark, d, cx, cy = prim
+            hit = (mx - cx) ** 2 + (my - cy) ** 2 <= (d / 2) ** 2
+        else:
+            _, dark, pts = prim
+            hit = _points_in_poly(mx, my, np.array(pts))
+        if dark:
+            mask |= hit
+        else:
+            mask &= ~hit
+    if not mask.any():
+        mask[r, r] = True                           # sub-pixel aperture: still one pixel
+    kr, kc = np.nonzero(mask)
+    return (kr - r).astype(np.int32), (kc - r).astype(np.int32)
+
+
+def _stamp(bitmap: np.ndarray, rows: np.ndarray, cols: np.ndarray, kernel: Tuple[np.ndarray, np.ndarray]) -> None:
+    kr, kc = kernel
+    h, w = bitmap.shape
+    batch = max(1, _STAMP_BATCH // max(1, len(kr)))
+    for s in range(0, len(rows), batch):
+        rr = rows[s:s + batch, None] + kr[None, :]
+        cc = cols[s:s + batch, None] + kc[None, :]
+        ok = (rr >= 0) & (rr < h) & (cc >= 0) & (cc < w)
+        bitmap[rr[ok], cc[ok]] = True
+
+
+def _draw_flashes(bitmap: np.ndarray, canvas: Canvas, op: Op) -> None:
+    r, c = canvas.to_px(op.data)
+    _stamp(bitmap, np.floor(r).astype(np.int32), np.floor(c).astype(np.int32),
+           aperture_kernel(op.aperture, canvas.scale))
+
+
+def _draw_strokes(bitmap: np.ndarray, canvas: Canvas, op: Op) -> None:
+    segs = op.data
+    r0, c0 = canvas.to_px(segs[:, 0:2])
+    r1, c1 = canvas.to_px(segs[:, 2:4])
+    radius = max(op.aperture.extent * canvas.scale, 0.5)
+    # Half-pixel steps for thin strokes; wider ones tolerate sparser samples (scallop depth step²/8r)
+    step = 0.5 if radius <= 4 else min(math.sqrt(2 * radius), radius / 2)
+    length = np.hypot(r1 - r0, c1 - c0)
+    n = np.maximum(1, np.ceil(length / step).astype(np.int64)) + 1
+    seg = np.repeat(np.arange(len(segs)), n)
+    first = np.cumsum(n) - n
+    t = (np.arange(n.sum()) - np.repeat(first, n)) / np.repeat(n - 1, n)
+    rows = r0[seg] + (r1[seg] - r0[seg]) * t
+    cols = c0[seg] + (c1[seg] - c0[seg]) * t
+    pix = np.unique(np.floor(rows).astype(np.int64) * (1 << 32) + np.floor(cols).astype(np.int64) + (1 << 31))
+    _stamp(bitmap, (pix >> 32).astype(np.int32), ((pix & 0xFFFFFFFF) - (1 << 31)).astype(np.int32),
+           aperture_kernel(op.aperture, canvas.scale))
+
+
+def _draw_regions(bitmap: np.ndarray, canvas: Canvas, op: Op) -> None:
+    h, w = bitmap.shape
+    ra, ca, rb, cb, pid = [], [], [], [], []
+    for k, poly in enumerate(op.data):
+        r, c = canvas.to_px(poly)
+        ra.append(r)
+        ca.append(c)
+        rb.append(np.roll(r, -1))
+        cb.append(np.roll(c, -1))
+        pid.append(np.full(len(r), k))
+    ra, ca, rb, cb, pid = (np.concatenate(a) for a in (ra, ca, rb, cb, pid))
+    lo, hi = np.minimum(ra, rb), np.maximum(ra, rb)
+    first = np.clip(np.ceil(lo - 0.5), 0, h).astype(np.int64)
+    last = np.clip(np.ceil(hi - 0.5), 0, h).astype(np.int64)
+    count = np.where(ra != rb, last - first, 0)
+    if count.sum() == 0:
+        return
+    edge = np.repeat(np.arange(len(ra)), count)
+    row = np.repeat(first, count) + (np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count))
+    yc = row + 0.5
+    xc = ca[edge] + (yc - ra[edge]) * (cb[edge] - ca[edge]) / (rb[edge] - ra[edge])
+    order = np.lexsort((xc, row, pid[edge]))
+    row, xc = row[order], xc[order]
+    start = np.clip(np.ceil(xc[0::2] - 0.5), 0, w).astype(np.int64)
+    end = np.clip(np.ceil(xc[1::2] - 0.5), 0, w).astype(np.int64)
+    rows = row[0::2]
+    diff = np.zeros((h, w + 1), dtype=np.int32)
+    np.add.at(diff, (rows, start), 1)
+    np.add.at(diff, (rows, end), -1)
+    bitmap |= np.cumsum(diff, axis=1)[:, :w] > 0
+
+
+_DRAW = {"flash": _draw_flashes, "stroke": _draw_strokes, "region": _draw_regions}
+
+
+def rasterize(layer: Layer, canvas: Canvas) -> np.ndarray:
+    """Render a layer to a boolean bitmap (True = dark) on canvas."""
+    bitmap = np.zeros(canvas.shape, dtype=bool)
+    for op in layer.ops:
+        if op.dark:
+            _DRAW[op.kind](bitmap, canvas, op)
+        else:
+            scratch = np.zeros_like(bitmap)
+            _DRAW[op.kind](scratch, canvas, op)
+            bitmap &= ~scratch
+    return bitmap
+
+
+# === Diff ====================================================================
+
+class LayerDiff(NamedTuple):
+    key: str
+    status: str                    # "same", "changed", "added", "removed"
+    area: float                    # mm² of XOR
+    boxes: List[Tuple[float, float, float, float]]
+
+
+def changed_boxes(xor: np.ndarray, canvas: Canvas, cell_mm: float = 0.5) -> List[Tuple[float, float, float, float]]:
+    """Bounding boxes (mm) of 8-connected groups of changed cells."""
+    cell = max(1, int(round(cell_mm * canvas.scale)))
+    h, w = xor.shape
+    ph, pw = -h % cell, -w % cell
+    padded = np.pad(xor, ((0, ph), (0, pw)))
+    cells = padded.reshape(padded.shape[0] // cell, cell, padded.shape[1] // cell, cell).any(axis=(1, 3))
+    seen = np.zeros_like(cells)
+    boxes = []
+    for r0, c0 in zip(*np.nonzero(cells)):
+        if seen[r0, c0]:
+            continue
+        stack = [(r0, c0)]
+        seen[r0, c0] = True
+        rmin = rmax = r0
+        cmin = cmax = c0
+        while stack:
+            r, c = stack.pop()
+            rmin, rmax, cmin, cmax = min(rmin, r), max(rmax, r), min(cmin, c), max(cmax, c)
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    rr, cc = r + dr, c + dc
+                    if 0 <= rr < cells.shape[0] and 0 <= cc < cells.shape[1] and cells[rr, cc] and not seen[rr, cc]:
+                        seen[rr, cc] = True
+                        stack.append((rr, cc))
+        xa, ya = canvas.to_mm((rmax + 1) * cell, cmin * cell)
+        xb, yb = canvas.to_mm(rmin * cell, (cmax + 1) * cell)
+        boxes.append((round(xa, 3), round(ya, 3), round(xb, 3), round(yb, 3)))
+    return boxes
+
+
+def diff_bundles(a: Dict[str, Layer], b: Dict[str, Layer], dpi: float = DEFAULT_DPI,
+                 images: Optional[Path] = None) -> List[LayerDiff]:
+    canvas = canvas_for(list(a.values()) + list(b.values()), dpi)
+    px_area = (1 / canvas.scale) ** 2
+    results = []
+    for key in sorted(set(a) | set(b)):
+        if key not in a or key not in b:
+            layer = a.get(key) or b.get(key)
+            status = "removed" if key not in b else "added"
+            results.append(LayerDiff(key, status, 0.0, [tuple(round(v, 3) for v in layer.bbox)] if layer.ops else []))
+            continue
+        ra, rb = rasterize(a[key], canvas), rasterize(b[key], canvas)
+        xor = ra ^ rb
+        n = int(np.count_nonzero(xor))
+        if n == 0:
+            results.append(LayerDiff(key, "same", 0.0, []))
+            continue
+        results.append(LayerDiff(key, "changed", n * px_area, changed_boxes(xor, canvas)))
+        if images is not None:
+            write_diff_image(images / (re.sub(r"[^\w.-]+", "_", key) + ".ppm"), ra, rb)
+    return results
+
+
+def write_diff_image(path: Path, old: np.ndarray, new: np.ndarray) -> None:
+    """Binary PPM: grey = both, red = only old, green = only new."""
+    img = np.full(old.shape + (3,), 255, dtype=np.uint8)
+    img[old & new] = (150, 150, 150)
+    img[old & ~new] = (220, 0, 0)
+    img[new & ~old] = (0, 170, 0)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        f.write(f"P6 {old.shape[1]} {old.shape[0]} 255\n".encode("ascii"))
+        f.write(img.tobytes())
+
+
+# === CLI =====================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parse, rasterize and diff Gerber/Excellon bundles")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("info", help="list layers in a bundle")
+    p.add_argument("bundle", type=Path)
+    p = sub.add_parser("diff", help="XOR-diff two bundles layer by layer")
+    p.add_argument("old", type=Path)
+    p.add_argument("new", type=Path)
+    p.add_argument("--dpi", type=float, default=DEFAULT_DPI)
+    p.add_argument("--images", type=Path, help="write a PPM per changed layer here")
+    p.add_argument("--all", action="store_true", help="also list unchanged layers")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.cmd == "info":
+        layers = load_bundle(args.bundle)
+        for key, layer in layers.items():
+            counts = ", ".join(f"{v} {k}" for k, v in layer.counts().items()) or "empty"
+            x0, y0, x1, y1 = layer.bbox
+            print(f"{key:28} {layer.name:34} {counts}  [{x0:.2f},{y0:.2f} .. {x1:.2f},{y1:.2f}]")
+        print(f"\n{len(layers)} layers parsed in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        return 0
+
+    old, new = load_bundle(args.old), load_bundle(args.new)
+    t1 = time.perf_counter()
+    results = diff_bundles(old, new, args.dpi, args.images)
+    t2 = time.perf_counter()
+    differ = [r for r in results if r.status != "same"]
+    for r in results:
+        if r.status == "same":
+            if args.all:
+                print(f"✅ {r.key}")
+            continue
+        if r.status == "changed":
+            print(f"❌ {r.key}: {r.area:.3f} mm² changed in {len(r.boxes)} region(s)")
+        else:
+            print(f"⚠️  {r.key}: {r.status}")
+        for box in r.boxes[:10]:
+            print(f"     ({box[0]:.2f}, {box[1]:.2f}) .. ({box[2]:.2f}, {box[3]:.2f})")
+        if len(r.boxes) > 10:
+            print(f"     ... {len(r.boxes) - 10} more")
+    summary = "physically identical" if not differ else f"{len(differ)} of {len(results)} layers differ"
+    print(f"\n{'✅' if not differ else '❌'} {summary} "
+          f"(parse {(t1 - t0) * 1000:.0f} ms, raster+diff {(t2 - t1) * 1000:.0f} ms at {args.dpi:g} dpi)")
+    return 1 if differ else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,35 +5,41 @@ vikingboard_kicad_check.py
 Lightweight KiCad integration checker for the VikingBoard project.
 
 Current goals:
-- Load the structured pin/net spec from vikingboard_spec.py
+- Load the compiled pin/net spec (vikingboard_specdb, merged from all spec sources)
 - Verify that the KiCad schematic file exists
 - Summarize what the spec expects (refs, nets, total connections)
-- Prepare the ground for future deep KiCad S-expression parsing
+- Read the PCB with vikingboard_sexpr (no pcbnew needed) and compare
+  every (ref, pad) -> net assignment against the spec
 """
 
 import sys
 from pathlib import Path
 from collections import Counter
 
-# Make sure we can import vikingboard_spec when running from anywhere
+# Make sure we can import vikingboard_specdb when running from anywhere
 REPO_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(REPO_ROOT))
 
 # Try both import paths so we stay flexible
 try:
-    from tools.vikingboard_spec import iter_net_rows
+    from tools.vikingboard_specdb import load_spec as load_compiled_spec
 except ModuleNotFoundError:
     try:
-        from vikingboard_spec import iter_net_rows
+        from vikingboard_specdb import load_spec as load_compiled_spec
     except ModuleNotFoundError as e:
-        print("❌ Could not import vikingboard_spec. Make sure tools/vikingboard_spec.py exists.")
+        print("❌ Could not import vikingboard_specdb. Make sure tools/vikingboard_specdb.py exists.")
         print(f"Details: {e}")
         sys.exit(1)
 
+try:
+    from tools.vikingboard_sexpr import SexprError, iter_footprint_pads
+except ModuleNotFoundError:
+    from vikingboard_sexpr import SexprError, iter_footprint_pads
+
 
 def normalize_row(row):
     """
-    Normalize one row from iter_net_rows() into a dict with keys:
+    Normalize one spec row into a dict with keys:
       - ref
       - pad
       - net
@@ -62,14 +68,17 @@ def normalize_row(row):
         return {"ref": str(ref), "pad": str(pad), "net": str(net)}
 
     # Unknown
-    raise TypeError(f"Unsupported row type from iter_net_rows(): {type(row)!r}, value={row!r}")
+    raise TypeError(f"Unsupported row type from spec: {type(row)!r}, value={row!r}")
 
 
 def load_spec():
-    raw_rows = list(iter_net_rows())
+    spec = load_compiled_spec()
+    raw_rows = list(spec.rows())
     if not raw_rows:
         print("⚠️ Spec returned no rows. Is vikingboard_spec.py empty?")
         return []
+    for c in spec.conflicts:
+        print(f"⚠️ Spec conflict {c.ref}.{c.pad}: {c.kept} vs {c.other}")
 
     norm_rows = []
     for idx, r in enumerate(raw_rows, start=1):
@@ -119,10 +128,38 @@ def check_kicad_files():
         print(f"  ❌ Missing PCB file: {pcb_file}")
         ok = False
 
-    # Future: parse schematic S-expressions here and compare against spec
     return ok
 
 
+def check_pcb_against_spec(rows, pcb_file):
+    """Compare spec rows with the pad nets stored in the .kicad_pcb file."""
+    print("\n🧠 Deep cross-checks (PCB pads vs spec)")
+    try:
+        board = {}
+        for ref, _lib_id, pads in iter_footprint_pads(pcb_file):
+            for pad, net in pads:
+                board[(ref, pad)] = net
+    except (OSError, SexprError) as e:
+        print(f"  ❌ Could not read {pcb_file}: {e}")
+        return False
+
+    missing = 0
+    mismatched = 0
+    for r in rows:
+        key = (r["ref"], r["pad"])
+        if key not in board:
+            print(f"  ❌ {r['ref']}.{r['pad']}: not on PCB (spec net {r['net']})")
+            missing += 1
+        elif board[key] != r["net"]:
+            print(f"  ⚠️  {r['ref']}.{r['pad']}: PCB net '{board[key]}' != spec '{r['net']}'")
+            mismatched += 1
+
+    print(f"  - Pads on PCB       : {len(board)}")
+    print(f"  - Missing on PCB    : {missing}")
+    print(f"  - Net mismatches    : {mismatched}")
+    return missing == 0 and mismatched == 0
+
+
 def main():
     print("🔍 VikingBoard KiCad/spec integration check\n")
 
@@ -137,17 +174,18 @@ def main():
     # 2) Check KiCad files exist
     ok_files = check_kicad_files()
 
-    # 3) Placeholder for future deep checks
-    print("\n🧠 Deep cross-checks")
-    print("  - Schematic parsing and net/pin verification is not implemented yet.")
-    print("  - This script currently only verifies spec + file presence.")
-    print("  - Next step will be to read .kicad_sch and map symbols/pins to the spec.")
+    if not ok_files:
+        print("\n⚠️ KiCad/spec integration incomplete (missing files).")
+        sys.exit(1)
 
-    if ok_files:
-        print("\n✅ Basic KiCad/spec integration looks sane (files present).")
+    # 3) Deep check: pad nets on the PCB vs spec
+    ok_nets = check_pcb_against_spec(rows, REPO_ROOT / "kicad" / "Vikingboard.kicad_pcb")
+
+    if ok_nets:
+        print("\n✅ KiCad/spec integration looks sane (PCB matches spec).")
         sys.exit(0)
     else:
-        print("\n⚠️ KiCad/spec integration incomplete (missing files).")
+        print("\n⚠️ PCB pad nets differ from the spec.")
         sys.exit(1)
 
 
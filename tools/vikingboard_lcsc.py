@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+vikingboard_lcsc.py - Offline LCSC parts catalog in SQLite.
+
+A single catalog replaces the three separate LCSC maps: LCSC_MAP in
+auto_annotate_schematic.py, common_lcsc in fix_common_lcsc.py, and the regex
+scrape of vikingboard_spec.py in create_jlcpcb_bom.py. Those maps disagreed
+on 10µF and mapped 1k and 10k to the same part.
+
+The catalog is seeded from pcb_scripts/lcsc_parts.csv and from every "lcsc"
+entry in pcb_scripts/vikingboard_spec.py. Larger dumps (for example the
+JLCPCB parts-list CSV) can be imported on top. Each part gets parsed
+value/tolerance/package columns and an FTS5 index over MPN and description.
+
+Matching, best first:
+1. Passives: normalized value plus footprint package, as an indexed join
+   (10uF = 10µF = 10 µF, 4k7 = 4.7k; Capacitor_SMD:C_0805_2012Metric -> 0805).
+2. Exact MPN (case-insensitive).
+3. Full-text search on the value tokens, preferring the same package.
+Basic-library parts and parts with more stock are preferred.
+
+Usage:
+    python tools/vikingboard_lcsc.py annotate pcb_scripts/vikingboard_bom.csv
+    python tools/vikingboard_lcsc.py match 4k7 --footprint Resistor_SMD:R_0805_2012Metric
+    python tools/vikingboard_lcsc.py search "LoRa transceiver"
+    python tools/vikingboard_lcsc.py import jlcpcb_parts.csv
+    python tools/vikingboard_lcsc.py --bench [--rows 5000]
+"""
+
+import argparse
+import csv
+import importlib.util
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = REPO_ROOT / ".cache"
+DEFAULT_DB = CACHE_DIR / "lcsc_catalog.sqlite"
+SEED_CSV = REPO_ROOT / "pcb_scripts" / "lcsc_parts.csv"
+SPEC_FILE = REPO_ROOT / "pcb_scripts" / "vikingboard_spec.py"
+
+# Column aliases accepted by import_csv (JLCPCB dump, our seed file, ad-hoc exports)
+COLUMNS = {
+    "lcsc": ("LCSC Part", "LCSC", "lcsc", "LCSC Part #", "Supplier Part Number"),
+    "mpn": ("MFR.Part", "MPN", "Part Number", "mpn", "Manufacturer Part"),
+    "manufacturer": ("Manufacturer", "manufacturer"),
+    "category": ("First Category", "Category", "category"),
+    "package": ("Package", "package", "Footprint"),
+    "library_type": ("Library Type", "library_type", "Type"),
+    "description": ("Description", "description", "Comment"),
+    "stock": ("Stock", "stock"),
+}
+
+_PREFIX = {"p": 1e-12, "n": 1e-9, "u": 1e-6, "m": 1e-3, "": 1.0, "k": 1e3, "K": 1e3, "M": 1e6, "G": 1e9,
+           "P": 1e-12, "N": 1e-9, "U": 1e-6}     # upper-case BOMs: "10UF", "100N"; M stays mega
+_UNIT_KIND = {"f": "C", "h": "L", "ω": "R", "ohm": "R", "ohms": "R", "r": "R"}
+_REF_KIND = {"C": "C", "R": "R", "L": "L", "FB": "L"}
+_PLAIN_RE = re.compile(r"^(\d+(?:\.\d+)?)([pnumkKMGPNU]?)((?i:f|h|ω|ohms?|r))?$")
+_RKM_RE = re.compile(r"^(\d+)([pnumkKMGPNUR])(\d+)((?i:f|h))?$")
+_TOL_RE = re.compile(r"±\s*(\d+(?:\.\d+)?)\s*%")
+_VALUE_IN_TEXT_RE = re.compile(r"(\d+(?:\.\d+)?\s*[pnuµμmkKMG]?\s*(?:F|H|Ω|ohms?)\b|\d+[pnuµμkKMGR]\d+)")
+_IMPERIAL_RE = re.compile(r"(?:^|[_\W])[CRL]?(0201|0402|0603|0805|1206|1210|1812|2010|2512)(?:_|$|\W)")
+_PACKAGE_RE = re.compile(r"((?:SOT|SOD|QFN|TQFN|DFN|SOIC|SOP|SSOP|TSSOP|VSSOP|MSOP|LGA|QFP|LQFP|TQFP|BGA|WSOF)-?\d+(?:-\d+)?)", re.I)
+_FTS_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+
+
+class Part(NamedTuple):
+    lcsc: str
+    mpn: str
+    manufacturer: str
+    package: str
+    library_type: str
+    description: str
+
+
+# === Normalization ===========================================================
+
+def parse_value(text: str, kind: str = "") -> Optional[Tuple[str, float]]:
+    """Parse a passive value into (kind, SI value): "4k7" -> ("R", 4700.0).
+
+    kind ("R", "C", "L") comes from the designator when the value itself has
+    no unit, so "100n" on a C-ref is a capacitor.
+    """
+    s = text.strip().replace("µ", "u").replace("μ", "u").replace(" ", "")
+    s = s.replace("Ω", "ω")
+    if not s:
+        return None
+    m = _RKM_RE.match(s)
+    if m:
+        whole, prefix, frac, unit = m.groups()
+        number = float(f"{whole}.{frac}")
+        value_kind = _UNIT_KIND.get((unit or "").lower()) or ("R" if prefix == "R" else kind)
+        prefix = "" if prefix == "R" else prefix
+    else:
+        m = _PLAIN_RE.match(s)
+        if not m:
+            return None
+        number, prefix, unit = float(m.group(1)), m.group(2), m.group(3)
+        value_kind = _UNIT_KIND.get((unit or "").lower()) or kind
+    if value_kind not in ("R", "C", "L"):
+        # Bare "10k" with no designator hint is a resistor in every BOM we have
+        if prefix not in ("k", "K", "M"):
+            return None
+        value_kind = "R"
+    return value_kind, number * _PREFIX[prefix]
+
+
+def value_key(kind: str, value: float) -> str:
+    """Canonical text key for a parsed value, used as the join column."""
+    return f"{kind}:{value:.4g}"
+
+
+def format_value(kind: str, value: float) -> str:
+    """Human form: ("C", 1e-05) -> "10uF", ("R", 4700.0) -> "4.7k"."""
+    if kind == "R":
+        steps = (("M", 1e6), ("k", 1e3), ("", 1.0), ("m", 1e-3))
+        unit = ""
+    else:
+        steps = (("m", 1e-3), ("u", 1e-6), ("n", 1e-9), ("p", 1e-12))
+        unit = "F" if kind == "C" else "H"
+    for prefix, scale in steps:
+        if value >= scale * 0.999:
+            return f"{value / scale:.4g}{prefix}{unit}"
+    return f"{value:.4g}{unit}"
+
+
+def normalize_package(text: str) -> str:
+    """Footprint or package name -> package code: "Capacitor_SMD:C_0805_2012Metric" -> "0805"."""
+    if not text:
+        return ""
+    name = text.split(":", 1)[-1]
+    m = _IMPERIAL_RE.search(name)
+    if m:
+        return m.group(1)
+    m = _PACKAGE_RE.search(name)
+    if m:
+        code = m.group(1).upper()
+        return code if "-" in code else re.sub(r"^([A-Z]+)(\d)", r"\1-\2", code)
+    return name.strip()
+
+
+def parse_description(description: str, category: str = "") -> Tuple[str, Optional[float], Optional[float]]:
+    """(value key, value, tolerance %) parsed from a catalog description."""
+    kind = {"capacitors": "C", "resistors": "R", "inductors": "L"}.get(category.strip().lower(), "")
+    tol = _TOL_RE.search(description)
+    tolerance = float(tol.group(1)) if tol else None
+    for m in _VALUE_IN_TEXT_RE.finditer(description):
+        parsed = parse_value(m.group(1), kind)
+        if parsed and (not kind or parsed[0] == kind):
+            return value_key(*parsed), parsed[1], tolerance
+    return "", None, tolerance
+
+
+def ref_kind(ref: str) -> str:
+    """Designator prefix -> passive kind: "C12" -> "C", "R1-R10" -> "R"."""
+    m = re.match(r"([A-Z]+)", ref.strip().upper())
+    return _REF_KIND.get(m.group(1), "") if m else ""
+
+
+# === Catalog =================================================================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parts (
+    lcsc TEXT PRIMARY KEY,
+    mpn TEXT NOT NULL DEFAULT '',
+    manufacturer TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT '',
+    package TEXT NOT NULL DEFAULT '',
+    library_type TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    stock INTEGER NOT NULL DEFAULT 0,
+    vkey TEXT NOT NULL DEFAULT '',
+    value REAL,
+    tolerance REAL,
+    basic INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS parts_value ON parts(vkey, package, basic DESC, stock DESC);
+CREATE INDEX IF NOT EXISTS parts_mpn ON parts(mpn COLLATE NOCASE);
+CREATE VIRTUAL TABLE IF NOT EXISTS parts_fts USING fts5(
+    lcsc, mpn, description, content='parts', content_rowid='rowid'
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_ORDER = "ORDER BY basic DESC, stock DESC, lcsc"
+
+
+def _pick(row: Dict[str, str], field: str) -> str:
+    for name in COLUMNS[field]:
+        value = row.get(name)
+        if value:
+            return value.strip()
+    return ""
+
+
+def _spec_parts(path: Path = SPEC_FILE) -> Iterator[Dict[str, str]]:
+    """Every {"name": ..., "lcsc": ...} dict in the spec class, found by import, not regex."""
+    if not path.exists():
+        return
+    spec = importlib.util.spec_from_file_location("_vikingboard_spec_v2", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    def walk(obj) -> Iterator[dict]:
+        if isinstance(obj, dict):
+            if "lcsc" in obj and "name" in obj:
+                yield obj
+            for v in obj.values():
+                yield from walk(v)
+        elif isinstance(obj, (list, tuple)):
+            for v in obj:
+                yield from walk(v)
+
+    for cls in vars(module).values():
+        if isinstance(cls, type):
+            for attr in vars(cls).values():
+                for part in walk(attr):
+                    yield {"LCSC": part["lcsc"], "MPN": part["name"], "Package": part.get("package", ""),
+                           "Description": part["name"]}
+
+
+class LcscCatalog:
+    def __init__(self, path: Path = DEFAULT_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, path: Path = DEFAULT_DB, seed: Optional[Path] = SEED_CSV) -> "LcscCatalog":
+        """Open the catalog, (re)importing the seed CSV and spec when they changed."""
+        catalog = cls(path)
+        if seed is not None:
+            stamp = ";".join(f"{p.name}:{p.stat().st_mtime_ns}" for p in (seed, SPEC_FILE) if p.exists())
+            if catalog._meta("seed") != stamp:
+                if seed.exists():
+                    catalog.import_csv(seed)
+                # The spec only knows name and code; richer catalog rows win
+                catalog.import_rows(_spec_parts(), replace=False)
+                catalog._set_meta("seed", stamp)
+        return catalog
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM parts").fetchone()[0]
+
+    # --- Import ---
+
+    def import_rows(self, rows: Iterable[Dict[str, str]], replace: bool = True) -> int:
+        records = []
+        for row in rows:
+            lcsc = _pick(row, "lcsc")
+            if not re.fullmatch(r"C\d+", lcsc):
+                continue
+            description = _pick(row, "description")
+            category = _pick(row, "category")
+            vkey, value, tolerance = parse_description(description, category)
+            library = _pick(row, "library_type")
+            stock = re.sub(r"\D", "", _pick(row, "stock")) or "0"
+            records.append((lcsc, _pick(row, "mpn"), _pick(row, "manufacturer"), category,
+                            normalize_package(_pick(row, "package")), library, description, int(stock),
+                            vkey, value, tolerance, 1 if library.lower() == "basic" else 0))
+        with self.db:
+            verb = "REPLACE" if replace else "IGNORE"
+            self.db.executemany(f"INSERT OR {verb} INTO parts VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", records)
+            self.db.execute("INSERT INTO parts_fts(parts_fts) VALUES ('rebuild')")
+        return len(records)
+
+    def import_csv(self, path: Path) -> int:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return self.import_rows(csv.DictReader(f))
+
+    # --- Queries ---
+
+    def _part(self, row) -> Optional[Part]:
+        return Part(*row) if row else None
+
+    def get(self, lcsc: str) -> Optional[Part]:
+        return self._part(self.db.execute(
+            "SELECT lcsc, mpn, manufacturer, package, library_type, description FROM parts WHERE lcsc = ?",
+            (lcsc,)).fetchone())
+
+    def search(self, text: str, package: str = "", limit: int = 10) -> List[Part]:
+        """Full-text search; all tokens must match, same package ranks first.
+
+        If nothing matches, retry with only the part-number-like tokens, so
+        "CC1101 Module" still finds the CC1101.
+        """
+        tokens = _FTS_TOKEN_RE.findall(text)
+        hits = self._fts(tokens, package, limit)
+        if not hits:
+            numbered = [t for t in tokens if re.search(r"\d", t) and re.search(r"[A-Za-z]", t)]
+            if numbered and numbered != tokens:
+                hits = self._fts(numbered, package, limit)
+        return hits
+
+    def _fts(self, tokens: List[str], package: str, limit: int) -> List[Part]:
+        if not tokens:
+            return []
+        query = " ".join(f'"{t}"' for t in tokens)
+        rows = self.db.execute(
+            "SELECT p.lcsc, p.mpn, p.manufacturer, p.package, p.library_type, p.description "
+            "FROM parts_fts JOIN parts p ON p.rowid = parts_fts.rowid "
+            "WHERE parts_fts MATCH ? ORDER BY (p.package = ?) DESC, bm25(parts_fts), p.basic DESC, p.stock DESC "
+            "LIMIT ?", (query, package, limit)).fetchall()
+        return [Part(*r) for r in rows]
+
+    def match(self, value: str, footprint: str = "", ref: str = "") -> Optional[Part]:
+        return self.annotate([(value, footprint, ref)])[0]
+
+    def annotate(self, rows: Sequence[Tuple[str, str, str]]) -> List[Optional[Part]]:
+        """Match many (value, footprint, ref) rows at once.
+
+        Passive values and exact MPNs resolve in one indexed join over a temp
+        table; only leftovers go through full-text search.
+        """
+        keyed = []
+        for i, (value, footprint, ref) in enumerate(rows):
+            parsed = parse_value(value, ref_kind(ref))
+            keyed.append((i, value.strip(), value_key(*parsed) if parsed else "", normalize_package(footprint)))
+        db = self.db
+        db.execute("CREATE TEMP TABLE IF NOT EXISTS bom (i INTEGER PRIMARY KEY, value TEXT, vkey TEXT, package TEXT)")
+        db.execute("DELETE FROM bom")
+        db.executemany("INSERT INTO bom VALUES (?,?,?,?)", keyed)
+        cols = "p.lcsc, p.mpn, p.manufacturer, p.package, p.library_type, p.description"
+        result: List[Optional[Part]] = [None] * len(rows)
+        joined = db.execute(
+            f"SELECT b.i, {cols} FROM bom b JOIN parts p ON p.lcsc = COALESCE("
+            f"  (SELECT lcsc FROM parts WHERE vkey = b.vkey AND b.vkey != '' AND package = b.package {_ORDER} LIMIT 1),"
+            f"  (SELECT lcsc FROM parts WHERE mpn = b.value COLLATE NOCASE AND b.value != '' {_ORDER} LIMIT 1))"
+        ).fetchall()
+        for row in joined:
+            result[row[0]] = Part(*row[1:])
+        for i, value, vkey, package in keyed:
+            if result[i] is None and value and not vkey:
+                hits = self.search(value, package, limit=1)
+                result[i] = hits[0] if hits else None
+        return result
+
+
+# === BOM helpers =============================================================
+
+def bom_columns(row: Dict[str, str]) -> Tuple[str, str, str]:
+    """(value, footprint, ref) from a KiCad, JLCPCB or production BOM row."""
+    def first(*names: str) -> str:
+        for n in names:
+            if row.get(n):
+                return row[n]
+        return ""
+    return (first("Value", "value", "Comment"),
+            first("Footprint", "footprint", "Package"),
+            first("Refs", "Reference", "Designator", "ref", "Id"))
+
+
+def annotate_csv(catalog: LcscCatalog, path: Path) -> Tuple[List[Dict[str, str]], List[Optional[Part]]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return rows, catalog.annotate([bom_columns(r) for r in rows])
+
+
+def run_benchmark(rows: int = 5000) -> None:
+    import random
+    import tempfile
+
+    values = ["10uF", "10 µF", "100nF", "0.1uF", "4k7", "4.7k", "10k", "1k", "100k", "CC1101", "SX1262",
+              "ESP32-WROOM-32E", "Conn_01x08", "BME280"]
+    fps = ["Capacitor_SMD:C_0805_2012Metric", "Resistor_SMD:R_0805_2012Metric", "", "Package_QFN:QFN-20"]
+    bom = [(random.choice(values), random.choice(fps), f"{random.choice('CRU')}{i}") for i in range(rows)]
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        catalog = LcscCatalog.open(Path(tmp) / "bench.sqlite")
+        t1 = time.perf_counter()
+        result = catalog.annotate(bom)
+        t2 = time.perf_counter()
+        catalog.close()
+    matched = sum(1 for r in result if r)
+    print(f"Seed import     : {(t1 - t0) * 1000:8.1f} ms")
+    print(f"Annotate {rows:>6} : {(t2 - t1) * 1000:8.1f} ms ({matched} matched)")
+
+
+# === CLI =====================================================================
+
+def _show(part: Optional[Part]) -> str:
+    if part is None:
+        return "MANUAL"
+    return f"{part.lcsc}  {part.mpn}  [{part.package}]  {part.description}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline LCSC parts catalog")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB)
+    parser.add_argument("--bench", action="store_true", help="time annotation of a synthetic BOM")
+    parser.add_argument("--rows", type=int, default=5000)
+    sub = parser.add_subparsers(dest="cmd")
+    p = sub.add_parser("import", help="import a CSV dump (JLCPCB parts list or seed format)")
+    p.add_argument("files", type=Path, nargs="+")
+    p = sub.add_parser("search", help="full-text search")
+    p.add_argument("text")
+    p.add_argument("--package", default="")
+    p = sub.add_parser("match", help="match one value")
+    p.add_argument("value")
+    p.add_argument("--footprint", default="")
+    p.add_argument("--ref", default="")
+    p = sub.add_parser("annotate", help="show LCSC matches for a BOM CSV")
+    p.add_argument("bom", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        run_benchmark(args.rows)
+        return 0
+    catalog = LcscCatalog.open(args.db)
+    try:
+        if args.cmd == "import":
+            for path in args.files:
+                print(f"✅ {path.name}: {catalog.import_csv(path)} parts")
+            print(f"📋 Catalog: {len(catalog)} parts")
+        elif args.cmd == "search":
+            for part in catalog.search(args.text, normalize_package(args.package)):
+                print(_show(part))
+        elif args.cmd == "match":
+            print(_show(catalog.match(args.value, args.footprint, args.ref)))
+        elif args.cmd == "annotate":
+            rows, parts = annotate_csv(catalog, args.bom)
+            for row, part in zip(rows, parts):
+                value, _, ref = bom_columns(row)
+                print(f"{ref:<10} {value:<24} {_show(part)}")
+        else:
+            print(f"📋 Catalog {catalog.path}: {len(catalog)} parts")
+    finally:
+        catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+vikingboard_pipeline.py - Parallel, incremental export pipeline.
+
+Replaces the serial kicad-cli calls in GO.sh/MASTER.sh. Every export
+(gerbers, drill, BOM, CPL, PDFs, STEP, DRC, JLCPCB bundle, net docs, KiKit) is a
+Stage with declared inputs and outputs:
+
+- Independent stages run concurrently in a process pool, and a stage
+  starts as soon as the stages it depends on have finished.
+- A stage is skipped when the content hash of its inputs (and its
+  command line) matches the last successful run and its outputs exist.
+  Only the schematic changed? Then only BOM and the schematic PDF rerun.
+- A per-stage timing report is printed and written to reports/.
+- With --trace (or inside a traced MASTER.sh run) every stage and
+  kicad-cli call is a span in the Chrome trace and the runtime history
+  (see vikingboard_trace.py).
+
+Usage:
+    python tools/vikingboard_pipeline.py                 # everything
+    python tools/vikingboard_pipeline.py gerbers drc     # just these (+ deps)
+    python tools/vikingboard_pipeline.py --layout master --force
+    python tools/vikingboard_pipeline.py --list
+    python tools/vikingboard_pipeline.py --trace --force docs
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from vikingboard_trace import run as trace_run
+from vikingboard_trace import session, span
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = REPO_ROOT / ".cache"
+STATE_PATH = CACHE_DIR / "pipeline_state.json"
+PCB = "kicad/Vikingboard.kicad_pcb"
+SCH = "kicad/Vikingboard.kicad_sch"
+SPEC_SOURCES = ["tools/vikingboard_spec.py", "tools/vikingboard_eda_automation.py", "pcb_scripts/vikingboard_spec.py"]
+MAC_KICAD_CLI = "/Applications/KiCad/KiCad.app/Contents/MacOS/kicad-cli"
+# Exported layers and kicad-cli's (Protel) extension for each; every file is a
+# stage output, so a change on any one layer reaches the bundle
+GERBER_LAYERS = {
+    "F.Cu": "gtl", "B.Cu": "gbl", "F.Mask": "gts", "B.Mask": "gbs", "F.Paste": "gtp", "B.Paste": "gbp",
+    "F.Silkscreen": "gto", "B.Silkscreen": "gbo", "Edge.Cuts": "gm1",
+}
+
+# Where each artifact goes. "production" is the GO.sh/RUN.sh layout,
+# "master" the one MASTER.sh and check_status.sh expect.
+LAYOUTS: Dict[str, Dict[str, str]] = {
+    "production": {
+        "gerbers": "production/gerbers",
+        "bom": "production/bom.csv",
+        "cpl": "production/cpl.csv",
+        "sch_pdf": "production/docs/schematic.pdf",
+        "pcb_pdf": "production/docs/pcb.pdf",
+        "step": "production/board.step",
+        "drc": "production/drc.txt",
+        "bundle": "production/JLCPCB_bundle.zip",
+        "kikit": "production/jlcpcb_bundle",
+        "report": "reports/pipeline_timing.json",
+    },
+    "master": {
+        "gerbers": "production_output/gerbers",
+        "bom": "production_output/vikingboard_bom.csv",
+        "cpl": "production_output/vikingboard_cpl.csv",
+        "sch_pdf": "documentation/schematic.pdf",
+        "pcb_pdf": "documentation/pcb.pdf",
+        "step": "production_output/vikingboard_3d.step",
+        "drc": "reports/drc_report.txt",
+        "bundle": "production_output/vikingboard_gerbers.zip",
+        "kikit": "production_output/jlcpcb_bundle",
+        "report": "reports/pipeline_timing.json",
+    },
+}
+
+
+@dataclass
+class Stage:
+    """
+    One export step.
+
+    command is an argv template ({cli}, {pcb}, {sch} and {<artifact>}
+    are substituted); func is a "module:function" called with the
+    resolved output paths instead. Outputs of the stages in deps are
+    added to this stage's inputs automatically.
+    """
+
+    name: str
+    inputs: List[str]
+    outputs: List[str]
+    command: Optional[List[str]] = None
+    func: Optional[str] = None
+    deps: List[str] = field(default_factory=list)
+    tool: Optional[str] = None  # skip the stage if this executable is missing
+    ok_returncodes: Tuple[int, ...] = (0,)
+
+
+STAGES: List[Stage] = [
+    Stage("gerbers", [PCB],
+          [f"{{gerbers}}/Vikingboard-{layer.replace('.', '_')}.{ext}" for layer, ext in GERBER_LAYERS.items()],
+          ["{cli}", "pcb", "export", "gerbers", "--output", "{gerbers}/", "--layers", ",".join(GERBER_LAYERS),
+           "{pcb}"]),
+    Stage("drill", [PCB], ["{gerbers}/Vikingboard.drl"],
+          ["{cli}", "pcb", "export", "drill", "--output", "{gerbers}/", "{pcb}"]),
+    Stage("bom", [SCH], ["{bom}"],
+          ["{cli}", "sch", "export", "bom", "--output", "{bom}", "{sch}"]),
+    Stage("cpl", [PCB], ["{cpl}"],
+          ["{cli}", "pcb", "export", "pos", "--format", "csv", "--units", "mm",
+           "--side", "both", "--output", "{cpl}", "{pcb}"]),
+    Stage("sch_pdf", [SCH], ["{sch_pdf}"],
+          ["{cli}", "sch", "export", "pdf", "--output", "{sch_pdf}", "{sch}"]),
+    Stage("pcb_pdf", [PCB], ["{pcb_pdf}"],
+          ["{cli}", "pcb", "export", "pdf", "--layers", "F.Cu,B.Cu,Edge.Cuts",
+           "--output", "{pcb_pdf}", "{pcb}"]),
+    Stage("step", [PCB], ["{step}"],
+          ["{cli}", "pcb", "export", "step", "--output", "{step}", "{pcb}"]),
+    # DRC exits non-zero when it finds violations; the report is still valid
+    Stage("drc", [PCB], ["{drc}"],
+          ["{cli}", "pcb", "drc", "--severity-all", "--output", "{drc}", "{pcb}"],
+          ok_returncodes=(0, 5)),
+    Stage("bundle", [], ["{bundle}"], func="vikingboard_pipeline:build_bundle",
+          deps=["gerbers", "drill", "bom", "cpl"]),
+    Stage("docs", SPEC_SOURCES, ["docs/vikingboard_nets.md", "docs/vikingboard_nets.csv"],
+          func="vikingboard_pipeline:build_docs"),
+    Stage("kikit", [PCB, SCH], ["{kikit}"],
+          ["kikit", "fab", "jlcpcb", "--assembly", "--schematic", "{sch}", "--no-drc",
+           "{pcb}", "{kikit}"],
+          tool="kikit"),
+]
+
+
+# === Hashing =================================================================
+
+class HashCache:
+    """Content hashes memoised on (mtime_ns, size) so no-op reruns stay cheap."""
+
+    def __init__(self, entries: Optional[dict] = None):
+        self.entries: Dict[str, list] = entries or {}
+
+    def file_hash(self, path: Path) -> str:
+        st = path.stat()
+        key = str(path)
+        cached = self.entries.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        self.entries[key] = [st.st_mtime_ns, st.st_size, digest]
+        return digest
+
+    def path_hash(self, path: Path) -> str:
+        """Hash of a file, or of every file under a directory (by relative name)."""
+        if path.is_dir():
+            h = hashlib.sha256()
+            for child in sorted(p for p in path.rglob("*") if p.is_file()):
+                h.update(child.relative_to(path).as_posix().encode())
+                h.update(self.file_hash(child).encode())
+            return h.hexdigest()
+        if path.exists():
+            return self.file_hash(path)
+        return "missing"
+
+
+# === Stage execution (runs inside pool workers) ================================
+
+def build_bundle(paths: Dict[str, str]) -> None:
+    """Zip gerbers, drill, BOM and CPL into the JLCPCB upload bundle (deterministic, cached)."""
+    from vikingboard_bundle import build
+
+    gerbers = Path(paths["gerbers"])
+    build(Path(paths["bundle"]), [f"gerbers={gerbers}", paths["bom"], paths["cpl"]],
+          include=["gerbers/*.g*", "gerbers/*.drl", Path(paths["bom"]).name, Path(paths["cpl"]).name])
+
+
+def build_docs(paths: Dict[str, str]) -> None:
+    """Regenerate the net tables in docs/ from the compiled spec."""
+    import vikingboard_docs
+
+    vikingboard_docs.main()
+
+
+def _run_stage(name: str, argv: Optional[List[str]], func: Optional[str],
+               paths: Dict[str, str], ok_returncodes: Sequence[int]) -> Tuple[str, bool, float, str]:
+    t0 = time.perf_counter()
+    try:
+        with span(name, cat="stage") as info:
+            if argv is not None:
+                proc = trace_run(argv, name=f"{name}: {Path(argv[0]).name}", cwd=REPO_ROOT,
+                                 capture_output=True, text=True)
+                ok = proc.returncode in ok_returncodes
+                detail = "" if ok else (proc.stderr or proc.stdout).strip()[-400:]
+            else:
+                module_name, func_name = func.split(":")
+                sys.path.insert(0, str(Path(__file__).resolve().parent))
+                module = __import__(module_name)
+                getattr(module, func_name)(paths)
+                ok, detail = True, ""
+            info["ok"] = ok
+    except Exception as e:  # report, don't kill the whole pool
+        ok, detail = False, f"{type(e).__name__}: {e}"
+    return name, ok, time.perf_counter() - t0, detail
+
+
+# === Pipeline ================================================================
+
+def find_kicad_cli() -> str:
+    for candidate in (os.environ.get("KICAD_CLI"), shutil.which("kicad-cli"), MAC_KICAD_CLI):
+        if candidate and Path(candidate).exists():
+            return candidate
+    return "kicad-cli"
+
+
+class Pipeline:
+    def __init__(self, stages: List[Stage] = STAGES, layout: str = "production",
+                 state_path: Path = STATE_PATH, kicad_cli: Optional[str] = None):
+        self.stages = {s.name: s for s in stages}
+        self.layout_name = layout
+        self.layout = LAYOUTS[layout]
+        self.state_path = state_path
+        self.vars = dict(self.layout, cli=kicad_cli or find_kicad_cli(), pcb=PCB, sch=SCH)
+        self.state = self._load_state()
+        self.stage_state: Dict[str, dict] = self.state.setdefault("stages", {}).setdefault(layout, {})
+        self.hashes = HashCache(self.state.get("hashes"))
+
+    def _load_state(self) -> dict:
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"stages": self.state["stages"], "hashes": self.hashes.entries}
+        # Unique temp name: two pipeline runs at once must not write through each other
+        fd, tmp = tempfile.mkstemp(dir=self.state_path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.state_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def expand(self, text: str) -> str:
+        return text.format(**self.vars)
+
+    def closure(self, targets: Sequence[str]) -> List[str]:
+        """Stages needed for targets, in dependency order."""
+        order: List[str] = []
+
+        def visit(name: str) -> None:
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage '{name}' (see --list)")
+            if name in order:
+                return
+            for dep in self.stages[name].deps:
+                visit(dep)
+            order.append(name)
+
+        for target in targets:
+            visit(target)
+        return order
+
+    def stage_inputs(self, stage: Stage) -> List[str]:
+        inputs = [self.expand(i) for i in stage.inputs]
+        for dep in stage.deps:
+            inputs.extend(self.expand(o) for o in self.stages[dep].outputs)
+        return inputs
+
+    def input_key(self, stage: Stage) -> str:
+        h = hashlib.sha256()
+        h.update(json.dumps([stage.command, stage.func, self.layout], sort_keys=True).encode())
+        for rel in self.stage_inputs(stage):
+            h.update(rel.encode())
+            h.update(self.hashes.path_hash(REPO_ROOT / rel).encode())
+        return h.hexdigest()
+
+    def is_fresh(self, stage: Stage, key: str) -> bool:
+        previous = self.stage_state.get(stage.name, {})
+        if previous.get("key") != key:
+            return False
+        return all((REPO_ROOT / self.expand(o)).exists() for o in stage.outputs)
+
+    def run(self, targets: Optional[Sequence[str]] = None, force: bool = False,
+            jobs: Optional[int] = None, dry_run: bool = False) -> List[dict]:
+        names = self.closure(targets or list(self.stages))
+        with span("pipeline", cat="pipeline", layout=self.layout_name, stages=",".join(names)):
+            return self._run(names, force, jobs, dry_run)
+
+    def _run(self, names: List[str], force: bool, jobs: Optional[int], dry_run: bool) -> List[dict]:
+        pending = set(names)
+        done: Dict[str, str] = {}  # name -> "ran" | "skipped" | "failed" | ...
+        report: List[dict] = []
+        running = {}
+        t_start = time.perf_counter()
+
+        # Workers mostly sit waiting on kicad-cli, so by default give every
+        # stage its own worker rather than capping at the CPU count.
+        with ProcessPoolExecutor(max_workers=jobs or len(names)) as pool:
+            while pending or running:
+                for name in sorted(pending):
+                    stage = self.stages[name]
+                    if any(d not in done for d in stage.deps):
+                        continue
+                    pending.discard(name)
+                    status = self._pre_check(stage, done, force)
+                    if status is not None:
+                        done[name] = status
+                        report.append({"stage": name, "status": status, "seconds": 0.0})
+                        continue
+                    key = self.input_key(stage)
+                    if not force and self.is_fresh(stage, key):
+                        done[name] = "skipped"
+                        report.append({"stage": name, "status": "skipped", "seconds": 0.0})
+                        continue
+                    if dry_run:
+                        done[name] = "would run"
+                        report.append({"stage": name, "status": "would run", "seconds": 0.0})
+                        continue
+                    paths = {k: str(REPO_ROOT / v) for k, v in self.layout.items()}
+                    for out in stage.outputs:
+                        (REPO_ROOT / self.expand(out)).parent.mkdir(parents=True, exist_ok=True)
+                    argv = [self.expand(a) for a in stage.command] if stage.command else None
+                    future = pool.submit(_run_stage, name, argv, stage.func, paths, stage.ok_returncodes)
+                    running[future] = key
+                    print(f"▶️  {name}")
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key = running.pop(future)
+                    name, ok, seconds, detail = future.result()
+                    done[name] = "ran" if ok else "failed"
+                    report.append({"stage": name, "status": done[name], "seconds": seconds, "detail": detail})
+                    if ok:
+                        self.stage_state[name] = {"key": key, "seconds": seconds, "finished": time.time()}
+                        print(f"✅ {name} ({seconds:.2f} s)")
+                    else:
+                        self.stage_state.pop(name, None)
+                        print(f"❌ {name} ({seconds:.2f} s): {detail}")
+
+        self._print_report(report, time.perf_counter() - t_start)
+        if not dry_run:
+            self._save_state()
+            self._write_report(report, time.perf_counter() - t_start)
+        return report
+
+    def _pre_check(self, stage: Stage, done: Dict[str, str], force: bool) -> Optional[str]:
+        if any(done[d] in ("failed", "blocked", "no tool") for d in stage.deps):
+            return "blocked"
+        tool = stage.tool or (self.vars["cli"] if stage.command and stage.command[0] == "{cli}" else None)
+        if tool and not (shutil.which(tool) or Path(tool).exists()):
+            return "no tool"
+        return None
+
+    def _print_report(self, report: List[dict], wall: float) -> None:
+        total = sum(r["seconds"] for r in report)
+        print("\n--- Pipeline timing ---")
+        for r in sorted(report, key=lambda r: -r["seconds"]):
+            print(f"{r['stage']:<10} {r['status']:<10} {r['seconds']:8.2f} s")
+        print(f"{'wall':<10} {'':<10} {wall:8.2f} s  (stage sum {total:.2f} s)")
+
+    def _write_report(self, report: List[dict], wall: float) -> None:
+        path = REPO_ROOT / self.layout["report"]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"layout": self.layout_name, "wall_seconds": wall, "stages": report}, indent=2), encoding="utf-8")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parallel, incremental VikingBoard export pipeline")
+    parser.add_argument("stages", nargs="*", help="stages to run (default: all)")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), default="production")
+    parser.add_argument("--force", action="store_true", help="ignore cached input hashes")
+    parser.add_argument("--jobs", "-j", type=int, help="worker processes (default: one per stage)")
+    parser.add_argument("--dry-run", action="store_true", help="show what would run")
+    parser.add_argument("--list", action="store_true", help="list stages and exit")
+    parser.add_argument("--trace", action="store_true",
+                        help="write a Chrome trace and record stage timings in the history")
+    args = parser.parse_args(argv)
+
+    pipeline = Pipeline(layout=args.layout)
+    if args.list:
+        for stage in pipeline.stages.values():
+            deps = f"  (after {', '.join(stage.deps)})" if stage.deps else ""
+            outputs = ", ".join(pipeline.expand(o) for o in stage.outputs)
+            print(f"{stage.name:<10} -> {outputs}{deps}")
+        return 0
+
+    try:
+        with session("pipeline") if args.trace else nullcontext():
+            report = pipeline.run(args.stages, force=args.force, jobs=args.jobs, dry_run=args.dry_run)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 2
+    return 1 if any(r["status"] == "failed" for r in report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
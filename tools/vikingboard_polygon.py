@@ -0,0 +1,768 @@
+#!/usr/bin/env python3
+"""
+vikingboard_polygon.py - Polygon engine for zone outlines and pre-fill estimates.
+
+The GND zone scripts hardcoded their corners, (45,65)-(130,115) in one and
+(45,65)-(135,115) in another, and those drift from the outline that
+fix_edge_cuts actually draws. This module derives zone outlines from the
+board instead:
+
+- Edge.Cuts lines, arcs, rects, circles and polygons are chained into
+  closed contours. Even nesting depth is board, odd is a cut-out (slots,
+  antenna windows).
+- zone_outline() insets the board by the clearance (cut-outs grow by the
+  same amount), subtracts copper-pour keep-outs on each layer (board rule
+  areas and footprint keep-outs such as RF modules) and unions the result
+  across the zone's layers.
+- estimate() predicts a zone's fill without KiCad: outline and inset board,
+  minus other-net pads, tracks, vias and higher-priority zones grown by
+  their clearance, minus thermal gaps around same-net pads, opened by
+  min_thickness. It reports copper area and islands and compares them with
+  the fill stored in the file, so a refill that would not change anything
+  can be skipped. Thermal spokes are not drawn, so the area is a close
+  estimate, not KiCad's exact fill.
+
+A region is a list of rings (NumPy arrays of x, y in mm) whose windings add
+up to a positive number inside: outers counter-clockwise and holes clockwise
+by signed area. Offsetting builds the raw offset ring of every edge and
+corner in one array operation: round joins where the ring grows, the vertex
+itself where it shrinks. A boolean operation splits all edges at their
+intersections (x-sweep for candidate pairs) and keeps each piece whose two
+sides differ in the result, tested with winding numbers (y-sorted stabbing
+for point/edge pairs). Self-intersections left by offsetting are resolved
+by the same step. Coordinates snap to KiCad's 1 nm grid, so edges that
+coincide in different inputs become one edge.
+
+Usage:
+    python tools/vikingboard_polygon.py outline                      # GND outline on B.Cu
+    python tools/vikingboard_polygon.py outline --layer F.Cu --layer B.Cu --clearance 0.5
+    python tools/vikingboard_polygon.py estimate                     # per-zone fill estimate vs stored fill
+    python tools/vikingboard_polygon.py estimate --json
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vikingboard_board import DEFAULT_PCB, Board, Graphic, Pad, Zone, load_board, rotate
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+GRID = 1e-6                # mm; KiCad's internal unit is 1 nm
+ARC_TOLERANCE = 0.005      # mm, max chord deviation when linearising arcs (as vikingboard_gerber)
+EDGE_TOLERANCE = 0.01      # mm, Edge.Cuts endpoints closer than this are joined
+AREA_TOLERANCE = 0.03      # relative area difference below which a stored fill counts as current
+_CHUNK = 1 << 20           # max pairs evaluated per NumPy step
+_SPOKE_PROBE = 0.001       # mm beyond a thermal gap, where the spokes reach the fill
+
+Region = List[np.ndarray]
+
+
+# === Rings ===================================================================
+
+def _ring(points) -> np.ndarray:
+    """(n, 2) float array without a repeated closing point."""
+    ring = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(ring) > 1 and np.allclose(ring[0], ring[-1], rtol=0, atol=GRID):
+        ring = ring[:-1]
+    return ring
+
+
+def signed_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def area(region: Region) -> float:
+    return sum(signed_area(r) for r in region)
+
+
+def orient(ring: np.ndarray, ccw: bool = True) -> np.ndarray:
+    return ring if (signed_area(ring) > 0) == ccw else ring[::-1].copy()
+
+
+def bounds(region: Region) -> Tuple[float, float, float, float]:
+    pts = np.concatenate(region)
+    return float(pts[:, 0].min()), float(pts[:, 1].min()), float(pts[:, 0].max()), float(pts[:, 1].max())
+
+
+def _arc_steps(radius: float, sweep: np.ndarray) -> np.ndarray:
+    if radius <= ARC_TOLERANCE:
+        return np.ones(np.shape(sweep), dtype=np.int64)
+    step = 2 * math.acos(1 - ARC_TOLERANCE / radius)
+    return np.maximum(1, np.ceil(np.abs(sweep) / step)).astype(np.int64)
+
+
+def circle(cx: float, cy: float, r: float) -> np.ndarray:
+    n = max(8, int(_arc_steps(r, np.array(2 * math.pi))))
+    t = np.arange(n) * (2 * math.pi / n)
+    return np.stack([cx + r * np.cos(t), cy + r * np.sin(t)], axis=1)
+
+
+def rect(cx: float, cy: float, w: float, h: float, angle: float = 0.0) -> np.ndarray:
+    corners = [(-w / 2, -h / 2), (w / 2, -h / 2), (w / 2, h / 2), (-w / 2, h / 2)]
+    return orient(np.array([(cx + dx, cy + dy) for dx, dy in (rotate(x, y, angle) for x, y in corners)]))
+
+
+def stadium(x1: float, y1: float, x2: float, y2: float, r: float) -> np.ndarray:
+    """Segment swept by a disc of radius r (a track, an oval pad)."""
+    length = math.hypot(x2 - x1, y2 - y1)
+    if length < GRID:
+        return circle(x1, y1, r)
+    base = math.atan2(y2 - y1, x2 - x1)
+    n = max(4, int(_arc_steps(r, np.array(math.pi))))
+    t = np.linspace(-math.pi / 2, math.pi / 2, n + 1) + base
+    cap2 = np.stack([x2 + r * np.cos(t), y2 + r * np.sin(t)], axis=1)
+    cap1 = np.stack([x1 - r * np.cos(t), y1 - r * np.sin(t)], axis=1)
+    return np.concatenate([cap2, cap1])
+
+
+def arc_points(start, mid, end) -> np.ndarray:
+    """Polyline through a three-point arc, start and end included."""
+    (ax, ay), (bx, by), (cx, cy) = start, mid, end
+    d = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    if abs(d) < 1e-12:
+        return np.array([start, end], dtype=np.float64)
+    ux = ((ax * ax + ay * ay) * (by - cy) + (bx * bx + by * by) * (cy - ay) + (cx * cx + cy * cy) * (ay - by)) / d
+    uy = ((ax * ax + ay * ay) * (cx - bx) + (bx * bx + by * by) * (ax - cx) + (cx * cx + cy * cy) * (bx - ax)) / d
+    r = math.hypot(ax - ux, ay - uy)
+    a0, a1, a2 = (math.atan2(y - uy, x - ux) for x, y in (start, mid, end))
+    sweep = (a2 - a0) % (2 * math.pi)
+    if (a1 - a0) % (2 * math.pi) > sweep:          # mid is not on the ccw path: go clockwise
+        sweep -= 2 * math.pi
+    n = int(_arc_steps(r, np.array(sweep)))
+    t = a0 + sweep * np.arange(n + 1) / n
+    pts = np.stack([ux + r * np.cos(t), uy + r * np.sin(t)], axis=1)
+    pts[0], pts[-1] = start, end
+    return pts
+
+
+def pad_ring(pad: Pad, grow: float = 0.0) -> np.ndarray:
+    """Copper outline of a pad grown by grow (roundrect, trapezoid and custom pads as their rect)."""
+    if pad.shape == "circle":
+        return circle(pad.x, pad.y, max(pad.w, pad.h) / 2 + grow)
+    if pad.shape == "oval":
+        half = abs(pad.w - pad.h) / 2
+        dx, dy = rotate(half, 0.0, pad.angle) if pad.w >= pad.h else rotate(0.0, half, pad.angle)
+        return stadium(pad.x - dx, pad.y - dy, pad.x + dx, pad.y + dy, min(pad.w, pad.h) / 2 + grow)
+    core = rect(pad.x, pad.y, pad.w, pad.h, pad.angle)
+    return _offset_ring(core, grow) if grow > 0 else core
+
+
+# === Edge.Cuts contours ======================================================
+
+class Contours(NamedTuple):
+    rings: Region          # oriented: board outers ccw, cut-outs cw
+    open_chains: int       # chains of lines/arcs that did not close
+
+
+def _chain(paths: List[np.ndarray], tolerance: float) -> Tuple[Region, int]:
+    def key(p) -> Tuple[int, int]:
+        return round(p[0] / tolerance), round(p[1] / tolerance)
+
+    ends: Dict[Tuple[int, int], List[int]] = {}
+    for i, path in enumerate(paths):
+        ends.setdefault(key(path[0]), []).append(i)
+        ends.setdefault(key(path[-1]), []).append(i)
+    used = [False] * len(paths)
+    rings, open_chains = [], 0
+    for first in range(len(paths)):
+        if used[first]:
+            continue
+        used[first] = True
+        parts = [paths[first]]
+        start, tail = key(paths[first][0]), key(paths[first][-1])
+        while tail != start:
+            nxt = next((j for j in ends.get(tail, ()) if not used[j]), None)
+            if nxt is None:
+                break
+            used[nxt] = True
+            path = paths[nxt] if key(paths[nxt][0]) == tail else paths[nxt][::-1]
+            parts.append(path[1:])
+            tail = key(path[-1])
+        if tail == start and sum(len(p) for p in parts) >= 3:
+            rings.append(_ring(np.concatenate(parts)))
+        else:
+            open_chains += 1
+    return rings, open_chains
+
+
+def edge_contours(edges: Sequence[Graphic], tolerance: float = EDGE_TOLERANCE) -> Contours:
+    """Closed Edge.Cuts contours, oriented by nesting depth."""
+    rings: Region = []
+    paths: List[np.ndarray] = []
+    for g in edges:
+        if g.kind == "rect":
+            (x1, y1), (x2, y2) = g.points
+            rings.append(np.array([(x1, y1), (x2, y1), (x2, y2), (x1, y2)], dtype=np.float64))
+        elif g.kind == "circle":
+            (cx, cy), (ex, ey) = g.points
+            rings.append(circle(cx, cy, math.hypot(ex - cx, ey - cy)))
+        elif g.kind == "poly" and len(g.points) >= 3:
+            rings.append(_ring(g.points))
+        elif g.kind == "line":
+            paths.append(np.asarray(g.points, dtype=np.float64))
+        elif g.kind == "arc":
+            paths.append(arc_points(*g.points))
+    chained, open_chains = _chain(paths, tolerance)
+    rings += chained
+    probes = np.array([r[0] for r in rings]).reshape(-1, 2)
+    oriented = []
+    for i, ring in enumerate(rings):
+        depth = sum(1 for j, other in enumerate(rings) if j != i and _winding(probes[i:i + 1], _segments([other]))[0])
+        oriented.append(orient(ring, ccw=depth % 2 == 0))
+    return Contours(oriented, open_chains)
+
+
+# === Offsetting ==============================================================
+
+def _offset_ring(ring: np.ndarray, d: float) -> np.ndarray:
+    """
+    Raw offset curve of one ring (d > 0 grows the region on its left).
+    May self-intersect; offset() cleans it up.
+    """
+    p = ring
+    e = np.roll(p, -1, axis=0) - p
+    length = np.hypot(e[:, 0], e[:, 1])
+    if not (length > GRID).all():             # drop repeated points
+        p = p[length > GRID]
+        if len(p) < 3:
+            return np.empty((0, 2))
+        e = np.roll(p, -1, axis=0) - p
+        length = np.hypot(e[:, 0], e[:, 1])
+    normal = np.stack([e[:, 1], -e[:, 0]], axis=1) / length[:, None]      # right-hand normal
+    u0 = d * np.roll(normal, 1, axis=0)            # offset of the edge ending at vertex i
+    u1 = d * normal                                # offset of the edge starting at vertex i
+    e_prev = np.roll(e, 1, axis=0)
+    cross = e_prev[:, 0] * e[:, 1] - e_prev[:, 1] * e[:, 0]
+    sweep = np.arctan2(u0[:, 0] * u1[:, 1] - u0[:, 1] * u1[:, 0], (u0 * u1).sum(axis=1))
+    straight = np.abs(sweep) < 1e-9
+    join = (cross * d > 0) & ~straight             # offset edges separate here: round join
+    # Offset edges cross here: meet at the miter point if both edges reach it,
+    # else go back through the vertex and let the union remove the loop
+    trim = np.where(join | straight, 0.0, abs(d) * np.tan(np.minimum(np.abs(sweep), 3.0) / 2))
+    fits = trim + np.roll(trim, -1) <= length      # edge i keeps a positive length after both trims
+    miter = ~join & ~straight & fits & np.roll(fits, 1)
+    steps = _arc_steps(abs(d), sweep)
+    count = np.where(straight | miter, 1, np.where(join, steps + 1, 3))
+    first = np.cumsum(count) - count
+    vertex = np.repeat(np.arange(len(p)), count)
+    j = np.arange(int(count.sum())) - first[vertex]
+    # Round joins: rotate u0 towards u1
+    angle = sweep[vertex] * j / np.maximum(steps[vertex], 1)
+    c, s = np.cos(angle), np.sin(angle)
+    ux, uy = u0[vertex, 0], u0[vertex, 1]
+    arc = np.stack([ux * c - uy * s, ux * s + uy * c], axis=1)
+    # Other corners: end of previous offset edge, the vertex, start of the next
+    corner = np.where((j == 0)[:, None], u0[vertex], np.where((j == 1)[:, None], 0.0, u1[vertex]))
+    tip = (u0 + u1) / (1 + (u0 * u1).sum(axis=1) / (d * d))[:, None]
+    corner = np.where(miter[vertex][:, None], tip[vertex], corner)
+    return p[vertex] + np.where(join[vertex][:, None], arc, corner)
+
+
+def offset(region: Region, d: float) -> Region:
+    """Grow (d > 0) or shrink (d < 0) a region by d mm with round corners."""
+    if not d:
+        return list(region)
+    raw = [r for r in (_offset_ring(ring, d) for ring in region) if len(r) >= 3]
+    return union(raw)
+
+
+# === Booleans ================================================================
+
+def _segments(region: Region) -> np.ndarray:
+    if not region:
+        return np.empty((0, 4))
+    segs = np.concatenate([np.hstack([r, np.roll(r, -1, axis=0)]) for r in region if len(r) >= 2])
+    return segs[(segs[:, :2] != segs[:, 2:]).any(axis=1)]          # repeated points add nothing
+
+
+def _winding(points: np.ndarray, segs: np.ndarray) -> np.ndarray:
+    """Winding number of every point (ray towards +x)."""
+    w = np.zeros(len(points), dtype=np.int64)
+    for pi, _edge, contrib in _crossings(points, segs):
+        w += np.bincount(pi, weights=contrib, minlength=len(points)).astype(np.int64)
+    return w
+
+
+def _crossings(points: np.ndarray, segs: np.ndarray):
+    """(point, edge, +1/-1/0) per edge the +x ray of a point may cross, by y-sorted stabbing, in blocks."""
+    if not len(segs) or not len(points):
+        return
+    order = np.argsort(points[:, 1], kind="stable")
+    ys = points[order, 1]
+    lo = np.minimum(segs[:, 1], segs[:, 3])
+    hi = np.maximum(segs[:, 1], segs[:, 3])
+    begin = np.searchsorted(ys, lo, side="left")
+    count = np.searchsorted(ys, hi, side="left") - begin          # points with lo <= y < hi
+    for block in _blocks(count):
+        n = count[block]
+        edge = np.repeat(block, n)
+        k = np.arange(int(n.sum())) - np.repeat(np.cumsum(n) - n, n) + np.repeat(begin[block], n)
+        pi = order[k]
+        x1, y1, x2, y2 = segs[edge, 0], segs[edge, 1], segs[edge, 2], segs[edge, 3]
+        side = (x2 - x1) * (points[pi, 1] - y1) - (points[pi, 0] - x1) * (y2 - y1)
+        up = y2 > y1
+        contrib = np.where(up & (side > 0), 1, np.where(~up & (side < 0), -1, 0))
+        yield pi, edge, contrib
+
+
+def _blocks(count: np.ndarray) -> List[np.ndarray]:
+    """Split row indices so each block expands to at most _CHUNK pairs."""
+    total = np.cumsum(count)
+    if not len(total) or total[-1] <= _CHUNK:
+        return [np.arange(len(count))]
+    cuts = np.searchsorted(total, np.arange(_CHUNK, int(total[-1]), _CHUNK), side="right")
+    return [b for b in np.split(np.arange(len(count)), np.unique(cuts)) if len(b)]
+
+
+def _split(segs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cut all segments at their mutual intersections. Returns the directed
+    pieces as int64 nm coordinates and the index of the segment each came from.
+    """
+    n = len(segs)
+    # (segment, parameter along it, cut point); every cut point is computed once and shared
+    # by both segments, so the two copies cannot round to different grid points
+    cut_seg = [np.repeat(np.arange(n), 2)]
+    cut_t = [np.tile([0.0, 1.0], n)]
+    cut_pt = [segs.reshape(-1, 2)]
+    xmin = np.minimum(segs[:, 0], segs[:, 2])
+    xmax = np.maximum(segs[:, 0], segs[:, 2])
+    ymin = np.minimum(segs[:, 1], segs[:, 3])
+    ymax = np.maximum(segs[:, 1], segs[:, 3])
+    order = np.argsort(xmin, kind="stable")
+    sorted_min = xmin[order]
+    stop = np.searchsorted(sorted_min, xmax[order] + GRID, side="right")
+    count = np.maximum(stop - np.arange(n) - 1, 0)             # later segments starting inside my x-range
+    for block in _blocks(count):
+        c = count[block]
+        i = np.repeat(block, c)
+        j = i + 1 + np.arange(int(c.sum())) - np.repeat(np.cumsum(c) - c, c)
+        a, b = order[i], order[j]
+        hit = (ymin[a] <= ymax[b] + GRID) & (ymin[b] <= ymax[a] + GRID)
+        a, b = a[hit], b[hit]
+        p, r = segs[a, :2], segs[a, 2:] - segs[a, :2]
+        q, s = segs[b, :2], segs[b, 2:] - segs[b, :2]
+        qp = q - p
+        den = r[:, 0] * s[:, 1] - r[:, 1] * s[:, 0]
+        rl = np.hypot(r[:, 0], r[:, 1])
+        sl = np.hypot(s[:, 0], s[:, 1])
+        crossing = np.abs(den) > 1e-12 * rl * sl
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (qp[:, 0] * s[:, 1] - qp[:, 1] * s[:, 0]) / den
+            u = (qp[:, 0] * r[:, 1] - qp[:, 1] * r[:, 0]) / den
+        tt, tu = GRID / rl, GRID / sl
+        ok = crossing & (t >= -tt) & (t <= 1 + tt) & (u >= -tu) & (u <= 1 + tu)
+        a, b, p, r, q, s, t, u, tt, tu = (x[ok] for x in (a, b, p, r, q, s, t, u, tt, tu))
+        t, u = np.clip(t, 0, 1), np.clip(u, 0, 1)
+        # Crossings at an endpoint land exactly on that endpoint
+        point = p + t[:, None] * r
+        for at_end, exact, param, value in ((u <= tu, q, u, 0.0), (u >= 1 - tu, q + s, u, 1.0),
+                                            (t <= tt, p, t, 0.0), (t >= 1 - tt, p + r, t, 1.0)):
+            point[at_end] = exact[at_end]
+            param[at_end] = value
+        cut_seg += [a, b]
+        cut_t += [t, u]
+        cut_pt += [point, point]
+        # Collinear overlaps: each segment is cut at the other's endpoints
+        a, b = order[i][hit], order[j][hit]
+        p, r = segs[a, :2], segs[a, 2:] - segs[a, :2]
+        q, s = segs[b, :2], segs[b, 2:] - segs[b, :2]
+        rl = np.hypot(r[:, 0], r[:, 1])
+        qp = q - p
+        line = ~crossing & (np.abs(qp[:, 0] * r[:, 1] - qp[:, 1] * r[:, 0]) <= GRID * rl)
+        a, b, p, r, q, s = a[line], b[line], p[line], r[line], q[line], s[line]
+        for seg, base, vec, ends in ((a, p, r, (q, q + s)), (b, q, s, (p, p + r))):
+            norm = (vec * vec).sum(axis=1)
+            for point in ends:
+                t = ((point - base) * vec).sum(axis=1) / norm
+                inside = (t > 0) & (t < 1)
+                cut_seg.append(seg[inside])
+                cut_t.append(t[inside])
+                cut_pt.append(point[inside])
+    seg = np.concatenate(cut_seg)
+    t = np.concatenate(cut_t)
+    pts = np.round(np.concatenate(cut_pt) / GRID).astype(np.int64)
+    order = np.lexsort((t, seg))
+    seg, pts = seg[order], pts[order]
+    same = seg[1:] == seg[:-1]
+    pieces = np.hstack([pts[:-1][same], pts[1:][same]])
+    source = seg[1:][same]
+    keep = (pieces[:, 0] != pieces[:, 2]) | (pieces[:, 1] != pieces[:, 3])
+    return pieces[keep], source[keep]
+
+
+def _stitch(pieces: np.ndarray) -> Region:
+    """Directed pieces (region on the left) -> closed rings, taking the sharpest left turn at shared vertices."""
+    outgoing: Dict[Tuple[int, int], List[int]] = {}
+    for i, (x1, y1, _x2, _y2) in enumerate(pieces.tolist()):
+        outgoing.setdefault((x1, y1), []).append(i)
+    coords = pieces.tolist()
+    used = [False] * len(coords)
+    rings = []
+    for first in range(len(coords)):
+        if used[first]:
+            continue
+        used[first] = True
+        x1, y1, x2, y2 = coords[first]
+        start = (x1, y1)
+        ring = [start]
+        dx, dy = x2 - x1, y2 - y1
+        here = (x2, y2)
+        while here != start:
+            options = [j for j in outgoing.get(here, ()) if not used[j]]
+            if not options:
+                break
+            if len(options) > 1:
+                options.sort(key=lambda j: -math.atan2(dx * (coords[j][3] - coords[j][1]) - dy * (coords[j][2] - coords[j][0]),
+                                                       dx * (coords[j][2] - coords[j][0]) + dy * (coords[j][3] - coords[j][1])))
+            j = options[0]
+            used[j] = True
+            ring.append(here)
+            _, _, nx, ny = coords[j]
+            dx, dy = nx - here[0], ny - here[1]
+            here = (nx, ny)
+        if here == start and len(ring) >= 3:
+            rings.append(_drop_collinear(np.array(ring, dtype=np.int64)))
+    return [r.astype(np.float64) * GRID for r in rings if len(r) >= 3]
+
+
+def _drop_collinear(ring: np.ndarray) -> np.ndarray:
+    while len(ring) >= 3:
+        prev, nxt = np.roll(ring, 1, axis=0), np.roll(ring, -1, axis=0)
+        cross = (ring[:, 0] - prev[:, 0]) * (nxt[:, 1] - ring[:, 1]) - (ring[:, 1] - prev[:, 1]) * (nxt[:, 0] - ring[:, 0])
+        keep = cross != 0
+        if keep.all():
+            break
+        ring = ring[keep]
+    return ring
+
+
+def _sides(pieces: np.ndarray, label: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Winding numbers of every operand on the left and right of each unique
+    piece, exactly: the winding is evaluated at the piece's midpoint in
+    integer coordinates (doubled, so the midpoint is on the grid), where a
+    piece through the point contributes 0. That is the winding just beyond
+    the piece along the ray; the other side differs by the piece's own
+    copies. Horizontal pieces are evaluated with x and y swapped, which
+    mirrors the plane and negates every winding number.
+    """
+    canon = pieces.copy()
+    swap = (canon[:, 0] > canon[:, 2]) | ((canon[:, 0] == canon[:, 2]) & (canon[:, 1] > canon[:, 3]))
+    canon[swap] = canon[swap][:, [2, 3, 0, 1]]
+    unique, inverse = np.unique(canon, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    m = len(unique)
+    flat = unique[:, 1] == unique[:, 3]
+    left = np.zeros((m, k), dtype=np.int64)
+    right = np.zeros((m, k), dtype=np.int64)
+    for swapped, rows in ((False, ~flat), (True, flat)):
+        if not rows.any():
+            continue
+        cols = [1, 0, 3, 2] if swapped else [0, 1, 2, 3]
+        sign = -1 if swapped else 1
+        u = unique[rows][:, cols]
+        mid = u[:, :2] + u[:, 2:]
+        own = np.zeros((m, k), dtype=np.int64)
+        directed = pieces[:, cols]
+        step = np.sign(directed[:, 3] - directed[:, 1])       # copies of the piece: +1 going up
+        np.add.at(own, (inverse, label), step)
+        own = own[rows]
+        beyond = np.stack([_winding(mid, 2 * directed[label == i]) for i in range(k)], axis=1)
+        before = beyond + own
+        up = (u[:, 3] > u[:, 1])[:, None]                      # canonical direction, in the evaluated frame
+        # Walking up, the +x side is on the right; mirrored frames swap both the sides and the signs
+        left[rows] = sign * np.where(up != swapped, before, beyond)
+        right[rows] = sign * np.where(up != swapped, beyond, before)
+    return unique, left, right
+
+
+def boolean(operands: Sequence[Region], rule: Callable[[np.ndarray], np.ndarray]) -> Region:
+    """
+    General boolean operation: rule maps an (m, k) matrix of "inside operand
+    k" (winding number > 0) to the m results.
+    """
+    groups = [_segments(op) for op in operands]
+    segs = np.concatenate(groups) if groups else np.empty((0, 4))
+    if not len(segs):
+        return []
+    pieces, source = _split(segs)
+    if not len(pieces):
+        return []
+    label = np.repeat(np.arange(len(groups)), [len(g) for g in groups])[source]
+    unique, left, right = _sides(pieces, label, len(groups))
+    in_left, in_right = rule(left > 0), rule(right > 0)
+    keep = in_left != in_right
+    directed = np.where(in_right[:, None], unique[:, [2, 3, 0, 1]], unique)[keep]
+    return _stitch(directed)
+
+
+def union(*regions: Region) -> Region:
+    return boolean([[r for region in regions for r in region]], lambda m: m[:, 0])
+
+
+def intersection(a: Region, b: Region) -> Region:
+    if not a or not b:
+        return []
+    return boolean([a, b], lambda m: m[:, 0] & m[:, 1])
+
+
+def difference(a: Region, b: Region) -> Region:
+    if not b:
+        return list(a)
+    return boolean([a, b], lambda m: m[:, 0] & ~m[:, 1])
+
+
+def polygons(region: Region) -> List[Tuple[np.ndarray, Region]]:
+    """(outer, holes) per island; each hole goes to the smallest outer containing it."""
+    outers = sorted((r for r in region if signed_area(r) > 0), key=signed_area)
+    holes = [r for r in region if signed_area(r) <= 0]
+    result = [(o, []) for o in outers]
+    if not holes or not outers:
+        return result
+    # One stabbing pass for all holes against all outers, keyed by (hole, outer)
+    parts = [_segments([o]) for o in outers]
+    label = np.repeat(np.arange(len(outers)), [len(part) for part in parts])
+    keys, weights = [], []
+    for pi, edge, contrib in _crossings(np.array([h[0] for h in holes]), np.concatenate(parts)):
+        keys.append(pi * len(outers) + label[edge])
+        weights.append(contrib)
+    if keys:
+        key, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+        inside = key[np.bincount(inverse, weights=np.concatenate(weights)) != 0]
+        hole, first = np.unique(inside // len(outers), return_index=True)      # key order: smallest outer first
+        for h, o in zip(hole, inside[first] % len(outers)):
+            result[o][1].append(holes[h])
+    return result
+
+
+def contains(region: Region, points: np.ndarray) -> np.ndarray:
+    return _winding(np.asarray(points, dtype=np.float64).reshape(-1, 2), _segments(region)) > 0
+
+
+# === Zone outlines ===========================================================
+
+def board_region(edges: Sequence[Graphic], inset: float = 0.0) -> Region:
+    """The board area from Edge.Cuts, shrunk by inset mm (empty if no closed contour)."""
+    rings = edge_contours(edges).rings
+    if not rings:
+        return []
+    return offset(union(rings), -inset) if inset else union(rings)
+
+
+def keepout_region(zones: Sequence[Zone], layer: str) -> Region:
+    """Copper-pour keep-outs on layer (board rule areas and footprint keep-outs)."""
+    return union([orient(_ring(z.outline)) for z in zones
+                  if z.keepout and z.pour_keepout and layer in z.layers and len(z.outline) >= 3])
+
+
+def zone_outline(edges: Sequence[Graphic], keepouts: Sequence[Zone], layers: Sequence[str],
+                 clearance: float) -> Region:
+    """
+    Board contour inset by clearance, minus pour keep-outs, unioned across
+    layers. Keep-outs on only some of the layers do not cut the outline;
+    the zone filler keeps copper out of them per layer.
+    """
+    inset = board_region(edges, clearance)
+    if not inset:
+        return []
+    return union(*(difference(inset, keepout_region(keepouts, layer)) for layer in layers))
+
+
+def board_zone_outline(board: Board, layers: Sequence[str], clearance: float) -> Region:
+    return zone_outline(board.edges(), board.zones, layers, clearance)
+
+
+def edge_change_affects(outline: Sequence[Tuple[float, float]], before: Sequence[Graphic],
+                        after: Sequence[Graphic], clearance: float) -> bool:
+    """Does an Edge.Cuts change alter what a zone with this outline may fill?"""
+    zone = union([orient(_ring(outline))])
+    if not zone:
+        return False
+    old = intersection(zone, board_region(before, clearance))
+    new = intersection(zone, board_region(after, clearance))
+    changed = union(difference(old, new), difference(new, old))
+    return abs(area(changed)) > GRID
+
+
+# === Fill estimate ===========================================================
+
+class FillEstimate(NamedTuple):
+    uuid: str
+    net: str
+    layer: str
+    area: float              # mm² of predicted copper
+    islands: int
+    isolated: int            # islands without a same-net pad, via or track
+    stored_area: float       # mm² of the fill in the file
+    stored_islands: int
+    seconds: float
+
+    @property
+    def verdict(self) -> str:
+        if not self.stored_islands:
+            return "unfilled" if self.islands else "empty"
+        if self.islands != self.stored_islands:
+            return "islands differ"
+        if abs(self.area - self.stored_area) > AREA_TOLERANCE * max(self.area, self.stored_area):
+            return "area differs"
+        return "current"
+
+    @property
+    def needs_refill(self) -> bool:
+        return self.verdict not in ("current", "empty")
+
+
+def _thermal(pad: Pad, zone: Zone) -> bool:
+    if zone.pad_connection == "thermal":
+        return True
+    return zone.pad_connection == "thru_hole_only" and pad.kind == "thru_hole"
+
+
+def _obstacles(board: Board, zone: Zone, layer: str, rules) -> Tuple[Region, np.ndarray]:
+    """Copper the fill must avoid, and probe points of same-net items for island connectivity."""
+    rings: Region = []
+    probes: List[Tuple[float, float]] = []
+    for pad in board.pads:
+        if layer not in pad.layers:
+            continue
+        if pad.net == zone.net and pad.net:
+            if zone.pad_connection == "none":
+                rings.append(pad_ring(pad, zone.clearance))
+            elif _thermal(pad, zone):
+                gap = zone.thermal_gap or zone.clearance
+                ring = pad_ring(pad, gap)
+                rings.append(ring)
+                probes.extend(map(tuple, pad_ring(pad, gap + _SPOKE_PROBE)))
+            else:
+                probes.append((pad.x, pad.y))
+            continue
+        rings.append(pad_ring(pad, max(zone.clearance, rules.clearance(zone.net, pad.net))))
+    for t in board.tracks:
+        if t.layer != layer:
+            continue
+        pts = arc_points((t.x1, t.y1), t.mid, (t.x2, t.y2)) if t.mid else np.array([(t.x1, t.y1), (t.x2, t.y2)])
+        if t.net == zone.net and t.net:
+            probes.extend(map(tuple, pts))
+            continue
+        r = t.width / 2 + max(zone.clearance, rules.clearance(zone.net, t.net))
+        rings.extend(stadium(x1, y1, x2, y2, r) for (x1, y1), (x2, y2) in zip(pts[:-1], pts[1:]))
+    for v in board.vias:
+        if layer not in v.layers:
+            continue
+        if v.net == zone.net and v.net:
+            probes.append((v.x, v.y))
+            continue
+        rings.append(circle(v.x, v.y, v.size / 2 + max(zone.clearance, rules.clearance(zone.net, v.net))))
+    for other in board.zones:
+        if (other.keepout or other is zone or other.net == zone.net or layer not in other.layers
+                or other.priority <= zone.priority or len(other.outline) < 3):
+            continue
+        rings.extend(offset([orient(_ring(other.outline))], max(zone.clearance, other.clearance)))
+    return rings, np.array(probes, dtype=np.float64).reshape(-1, 2)
+
+
+def estimate(board: Board, zone: Zone, layer: Optional[str] = None, rules=None) -> FillEstimate:
+    """Predict the fill of zone on layer (default: its first layer) and compare with the stored fill."""
+    from vikingboard_spatial import DesignRules
+
+    t0 = time.perf_counter()
+    layer = layer or (zone.layers[0] if zone.layers else "")
+    rules = rules or DesignRules.load()
+    region = union([orient(_ring(zone.outline))]) if len(zone.outline) >= 3 else []
+    edge = board_region(board.edges(), max(rules.edge_clearance, zone.clearance))
+    if edge:
+        region = intersection(region, edge)
+    region = difference(region, keepout_region(board.zones, layer))
+    if region:
+        x0, y0, x1, y1 = bounds(region)
+        obstacles, probes = _obstacles(board, zone, layer, rules)
+        near = [r for r in obstacles if r[:, 0].max() >= x0 and r[:, 0].min() <= x1
+                and r[:, 1].max() >= y0 and r[:, 1].min() <= y1]
+        region = difference(region, union(near))
+        if zone.min_thickness > 0 and region:
+            region = offset(offset(region, -zone.min_thickness / 2), zone.min_thickness / 2)
+    else:
+        probes = np.empty((0, 2))
+    islands = polygons(region)
+    isolated = sum(1 for outer, holes in islands if not contains([outer] + holes, probes).any())
+    if zone.island_removal == 0:
+        kept = [(o, h) for o, h in islands if contains([o] + h, probes).any()]
+        region = [r for o, h in kept for r in [o] + h]
+        islands = kept
+    stored = [pts for fill_layer, pts in zone.fills if fill_layer == layer and len(pts) >= 3]
+    return FillEstimate(
+        zone.uuid, zone.net, layer, area(region), len(islands), isolated,
+        sum(abs(signed_area(_ring(pts))) for pts in stored), len(stored), time.perf_counter() - t0,
+    )
+
+
+# === CLI =====================================================================
+
+def _print_region(region: Region) -> None:
+    for i, (outer, holes) in enumerate(polygons(region), 1):
+        print(f"  Polygon {i}: {len(outer)} corners, {signed_area(outer) + sum(map(signed_area, holes)):.1f} mm², "
+              f"{len(holes)} hole(s)")
+        for x, y in outer:
+            print(f"    ({x:.4f}, {y:.4f})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Derive zone outlines from Edge.Cuts and estimate zone fills")
+    parser.add_argument("--board", type=Path, default=DEFAULT_PCB)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("outline", help="zone outline derived from Edge.Cuts and keep-outs")
+    p.add_argument("--layer", action="append", default=None, help="copper layer (repeat to union; default B.Cu)")
+    p.add_argument("--clearance", type=float, default=None, help="inset in mm (default: GND net class clearance)")
+    p.add_argument("--net", default="GND", help="net for the default clearance")
+    p = sub.add_parser("estimate", help="predicted fill of every zone vs the fill stored in the file")
+    p.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    if not args.board.exists():
+        print(f"❌ Board not found: {args.board}")
+        return 2
+    board = load_board(args.board)
+
+    if args.cmd == "outline":
+        from vikingboard_spatial import DesignRules
+
+        contours = edge_contours(board.edges())
+        if not contours.rings:
+            print(f"❌ No closed Edge.Cuts contour ({len(board.edges())} shapes, {contours.open_chains} open chain(s))")
+            return 1
+        if contours.open_chains:
+            print(f"⚠️  {contours.open_chains} open Edge.Cuts chain(s) ignored")
+        layers = args.layer or ["B.Cu"]
+        clearance = args.clearance if args.clearance is not None else DesignRules.load().clearance(args.net)
+        t0 = time.perf_counter()
+        region = board_zone_outline(board, layers, clearance)
+        print(f"📋 {'+'.join(layers)} outline, inset {clearance:g} mm ({(time.perf_counter() - t0) * 1000:.1f} ms):")
+        _print_region(region)
+        return 0
+
+    results = [estimate(board, zone, layer) for zone in board.zones if not zone.keepout for layer in zone.layers]
+    if args.json:
+        print(json.dumps([dict(r._asdict(), verdict=r.verdict) for r in results], indent=2))
+    else:
+        print(f"📋 {len(results)} zone fill(s) in {args.board.name}")
+        for r in results:
+            mark = "⚠️ " if r.needs_refill else "✅"
+            print(f"  {mark} {r.net or '(no net)':<10} {r.layer:<6} {r.uuid[:8]}  estimate {r.area:8.1f} mm² "
+                  f"/ {r.islands} island(s)  stored {r.stored_area:8.1f} mm² / {r.stored_islands}  "
+                  f"-> {r.verdict} ({r.seconds * 1000:.0f} ms)")
+            if r.isolated:
+                print(f"       {r.isolated} isolated island(s) before island removal")
+    return 1 if any(r.needs_refill for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,52 +1,414 @@
 #!/usr/bin/env python3
 """
-vikingboard_sch_generate.py - Minimal schematic generator for VikingBoard.
+vikingboard_sch_generate.py - Schematic generator for VikingBoard.
 
-- Leser vikingboard_spec.get_all_pins()
-- Lager en enkel .kicad_sch med stub-symboler for J1, J3, U1..U8
-  og tekstlabels for alle nets.
+- Leser den kompilerte spec-en (vikingboard_specdb) og footprints fra PCB-en
+- Bruker ekte symboler fra kicad/libraries/vikingboard_components.kicad_sym
+  når symbolet har alle padene spec-en krever; ellers lages et enkelt
+  boks-symbol (vikingboard_auto:Box_N) slik at ingen pinner mistes.
+  Begrensning: på dagens brett kommer 0 av 9 symboler fra biblioteket.
+  Footprintene er generiske pin headers med verdier (DRV2605LDGS, SX1276,
+  Conn_02x09_Odd_Even, ...) som ikke finnes i vikingboard_components, og
+  ESP32-WROOM-32E-symbolet mangler pad 4 og 5 som spec-ens U1 bruker. Alle
+  blir Box_N til biblioteket får symboler med de padene
+- Én global label per pinne, plassert på pinnens koblingspunkt, så
+  nettene faktisk henger sammen i ERC/netlist
+- Komponentene pakkes i hyller (shelf packing) på et 2.54 mm grid, inkludert
+  plass til labels, så ingenting overlapper. Minste papirstørrelse som får
+  plass velges (A4..A0, ellers User)
+- Filen strømmes rett til disk; en uendret fil blir ikke skrevet på nytt
+
+Usage:
+    python tools/vikingboard_sch_generate.py
+    python tools/vikingboard_sch_generate.py --symbol U1=ESP32-WROOM-32E -o /tmp/test.kicad_sch
+    python tools/vikingboard_sch_generate.py --bench 2000
 """
 
+import argparse
+import filecmp
+import math
+import os
+import sys
+import tempfile
+import time
+import uuid
 from pathlib import Path
-from typing import Set
-from vikingboard_spec import get_all_pins  # forutsetter at denne finnes
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+from vikingboard_board import load_board
+from vikingboard_sexpr import Node, QStr, dumps, load, quote
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 SCH_PATH = REPO_ROOT / "kicad" / "Vikingboard_auto.kicad_sch"
+PCB_PATH = REPO_ROOT / "kicad" / "Vikingboard.kicad_pcb"
+LIB_PATH = REPO_ROOT / "kicad" / "libraries" / "vikingboard_components.kicad_sym"
+LIB_NICK = "vikingboard_components"
+AUTO_NICK = "vikingboard_auto"
+PROJECT = "Vikingboard"
+
+GRID = 2.54
+MARGIN = 12.7          # sheet border
+GAP = 5.08             # between placed components
+CHAR_W = 1.0           # approx. width of one 1.27 mm label character
+FONT = "(effects (font (size 1.27 1.27)))"
+
+# (name, width, height) in mm, landscape
+PAPERS = [("A4", 297, 210), ("A3", 420, 297), ("A2", 594, 420), ("A1", 841, 594), ("A0", 1189, 841)]
+
+NAMESPACE = uuid.UUID("6f1c1a52-7a1e-4f55-9d38-5a0b1c0ffee0")
+
+PinDef = Tuple[str, str, float, float, int]     # number, name, x, y (lib coords, y up), angle
+
+
+class Symbol(NamedTuple):
+    lib_id: str
+    value: str
+    footprint: str
+    pins: Dict[str, PinDef]
+    text: str            # the (symbol "lib_id" ...) block for lib_symbols
+
+
+class Placed(NamedTuple):
+    ref: str
+    symbol: Symbol
+    x: float
+    y: float
+    value: str
+    footprint: str
+    nets: List[Tuple[str, str]]          # (pad, net)
+    top: float                           # bbox relative to (x, y), schematic coords
+    bottom: float
+
+
+# === Symbols =================================================================
+
+def _fmt(v: float) -> str:
+    return f"{round(v, 4):g}"
+
+
+def load_library(path: Path = LIB_PATH, nick: str = LIB_NICK) -> Dict[str, Symbol]:
+    """Parse a .kicad_sym and return {symbol name: Symbol} with lib_ids prefixed by nick."""
+    if not path.exists():
+        return {}
+    symbols = {}
+    for node in load(path).find_all("symbol"):
+        name = node.arg(0, "")
+        lib_id = f"{nick}:{name}"
+        pins = {}
+        for pin in node.walk("pin"):
+            at = pin.xy("at") or (0.0, 0.0, 0.0)
+            number = pin.find("number").arg(0, "") if pin.find("number") is not None else ""
+            pname = pin.find("name").arg(0, "~") if pin.find("name") is not None else "~"
+            pins[number] = (number, pname, at[0], at[1], int(at[2]) if len(at) > 2 else 0)
+        renamed = Node("symbol", [QStr(lib_id)] + node.items[1:])
+        text = "\n".join("  " + line for line in dumps(renamed, indent="  ").splitlines())
+        symbols[name] = Symbol(lib_id, node.property("Value", name), node.property("Footprint", ""), pins, text)
+    return symbols
+
+
+def box_symbol(pads: Sequence[str]) -> Symbol:
+    """Generated rectangle: first half of the pads on the left, the rest on the right."""
+    n = len(pads)
+    if list(pads) == [str(i) for i in range(1, n + 1)]:
+        name = f"Box_{n}"
+    else:
+        name = f"Box_{n}_{uuid.uuid5(NAMESPACE, '/'.join(pads)).hex[:6]}"
+    lib_id = f"{AUTO_NICK}:{name}"
+    left = (n + 1) // 2
+    rows = max(left, n - left)
+    half_w = 5.08
+    top = (rows - 1) * GRID / 2
+    top = math.ceil(top / GRID) * GRID
+    pins: Dict[str, PinDef] = {}
+    lines = [f"  (symbol {quote(lib_id)} (pin_names (offset 1.016)) (exclude_from_sim no) (in_bom yes) (on_board yes)",
+             f'    (property "Reference" "U" (at 0 {_fmt(top + 2 * GRID)} 0) {FONT})',
+             f'    (property "Value" {quote(name)} (at 0 {_fmt(top - rows * GRID - GRID)} 0) {FONT})',
+             f'    (symbol "{name}_0_1"',
+             f"      (rectangle (start {_fmt(-half_w)} {_fmt(top + GRID)}) (end {_fmt(half_w)} {_fmt(top - rows * GRID)})"
+             f" (stroke (width 0.254) (type default)) (fill (type background)))",
+             "    )",
+             f'    (symbol "{name}_1_1"']
+    for i, pad in enumerate(pads):
+        if i < left:
+            x, y, angle = -half_w - GRID, top - i * GRID, 0
+        else:
+            x, y, angle = half_w + GRID, top - (i - left) * GRID, 180
+        pins[pad] = (pad, "~", x, y, angle)
+        lines.append(f"      (pin passive line (at {_fmt(x)} {_fmt(y)} {angle}) (length 2.54)"
+                     f" (name \"~\" {FONT}) (number {quote(pad)} {FONT}))")
+    lines += ["    )", "  )"]
+    return Symbol(lib_id, name, "", pins, "\n".join(lines))
+
+
+def choose_symbol(ref: str, pads: Sequence[str], names: Iterable[str],
+                  library: Dict[str, Symbol], cache: Dict[Tuple[str, ...], Symbol]) -> Tuple[Symbol, str]:
+    """First library symbol (by candidate name) that has every pad; else a generated box."""
+    for name in names:
+        sym = library.get(name)
+        if sym is None:
+            continue
+        missing = [p for p in pads if p not in sym.pins]
+        if not missing:
+            return sym, "lib"
+        reason = f"{name} mangler pad {', '.join(missing)}"
+        break
+    else:
+        reason = "ingen passende bibliotekssymbol"
+    key = tuple(pads)
+    if key not in cache:
+        cache[key] = box_symbol(pads)
+    return cache[key], reason
+
+
+# === Placement ===============================================================
+
+_LABEL_DIR = {0: (-1, 0), 180: (1, 0), 90: (0, 1), 270: (0, -1)}
+
+
+def symbol_box(symbol: Symbol, nets: Sequence[Tuple[str, str]]) -> Tuple[float, float, float, float]:
+    """Bounding box (x0, y0, x1, y1) relative to the symbol anchor, labels included."""
+    xs, ys = [-GRID, GRID], [-GRID, GRID]
+    for pad, net in nets:
+        _, _, px, py, angle = symbol.pins[pad]
+        sx, sy = px, -py
+        dx, dy = _LABEL_DIR.get(angle % 360, (-1, 0))
+        length = len(net) * CHAR_W + 2.5
+        xs += [sx, sx + dx * length]
+        ys += [sy, sy + dy * length]
+        if dx:
+            ys += [sy - 1, sy + 1]
+        else:
+            xs += [sx - 1, sx + 1]
+    # Reference above, Value below
+    return min(xs), min(ys) - 2 * GRID, max(xs), max(ys) + 2 * GRID
+
+
+def _snap_up(v: float) -> float:
+    return math.ceil(v / GRID - 1e-9) * GRID
+
+
+def pack(boxes: Sequence[Tuple[float, float, float, float]], width: float) -> Tuple[List[Tuple[float, float]], float, float]:
+    """
+    Shelf packing, tallest first. Returns anchor positions (same order as
+    boxes, relative to the sheet's inner origin) and the used width/height.
+    """
+    order = sorted(range(len(boxes)), key=lambda i: -(boxes[i][3] - boxes[i][1]))
+    anchors: List[Tuple[float, float]] = [(0.0, 0.0)] * len(boxes)
+    x = y = shelf_h = used_w = 0.0
+    for i in order:
+        x0, y0, x1, y1 = boxes[i]
+        w, h = x1 - x0, y1 - y0
+        if x > 0 and x + w > width:
+            y += shelf_h + GAP
+            x = shelf_h = 0.0
+        ax, ay = _snap_up(x - x0), _snap_up(y - y0)
+        anchors[i] = (ax, ay)
+        x = ax + x1 + GAP
+        shelf_h = max(shelf_h, ay + y1 - y)
+        used_w = max(used_w, ax + x1)
+    return anchors, used_w, y + shelf_h
+
+
+def place(items: Sequence[Tuple[str, Symbol, str, str, List[Tuple[str, str]]]]) -> Tuple[List[Placed], Tuple[str, float, float]]:
+    """Pick the smallest paper the shelves fit on and place every component."""
+    boxes = [symbol_box(sym, nets) for _, sym, _, _, nets in items]
+    paper = None
+    for name, pw, ph in PAPERS:
+        anchors, used_w, used_h = pack(boxes, pw - 2 * MARGIN)
+        if used_w <= pw - 2 * MARGIN and used_h <= ph - 2 * MARGIN:
+            paper = (name, pw, ph)
+            break
+    if paper is None:
+        area = sum((b[2] - b[0] + GAP) * (b[3] - b[1] + GAP) for b in boxes)
+        anchors, used_w, used_h = pack(boxes, max(math.sqrt(area * 1.4), max(b[2] - b[0] for b in boxes)))
+        paper = ("User", _snap_up(used_w + 2 * MARGIN), _snap_up(used_h + 2 * MARGIN))
+    placed = []
+    for (ref, sym, value, fp, nets), (ax, ay), box in zip(items, anchors, boxes):
+        placed.append(Placed(ref, sym, MARGIN + ax, MARGIN + ay, value, fp, nets, box[1], box[3]))
+    return placed, paper
+
+
+# === Writer ==================================================================
+
+_JUSTIFY = {0: "right", 180: "left", 90: "left", 270: "right"}
+_LABEL_ANGLE = {0: 180, 180: 0, 90: 270, 270: 90}
+
+
+def _uid(*parts: str) -> str:
+    return str(uuid.uuid5(NAMESPACE, "/".join(parts)))
+
+
+def write_schematic(out: TextIO, placed: Sequence[Placed], paper: Tuple[str, float, float],
+                    title: str = "VikingBoard (auto)") -> None:
+    """Stream a complete .kicad_sch to out, one element at a time."""
+    w = out.write
+    root = _uid("root", title)
+    name, pw, ph = paper
+    w("(kicad_sch\n  (version 20231120)\n  (generator \"vikingboard_sch_generate\")\n  (generator_version \"1.0\")\n")
+    w(f"  (uuid \"{root}\")\n")
+    w(f"  (paper \"{name}\")\n" if name != "User" else f"  (paper \"User\" {_fmt(pw)} {_fmt(ph)})\n")
+    w(f"  (title_block\n    (title {quote(title)})\n    (company \"VikingBoard Project\")\n  )\n")
+
+    w("  (lib_symbols\n")
+    seen = set()
+    for p in placed:
+        if p.symbol.lib_id not in seen:
+            seen.add(p.symbol.lib_id)
+            w(p.symbol.text)
+            w("\n")
+    w("  )\n")
+
+    path = f"/{root}"
+    for p in placed:
+        x, y = _fmt(p.x), _fmt(p.y)
+        ref_q = quote(p.ref)
+        w(f"  (symbol (lib_id {quote(p.symbol.lib_id)}) (at {x} {y} 0) (unit 1)"
+          f" (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)\n")
+        w(f"    (uuid \"{_uid(p.ref)}\")\n")
+        w(f"    (property \"Reference\" {ref_q} (at {x} {_fmt(p.y + p.top + GRID)} 0) {FONT})\n")
+        w(f"    (property \"Value\" {quote(p.value)} (at {x} {_fmt(p.y + p.bottom - GRID)} 0) {FONT})\n")
+        w(f"    (property \"Footprint\" {quote(p.footprint)} (at {x} {y} 0)"
+          f" (effects (font (size 1.27 1.27)) (hide yes)))\n")
+        w(f"    (property \"Datasheet\" \"\" (at {x} {y} 0) (effects (font (size 1.27 1.27)) (hide yes)))\n")
+        for number in p.symbol.pins:
+            w(f"    (pin {quote(number)} (uuid \"{_uid(p.ref, 'pin', number)}\"))\n")
+        w(f"    (instances (project \"{PROJECT}\" (path \"{path}\" (reference {ref_q}) (unit 1))))\n  )\n")
+
+    for p in placed:
+        pins = p.symbol.pins
+        for pad, net in p.nets:
+            _, _, px, py, angle = pins[pad]
+            angle %= 360
+            lx, ly = _fmt(p.x + px), _fmt(p.y - py)
+            la = _LABEL_ANGLE.get(angle, 180)
+            just = _JUSTIFY.get(angle, "right")
+            w(f"  (global_label {quote(net)} (shape bidirectional) (at {lx} {ly} {la}) (fields_autoplaced yes)"
+              f" (effects (font (size 1.27 1.27)) (justify {just}))\n")
+            w(f"    (uuid \"{_uid(p.ref, pad, net)}\")\n")
+            w(f"    (property \"Intersheetrefs\" \"${{INTERSHEET_REFS}}\" (at {lx} {ly} 0)"
+              f" (effects (font (size 1.27 1.27)) (justify {just}) (hide yes)))\n  )\n")
+
+    w(f"  (sheet_instances (path \"/\" (page \"1\")))\n)\n")
+
+
+def generate(path: Path, placed: Sequence[Placed], paper: Tuple[str, float, float]) -> bool:
+    """Stream to a temp file next to path; replace only if the content changed."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mask = os.umask(0)
+    os.umask(mask)
+    mode = path.stat().st_mode & 0o777 if path.exists() else 0o666 & ~mask
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+            write_schematic(f, placed, paper)
+        if path.exists() and filecmp.cmp(tmp, path, shallow=False):
+            os.unlink(tmp)
+            return False
+        os.chmod(tmp, mode)             # mkstemp creates 0600
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return True
+
+
+# === Spec -> items ===========================================================
+
+def build_items(rows: Iterable[Tuple[str, str, str]], library: Dict[str, Symbol],
+                parts: Optional[Dict[str, str]] = None, footprints: Optional[Dict[str, Tuple[str, str]]] = None,
+                overrides: Optional[Dict[str, str]] = None, verbose: bool = False):
+    """Group spec rows by ref and resolve a symbol for each."""
+    parts = parts or {}
+    footprints = footprints or {}
+    overrides = overrides or {}
+    by_ref: Dict[str, List[Tuple[str, str]]] = {}
+    for ref, pad, net in rows:
+        by_ref.setdefault(ref, []).append((str(pad), net))
+    cache: Dict[Tuple[str, ...], Symbol] = {}
+    items, notes = [], []
+    for ref, nets in by_ref.items():
+        pads = list(dict.fromkeys(pad for pad, _ in nets))
+        fp_id, fp_value = footprints.get(ref, ("", ""))
+        candidates = [n for n in (overrides.get(ref), parts.get(ref), fp_value) if n]
+        sym, how = choose_symbol(ref, pads, candidates, library, cache)
+        if how != "lib":
+            notes.append(f"{ref}: {how} -> {sym.lib_id}")
+        value = parts.get(ref) or fp_value or sym.value
+        items.append((ref, sym, value, fp_id or sym.footprint, nets))
+    if verbose:
+        for note in notes:
+            print(f"   {note}")
+    return items, notes
+
+
+# === CLI =====================================================================
+
+def run_benchmark(count: int) -> None:
+    import tempfile
+
+    library = load_library()
+    names = [n for n, s in library.items() if len(s.pins) >= 3] or ["Box"]
+    rows = []
+    for i in range(count):
+        name = names[i % len(names)]
+        sym = library.get(name)
+        pads = list(sym.pins) if sym else [str(k) for k in range(1, 9)]
+        for k, pad in enumerate(pads):
+            rows.append((f"U{i + 1}", pad, f"NET_{(i * 7 + k) % (count // 2 + 1)}"))
+    parts = {f"U{i + 1}": names[i % len(names)] for i in range(count)}
+    t0 = time.perf_counter()
+    items, _ = build_items(rows, library, parts)
+    t1 = time.perf_counter()
+    placed, paper = place(items)
+    t2 = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "bench.kicad_sch"
+        generate(out, placed, paper)
+        t3 = time.perf_counter()
+        size = out.stat().st_size
+    print(f"Symbols   : {count} ({len(rows)} labels), paper {paper[0]} {paper[1]:.0f}x{paper[2]:.0f} mm")
+    print(f"Resolve   : {(t1 - t0) * 1000:7.1f} ms")
+    print(f"Place     : {(t2 - t1) * 1000:7.1f} ms")
+    print(f"Write     : {(t3 - t2) * 1000:7.1f} ms ({size / 1024:.0f} KiB)")
+    print(f"Total     : {(t3 - t0) * 1000:7.1f} ms")
 
 
-def main():
-    pins = get_all_pins()
-    refs: Set[str] = set(p.ref for p in pins)
-    nets: Set[str] = set(p.net for p in pins)
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a connected schematic from the VikingBoard spec")
+    parser.add_argument("-o", "--output", type=Path, default=SCH_PATH)
+    parser.add_argument("--pcb", type=Path, default=PCB_PATH, help="read footprint lib_ids/values from this board")
+    parser.add_argument("--symbol", action="append", default=[], metavar="REF=NAME",
+                        help="force a library symbol for a ref")
+    parser.add_argument("--bench", type=int, metavar="N", help="benchmark an N-symbol schematic")
+    args = parser.parse_args(argv)
 
-    lines = []
-    lines.append("(kicad_sch (version 20211014) (generator vikingboard_sch_generate)")
-    lines.append('  (paper "A4")')
+    if args.bench:
+        run_benchmark(args.bench)
+        return 0
 
-    y = 0
-    for ref in sorted(refs):
-        y += 20
-        lines.append('  (symbol (lib_id "Device:Stub")')
-        lines.append(f"    (at 0 {y})")
-        lines.append(f'    (property "Reference" "{ref}" (at 0 {y+2}) (effects (font (size 1.27 1.27))))')
-        lines.append(f'    (property "Value" "{ref}" (at 0 {y+4}) (effects (font (size 1.27 1.27))))')
-        lines.append("  )")
+    from vikingboard_specdb import load_spec
 
-    x = 60
-    y = 0
-    for net in sorted(nets):
-        y += 5
-        lines.append(f'  (text (at {x} {y}) (effects (font (size 1 1)))')
-        lines.append(f'    "{net}"')
-        lines.append("  )")
+    spec = load_spec()
+    parts = {ref: spec.part(ref).name for ref in spec.refs if spec.part(ref).name}
+    footprints = {}
+    if args.pcb.exists():
+        footprints = {fp.ref: (fp.lib_id, fp.value) for fp in load_board(args.pcb).footprints}
+    overrides = dict(s.split("=", 1) for s in args.symbol)
 
-    lines.append(")")
+    library = load_library()
+    items, notes = build_items(spec.rows(), library, parts, footprints, overrides)
+    placed, paper = place(items)
+    changed = generate(args.output, placed, paper)
 
-    SCH_PATH.parent.mkdir(parents=True, exist_ok=True)
-    SCH_PATH.write_text("\n".join(lines), encoding="utf-8")
-    print(f"[INFO] Generated schematic stub at {SCH_PATH}")
+    n_lib = len(items) - len(notes)
+    print(f"[INFO] {len(items)} symbols ({n_lib} from {LIB_NICK}, {len(notes)} generated), "
+          f"{len(spec)} global labels, paper {paper[0]}")
+    for note in notes:
+        print(f"   {note}")
+    print(f"[INFO] {'Generated' if changed else 'Unchanged'} schematic at {args.output}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
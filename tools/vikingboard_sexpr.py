@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+vikingboard_sexpr.py - Pure-Python S-expression reader for KiCad files.
+
+Reads .kicad_pcb, .kicad_sch and the timestamped copies in backups/ without
+importing pcbnew, so it runs on CI runners that have no KiCad install.
+
+Two modes:
+- Tree mode:   load(path) / parse(text) returns a Node tree.
+- Stream mode: iter_events(path) yields (event, value, offset) tuples, and
+               iter_nodes(path, names) builds only the subtrees you ask for.
+               A query like "all footprints with their pads" never builds
+               the whole board in memory.
+
+Usage:
+    python tools/vikingboard_sexpr.py kicad/Vikingboard.kicad_pcb
+    python tools/vikingboard_sexpr.py --bench [--lines 100000]
+"""
+
+import argparse
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PCB = REPO_ROOT / "kicad" / "Vikingboard.kicad_pcb"
+
+# KiCad never writes a raw newline inside a quoted string (it escapes them),
+# so chunks are always cut at a newline and no token spans two chunks.
+CHUNK_SIZE = 1 << 16
+
+OPEN = "open"
+CLOSE = "close"
+ATOM = "atom"
+STRING = "string"
+
+_TOKEN_RE = re.compile(r'(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+)', re.S)
+_ESCAPE_RE = re.compile(r"\\(.)", re.S)
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+_NEEDS_QUOTE_RE = re.compile(r'[\s()"\\]')
+
+Source = Union[str, os.PathLike, IO[str]]
+
+
+class SexprError(ValueError):
+    """Raised when the input is not a well-formed S-expression."""
+
+
+class QStr(str):
+    """A string atom that was quoted in the source ("F.Cu" vs F.Cu)."""
+
+    __slots__ = ()
+
+
+class Node:
+    """
+    One parenthesised list: (name item item ...).
+
+    items holds child Nodes and string atoms in source order. start/end are
+    character offsets of the opening and one past the closing parenthesis.
+    """
+
+    __slots__ = ("name", "items", "start", "end")
+
+    def __init__(self, name: str, items: Optional[list] = None, start: int = -1, end: int = -1):
+        self.name = name
+        self.items = items if items is not None else []
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"Node({self.name!r}, {len(self.items)} items)"
+
+    def __iter__(self) -> Iterator[Union["Node", str]]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __getstate__(self):
+        return (self.name, self.items, self.start, self.end)
+
+    def __setstate__(self, state):
+        self.name, self.items, self.start, self.end = state
+
+    # --- Query helpers ----------------------------------------------------
+
+    @property
+    def atoms(self) -> List[str]:
+        """All direct atom children (positional arguments)."""
+        return [i for i in self.items if not isinstance(i, Node)]
+
+    @property
+    def children(self) -> List["Node"]:
+        """All direct Node children."""
+        return [i for i in self.items if isinstance(i, Node)]
+
+    def find(self, name: str) -> Optional["Node"]:
+        """First direct child node called name, or None."""
+        for i in self.items:
+            if isinstance(i, Node) and i.name == name:
+                return i
+        return None
+
+    def find_all(self, name: str) -> List["Node"]:
+        """All direct child nodes called name."""
+        return [i for i in self.items if isinstance(i, Node) and i.name == name]
+
+    def walk(self, name: Optional[str] = None) -> Iterator["Node"]:
+        """Depth-first walk over this node and all descendants."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if name is None or node.name == name:
+                yield node
+            stack.extend(reversed([i for i in node.items if isinstance(i, Node)]))
+
+    def arg(self, index: int = 0, default: Optional[str] = None) -> Optional[str]:
+        """Positional atom argument number index."""
+        atoms = self.atoms
+        return atoms[index] if index < len(atoms) else default
+
+    def value(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """First atom of the first child called name: (layer "F.Cu") -> "F.Cu"."""
+        child = self.find(name)
+        if child is None:
+            return default
+        return child.arg(0, default)
+
+    def xy(self, name: str = "at") -> Optional[Tuple[float, ...]]:
+        """Numeric arguments of a child like (at 10 20 90) -> (10.0, 20.0, 90.0)."""
+        child = self.find(name)
+        if child is None:
+            return None
+        return tuple(float(a) for a in child.atoms)
+
+    def property(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Value of (property "key" "value" ...) on footprints and symbols."""
+        for child in self.find_all("property"):
+            if child.arg(0) == key:
+                return child.arg(1, default)
+        return default
+
+
+# === Tokenizer ===============================================================
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), text)
+
+
+def quote(text: str) -> str:
+    """Quote a string the way KiCad writes it."""
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+def _open_source(source: Source) -> Tuple[IO[str], bool]:
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "r", encoding="utf-8", newline=""), True
+    return source, False
+
+
+def _iter_chunks(stream: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, str]]:
+    """Yield (offset, text) pieces that always end on a line boundary."""
+    offset = 0
+    tail = ""
+    while True:
+        block = stream.read(chunk_size)
+        if not block:
+            break
+        block = tail + block
+        cut = block.rfind("\n") + 1
+        if cut == 0:
+            tail = block
+            continue
+        yield offset, block[:cut]
+        offset += cut
+        tail = block[cut:]
+    if tail:
+        yield offset, tail
+
+
+def iter_tokens(source: Source) -> Iterator[Tuple[str, str, int]]:
+    """
+    Yield (kind, value, offset) for every token in source.
+
+    kind is one of OPEN, CLOSE, ATOM or STRING. For OPEN and CLOSE the value
+    is the parenthesis itself.
+    """
+    stream, owned = _open_source(source)
+    try:
+        for base, text in _iter_chunks(stream):
+            for m in _TOKEN_RE.finditer(text):
+                group = m.lastindex
+                if group == 1:
+                    yield OPEN, "(", base + m.start()
+                elif group == 2:
+                    yield CLOSE, ")", base + m.start()
+                elif group == 4:
+                    yield ATOM, m.group(4), base + m.start()
+                else:
+                    yield STRING, _unescape(m.group(3)), base + m.start()
+    finally:
+        if owned:
+            stream.close()
+
+
+def iter_events(source: Source) -> Iterator[Tuple[str, str, int]]:
+    """
+    Yield structural events (OPEN, name, offset), (ATOM|STRING, value, offset)
+    and (CLOSE, name, end_offset).
+
+    The head symbol of each list is folded into its OPEN event, so consumers
+    see (OPEN, "footprint", 1234) instead of a bare parenthesis.
+    """
+    names: List[str] = []
+    pending = -1
+    for kind, value, offset in iter_tokens(source):
+        if pending >= 0:
+            if kind not in (ATOM, STRING):
+                raise SexprError(f"List at offset {pending} has no head symbol")
+            names.append(value)
+            yield OPEN, value, pending
+            pending = -1
+        elif kind == OPEN:
+            pending = offset
+        elif kind == CLOSE:
+            if not names:
+                raise SexprError(f"Unbalanced ')' at offset {offset}")
+            yield CLOSE, names.pop(), offset + 1
+        else:
+            yield kind, value, offset
+    if names or pending >= 0:
+        raise SexprError("Unexpected end of input (unclosed list)")
+
+
+# === Tree builder ============================================================
+
+def _build(source: Source) -> List[Node]:
+    # Inlined copy of iter_tokens(): the generator hop costs ~40% on big boards.
+    roots: List[Node] = []
+    stack: List[Node] = []
+    expect_name = False
+    stream, owned = _open_source(source)
+    try:
+        for base, text in _iter_chunks(stream):
+            for m in _TOKEN_RE.finditer(text):
+                group = m.lastindex
+                if expect_name:
+                    if group <= 2:
+                        raise SexprError(f"List at offset {stack[-1].start} has no head symbol")
+                    stack[-1].name = m.group(4) if group == 4 else _unescape(m.group(3))
+                    expect_name = False
+                elif group == 1:
+                    stack.append(Node("", [], base + m.start()))
+                    expect_name = True
+                elif group == 2:
+                    if not stack:
+                        raise SexprError(f"Unbalanced ')' at offset {base + m.start()}")
+                    node = stack.pop()
+                    node.end = base + m.end()
+                    if stack:
+                        stack[-1].items.append(node)
+                    else:
+                        roots.append(node)
+                elif not stack:
+                    raise SexprError(f"Atom outside of any list at offset {base + m.start()}")
+                elif group == 4:
+                    stack[-1].items.append(m.group(4))
+                else:
+                    stack[-1].items.append(QStr(_unescape(m.group(3))))
+    finally:
+        if owned:
+            stream.close()
+    if stack:
+        raise SexprError("Unexpected end of input (unclosed list)")
+    return roots
+
+
+def parse(text: str) -> Node:
+    """Parse a complete S-expression document held in a string."""
+    roots = _build(io.StringIO(text))
+    if len(roots) != 1:
+        raise SexprError(f"Expected exactly one top-level list, found {len(roots)}")
+    return roots[0]
+
+
+def load(path: Union[str, os.PathLike]) -> Node:
+    """Parse a KiCad file (.kicad_pcb, .kicad_sch, .kicad_sym, ...) into a tree."""
+    roots = _build(path)
+    if len(roots) != 1:
+        raise SexprError(f"{path}: expected exactly one top-level list, found {len(roots)}")
+    return roots[0]
+
+
+def iter_nodes(source: Source, names: Iterable[str], max_depth: int = 1) -> Iterator[Node]:
+    """
+    Stream source and yield fully built subtrees for lists called one of names.
+
+    Depth 0 is the root list (kicad_pcb), depth 1 its direct children
+    (footprint, segment, via, zone, ...). Lists deeper than max_depth are
+    never matched, and nothing outside a matched subtree is kept in memory.
+    """
+    wanted = frozenset(names)
+    depth = -1
+    stack: List[Node] = []
+    capture_depth = -1
+    expect_name = False
+    for kind, value, offset in iter_tokens(source):
+        if expect_name:
+            expect_name = False
+            if capture_depth < 0:
+                if depth <= max_depth and value in wanted:
+                    capture_depth = depth
+                    stack.append(Node(value, [], pending))
+            else:
+                stack.append(Node(value, [], pending))
+        elif kind == OPEN:
+            depth += 1
+            pending = offset
+            expect_name = True
+        elif kind == CLOSE:
+            if capture_depth >= 0:
+                node = stack.pop()
+                node.end = offset + 1
+                if depth == capture_depth:
+                    capture_depth = -1
+                    yield node
+                else:
+                    stack[-1].items.append(node)
+            depth -= 1
+        elif capture_depth >= 0:
+            stack[-1].items.append(QStr(value) if kind == STRING else value)
+
+
+def dumps(node: Union[Node, str], indent: str = "\t", _level: int = 0) -> str:
+    """Serialise a tree back to KiCad-style text (one list per line)."""
+    if not isinstance(node, Node):
+        if isinstance(node, QStr) or not node or _NEEDS_QUOTE_RE.search(node):
+            return quote(node)
+        return node
+    pad = indent * _level
+    head = [node.name]
+    nested = []
+    for item in node.items:
+        if isinstance(item, Node):
+            nested.append(dumps(item, indent, _level + 1))
+        elif nested:
+            nested.append(indent * (_level + 1) + dumps(item))
+        else:
+            head.append(dumps(item))
+    if not nested:
+        return f"{pad}({' '.join(head)})"
+    body = "\n".join(nested)
+    return f"{pad}({' '.join(head)}\n{body}\n{pad})"
+
+
+# === Common queries ==========================================================
+
+def iter_footprint_pads(source: Source) -> Iterator[Tuple[str, str, List[Tuple[str, str]]]]:
+    """
+    Stream (reference, lib_id, [(pad_number, net_name), ...]) per footprint.
+
+    Only one footprint subtree is held in memory at a time.
+    """
+    for fp in iter_nodes(source, ("footprint",)):
+        ref = fp.property("Reference")
+        if ref is None:
+            # KiCad 6 and older: (fp_text reference "R1" ...)
+            texts = [t for t in fp.find_all("fp_text") if t.arg(0) == "reference"]
+            ref = texts[0].arg(1, "") if texts else ""
+        pads = []
+        for pad in fp.find_all("pad"):
+            net = pad.find("net")
+            pads.append((pad.arg(0, ""), net.arg(1, "") if net is not None else ""))
+        yield ref, fp.arg(0, ""), pads
+
+
+# === Benchmark ===============================================================
+
+_BENCH_FOOTPRINT = """\t(footprint "Resistor_SMD:R_0805_2012Metric"
+\t\t(layer "F.Cu")
+\t\t(uuid "00000000-0000-0000-0000-{n:012d}")
+\t\t(at {x} {y} 90)
+\t\t(property "Reference" "R{n}"
+\t\t\t(at 0 -1.65 90)
+\t\t\t(layer "F.SilkS")
+\t\t\t(effects
+\t\t\t\t(font
+\t\t\t\t\t(size 1 1)
+\t\t\t\t\t(thickness 0.15)
+\t\t\t\t)
+\t\t\t)
+\t\t)
+\t\t(pad "1" smd roundrect
+\t\t\t(at -0.9125 0 90)
+\t\t\t(size 1.025 1.4)
+\t\t\t(layers "F.Cu" "F.Mask" "F.Paste")
+\t\t\t(net {net_a} "N{net_a}")
+\t\t)
+\t\t(pad "2" smd roundrect
+\t\t\t(at 0.9125 0 90)
+\t\t\t(size 1.025 1.4)
+\t\t\t(layers "F.Cu" "F.Mask" "F.Paste")
+\t\t\t(net {net_b} "N{net_b}")
+\t\t)
+\t)
+"""
+
+_BENCH_SEGMENT = """\t(segment
+\t\t(start {x} {y})
+\t\t(end {x2} {y})
+\t\t(width 0.2)
+\t\t(layer "F.Cu")
+\t\t(net {net})
+\t\t(uuid "10000000-0000-0000-0000-{n:012d}")
+\t)
+"""
+
+
+def write_bench_board(path: Path, lines: int = 100_000, nets: int = 200) -> int:
+    """Write a synthetic board of roughly lines lines; return footprint count."""
+    written = 0
+    footprints = 0
+    with path.open("w", encoding="utf-8") as f:
+        f.write('(kicad_pcb\n\t(version 20241229)\n\t(generator "pcbnew")\n')
+        for n in range(1, nets + 1):
+            f.write(f'\t(net {n} "N{n}")\n')
+        written += nets + 3
+        n = 0
+        while written < lines:
+            n += 1
+            x, y = 10 + (n % 100) * 2.5, 10 + (n // 100) * 2.5
+            if n % 2:
+                footprints += 1
+                text = _BENCH_FOOTPRINT.format(
+                    n=n, x=x, y=y, net_a=n % nets + 1, net_b=(n + 1) % nets + 1
+                )
+            else:
+                text = _BENCH_SEGMENT.format(n=n, x=x, y=y, x2=x + 2, net=n % nets + 1)
+            f.write(text)
+            written += text.count("\n")
+        f.write(")\n")
+    return footprints
+
+
+def run_benchmark(lines: int = 100_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.kicad_pcb"
+        footprints = write_bench_board(path, lines)
+        size_mb = path.stat().st_size / 1e6
+        print(f"[BENCH] Synthetic board: {lines} lines, {footprints} footprints, {size_mb:.1f} MB")
+
+        t0 = time.perf_counter()
+        n_tokens = sum(1 for _ in iter_tokens(path))
+        t1 = time.perf_counter()
+        print(f"[BENCH] tokenize            : {t1 - t0:7.3f} s  ({n_tokens} tokens)")
+
+        t0 = time.perf_counter()
+        root = load(path)
+        t1 = time.perf_counter()
+        print(f"[BENCH] load (full tree)    : {t1 - t0:7.3f} s  ({len(root.items)} top-level items)")
+        del root
+
+        t0 = time.perf_counter()
+        pads = sum(len(p) for _, _, p in iter_footprint_pads(path))
+        t1 = time.perf_counter()
+        print(f"[BENCH] stream footprints   : {t1 - t0:7.3f} s  ({pads} pads)")
+
+
+# === CLI =====================================================================
+
+def summarize(path: Path) -> None:
+    counts = {}
+    for kind, name, _ in iter_events(path):
+        if kind == OPEN:
+            counts[name] = counts.get(name, 0) + 1
+    print(f"[INFO] {path}")
+    for name in ("footprint", "pad", "segment", "arc", "via", "zone", "gr_line", "symbol", "wire", "label"):
+        if counts.get(name):
+            print(f"  {name:<10}: {counts[name]}")
+    if path.suffix == ".kicad_pcb":
+        for ref, lib_id, pads in iter_footprint_pads(path):
+            print(f"  {ref:<6} {lib_id}  ({len(pads)} pads)")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="KiCad S-expression reader")
+    parser.add_argument("file", nargs="?", type=Path, default=DEFAULT_PCB)
+    parser.add_argument("--bench", action="store_true", help="run the synthetic-board benchmark")
+    parser.add_argument("--lines", type=int, default=100_000, help="benchmark board size")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        run_benchmark(args.lines)
+        return
+    if not args.file.exists():
+        print(f"[ERROR] File not found: {args.file}")
+        sys.exit(1)
+    summarize(args.file)
+
+
+if __name__ == "__main__":
+    main()
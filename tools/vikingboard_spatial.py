@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+vikingboard_spatial.py - Spatial index and clearance checks for the board.
+
+An STR-packed R-tree over pads, tracks, vias, zone fill edges, keep-outs
+and Edge.Cuts, built from the parsed .kicad_pcb (vikingboard_board). It is
+bulk-loaded once in O(n log n). Range, radius and nearest-neighbour queries
+then cost O(log n) each, so an all-pairs clearance check stays O(n log n)
+as the board grows.
+
+Clearances come from the net classes in Vikingboard.kicad_pro, not from the
+0.2 mm hardcoded in fix_gnd_clearance.py / connect_gnd_plane.py. A pair of
+nets uses the larger of its two class clearances, as KiCad does. Copper to
+Edge.Cuts uses min_copper_edge_clearance.
+
+Usage:
+    python tools/vikingboard_spatial.py                      # clearance check
+    python tools/vikingboard_spatial.py --near U1.2 --radius 3
+    python tools/vikingboard_spatial.py --box 50,65,70,80 --layer B.Cu
+    python tools/vikingboard_spatial.py --keepouts
+"""
+
+import argparse
+import heapq
+import json
+import math
+import sys
+import time
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from vikingboard_board import DEFAULT_PCB, Board, Pad, Point, load_board, rotate
+
+DEFAULT_PRO = DEFAULT_PCB.with_suffix(".kicad_pro")
+NODE_SIZE = 16
+EDGE = "Edge.Cuts"
+
+Box = Tuple[float, float, float, float]
+Segment = Tuple[float, float, float, float]
+
+
+# === Net classes =============================================================
+
+class NetClass(NamedTuple):
+    name: str
+    clearance: float
+    track_width: float
+    via_diameter: float
+
+
+class DesignRules:
+    """Net classes, patterns and board-level minimums from a .kicad_pro."""
+
+    def __init__(self, classes: Dict[str, NetClass], assignments: Dict[str, str],
+                 patterns: List[Tuple[str, str]], edge_clearance: float, hole_clearance: float):
+        self.classes = classes
+        self.assignments = assignments
+        self.patterns = patterns
+        self.edge_clearance = edge_clearance
+        self.hole_clearance = hole_clearance
+        self._cache: Dict[str, NetClass] = {}
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_PRO) -> "DesignRules":
+        try:
+            pro = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            pro = {}
+        settings = pro.get("net_settings", {})
+        classes = {}
+        for c in settings.get("classes", []) or []:
+            classes[c["name"]] = NetClass(c["name"], float(c.get("clearance", 0.2)),
+                                          float(c.get("track_width", 0.2)), float(c.get("via_diameter", 0.6)))
+        classes.setdefault("Default", NetClass("Default", 0.2, 0.2, 0.6))
+        patterns = [(p["pattern"], p["netclass"]) for p in settings.get("netclass_patterns", []) or []]
+        rules = pro.get("board", {}).get("design_settings", {}).get("rules", {})
+        return cls(classes, settings.get("netclass_assignments") or {}, patterns,
+                   float(rules.get("min_copper_edge_clearance", 0.0)),
+                   float(rules.get("min_hole_clearance", 0.0)))
+
+    def net_class(self, net: str) -> NetClass:
+        nc = self._cache.get(net)
+        if nc is None:
+            name = self.assignments.get(net)
+            if isinstance(name, list):
+                name = name[0] if name else None
+            if name is None:
+                name = next((c for p, c in self.patterns if fnmatchcase(net, p)), "Default")
+            nc = self.classes.get(name, self.classes["Default"])
+            self._cache[net] = nc
+        return nc
+
+    def clearance(self, net_a: str, net_b: str = "") -> float:
+        a = self.net_class(net_a).clearance
+        return a if not net_b else max(a, self.net_class(net_b).clearance)
+
+    @property
+    def max_clearance(self) -> float:
+        return max([c.clearance for c in self.classes.values()] + [self.edge_clearance])
+
+
+# === Shapes ==================================================================
+
+class Entry(NamedTuple):
+    """One indexed object: segments inflated by radius, optionally a solid polygon."""
+    kind: str                       # pad, track, via, zone, keepout, edge
+    label: str
+    net: str
+    layers: Tuple[str, ...]
+    segs: Tuple[Segment, ...]
+    radius: float
+    solid: Tuple[Point, ...]        # filled polygon for containment tests, or ()
+    box: Box
+    extra: float = 0.0              # zone-specific clearance
+
+
+def _seg_box(segs: Sequence[Segment], r: float) -> Box:
+    xs = [c for s in segs for c in (s[0], s[2])]
+    ys = [c for s in segs for c in (s[1], s[3])]
+    return (min(xs) - r, min(ys) - r, max(xs) + r, max(ys) + r)
+
+
+def _ring(points: Sequence[Point]) -> Tuple[Segment, ...]:
+    n = len(points)
+    return tuple((points[i][0], points[i][1], points[(i + 1) % n][0], points[(i + 1) % n][1]) for i in range(n))
+
+
+def pad_entry(pad: Pad, copper: Sequence[str]) -> Entry:
+    layers = tuple(l for l in pad.layers if l in copper)
+    hw, hh = pad.w / 2, pad.h / 2
+    label = f"{pad.ref}.{pad.number}"
+    if pad.shape == "circle":
+        segs = ((pad.x, pad.y, pad.x, pad.y),)
+        return Entry("pad", label, pad.net, layers, segs, hw, (), _seg_box(segs, hw))
+    if pad.shape == "oval":
+        r = min(hw, hh)
+        ax, ay = rotate(hw - r, hh - r, pad.angle)
+        segs = ((pad.x - ax, pad.y - ay, pad.x + ax, pad.y + ay),)
+        return Entry("pad", label, pad.net, layers, segs, r, (), _seg_box(segs, r))
+    corners = []
+    for cx, cy in ((-hw, -hh), (hw, -hh), (hw, hh), (-hw, hh)):
+        dx, dy = rotate(cx, cy, pad.angle)
+        corners.append((pad.x + dx, pad.y + dy))
+    segs = _ring(corners)
+    return Entry("pad", label, pad.net, layers, segs, 0.0, tuple(corners), _seg_box(segs, 0.0))
+
+
+def board_entries(board: Board, zones: bool = True) -> List[Entry]:
+    """Index entries for every copper item, keep-out and board edge."""
+    copper = board.copper
+    entries = [pad_entry(p, copper) for p in board.pads if any(l in copper for l in p.layers)]
+    for t in board.tracks:
+        if t.mid is None:
+            segs = ((t.x1, t.y1, t.x2, t.y2),)
+        else:
+            segs = ((t.x1, t.y1, t.mid[0], t.mid[1]), (t.mid[0], t.mid[1], t.x2, t.y2))
+        r = t.width / 2
+        entries.append(Entry("track", f"track@({t.x1:g},{t.y1:g})", t.net, (t.layer,), segs, r, (), _seg_box(segs, r)))
+    for v in board.vias:
+        segs = ((v.x, v.y, v.x, v.y),)
+        entries.append(Entry("via", f"via@({v.x:g},{v.y:g})", v.net, v.layers, segs, v.size / 2, (),
+                             _seg_box(segs, v.size / 2)))
+    for z in board.zones:
+        if z.keepout:
+            if len(z.outline) >= 3:
+                segs = _ring(z.outline)
+                entries.append(Entry("keepout", f"keepout {z.uuid[:8]}", "", z.layers, segs, 0.0, z.outline,
+                                     _seg_box(segs, 0.0)))
+            continue
+        if not zones:
+            continue
+        # Each fill edge is indexed on its own so a query only touches nearby edges
+        for layer, poly in z.fills:
+            for s in _ring(poly):
+                entries.append(Entry("zone", f"zone [{z.net}]", z.net, (layer,), (s,), 0.0, (),
+                                     _seg_box((s,), 0.0), z.clearance))
+    for g in board.edges():
+        pts = g.points
+        if g.kind == "rect":
+            (x0, y0), (x1, y1) = pts
+            pts = ((x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0))
+        elif g.kind == "circle":
+            (cx, cy), (ex, ey) = pts
+            r = math.hypot(ex - cx, ey - cy)
+            pts = tuple((cx + r * math.cos(a * math.pi / 18), cy + r * math.sin(a * math.pi / 18)) for a in range(37))
+        elif g.kind == "poly":
+            pts = tuple(pts) + (pts[0],)
+        segs = tuple((pts[i][0], pts[i][1], pts[i + 1][0], pts[i + 1][1]) for i in range(len(pts) - 1))
+        if segs:
+            entries.append(Entry("edge", f"{EDGE} {g.kind}", "", (EDGE,), segs, 0.0, (), _seg_box(segs, 0.0)))
+    return entries
+
+
+# === Distances ===============================================================
+
+def _point_seg(px: float, py: float, s: Segment) -> float:
+    x1, y1, x2, y2 = s
+    dx, dy = x2 - x1, y2 - y1
+    l2 = dx * dx + dy * dy
+    t = 0.0 if l2 == 0 else max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / l2))
+    return math.hypot(x1 + t * dx - px, y1 + t * dy - py)
+
+
+def _cross(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> float:
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _seg_seg(a: Segment, b: Segment) -> float:
+    d1 = _cross(a[0], a[1], a[2], a[3], b[0], b[1])
+    d2 = _cross(a[0], a[1], a[2], a[3], b[2], b[3])
+    d3 = _cross(b[0], b[1], b[2], b[3], a[0], a[1])
+    d4 = _cross(b[0], b[1], b[2], b[3], a[2], a[3])
+    if ((d1 > 0) != (d2 > 0)) and ((d3 > 0) != (d4 > 0)) and d1 and d2 and d3 and d4:
+        return 0.0
+    return min(_point_seg(b[0], b[1], a), _point_seg(b[2], b[3], a),
+               _point_seg(a[0], a[1], b), _point_seg(a[2], a[3], b))
+
+
+def _inside(px: float, py: float, poly: Sequence[Point]) -> bool:
+    inside = False
+    j = len(poly) - 1
+    for i in range(len(poly)):
+        xi, yi = poly[i]
+        xj, yj = poly[j]
+        if (yi > py) != (yj > py) and px < xi + (py - yi) * (xj - xi) / (yj - yi):
+            inside = not inside
+        j = i
+    return inside
+
+
+def distance(a: Entry, b: Entry) -> float:
+    """Copper-to-copper gap between two entries (0 when they touch or overlap)."""
+    if a.solid and _inside(b.segs[0][0], b.segs[0][1], a.solid):
+        return 0.0
+    if b.solid and _inside(a.segs[0][0], a.segs[0][1], b.solid):
+        return 0.0
+    d = min(_seg_seg(sa, sb) for sa in a.segs for sb in b.segs)
+    return max(0.0, d - a.radius - b.radius)
+
+
+def point_distance(e: Entry, x: float, y: float) -> float:
+    if e.solid and _inside(x, y, e.solid):
+        return 0.0
+    return max(0.0, min(_point_seg(x, y, s) for s in e.segs) - e.radius)
+
+
+def _box_dist(b: Box, x: float, y: float) -> float:
+    dx = max(b[0] - x, 0.0, x - b[2])
+    dy = max(b[1] - y, 0.0, y - b[3])
+    return math.hypot(dx, dy)
+
+
+# === STR R-tree ==============================================================
+
+class _Node(NamedTuple):
+    box: Box
+    children: list     # child _Nodes, or entry ids at the leaf level
+    leaf: bool
+
+
+def _union(boxes: Iterable[Box]) -> Box:
+    x0, y0, x1, y1 = zip(*boxes)
+    return (min(x0), min(y0), max(x1), max(y1))
+
+
+def _str_pack(items: List[Tuple[Box, object]], leaf: bool, m: int) -> List[_Node]:
+    """Sort-Tile-Recursive packing of (box, payload) into nodes of m."""
+    count = math.ceil(len(items) / m)
+    slabs = max(1, math.ceil(math.sqrt(count)))
+    items = sorted(items, key=lambda it: it[0][0] + it[0][2])
+    per_slab = slabs * m
+    nodes = []
+    for s in range(0, len(items), per_slab):
+        slab = sorted(items[s:s + per_slab], key=lambda it: it[0][1] + it[0][3])
+        for k in range(0, len(slab), m):
+            group = slab[k:k + m]
+            nodes.append(_Node(_union(b for b, _ in group), [p for _, p in group], leaf))
+    return nodes
+
+
+class SpatialIndex:
+    """Static R-tree over Entry objects, bulk-loaded with STR packing."""
+
+    def __init__(self, entries: Sequence[Entry], node_size: int = NODE_SIZE):
+        self.entries = list(entries)
+        self.root: Optional[_Node] = None
+        if not self.entries:
+            return
+        level = _str_pack([(e.box, i) for i, e in enumerate(self.entries)], True, node_size)
+        while len(level) > 1:
+            level = _str_pack([(n.box, n) for n in level], False, node_size)
+        self.root = level[0]
+
+    @classmethod
+    def from_board(cls, board: Board, zones: bool = True) -> "SpatialIndex":
+        return cls(board_entries(board, zones))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _ids_in(self, box: Box) -> Iterator[int]:
+        if self.root is None:
+            return
+        x0, y0, x1, y1 = box
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            b = node.box
+            if b[0] > x1 or b[2] < x0 or b[1] > y1 or b[3] < y0:
+                continue
+            if node.leaf:
+                for i in node.children:
+                    e = self.entries[i].box
+                    if e[0] <= x1 and e[2] >= x0 and e[1] <= y1 and e[3] >= y0:
+                        yield i
+            else:
+                stack.extend(node.children)
+
+    def query(self, box: Box, layer: Optional[str] = None, kinds: Optional[Iterable[str]] = None) -> List[Entry]:
+        """Entries whose bounding box intersects box."""
+        kinds = set(kinds) if kinds else None
+        out = []
+        for i in self._ids_in(box):
+            e = self.entries[i]
+            if layer is not None and layer not in e.layers and EDGE not in e.layers:
+                continue
+            if kinds is not None and e.kind not in kinds:
+                continue
+            out.append(e)
+        return out
+
+    def within(self, x: float, y: float, radius: float, layer: Optional[str] = None) -> List[Tuple[float, Entry]]:
+        """Entries whose copper lies within radius of a point, nearest first."""
+        hits = [(point_distance(e, x, y), e) for e in self.query((x - radius, y - radius, x + radius, y + radius), layer)]
+        return sorted((h for h in hits if h[0] <= radius), key=lambda h: h[0])
+
+    def nearest(self, x: float, y: float, k: int = 1, layer: Optional[str] = None,
+                exclude_net: Optional[str] = None) -> List[Tuple[float, Entry]]:
+        """k nearest entries to a point by best-first search."""
+        if self.root is None:
+            return []
+        heap: list = [(0.0, 0, self.root)]
+        counter = 1
+        out: List[Tuple[float, Entry]] = []
+        while heap and len(out) < k:
+            d, _, item = heapq.heappop(heap)
+            if isinstance(item, Entry):
+                out.append((d, item))
+                continue
+            for child in item.children:
+                if item.leaf:
+                    e = self.entries[child]
+                    if layer is not None and layer not in e.layers:
+                        continue
+                    if exclude_net is not None and e.net == exclude_net:
+                        continue
+                    heapq.heappush(heap, (point_distance(e, x, y), counter, e))
+                else:
+                    heapq.heappush(heap, (_box_dist(child.box, x, y), counter, child))
+                counter += 1
+        return out
+
+    def query_many(self, boxes: Sequence[Box], layer: Optional[str] = None) -> List[List[Entry]]:
+        return [self.query(b, layer) for b in boxes]
+
+    def nearest_many(self, points: Sequence[Point], k: int = 1, layer: Optional[str] = None) -> List[List[Tuple[float, Entry]]]:
+        return [self.nearest(x, y, k, layer) for x, y in points]
+
+
+# === Checks ==================================================================
+
+class Violation(NamedTuple):
+    a: Entry
+    b: Entry
+    layer: str
+    actual: float
+    required: float
+
+
+def _required(a: Entry, b: Entry, rules: DesignRules) -> Optional[float]:
+    if a.kind == "edge" or b.kind == "edge":
+        other = b if a.kind == "edge" else a
+        return None if other.kind in ("edge", "keepout") else rules.edge_clearance
+    if a.kind == "keepout" or b.kind == "keepout":
+        return None
+    if a.net and a.net == b.net:
+        return None
+    if a.kind == "zone" and b.kind == "zone":
+        return None
+    return max(rules.clearance(a.net, b.net), a.extra, b.extra)
+
+
+def clearance_violations(index: SpatialIndex, rules: DesignRules) -> List[Violation]:
+    """All-pairs clearance check: one range query per entry, O(n log n) overall."""
+    reach = rules.max_clearance
+    found = []
+    for i, a in enumerate(index.entries):
+        if a.kind in ("edge", "keepout", "zone"):
+            continue  # zone and edge pairs are found from the copper side
+        x0, y0, x1, y1 = a.box
+        for j in index._ids_in((x0 - reach, y0 - reach, x1 + reach, y1 + reach)):
+            b = index.entries[j]
+            if b.kind not in ("edge", "zone") and j <= i:
+                continue
+            shared = [l for l in a.layers if l in b.layers] or ([a.layers[0]] if b.kind == "edge" else [])
+            if not shared:
+                continue
+            required = _required(a, b, rules)
+            if required is None:
+                continue
+            gap = distance(a, b)
+            if gap < required - 1e-6:
+                found.append(Violation(a, b, shared[0], gap, required))
+    return found
+
+
+def keepout_crossings(index: SpatialIndex) -> List[Tuple[Entry, Entry]]:
+    """(keepout, item) pairs where copper enters a keep-out area."""
+    hits = []
+    for ko in (e for e in index.entries if e.kind == "keepout"):
+        for e in index.query(ko.box):
+            if e.kind in ("keepout", "edge", "zone") or not set(e.layers) & set(ko.layers):
+                continue
+            if distance(ko, e) == 0.0:
+                hits.append((ko, e))
+    return hits
+
+
+# === CLI =====================================================================
+
+def _find_pad(board: Board, label: str) -> Optional[Pad]:
+    ref, _, number = label.partition(".")
+    return next((p for p in board.pads if p.ref == ref and p.number == number), None)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Spatial queries and clearance checks on the board")
+    parser.add_argument("pcb", type=Path, nargs="?", default=DEFAULT_PCB)
+    parser.add_argument("--pro", type=Path, help="project file with net classes (default: next to the board)")
+    parser.add_argument("--near", metavar="REF.PAD", help="list items near this pad")
+    parser.add_argument("--radius", type=float, default=2.0)
+    parser.add_argument("--box", metavar="X0,Y0,X1,Y1", help="list items in this rectangle")
+    parser.add_argument("--layer", help="restrict --near/--box to one layer")
+    parser.add_argument("--keepouts", action="store_true", help="list copper entering keep-out zones")
+    parser.add_argument("--no-zones", action="store_true", help="leave zone fills out of the index")
+    args = parser.parse_args(argv)
+
+    board = load_board(args.pcb)
+    rules = DesignRules.load(args.pro or args.pcb.with_suffix(".kicad_pro"))
+    t0 = time.perf_counter()
+    index = SpatialIndex.from_board(board, zones=not args.no_zones)
+    built = time.perf_counter() - t0
+
+    if args.near:
+        pad = _find_pad(board, args.near)
+        if pad is None:
+            print(f"❌ No pad {args.near}")
+            return 1
+        for d, e in index.within(pad.x, pad.y, args.radius, args.layer):
+            print(f"  {d:7.3f} mm  {e.kind:<7} {e.label:<28} [{e.net}]")
+        return 0
+    if args.box:
+        box = tuple(float(v) for v in args.box.split(","))
+        for e in index.query(box, args.layer):
+            print(f"  {e.kind:<7} {e.label:<28} [{e.net}] {','.join(e.layers)}")
+        return 0
+    if args.keepouts:
+        hits = keepout_crossings(index)
+        for ko, e in hits:
+            print(f"⚠️  {e.kind} {e.label} [{e.net}] crosses {ko.label}")
+        print(f"\n📋 {len(hits)} keep-out crossing(s)")
+        return 1 if hits else 0
+
+    t1 = time.perf_counter()
+    violations = clearance_violations(index, rules)
+    checked = time.perf_counter() - t1
+    for v in violations:
+        print(f"⚠️  {v.layer}: {v.a.label} [{v.a.net}] ↔ {v.b.label} [{v.b.net}] "
+              f"{v.actual:.3f} mm < {v.required:.3f} mm")
+    print(f"\n📋 {len(index)} indexed items, {len(violations)} clearance violation(s) "
+          f"(index {built * 1000:.0f} ms, check {checked * 1000:.0f} ms)")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,7 @@ riktige symboler/footprints er på plass.
 """
 
 from dataclasses import dataclass
-from typing import List
+from typing import Iterator, List, Tuple
 
 
 @dataclass
@@ -110,3 +110,9 @@ def get_all_pins() -> List[Pin]:
     pins.append(Pin("U7", "8", "GND"))
 
     return pins
+
+
+def iter_net_rows() -> Iterator[Tuple[str, str, str]]:
+    """Yield (ref, pad, net) for every pin, in spec order."""
+    for pin in get_all_pins():
+        yield pin.ref, pin.pad, pin.net
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+vikingboard_specdb.py - Compiled, unified pin/net spec.
+
+The spec lives in three places:
+- tools/vikingboard_spec.get_all_pins()         (prototype, Pin dataclasses)
+- tools/vikingboard_eda_automation.MODULE_CONFIG (module pinout, tuples)
+- pcb_scripts/vikingboard_spec.VikingBoard_v2_0 (part metadata, nested dicts)
+
+The compiler merges them, reports conflicts and writes one binary artifact
+to .cache/vikingboard_spec.bin:
+
+- All strings (refs, pads, nets, part fields) are interned into a single
+  table, addressed by integer index.
+- Pins are parallel uint32 arrays (ref, pad, net, source), grouped by ref,
+  with a second permutation grouped by net. Both "pins of U3" and "pins on
+  GND" are slices.
+- The loader mmaps the file and casts memoryviews. It builds no per-pin
+  Python objects, so a 100k-pin spec opens as fast as the real one.
+
+Merge rule: each ref takes its pins from the highest-priority source that
+defines it, so pad numbering is never mixed between sources. The shadowed
+definitions are still checked: the same pad on a different net is reported
+as a conflict.
+
+The artifact is rebuilt automatically when a source file changes (mtime and
+size are checked on open). `SPEC` is loaded lazily on first attribute access:
+
+    from vikingboard_specdb import load_spec
+    spec = load_spec()
+    for ref, pad, net in spec.rows(): ...
+
+Usage:
+    python tools/vikingboard_specdb.py              # compile + summary + conflicts
+    python tools/vikingboard_specdb.py --bench 100000
+"""
+
+import argparse
+import importlib.util
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_ARTIFACT = REPO_ROOT / ".cache" / "vikingboard_spec.bin"
+
+MAGIC = b"VBSPEC01"
+_HEADER = struct.Struct("<8sI")
+
+# Sources in priority order (first wins per ref)
+SOURCES = [
+    ("prototype", REPO_ROOT / "tools" / "vikingboard_spec.py"),
+    ("eda_automation", REPO_ROOT / "tools" / "vikingboard_eda_automation.py"),
+    ("v2_0", REPO_ROOT / "pcb_scripts" / "vikingboard_spec.py"),
+]
+
+Row = Tuple[str, str, str]
+
+
+class Conflict(NamedTuple):
+    ref: str
+    pad: str
+    kept: str          # "net (source)"
+    other: str
+
+
+class PartInfo(NamedTuple):
+    name: str
+    package: str
+    lcsc: str
+
+
+# === Sources =================================================================
+
+def _import(name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(f"_specdb_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, str(path.parent))
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(str(path.parent))
+    return module
+
+
+def _read_prototype(path: Path) -> Tuple[List[Row], Dict[str, PartInfo]]:
+    module = _import("prototype", path)
+    return [(p.ref, str(p.pad), p.net) for p in module.get_all_pins()], {}
+
+
+def _read_eda(path: Path) -> Tuple[List[Row], Dict[str, PartInfo]]:
+    module = _import("eda", path)
+    return [(ref, str(pad), net) for ref, mappings in module.MODULE_CONFIG.items() for net, pad in mappings], {}
+
+
+def _read_v2(path: Path) -> Tuple[List[Row], Dict[str, PartInfo]]:
+    """Part metadata ({"U1": {"name", "package", "lcsc"}}) from the v2.0 spec class."""
+    module = _import("v2", path)
+    parts: Dict[str, PartInfo] = {}
+    for cls in vars(module).values():
+        if not isinstance(cls, type):
+            continue
+        for attr in vars(cls).values():
+            if not isinstance(attr, dict):
+                continue
+            for ref, info in attr.items():
+                if isinstance(info, dict) and "name" in info and ref[:1].isalpha() and ref[-1:].isdigit():
+                    parts[ref] = PartInfo(info["name"], info.get("package", ""), info.get("lcsc", ""))
+    return [], parts
+
+
+_READERS = {"prototype": _read_prototype, "eda_automation": _read_eda, "v2_0": _read_v2}
+
+
+def source_stamp(sources=SOURCES) -> List[List]:
+    stamp = []
+    for name, path in sources:
+        try:
+            st = os.stat(path)
+            stamp.append([name, str(path), st.st_mtime_ns, st.st_size])
+        except OSError:
+            stamp.append([name, str(path), 0, 0])
+    return stamp
+
+
+# === Compiler ================================================================
+
+class _Interner:
+    def __init__(self):
+        self.index: Dict[str, int] = {"": 0}
+        self.strings: List[str] = [""]
+
+    def __call__(self, s: str) -> int:
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+
+def merge(per_source: Sequence[Tuple[str, List[Row]]]) -> Tuple[List[Tuple[str, str, str, int]], List[Conflict]]:
+    """Ref-level merge in priority order; returns (ref, pad, net, source) rows and conflicts."""
+    owner: Dict[str, int] = {}
+    kept: Dict[Tuple[str, str], Tuple[str, int]] = {}
+    rows: List[Tuple[str, str, str, int]] = []
+    conflicts: List[Conflict] = []
+    names = [name for name, _ in per_source]
+    for src, (name, source_rows) in enumerate(per_source):
+        for ref in dict.fromkeys(r[0] for r in source_rows):
+            owner.setdefault(ref, src)
+        for ref, pad, net in source_rows:
+            prev = kept.get((ref, pad))
+            if owner[ref] == src:
+                if prev is not None and prev[0] != net:
+                    conflicts.append(Conflict(ref, pad, f"{prev[0]} ({names[prev[1]]})", f"{net} ({name}, duplicate)"))
+                    continue
+                if prev is None:
+                    kept[(ref, pad)] = (net, src)
+                    rows.append((ref, pad, net, src))
+            elif prev is not None and prev[0] != net:
+                conflicts.append(Conflict(ref, pad, f"{prev[0]} ({names[prev[1]]})", f"{net} ({name})"))
+    return rows, conflicts
+
+
+def compile_spec(rows: Sequence[Tuple[str, str, str, int]], parts: Dict[str, PartInfo],
+                 source_names: Sequence[str], conflicts: Sequence[Conflict], stamp: List[List],
+                 path: Path = DEFAULT_ARTIFACT) -> Path:
+    """Intern, group and write the artifact atomically."""
+    strings = _Interner()
+    ref_ids: Dict[str, int] = {}
+    net_ids: Dict[str, int] = {}
+    ref_names, net_names = array("I"), array("I")
+    for ref, _, net, _ in rows:
+        if ref not in ref_ids:
+            ref_ids[ref] = len(ref_names)
+            ref_names.append(strings(ref))
+        if net not in net_ids:
+            net_ids[net] = len(net_names)
+            net_names.append(strings(net))
+
+    # Group pins by ref (stable), keeping source order inside each ref
+    order = sorted(range(len(rows)), key=lambda i: ref_ids[rows[i][0]])
+    pin_ref, pin_pad, pin_net, pin_src = array("I"), array("I"), array("I"), array("I")
+    for i in order:
+        ref, pad, net, src = rows[i]
+        pin_ref.append(ref_ids[ref])
+        pin_pad.append(strings(pad))
+        pin_net.append(net_ids[net])
+        pin_src.append(src)
+    ref_offsets = array("I", [0] * (len(ref_names) + 1))
+    for r in pin_ref:
+        ref_offsets[r + 1] += 1
+    for k in range(len(ref_names)):
+        ref_offsets[k + 1] += ref_offsets[k]
+    net_order = array("I", sorted(range(len(pin_net)), key=pin_net.__getitem__))
+    net_offsets = array("I", [0] * (len(net_names) + 1))
+    for n in pin_net:
+        net_offsets[n + 1] += 1
+    for k in range(len(net_names)):
+        net_offsets[k + 1] += net_offsets[k]
+    ref_part = array("I")
+    for ref in ref_ids:
+        info = parts.get(ref, PartInfo("", "", ""))
+        ref_part.extend((strings(info.name), strings(info.package), strings(info.lcsc)))
+
+    blob = bytearray()
+    str_offsets = array("I", [0])
+    for s in strings.strings:
+        blob += s.encode("utf-8")
+        str_offsets.append(len(blob))
+    while len(blob) % 4:
+        blob += b"\0"
+
+    sections = [("str_offsets", str_offsets), ("str_blob", bytes(blob)), ("ref_names", ref_names),
+                ("ref_offsets", ref_offsets), ("ref_part", ref_part), ("net_names", net_names),
+                ("net_offsets", net_offsets), ("net_order", net_order), ("pin_ref", pin_ref),
+                ("pin_pad", pin_pad), ("pin_net", pin_net), ("pin_src", pin_src)]
+    payload = bytearray()
+    layout = {}
+    for name, data in sections:
+        raw = data.tobytes() if isinstance(data, array) else data
+        layout[name] = [len(payload), len(raw)]
+        payload += raw
+    meta = json.dumps({
+        "sources": list(source_names), "stamp": stamp, "sections": layout,
+        "counts": {"pins": len(pin_ref), "refs": len(ref_names), "nets": len(net_names), "strings": len(strings.strings)},
+        "conflicts": [list(c) for c in conflicts],
+    }).encode("utf-8")
+    meta += b" " * (-(len(meta) + _HEADER.size) % 4)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique temp name: pipeline stages and the watcher may compile at the same time
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, len(meta)))
+            f.write(meta)
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return path
+
+
+def build(path: Path = DEFAULT_ARTIFACT, sources=SOURCES) -> Path:
+    """Read every source, merge and write the artifact."""
+    per_source = []
+    parts: Dict[str, PartInfo] = {}
+    for name, src_path in sources:
+        if not Path(src_path).exists():
+            per_source.append((name, []))
+            continue
+        rows, meta = _READERS[name](Path(src_path))
+        per_source.append((name, rows))
+        for ref, info in meta.items():
+            parts.setdefault(ref, info)
+    rows, conflicts = merge(per_source)
+    return compile_spec(rows, parts, [n for n, _ in sources], conflicts, source_stamp(sources), path)
+
+
+# === Loader ==================================================================
+
+class CompiledSpec:
+    """Read-only view over the mmapped artifact."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, meta_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a compiled spec")
+        self.meta = json.loads(self._mm[_HEADER.size:_HEADER.size + meta_len])
+        base = _HEADER.size + meta_len
+        view = memoryview(self._mm)
+        self._sec: Dict[str, memoryview] = {}
+        for name, (offset, length) in self.meta["sections"].items():
+            raw = view[base + offset:base + offset + length]
+            self._sec[name] = raw if name == "str_blob" else raw.cast("I")
+        self._str_cache: Dict[int, str] = {}
+        self._ref_index: Optional[Dict[str, int]] = None
+        self._net_index: Optional[Dict[str, int]] = None
+
+    # --- strings ---
+
+    def _s(self, i: int) -> str:
+        s = self._str_cache.get(i)
+        if s is None:
+            off = self._sec["str_offsets"]
+            s = self._str_cache[i] = bytes(self._sec["str_blob"][off[i]:off[i + 1]]).decode("utf-8")
+        return s
+
+    # --- sizes ---
+
+    def __len__(self) -> int:
+        return self.meta["counts"]["pins"]
+
+    @property
+    def sources(self) -> List[str]:
+        return self.meta["sources"]
+
+    @property
+    def conflicts(self) -> List[Conflict]:
+        return [Conflict(*c) for c in self.meta["conflicts"]]
+
+    @property
+    def refs(self) -> List[str]:
+        return [self._s(i) for i in self._sec["ref_names"]]
+
+    @property
+    def nets(self) -> List[str]:
+        return [self._s(i) for i in self._sec["net_names"]]
+
+    # --- rows ---
+
+    def row(self, i: int) -> Row:
+        return (self._s(self._sec["ref_names"][self._sec["pin_ref"][i]]),
+                self._s(self._sec["pin_pad"][i]),
+                self._s(self._sec["net_names"][self._sec["pin_net"][i]]))
+
+    def rows(self, source: Optional[str] = None) -> Iterator[Row]:
+        """(ref, pad, net) for every pin, grouped by ref in spec order."""
+        want = None if source is None else self.sources.index(source)
+        src = self._sec["pin_src"]
+        for i in range(len(self)):
+            if want is None or src[i] == want:
+                yield self.row(i)
+
+    def _ref_id(self, ref: str) -> Optional[int]:
+        if self._ref_index is None:
+            self._ref_index = {self._s(s): k for k, s in enumerate(self._sec["ref_names"])}
+        return self._ref_index.get(ref)
+
+    def _net_id(self, net: str) -> Optional[int]:
+        if self._net_index is None:
+            self._net_index = {self._s(s): k for k, s in enumerate(self._sec["net_names"])}
+        return self._net_index.get(net)
+
+    def pins_of(self, ref: str) -> List[Tuple[str, str]]:
+        """(pad, net) for one ref."""
+        r = self._ref_id(ref)
+        if r is None:
+            return []
+        off = self._sec["ref_offsets"]
+        return [self.row(i)[1:] for i in range(off[r], off[r + 1])]
+
+    def pins_on(self, net: str) -> List[Tuple[str, str]]:
+        """(ref, pad) for one net."""
+        n = self._net_id(net)
+        if n is None:
+            return []
+        off, order = self._sec["net_offsets"], self._sec["net_order"]
+        return [self.row(order[k])[:2] for k in range(off[n], off[n + 1])]
+
+    def net_of(self, ref: str, pad: str) -> Optional[str]:
+        for p, net in self.pins_of(ref):
+            if p == pad:
+                return net
+        return None
+
+    def part(self, ref: str) -> Optional[PartInfo]:
+        r = self._ref_id(ref)
+        if r is None:
+            return None
+        rp = self._sec["ref_part"]
+        return PartInfo(self._s(rp[3 * r]), self._s(rp[3 * r + 1]), self._s(rp[3 * r + 2]))
+
+    def is_stale(self) -> bool:
+        current = source_stamp([(name, Path(path)) for name, path, _, _ in self.meta["stamp"]])
+        return [s[2:] for s in current] != [s[2:] for s in self.meta["stamp"]]
+
+
+def load_spec(path: Path = DEFAULT_ARTIFACT, rebuild: bool = True) -> CompiledSpec:
+    """Open the compiled spec, compiling first if it is missing or stale."""
+    path = Path(path)
+    if path.exists():
+        try:
+            spec = CompiledSpec(path)
+            if not rebuild or path != DEFAULT_ARTIFACT or not spec.is_stale():
+                return spec
+        except (ValueError, KeyError, struct.error):
+            pass
+    build(path)
+    return CompiledSpec(path)
+
+
+_SPEC: Optional[CompiledSpec] = None
+
+
+def __getattr__(name: str):
+    # `from vikingboard_specdb import SPEC` loads the artifact on first use only
+    global _SPEC
+    if name == "SPEC":
+        if _SPEC is None:
+            _SPEC = load_spec()
+        return _SPEC
+    raise AttributeError(name)
+
+
+# === CLI =====================================================================
+
+def run_benchmark(pins: int = 100_000) -> None:
+    import tempfile
+    import tracemalloc
+
+    per_ref = 50
+    rows = [(f"U{i // per_ref + 1}", str(i % per_ref + 1), f"NET_{(i * 7919) % (pins // 4 + 1)}", 0)
+            for i in range(pins)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_spec.bin"
+        t0 = time.perf_counter()
+        compile_spec(rows, {}, ["bench"], [], [], path)
+        t1 = time.perf_counter()
+        tracemalloc.start()
+        spec = CompiledSpec(path)
+        t2 = time.perf_counter()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        t3 = time.perf_counter()
+        hits = spec.pins_on("NET_42")
+        one = spec.pins_of(f"U{pins // per_ref // 2}")
+        t4 = time.perf_counter()
+        count = sum(1 for _ in spec.rows())
+        t5 = time.perf_counter()
+        size = path.stat().st_size
+        del spec
+    print(f"Pins          : {pins}")
+    print(f"Artifact      : {size / 1024:.0f} KiB")
+    print(f"Compile       : {(t1 - t0) * 1000:8.1f} ms")
+    print(f"Open          : {(t2 - t1) * 1000:8.3f} ms (peak {peak / 1024:.0f} KiB Python heap)")
+    print(f"Net + ref hit : {(t4 - t3) * 1000:8.3f} ms ({len(hits)} + {len(one)} pins, first lookup builds name index)")
+    print(f"Full scan     : {(t5 - t4) * 1000:8.1f} ms ({count} rows)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile the VikingBoard spec into a cached artifact")
+    parser.add_argument("--out", type=Path, default=DEFAULT_ARTIFACT)
+    parser.add_argument("--bench", type=int, metavar="PINS", help="benchmark a synthetic spec")
+    parser.add_argument("--strict", action="store_true", help="exit 1 when sources conflict")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        run_benchmark(args.bench)
+        return 0
+    t0 = time.perf_counter()
+    build(args.out)
+    spec = CompiledSpec(args.out)
+    print(f"✅ Compiled {len(spec)} pins, {len(spec.refs)} refs, {len(spec.nets)} nets "
+          f"from {', '.join(spec.sources)} in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    print(f"   {args.out}")
+    conflicts = spec.conflicts
+    if conflicts:
+        print(f"\n⚠️  {len(conflicts)} conflict(s):")
+        for c in conflicts:
+            print(f"   {c.ref}.{c.pad}: {c.kept} vs {c.other}")
+    return 1 if conflicts and args.strict else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
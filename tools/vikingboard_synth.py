@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+vikingboard_synth.py - Parametric synthetic boards for benchmarks.
+
+The real board has nine headers, so scaling problems only show up once the
+98-pin design lands. This writes a deterministic (seeded) design of any
+size in the same formats the tools read:
+
+- <name>.kicad_pcb  N footprints (passives, QFN ICs, pin headers), M nets,
+                    tracks, vias, zones and an Edge.Cuts outline
+- <name>.kicad_sch  one symbol instance per footprint
+- <name>_nets.csv   spec in the docs/vikingboard_nets.csv format (Ref,Pad,Net);
+                    a fraction of pads disagree with the board (--drift) so a
+                    net sync has real work to do
+- <name>_bom.csv    KiCad BOM ("Refs","Value","Footprint","Qty","DNP")
+- <name>_drc.txt    kicad-cli text DRC report with V violations
+
+Usage:
+    python tools/vikingboard_synth.py /tmp/synth --footprints 1000 --nets 400
+    python tools/vikingboard_synth.py /tmp/synth -n 98 --tracks 2000 --vias 300 --zones 2
+"""
+
+import argparse
+import csv
+import random
+import sys
+import uuid
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+_NS = uuid.UUID("6b1f9d3e-51a4-4c1e-9a51-7e9b0a5d2c10")
+PITCH = 8.0                     # mm between footprint origins
+MARGIN = 5.0
+
+
+class SynthConfig(NamedTuple):
+    footprints: int = 100
+    nets: int = 50
+    tracks: int = 500
+    vias: int = 100
+    zones: int = 2
+    violations: int = 200
+    drift: float = 0.05         # share of spec pads that differ from the board
+    seed: int = 1
+
+
+_DEFAULTS = SynthConfig._field_defaults
+
+
+class SynthPart(NamedTuple):
+    ref: str
+    lib_id: str
+    value: str
+    symbol: str
+    pads: Tuple[Tuple[str, float, float], ...]    # (number, dx, dy)
+    smd: bool
+
+
+class SynthFiles(NamedTuple):
+    pcb: Path
+    sch: Path
+    spec: Path
+    bom: Path
+    drc: Path
+
+
+_PASSIVES = [
+    ("R", "Resistor_SMD:R_0603_1608Metric", "Device:R", ("10k", "4.7k", "100", "1k", "47k")),
+    ("C", "Capacitor_SMD:C_0805_2012Metric", "Device:C", ("100nF", "10uF", "1uF", "22pF")),
+    ("C", "Capacitor_SMD:C_0603_1608Metric", "Device:C", ("100nF", "1uF")),
+]
+
+
+def _uuid(*parts) -> str:
+    return str(uuid.uuid5(_NS, "/".join(map(str, parts))))
+
+
+def _qfn(pins: int) -> Tuple[Tuple[str, float, float], ...]:
+    side = pins // 4
+    span = (side - 1) * 0.5
+    pads = []
+    for i in range(pins):
+        k, j = divmod(i, side)
+        t = -span / 2 + j * 0.5
+        x, y = [(-2.5, t), (t, 2.5), (2.5, -t), (-t, -2.5)][k]
+        pads.append((str(i + 1), x, y))
+    pads.append((str(pins + 1), 0.0, 0.0))           # exposed pad
+    return tuple(pads)
+
+
+def make_parts(cfg: SynthConfig) -> List[SynthPart]:
+    """Deterministic mix: ~60 % passives, ~25 % ICs, ~15 % headers."""
+    rng = random.Random(cfg.seed)
+    counters: Dict[str, int] = {}
+    parts = []
+    for _ in range(cfg.footprints):
+        roll = rng.random()
+        if roll < 0.6:
+            prefix, lib_id, symbol, values = rng.choice(_PASSIVES)
+            pads = (("1", -0.8, 0.0), ("2", 0.8, 0.0))
+            value, smd = rng.choice(values), True
+        elif roll < 0.85:
+            pins = rng.choice((16, 24, 32, 48))
+            prefix, symbol, smd = "U", f"vikingboard_synth:IC_{pins}", True
+            lib_id = f"Package_DFN_QFN:QFN-{pins}-1EP_5x5mm_P0.5mm_EP3.45x3.45mm"
+            pads, value = _qfn(pins), f"IC_{pins}"
+        else:
+            prefix, symbol, smd = "J", "Connector_Generic:Conn_01x08", False
+            lib_id = "Connector_PinHeader_2.54mm:PinHeader_1x08_P2.54mm_Vertical"
+            pads = tuple((str(i + 1), 0.0, i * 2.54) for i in range(8))
+            value = "Conn_01x08"
+        counters[prefix] = counters.get(prefix, 0) + 1
+        parts.append(SynthPart(f"{prefix}{counters[prefix]}", lib_id, value, symbol, pads, smd))
+    return parts
+
+
+def net_names(cfg: SynthConfig) -> List[str]:
+    fixed = ["GND", "+3V3", "+5V"]
+    return (fixed + [f"N{i}" for i in range(len(fixed), cfg.nets)])[:max(cfg.nets, 1)]
+
+
+def assign_nets(cfg: SynthConfig, parts: List[SynthPart]) -> Dict[Tuple[str, str], str]:
+    """(ref, pad) -> net; about a quarter of the pads land on GND."""
+    rng = random.Random(cfg.seed + 1)
+    names = net_names(cfg)
+    out = {}
+    for part in parts:
+        for number, _, _ in part.pads:
+            out[(part.ref, number)] = names[0] if rng.random() < 0.25 else rng.choice(names)
+    return out
+
+
+def placement(parts: List[SynthPart]) -> Tuple[Dict[str, Tuple[float, float]], Tuple[float, float]]:
+    cols = max(1, int(len(parts) ** 0.5 + 0.999))
+    pos = {p.ref: (MARGIN + (i % cols) * PITCH, MARGIN + (i // cols) * PITCH) for i, p in enumerate(parts)}
+    rows = (len(parts) + cols - 1) // cols
+    return pos, (2 * MARGIN + (cols - 1) * PITCH + 5, 2 * MARGIN + (rows - 1) * PITCH + 20)
+
+
+# === Writers =================================================================
+
+def write_pcb(path: Path, cfg: SynthConfig, parts: List[SynthPart], nets: Dict[Tuple[str, str], str]) -> None:
+    rng = random.Random(cfg.seed + 2)
+    names = net_names(cfg)
+    code = {name: i + 1 for i, name in enumerate(names)}
+    pos, (width, height) = placement(parts)
+    pad_xy = [(pos[p.ref][0] + dx, pos[p.ref][1] + dy, nets[(p.ref, n)]) for p in parts for n, dx, dy in p.pads]
+    with path.open("w", encoding="utf-8") as f:
+        w = f.write
+        w('(kicad_pcb\n\t(version 20241229)\n\t(generator "pcbnew")\n\t(generator_version "9.0")\n')
+        w('\t(general\n\t\t(thickness 1.6)\n\t)\n\t(paper "A4")\n')
+        w('\t(layers\n\t\t(0 "F.Cu" signal)\n\t\t(2 "B.Cu" signal)\n\t\t(25 "Edge.Cuts" user)\n'
+          '\t\t(5 "F.SilkS" user "F.Silkscreen")\n\t\t(1 "F.Mask" user)\n\t\t(3 "B.Mask" user)\n\t)\n')
+        w('\t(net 0 "")\n')
+        for name in names:
+            w(f'\t(net {code[name]} "{name}")\n')
+        for part in parts:
+            x, y = pos[part.ref]
+            w(f'\t(footprint "{part.lib_id}"\n\t\t(layer "F.Cu")\n\t\t(uuid "{_uuid("fp", part.ref)}")\n'
+              f'\t\t(at {x:g} {y:g})\n')
+            w(f'\t\t(property "Reference" "{part.ref}"\n\t\t\t(at 0 -2 0)\n\t\t\t(layer "F.SilkS")\n\t\t)\n')
+            w(f'\t\t(property "Value" "{part.value}"\n\t\t\t(at 0 2 0)\n\t\t\t(layer "F.Fab")\n\t\t)\n')
+            for number, dx, dy in part.pads:
+                net = nets[(part.ref, number)]
+                if part.smd:
+                    w(f'\t\t(pad "{number}" smd roundrect\n\t\t\t(at {dx:g} {dy:g})\n\t\t\t(size 0.8 0.9)\n'
+                      f'\t\t\t(layers "F.Cu" "F.Mask" "F.Paste")\n')
+                else:
+                    w(f'\t\t(pad "{number}" thru_hole circle\n\t\t\t(at {dx:g} {dy:g})\n\t\t\t(size 1.7 1.7)\n'
+                      f'\t\t\t(drill 1)\n\t\t\t(layers "*.Cu" "*.Mask")\n')
+                w(f'\t\t\t(net {code[net]} "{net}")\n\t\t\t(uuid "{_uuid("pad", part.ref, number)}")\n\t\t)\n')
+            w('\t)\n')
+        for i in range(cfg.tracks):
+            ax, ay, net = pad_xy[rng.randrange(len(pad_xy))] if pad_xy else (0.0, 0.0, names[0])
+            bx, by = ax + rng.uniform(-PITCH, PITCH), ay + rng.uniform(-PITCH, PITCH)
+            layer = "F.Cu" if i % 3 else "B.Cu"
+            w(f'\t(segment\n\t\t(start {ax:.4f} {ay:.4f})\n\t\t(end {bx:.4f} {by:.4f})\n\t\t(width 0.25)\n'
+              f'\t\t(layer "{layer}")\n\t\t(net {code[net]})\n\t\t(uuid "{_uuid("seg", i)}")\n\t)\n')
+        for i in range(cfg.vias):
+            x, y = rng.uniform(MARGIN, width - MARGIN), rng.uniform(MARGIN, height - MARGIN)
+            net = rng.choice(names)
+            w(f'\t(via\n\t\t(at {x:.4f} {y:.4f})\n\t\t(size 0.6)\n\t\t(drill 0.3)\n\t\t(layers "F.Cu" "B.Cu")\n'
+              f'\t\t(net {code[net]})\n\t\t(uuid "{_uuid("via", i)}")\n\t)\n')
+        for i in range(cfg.zones):
+            layer = "B.Cu" if i % 2 == 0 else "F.Cu"
+            net = names[0] if i < 2 else rng.choice(names)
+            inset = 1.0 + i * 0.5
+            pts = [(inset, inset), (width - inset, inset), (width - inset, height - inset), (inset, height - inset)]
+            xy = " ".join(f"(xy {px:g} {py:g})" for px, py in pts)
+            w(f'\t(zone\n\t\t(net {code[net]})\n\t\t(net_name "{net}")\n\t\t(layer "{layer}")\n'
+              f'\t\t(uuid "{_uuid("zone", i)}")\n\t\t(priority {i})\n'
+              f'\t\t(connect_pads\n\t\t\t(clearance 0.3)\n\t\t)\n\t\t(min_thickness 0.25)\n'
+              f'\t\t(polygon\n\t\t\t(pts {xy})\n\t\t)\n\t)\n')
+        w(f'\t(gr_rect\n\t\t(start 0 0)\n\t\t(end {width:g} {height:g})\n\t\t(stroke\n\t\t\t(width 0.1)\n'
+          f'\t\t\t(type default)\n\t\t)\n\t\t(fill no)\n\t\t(layer "Edge.Cuts")\n\t\t(uuid "{_uuid("edge")}")\n\t)\n')
+        w(')\n')
+
+
+def write_sch(path: Path, cfg: SynthConfig, parts: List[SynthPart]) -> None:
+    root = _uuid("sch", cfg.seed, len(parts))
+    with path.open("w", encoding="utf-8") as f:
+        w = f.write
+        w(f'(kicad_sch\n\t(version 20231120)\n\t(generator "vikingboard_synth")\n\t(uuid "{root}")\n'
+          '\t(paper "User" 1000 1000)\n\t(lib_symbols)\n')
+        for i, part in enumerate(parts):
+            x, y = 25.4 + (i % 40) * 22.86, 25.4 + (i // 40) * 22.86
+            w(f'\t(symbol\n\t\t(lib_id "{part.symbol}")\n\t\t(at {x:.2f} {y:.2f} 0)\n\t\t(unit 1)\n'
+              f'\t\t(uuid "{_uuid("sym", part.ref)}")\n')
+            for name, value in (("Reference", part.ref), ("Value", part.value), ("Footprint", part.lib_id)):
+                w(f'\t\t(property "{name}" "{value}"\n\t\t\t(at {x:.2f} {y:.2f} 0)\n\t\t)\n')
+            w(f'\t\t(instances\n\t\t\t(project "synth"\n\t\t\t\t(path "/{root}"\n'
+              f'\t\t\t\t\t(reference "{part.ref}")\n\t\t\t\t\t(unit 1)\n\t\t\t\t)\n\t\t\t)\n\t\t)\n\t)\n')
+        w('\t(sheet_instances\n\t\t(path "/"\n\t\t\t(page "1")\n\t\t)\n\t)\n)\n')
+
+
+def write_spec(path: Path, cfg: SynthConfig, nets: Dict[Tuple[str, str], str]) -> int:
+    """Spec CSV; returns how many pads were drifted away from the board."""
+    rng = random.Random(cfg.seed + 3)
+    names = net_names(cfg)
+    drifted = 0
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Ref", "Pad", "Net"])
+        for (ref, pad), net in nets.items():
+            if rng.random() < cfg.drift:
+                net = rng.choice(names)
+                drifted += 1
+            writer.writerow([ref, pad, net])
+    return drifted
+
+
+def write_bom(path: Path, parts: List[SynthPart], grouped: bool = True) -> None:
+    """KiCad BOM; grouped=False writes one line per part (KiCad's --group-by "")."""
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for part in parts:
+        key = (part.value, part.lib_id) if grouped else (part.value, part.lib_id, part.ref)
+        groups.setdefault(key, []).append(part.ref)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(["Refs", "Value", "Footprint", "Qty", "DNP"])
+        for (value, lib_id, *_), refs in sorted(groups.items()):
+            writer.writerow([",".join(refs), value, lib_id, len(refs), ""])
+
+
+_RULES = [
+    ("clearance", "Clearance violation (netclass 'Default' clearance 0.2000 mm; actual 0.1500 mm)"),
+    ("track_width", "Track width (board setup constraints min width 0.2000 mm; actual 0.1500 mm)"),
+    ("silk_overlap", "Silkscreen overlap"),
+    ("courtyards_overlap", "Courtyards overlap"),
+]
+
+
+def write_drc(path: Path, cfg: SynthConfig, parts: List[SynthPart], nets: Dict[Tuple[str, str], str]) -> None:
+    rng = random.Random(cfg.seed + 4)
+    pos, _ = placement(parts)
+    pads = [(p.ref, n, pos[p.ref][0] + dx, pos[p.ref][1] + dy) for p in parts for n, dx, dy in p.pads]
+    unconnected = cfg.violations // 4
+    violations = cfg.violations - unconnected
+    with path.open("w", encoding="utf-8") as f:
+        w = f.write
+        w("** Drc report for synth.kicad_pcb **\n** Created on 2025-01-01T00:00:00+0000 **\n\n")
+        w(f"** Found {violations} DRC violations **\n")
+        for _ in range(violations):
+            rule, text = rng.choice(_RULES)
+            w(f"[{rule}]: {text}\n    Rule: {rule}; {rng.choice(('error', 'warning'))}\n")
+            for _ in range(2):
+                ref, pad, x, y = rng.choice(pads)
+                w(f"    @({x:.4f} mm, {y:.4f} mm): SMD pad {pad} [{nets[(ref, pad)]}] of {ref} on F.Cu\n")
+        w(f"\n** Found {unconnected} unconnected pads **\n")
+        for _ in range(unconnected):
+            w("[unconnected_items]: Missing connection between items\n    Local override; error\n")
+            for _ in range(2):
+                ref, pad, x, y = rng.choice(pads)
+                w(f"    @({x:.4f} mm, {y:.4f} mm): PTH pad {pad} [{nets[(ref, pad)]}] of {ref}\n")
+        w("\n** Found 0 Footprint errors **\n\n** End of Report **\n")
+
+
+def generate(out_dir: Path, cfg: SynthConfig = SynthConfig(), name: str = "synth") -> SynthFiles:
+    """Write the whole synthetic design into out_dir."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    parts = make_parts(cfg)
+    nets = assign_nets(cfg, parts)
+    files = SynthFiles(out_dir / f"{name}.kicad_pcb", out_dir / f"{name}.kicad_sch",
+                       out_dir / f"{name}_nets.csv", out_dir / f"{name}_bom.csv", out_dir / f"{name}_drc.txt")
+    write_pcb(files.pcb, cfg, parts, nets)
+    write_sch(files.sch, cfg, parts)
+    write_spec(files.spec, cfg, nets)
+    write_bom(files.bom, parts)
+    write_drc(files.drc, cfg, parts, nets)
+    return files
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic VikingBoard-style design")
+    parser.add_argument("out", type=Path, help="output directory")
+    parser.add_argument("--name", default="synth")
+    parser.add_argument("--footprints", "-n", type=int, default=_DEFAULTS["footprints"])
+    parser.add_argument("--nets", "-m", type=int, default=_DEFAULTS["nets"])
+    parser.add_argument("--tracks", type=int, default=_DEFAULTS["tracks"])
+    parser.add_argument("--vias", type=int, default=_DEFAULTS["vias"])
+    parser.add_argument("--zones", type=int, default=_DEFAULTS["zones"])
+    parser.add_argument("--violations", type=int, default=_DEFAULTS["violations"])
+    parser.add_argument("--drift", type=float, default=_DEFAULTS["drift"])
+    parser.add_argument("--seed", type=int, default=_DEFAULTS["seed"])
+    args = parser.parse_args(argv)
+
+    cfg = SynthConfig(args.footprints, args.nets, args.tracks, args.vias, args.zones,
+                      args.violations, args.drift, args.seed)
+    files = generate(args.out, cfg, args.name)
+    for path in files:
+        print(f"✅ {path} ({path.stat().st_size / 1024:.0f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
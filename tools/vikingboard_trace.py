@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+vikingboard_trace.py - Spans, subprocess timing and run history.
+
+A small instrumentation layer shared by the tools, the pipeline and the
+shell scripts. Tracing is off unless VIKINGBOARD_TRACE points at a run
+directory; then every span (wall time, CPU time of the process and of
+its children, peak RSS) is appended to <dir>/events-<pid>.jsonl, so
+pool workers and separate python3 invocations from MASTER.sh all land in
+the same run. `finish` merges them into Chrome trace-event JSON (open in
+chrome://tracing or ui.perfetto.dev) and appends one row per span name to
+a SQLite history, so the trend of each stage can be followed over time.
+
+In Python:
+    from vikingboard_trace import span, run
+    with span("zone refill", cat="python"):
+        ...
+    run(["kicad-cli", "pcb", "drc", ...], name="drc")   # subprocess.run, timed
+
+Usage:
+    export VIKINGBOARD_TRACE="$(python3 tools/vikingboard_trace.py start)"
+    python3 tools/vikingboard_trace.py exec svg -- kicad-cli pcb export svg ...
+    python3 tools/vikingboard_trace.py finish --label master --log automation/last_run.log
+    python3 tools/vikingboard_trace.py history drc --last 20
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not on Windows
+    resource = None
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENV = "VIKINGBOARD_TRACE"
+TRACE_ROOT = REPO_ROOT / ".cache" / "trace"
+HISTORY_DB = REPO_ROOT / ".cache" / "trace_history.sqlite"
+REPORT_DIR = REPO_ROOT / "reports"
+
+
+class SpanSummary(NamedTuple):
+    name: str
+    cat: str
+    count: int
+    wall: float        # seconds, summed over occurrences
+    cpu: float         # seconds, own + children
+    rss_mb: float      # peak
+
+
+# === Measurements ============================================================
+
+def _peak_rss_mb(who: str = "self") -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if who == "children" else resource.RUSAGE_SELF)
+    # Linux reports KiB, macOS bytes
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _child_cpu() -> float:
+    t = os.times()
+    return t.children_user + t.children_system
+
+
+def trace_dir() -> Optional[Path]:
+    value = os.environ.get(ENV)
+    return Path(value) if value else None
+
+
+def enabled() -> bool:
+    return trace_dir() is not None
+
+
+_lock = threading.Lock()
+
+
+def _emit(event: dict) -> None:
+    directory = trace_dir()
+    if directory is None:
+        return
+    line = json.dumps(event, separators=(",", ":")) + "\n"
+    with _lock:
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / f"events-{os.getpid()}.jsonl", "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+# === Spans ===================================================================
+
+@contextmanager
+def span(name: str, cat: str = "python", **args) -> Iterator[dict]:
+    """Time a block. The yielded dict can be filled with extra args for the trace."""
+    if not enabled():
+        yield args
+        return
+    start = time.time()
+    t0, cpu0, child0 = time.perf_counter(), time.process_time(), _child_cpu()
+    try:
+        yield args
+    except BaseException as e:
+        args.setdefault("error", f"{type(e).__name__}: {e}"[:200])
+        raise
+    finally:
+        wall = time.perf_counter() - t0
+        cpu, child = time.process_time() - cpu0, _child_cpu() - child0
+        args.update(cpu_ms=round(cpu * 1000, 3), child_cpu_ms=round(child * 1000, 3),
+                    rss_peak_mb=round(_peak_rss_mb(), 1))
+        if child:
+            args["child_rss_peak_mb"] = round(_peak_rss_mb("children"), 1)
+        _emit({"name": name, "cat": cat, "ph": "X", "ts": int(start * 1e6), "dur": int(wall * 1e6),
+               "pid": os.getpid(), "tid": threading.get_ident() % 2**31, "args": args})
+
+
+def traced(name: Optional[str] = None, cat: str = "python"):
+    """Decorator form of span()."""
+    def wrap(func):
+        @wraps(func)
+        def inner(*a, **kw):
+            with span(name or func.__qualname__, cat):
+                return func(*a, **kw)
+        return inner
+    return wrap
+
+
+def run(argv: Sequence[str], name: Optional[str] = None, **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run in a "subprocess" span, recording exit code and stderr tail."""
+    label = name or Path(str(argv[0])).name
+    with span(label, cat="subprocess", argv=" ".join(map(str, argv))[:300]) as info:
+        proc = subprocess.run(list(argv), **kwargs)
+        info["returncode"] = proc.returncode
+        if proc.returncode and isinstance(proc.stderr, str):
+            info["stderr"] = proc.stderr.strip()[-300:]
+    return proc
+
+
+# === Runs ====================================================================
+
+def start(label: str = "run") -> Path:
+    directory = TRACE_ROOT / f"{time.strftime('%Y%m%d_%H%M%S')}_{label}_{os.getpid()}"
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "meta.json").write_text(json.dumps({"label": label, "started": time.time()}), encoding="utf-8")
+    return directory
+
+
+def load_events(directory: Path) -> List[dict]:
+    events = []
+    for path in sorted(directory.glob("events-*.jsonl")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue        # a worker killed mid-write
+    events.sort(key=lambda e: e["ts"])
+    return events
+
+
+def summarize(events: List[dict]) -> List[SpanSummary]:
+    acc: Dict[tuple, list] = {}
+    for e in events:
+        a = e.get("args", {})
+        entry = acc.setdefault((e["name"], e["cat"]), [0, 0.0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += e["dur"] / 1e6
+        entry[2] += (a.get("cpu_ms", 0) + a.get("child_cpu_ms", 0)) / 1000
+        entry[3] = max(entry[3], a.get("rss_peak_mb", 0), a.get("child_rss_peak_mb", 0))
+    return sorted((SpanSummary(n, c, *v) for (n, c), v in acc.items()), key=lambda s: -s.wall)
+
+
+def write_chrome(events: List[dict], path: Path, label: str) -> None:
+    names = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"{label} [{pid}]"}}
+             for pid in sorted({e["pid"] for e in events})]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"traceEvents": names + events, "displayTimeUnit": "ms", "otherData": {"label": label}}
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY, label TEXT, started REAL, commit_id TEXT, wall REAL, trace TEXT
+);
+CREATE TABLE IF NOT EXISTS spans (
+    run_id INTEGER REFERENCES runs(id), name TEXT, cat TEXT, count INTEGER,
+    wall REAL, cpu REAL, rss_mb REAL
+);
+CREATE INDEX IF NOT EXISTS spans_name ON spans(name);
+"""
+
+
+def _commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def record_history(label: str, started: float, wall: float, trace: Path,
+                   spans: List[SpanSummary], db_path: Path = HISTORY_DB) -> int:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        db.executescript(_SCHEMA)
+        with db:
+            cur = db.execute("INSERT INTO runs (label, started, commit_id, wall, trace) VALUES (?,?,?,?,?)",
+                             (label, started, _commit(), wall, str(trace)))
+            db.executemany("INSERT INTO spans VALUES (?,?,?,?,?,?,?)",
+                           [(cur.lastrowid, s.name, s.cat, s.count, s.wall, s.cpu, s.rss_mb) for s in spans])
+        return cur.lastrowid
+    finally:
+        db.close()
+
+
+def format_summary(spans: List[SpanSummary], wall: float, limit: int = 15) -> List[str]:
+    lines = [f"{'span':<24} {'cat':<10} {'n':>3} {'wall s':>8} {'cpu s':>8} {'rss MB':>7}"]
+    for s in spans[:limit]:
+        lines.append(f"{s.name[:24]:<24} {s.cat:<10} {s.count:>3} {s.wall:8.2f} {s.cpu:8.2f} {s.rss_mb:7.0f}")
+    lines.append(f"{'run wall':<24} {'':<10} {'':>3} {wall:8.2f}")
+    return lines
+
+
+def finish(directory: Path, label: Optional[str] = None, out: Optional[Path] = None,
+           log: Optional[Path] = None) -> Optional[Path]:
+    """Merge a run directory into Chrome JSON + history; print and return the trace path."""
+    try:
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        meta = {"label": "run", "started": time.time()}
+    label = label or meta["label"]
+    events = load_events(directory)
+    if not events:
+        print(f"⚠️  No spans recorded in {directory}")
+        return None
+    wall = max(e["ts"] + e["dur"] for e in events) / 1e6 - min(e["ts"] for e in events) / 1e6
+    out = out or REPORT_DIR / f"trace_{label}_{time.strftime('%Y%m%d_%H%M%S', time.localtime(meta['started']))}.json"
+    write_chrome(events, out, label)
+    spans = summarize(events)
+    record_history(label, meta["started"], wall, out, spans)
+    lines = format_summary(spans, wall)
+    print(f"\n--- Trace: {label} ---")
+    for line in lines:
+        print(line)
+    print(f"📋 {out}")
+    if log is not None:
+        with open(log, "a", encoding="utf-8") as f:
+            f.write("Timings:\n" + "".join(f"  {line}\n" for line in lines) + f"Trace: {out}\n")
+    return out
+
+
+@contextmanager
+def session(label: str) -> Iterator[Optional[Path]]:
+    """Trace a run unless an outer run (e.g. MASTER.sh) already owns one."""
+    if enabled():
+        yield trace_dir()
+        return
+    directory = start(label)
+    os.environ[ENV] = str(directory)
+    try:
+        yield directory
+    finally:
+        del os.environ[ENV]
+        finish(directory, label)
+
+
+# === CLI =====================================================================
+
+def show_history(name: Optional[str], last: int, db_path: Path = HISTORY_DB) -> int:
+    if not db_path.exists():
+        print(f"❌ No history yet at {db_path}")
+        return 1
+    db = sqlite3.connect(str(db_path))
+    try:
+        if name is None:
+            rows = db.execute("SELECT r.id, r.label, r.started, r.commit_id, r.wall FROM runs r "
+                              "ORDER BY r.id DESC LIMIT ?", (last,)).fetchall()
+            print(f"{'run':>5} {'when':<17} {'commit':<9} {'label':<12} {'wall s':>8}")
+            for rid, lbl, started, commit, wall in reversed(rows):
+                print(f"{rid:>5} {time.strftime('%Y-%m-%d %H:%M', time.localtime(started)):<17} "
+                      f"{commit or '-':<9} {lbl:<12} {wall:8.2f}")
+            return 0
+        rows = db.execute("SELECT r.id, r.started, r.commit_id, s.count, s.wall, s.cpu, s.rss_mb "
+                          "FROM spans s JOIN runs r ON r.id = s.run_id WHERE s.name = ? "
+                          "ORDER BY r.id DESC LIMIT ?", (name, last)).fetchall()
+    finally:
+        db.close()
+    if not rows:
+        print(f"❌ No span named '{name}' in the history")
+        return 1
+    print(f"📋 {name}")
+    print(f"{'run':>5} {'when':<17} {'commit':<9} {'n':>3} {'wall s':>8} {'cpu s':>8} {'rss MB':>7}")
+    for rid, started, commit, count, wall, cpu, rss in reversed(rows):
+        print(f"{rid:>5} {time.strftime('%Y-%m-%d %H:%M', time.localtime(started)):<17} "
+              f"{commit or '-':<9} {count:>3} {wall:8.2f} {cpu:8.2f} {rss:7.0f}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Trace spans and keep a runtime history")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("start", help="create a run directory and print it (export as VIKINGBOARD_TRACE)")
+    p.add_argument("--label", default="run")
+    p = sub.add_parser("exec", help="run a command inside a span")
+    p.add_argument("name")
+    p.add_argument("command", nargs=argparse.REMAINDER)
+    p = sub.add_parser("finish", help="write Chrome trace JSON and append to the history")
+    p.add_argument("--dir", type=Path, help=f"run directory (default: ${ENV})")
+    p.add_argument("--label")
+    p.add_argument("--out", type=Path)
+    p.add_argument("--log", type=Path, help="also append the summary to this log file")
+    p = sub.add_parser("history", help="runtime trend of one span, or the list of runs")
+    p.add_argument("name", nargs="?")
+    p.add_argument("--last", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "start":
+        print(start(args.label))
+        return 0
+    if args.cmd == "exec":
+        command = args.command[1:] if args.command[:1] == ["--"] else args.command
+        if not command:
+            parser.error("exec needs a command after --")
+        try:
+            return run(command, name=args.name).returncode
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            return 127
+    if args.cmd == "finish":
+        directory = args.dir or trace_dir()
+        if directory is None:
+            print(f"❌ No run directory: pass --dir or set {ENV}")
+            return 1
+        finish(directory, args.label, args.out, args.log)
+        return 0
+    return show_history(args.name, args.last)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+vikingboard_watch.py - Rerun only the affected pipeline stages on save.
+
+Watches kicad/, docs/, tools/ and pcb_scripts/ with Linux inotify (via
+ctypes, no extra packages) and falls back to mtime polling elsewhere.
+KiCad writes a save as a burst of events (temp file, rename, backup,
+lock file), so events are debounced until the tree has been quiet for a
+moment, then the changed files are mapped to pipeline stages:
+
+    spec sources         -> docs (+ consistency check)
+    kicad/*.kicad_sch    -> bom (+ consistency check)
+    kicad/*.kicad_pcb    -> gerbers, drill, drc, cpl (+ consistency check)
+    docs/*_nets.csv      -> consistency check
+
+Only those stages run, through the normal incremental pipeline, and a
+one-line status summary is printed, written to reports/watch_status.json
+and optionally pushed as a desktop notification.
+
+Usage:
+    python tools/vikingboard_watch.py
+    python tools/vikingboard_watch.py --poll --interval 1.0
+    python tools/vikingboard_watch.py --layout master --notify --initial
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import json
+import os
+import select
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from vikingboard_pipeline import LAYOUTS, PCB, SCH, SPEC_SOURCES, STAGES, Pipeline
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+WATCH_DIRS = ["kicad", "docs", "tools", "pcb_scripts"]
+STATUS_PATH = REPO_ROOT / "reports" / "watch_status.json"
+CHECK = "consistency"   # pseudo-stage run by the watcher itself, after the pipeline
+
+
+class Rule(NamedTuple):
+    pattern: str            # fnmatch pattern on the repo-relative posix path
+    stages: Tuple[str, ...]
+
+
+RULES: List[Rule] = [
+    *(Rule(src, ("docs", CHECK)) for src in SPEC_SOURCES),
+    Rule(SCH, ("bom", CHECK)),
+    Rule(PCB, ("gerbers", "drill", "drc", "cpl", CHECK)),
+    Rule("docs/vikingboard_nets.csv", (CHECK,)),
+]
+
+# Editor and KiCad side files that never mean "the design changed"
+IGNORE = [
+    "*/__pycache__/*", "*.pyc", "*.lck", "*~", "*.swp", "*.tmp", "*-bak",
+    "*/_autosave-*", "*/fp-info-cache", "*-backups/*", "*.backup*",
+]
+
+
+def stages_for(paths: Iterable[str], rules: Sequence[Rule] = RULES) -> List[str]:
+    """Changed repo-relative paths -> stages to run, in rule order, no duplicates."""
+    out: List[str] = []
+    for path in paths:
+        for rule in rules:
+            if fnmatch.fnmatch(path, rule.pattern):
+                out.extend(s for s in rule.stages if s not in out)
+    return out
+
+
+def ignored(path: str) -> bool:
+    return any(fnmatch.fnmatch(path, pattern) for pattern in IGNORE)
+
+
+def _rel(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+# === Watchers ================================================================
+
+class InotifyWatcher:
+    """Recursive inotify watch over a set of directories."""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, roots: Sequence[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify not available")
+        self._libc = libc
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: Dict[int, Path] = {}
+        for root in roots:
+            for dirpath, dirnames, _ in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".") and d != "__pycache__"]
+                self._add(Path(dirpath))
+
+    def _add(self, path: Path) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd >= 0:
+            self.dirs[wd] = path
+
+    def changes(self, timeout: Optional[float]) -> Set[str]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        out: Set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            base = self.dirs.get(wd)
+            if base is None or not name:
+                continue
+            path = base / name
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._add(path)
+                continue
+            out.add(_rel(path))
+        return out
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """mtime/size scan of the watched trees every interval seconds."""
+
+    def __init__(self, roots: Sequence[Path], interval: float = 1.0):
+        self.roots = list(roots)
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        out: Dict[str, Tuple[int, int]] = {}
+        for root in self.roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".") and d != "__pycache__"]
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    out[path] = (st.st_mtime_ns, st.st_size)
+        return out
+
+    def changes(self, timeout: Optional[float]) -> Set[str]:
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        current = self._scan()
+        changed = {p for p, stamp in current.items() if self.snapshot.get(p) != stamp}
+        changed |= self.snapshot.keys() - current.keys()
+        self.snapshot = current
+        return {_rel(Path(p)) for p in changed}
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(roots: Sequence[Path], poll: bool = False, interval: float = 1.0):
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except OSError as e:
+            print(f"⚠️  inotify unavailable ({e}), polling every {interval:g} s")
+    return PollingWatcher(roots, interval)
+
+
+def debounced(watcher, quiet: float, max_wait: float) -> Iterable[Set[str]]:
+    """Yield batches of changed paths once the tree has been quiet for `quiet` seconds."""
+    while True:
+        batch = {p for p in watcher.changes(None) if not ignored(p)}
+        if not batch:
+            continue
+        first = time.monotonic()
+        while True:
+            remaining = min(quiet, max_wait - (time.monotonic() - first))
+            if remaining <= 0:
+                break
+            more = {p for p in watcher.changes(remaining) if not ignored(p)}
+            if not more:
+                break
+            batch |= more
+        yield batch
+
+
+# === Running =================================================================
+
+def run_check(layout: str) -> Tuple[str, str]:
+    """Run the consistency check; (status, short detail)."""
+    import vikingboard_consistency as vc
+
+    argv = ["--layout", layout, "--json", "--no-lcsc-lookup"]
+    proc = subprocess.run([sys.executable, vc.__file__] + argv, cwd=REPO_ROOT, capture_output=True, text=True)
+    try:
+        issues = json.loads(proc.stdout)
+    except ValueError:
+        return "failed", (proc.stderr or proc.stdout).strip()[-200:]
+    errors = sum(1 for i in issues if i["severity"] == "error")
+    if not issues:
+        return "ran", "all files agree"
+    return ("failed" if errors else "ran"), f"{errors} error(s), {len(issues) - errors} warning(s)"
+
+
+def run_stages(stages: List[str], layout: str) -> List[dict]:
+    report: List[dict] = []
+    pipeline_stages = [s for s in stages if s != CHECK]
+    if pipeline_stages:
+        report += Pipeline(layout=layout).run(pipeline_stages)
+    if CHECK in stages:
+        t0 = time.perf_counter()
+        status, detail = run_check(layout)
+        report.append({"stage": CHECK, "status": status, "seconds": time.perf_counter() - t0, "detail": detail})
+    return report
+
+
+def outputs_of(stages: Iterable[str], layout: str) -> Set[str]:
+    """Repo-relative outputs of the given stages, so our own writes don't retrigger."""
+    by_name = {s.name: s for s in STAGES}
+    values = dict(LAYOUTS[layout])
+    return {o.format(**values) for name in stages if name in by_name for o in by_name[name].outputs}
+
+
+_ICON = {"ran": "✅", "skipped": "⏭️ ", "failed": "❌", "blocked": "⛔", "no tool": "⚠️ "}
+
+
+def summary(changed: Sequence[str], report: List[dict], seconds: float) -> str:
+    parts = []
+    for r in report:
+        text = f"{_ICON.get(r['status'], '•')} {r['stage']}"
+        if r["status"] == "no tool":
+            text += " (no tool)"
+        elif r["stage"] == CHECK and r.get("detail"):
+            text += f" ({r['detail']})"
+        parts.append(text)
+    files = ", ".join(sorted(changed)[:3]) + (f" +{len(changed) - 3}" if len(changed) > 3 else "")
+    return f"[{time.strftime('%H:%M:%S')}] {files} -> {'  '.join(parts)}  [{seconds:.1f} s]"
+
+
+def notify(text: str) -> None:
+    if shutil.which("notify-send"):
+        subprocess.run(["notify-send", "VikingBoard", text], check=False)
+    elif shutil.which("osascript"):
+        script = f'display notification {json.dumps(text)} with title "VikingBoard"'
+        subprocess.run(["osascript", "-e", script], check=False)
+
+
+def write_status(changed: Sequence[str], report: List[dict], line: str) -> None:
+    STATUS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    data = {"time": time.time(), "changed": sorted(changed), "stages": report, "summary": line}
+    mask = os.umask(0)
+    os.umask(mask)
+    # Unique temp name (still *.tmp, so the watcher ignores it); mkstemp creates 0600
+    fd, tmp = tempfile.mkstemp(dir=STATUS_PATH.parent, prefix=".watch_status.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.chmod(tmp, 0o666 & ~mask)
+        os.replace(tmp, STATUS_PATH)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def handle(changed: Set[str], layout: str, push: bool) -> Set[str]:
+    """Run what changed implies; return the outputs we wrote."""
+    stages = stages_for(sorted(changed))
+    if not stages:
+        return set()
+    t0 = time.perf_counter()
+    report = run_stages(stages, layout)
+    line = summary(sorted(changed), report, time.perf_counter() - t0)
+    print(line, flush=True)
+    write_status(sorted(changed), report, line)
+    if push:
+        notify(line.split("] ", 1)[-1])
+    return outputs_of([r["stage"] for r in report if r["status"] == "ran"], layout)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Watch the design and rerun affected pipeline stages")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), default="production")
+    parser.add_argument("--poll", action="store_true", help="use mtime polling instead of inotify")
+    parser.add_argument("--interval", type=float, default=1.0, help="polling interval in seconds")
+    parser.add_argument("--debounce", type=float, default=0.5, help="quiet time before running")
+    parser.add_argument("--max-wait", type=float, default=5.0, help="run at the latest this long after the first event")
+    parser.add_argument("--notify", action="store_true", help="push the summary as a desktop notification")
+    parser.add_argument("--initial", action="store_true", help="bring every watched stage up to date at start")
+    args = parser.parse_args(argv)
+
+    roots = [REPO_ROOT / d for d in WATCH_DIRS if (REPO_ROOT / d).is_dir()]
+    watcher = open_watcher(roots, poll=args.poll, interval=args.interval)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"👀 Watching {', '.join(_rel(r) for r in roots)} ({kind}, layout {args.layout}); Ctrl-C to stop")
+
+    own: Set[str] = set()
+    if args.initial:
+        own = handle({rule.pattern for rule in RULES if "*" not in rule.pattern}, args.layout, args.notify)
+    try:
+        for batch in debounced(watcher, args.debounce, args.max_wait):
+            batch -= own
+            own = handle(batch, args.layout, args.notify) if batch else set()
+    except KeyboardInterrupt:
+        print("\n[INFO] Watcher stopped")
+    finally:
+        watcher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())